@@ -1,5 +1,7 @@
 import os
 import json
+from functools import lru_cache
+import numpy as np
 
 this_directory = os.path.abspath(os.path.dirname(__file__))
 
@@ -19,40 +21,35 @@ class JSPLIBInstance:
         self.path = instance['path']
 
     def jsplib_to_jobshop(self):
-        file = open(os.path.join(this_directory, "data/jobshop/%s" % self.path), 'r')
-        split_lines = []
-        lines = file.readlines()
-        processed_line = 0
-        problem = []
-        for line in lines:
-            if not (line.startswith("#")):
-                split_line = line.split()
-                job = []
-                if processed_line == 0:
-                    if not (int(split_line[0]) == self.n_jobs
-                            and int(split_line[1]) == self.n_machines):
-                        exit(1)
-                else:
-                    for num, n in enumerate(split_line):
-                        if num % 2 == 0:
-                            machine = int(n)
-                        else:
-                            job.append({"machine_id": machine, "processing_time": int(n)})
-                    problem.append(job)
-                processed_line += 1
-        return problem
+        with open(os.path.join(this_directory, "data/jobshop/%s" % self.path), 'r') as file:
+            lines = [line for line in file.readlines() if not line.startswith("#") and line.strip()]
+        header = lines[0].split()
+        if not (int(header[0]) == self.n_jobs
+                and int(header[1]) == self.n_machines):
+            exit(1)
+        # one line per job of n_machines (machine_id, processing_time) pairs, read in one go
+        operations = np.fromstring(" ".join(lines[1:]), dtype=np.int64, sep=" ")
+        operations = operations.reshape((self.n_jobs, self.n_machines, 2)).tolist()
+        return [[{"machine_id": machine, "processing_time": processing_time}
+                 for machine, processing_time in job]
+                for job in operations]
+
+
+@lru_cache(maxsize=1)
+def load_instances_json():
+    # content of data/jobshop/instances.json, read once
+    with open(os.path.join(this_directory, "data/jobshop/instances.json"), "r") as file:
+        return json.load(file)
 
 
 def instance_names():
-    file = open(os.path.join(this_directory, "data/jobshop/instances.json"), "r")
-    data = json.load(file)
+    data = load_instances_json()
     instance = [inst["name"] for inst in data]
     return instance
 
 
 def instance_opti():
-    file = open(os.path.join(this_directory, "data/jobshop/instances.json"), "r")
-    data = json.load(file)
+    data = load_instances_json()
     optimum = {inst["name"]: inst["optimum"] for inst in data}
     return optimum
 
@@ -63,11 +60,9 @@ def create_jsplib_instance(instance_name) -> JSPLIBInstance:
     :param instance_name: name of a JSPlib instance of jobshop problem
     :return: an instance of type JSPLIBInstance that can be translated in a JobshopProblem
     """
-    file = open(os.path.join(this_directory, "data/jobshop/instances.json"), "r")
-    data = json.load(file)
+    data = load_instances_json()
     instance = [inst for inst in data if inst['name'] == instance_name]
     if len(instance) == 0:
         raise Exception("There is no instance named %s" % instance_name)
     instance = instance[0]
-    file.close()
     return JSPLIBInstance(instance)
@@ -0,0 +1,7 @@
+def warmup(verbose: bool = True):
+    """
+    Compile (or load from the numba cache) the sgs kernels of the rcpsp, preemptive and multiskill models,
+    see discrete_optimization.jit_warmup. Returns the time spent per model family.
+    """
+    from discrete_optimization.jit_warmup import warmup as warmup_kernels
+    return warmup_kernels(verbose=verbose)
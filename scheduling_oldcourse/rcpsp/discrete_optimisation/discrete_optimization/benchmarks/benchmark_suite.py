@@ -0,0 +1,482 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List, Callable, Any, Tuple, Optional
+import numpy as np
+from discrete_optimization.benchmarks.sgs_benchmark import get_psplib_families
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file, get_data_available
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, SingleModeRCPSPModel, MultiModeRCPSPModel, \
+    RCPSPSolution, ScheduleGenerationScheme, permutation_do_to_permutation_sgs_fast
+
+# root of the git repository (scheduling_oldcourse/rcpsp/discrete_optimisation/discrete_optimization/benchmarks/..)
+ROOT_REPOSITORY = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), *[".."]*5))
+PATH_ADVANCED = os.path.join(ROOT_REPOSITORY, "scheduling_newcourse", "data", "advanced")
+PATH_JSON_LOADER = os.path.join(ROOT_REPOSITORY, "scheduling_oldcourse", "rcpsp")
+PATH_JSPLIB_PARSER = os.path.join(ROOT_REPOSITORY, "scheduling_newcourse")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_history.json")
+JSPLIB_INSTANCES = ("ft06", "la01", "ft10", "abz5")
+PLAIN_RCPSP_CLASSES = (RCPSPModel, SingleModeRCPSPModel, MultiModeRCPSPModel)
+# metrics compared by the compare command, with the direction of improvement
+HIGHER_IS_BETTER = ("decodes_per_second", "evaluations_per_second")
+LOWER_IS_BETTER = ("time", "makespan", "peak_rss_mb")
+
+
+def peak_rss_mb() -> float:
+    # peak resident set size of the process (ru_maxrss is in kilobytes on linux, bytes on macos)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss/(1024*1024) if sys.platform == "darwin" else maxrss/1024
+
+
+def jobshop_to_rcpsp(jobs: List[List[Dict[str, int]]]) -> SingleModeRCPSPModel:
+    """
+    Rcpsp model of a jobshop instance (as returned by JSPLIBInstance.jsplib_to_jobshop) :
+    one task per operation, the operations of a job are chained, each machine is a resource of capacity 1.
+    """
+    machines = sorted(set(operation["machine_id"] for job in jobs for operation in job))
+    resources = {"machine_"+str(m): 1 for m in machines}
+    source, sink = 1, 2+sum(len(job) for job in jobs)
+    mode_details = {source: {1: {"duration": 0, **{r: 0 for r in resources}}},
+                    sink: {1: {"duration": 0, **{r: 0 for r in resources}}}}
+    successors = {source: [], sink: []}
+    task = 2
+    for job in jobs:
+        successors[source] += [task]
+        for operation in job:
+            mode_details[task] = {1: {"duration": operation["processing_time"],
+                                      **{r: 0 for r in resources}}}
+            mode_details[task][1]["machine_"+str(operation["machine_id"])] = 1
+            successors[task] = [task+1] if operation is not job[-1] else [sink]
+            task += 1
+    return SingleModeRCPSPModel(resources=resources,
+                                non_renewable_resources=[],
+                                mode_details=mode_details,
+                                successors=successors,
+                                horizon=sum(mode_details[t][1]["duration"] for t in mode_details))
+
+
+def load_benchmark_instances(nb_instances_per_family: int = 2,
+                             jsplib_instances=JSPLIB_INSTANCES,
+                             advanced_folder: str = PATH_ADVANCED) -> Dict[str, Any]:
+    """
+    Bundled instances used by the benchmark : the first nb_instances_per_family psplib instances of the j30, j60,
+    j120 and multimode families, the jsplib instances of jsplib_instances (converted with jobshop_to_rcpsp)
+    and the json instances of advanced_folder. The sources that are not found are skipped.
+    """
+    instances = {}
+    families = get_psplib_families()
+    families["mm"] = sorted([f for f in get_data_available() if f.endswith(".mm")])
+    for family in families:
+        for f in families[family][:nb_instances_per_family]:
+            instances["psplib/"+os.path.basename(f)] = parse_file(f)
+    if len(jsplib_instances) > 0 and os.path.exists(PATH_JSPLIB_PARSER):
+        if PATH_JSPLIB_PARSER not in sys.path:
+            sys.path.append(PATH_JSPLIB_PARSER)
+        from jsplib_parser import create_jsplib_instance
+        for name in jsplib_instances:
+            instances["jsplib/"+name] = jobshop_to_rcpsp(create_jsplib_instance(name).jsplib_to_jobshop())
+    if advanced_folder is not None and os.path.exists(advanced_folder):
+        if PATH_JSON_LOADER not in sys.path:
+            sys.path.append(PATH_JSON_LOADER)
+        from script_utils.json_format import load_any_json
+        for f in sorted(os.listdir(advanced_folder)):
+            if f.endswith(".json"):
+                instances["advanced/"+f[:-len(".json")]] = load_any_json(os.path.join(advanced_folder, f))
+    return instances
+
+
+def get_decoders(model) -> Dict[str, Tuple[Any, Callable]]:
+    """
+    sgs kernels of the model, name -> (model to decode with, function(permutation_task, modes_array)).
+    Covers the serial and parallel kernels of the plain rcpsp models, their batch version, the preemptive kernel,
+    and the kernel of the multiskill models.
+    """
+    decoders = {}
+    if type(model) in PLAIN_RCPSP_CLASSES:
+        for sgs in [ScheduleGenerationScheme.SERIAL_SGS, ScheduleGenerationScheme.PARALLEL_SGS]:
+            sgs_model = model.copy()
+            sgs_model.set_sgs(sgs)
+            decoders[sgs.name] = (sgs_model, sgs_model.func_sgs_array)
+            decoders[sgs.name+"_BATCH"] = (sgs_model, None)
+        from discrete_optimization.rcpsp.rcpsp_model_preemptive import get_rcpsp_modelp_preemptive
+        preemptive_model = get_rcpsp_modelp_preemptive(model)
+        decoders["PREEMPTIVE"] = (preemptive_model, preemptive_model.func_sgs)
+    from discrete_optimization.rcpsp_multiskill.rcpsp_multiskill import MS_RCPSPModel, \
+        priority_worker_per_task_do_to_permutation_sgs_fast
+    if isinstance(model, MS_RCPSPModel):
+        dummy = model.get_dummy_solution()
+        priority_worker = priority_worker_per_task_do_to_permutation_sgs_fast(model, dummy.priority_worker_per_task)
+        decoders["MULTISKILL"] = (model, lambda permutation_task, modes_array:
+                                  model.func_sgs(permutation_task=permutation_task,
+                                                 priority_worker_per_task=priority_worker,
+                                                 modes_array=modes_array))
+    return decoders
+
+
+def benchmark_decoders(model, nb_permutations: int = 500, seed: int = 0) -> Dict[str, float]:
+    """
+    Decodes per second of each sgs kernel of get_decoders on nb_permutations random permutations
+    (first mode of every task), the compilation being done before the measure.
+    """
+    rng = np.random.RandomState(seed)
+    results = {}
+    for name, (decoder_model, decoder) in get_decoders(model).items():
+        permutations = [rng.permutation(decoder_model.n_jobs_non_dummy) for i in range(nb_permutations)]
+        permutations_task = [permutation_do_to_permutation_sgs_fast(decoder_model, p) for p in permutations]
+        modes_array = np.zeros(decoder_model.n_jobs, dtype=np.int32)
+        if name.endswith("_BATCH"):
+            permutations_task = np.array(permutations_task, dtype=np.int32)
+            modes_arrays = np.zeros((nb_permutations, decoder_model.n_jobs), dtype=np.int32)
+            decoder_model.func_sgs_batch(permutations_task=permutations_task[:1], modes_arrays=modes_arrays[:1])
+            t = time.perf_counter()
+            decoder_model.func_sgs_batch(permutations_task=permutations_task, modes_arrays=modes_arrays)
+        else:
+            decoder(permutation_task=permutations_task[0], modes_array=modes_array)
+            t = time.perf_counter()
+            for permutation_task in permutations_task:
+                decoder(permutation_task=permutation_task, modes_array=modes_array)
+        results[name] = {"decodes_per_second": nb_permutations/(time.perf_counter()-t)}
+    return results
+
+
+def feasible_modes(model: MultiModeRCPSPModel, max_iteration: int = 1000) -> Optional[List[int]]:
+    """
+    Modes of the non dummy tasks respecting the non-renewable resources, None if none is found :
+    the mode of least non-renewable consumption (relative to the capacity) of every task, then the mode change
+    reducing the most the overconsumption, until there is none.
+    """
+    tasks = model.tasks_list_non_dummy
+    capacity = {res: max(1, model.get_max_resource_capacity(res)) for res in model.non_renewable_resources}
+
+    def overconsumption(modes):
+        return sum(max(0, sum(model.mode_details[t][modes[t]].get(res, 0) for t in tasks)-capacity[res])/capacity[res]
+                   for res in capacity)
+    modes = {t: min(model.mode_details[t], key=lambda m: sum(model.mode_details[t][m].get(res, 0)/capacity[res]
+                                                             for res in capacity))
+             for t in tasks}
+    current = overconsumption(modes)
+    for i in range(max_iteration):
+        if current == 0:
+            return [modes[t] for t in tasks]
+        best = None
+        for t in tasks:
+            for m in model.mode_details[t]:
+                if m != modes[t]:
+                    value = overconsumption({**modes, t: m})
+                    if value < current and (best is None or value < best[0]):
+                        best = (value, t, m)
+        if best is None:
+            return None
+        current, t, m = best
+        modes[t] = m
+    return None
+
+
+def benchmark_metaheuristics(model, nb_iteration: int = 2000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """
+    Evaluations per second and final makespan of SimulatedAnnealing, HillClimber (nb_iteration iterations,
+    one evaluation per iteration) and Ga (nb_iteration evaluations, permutation encoding),
+    with swap and partial shuffle mutations. The modes are fixed, to the first mode of every task or for
+    the multimode models to feasible_modes (the solvers are reported with an "error" entry when none is found).
+    Ga is skipped when deap is not installed.
+    """
+    import random
+    from discrete_optimization.generic_tools.do_problem import ParamsObjectiveFunction, ObjectiveHandling, \
+        ModeOptim, build_aggreg_function_and_params_objective
+    from discrete_optimization.generic_tools.ls.hill_climber import HillClimber
+    from discrete_optimization.generic_tools.ls.local_search import RestartHandlerLimit, ModeMutation
+    from discrete_optimization.generic_tools.ls.simulated_annealing import TemperatureSchedulingFactor, \
+        SimulatedAnnealing
+    from discrete_optimization.generic_tools.mutations.mixed_mutation import BasicPortfolioMutation
+    from discrete_optimization.generic_tools.mutations.permutation_mutations import PermutationSwap, \
+        PermutationPartialShuffleMutation
+    from discrete_optimization.rcpsp.mutations.mutation_rcpsp import PermutationMutationRCPSP
+    params_objective_function = ParamsObjectiveFunction(objective_handling=ObjectiveHandling.AGGREGATE,
+                                                        objectives=["makespan"],
+                                                        weights=[-1],
+                                                        sense_function=ModeOptim.MAXIMIZATION)
+    aggreg_sol, _, _ = build_aggreg_function_and_params_objective(model, params_objective_function)
+    results = {}
+    modes = None
+    if isinstance(model, MultiModeRCPSPModel):
+        # the first modes can violate the non-renewable resources, the makespan would be the infeasible one
+        modes = feasible_modes(model)
+        if modes is None:
+            return {name: {"error": "no mode assignment respecting the non-renewable resources found"}
+                    for name in ["SimulatedAnnealing", "HillClimber", "Ga"]}
+    for name in ["SimulatedAnnealing", "HillClimber"]:
+        random.seed(seed)
+        np.random.seed(seed)
+        dummy = model.get_dummy_solution()
+        if modes is not None:
+            dummy = RCPSPSolution(problem=model, rcpsp_permutation=dummy.rcpsp_permutation, rcpsp_modes=modes)
+        # permutation mutations of the rcpsp mutation catalog
+        list_mutation = [PermutationMutationRCPSP.build(model, dummy, nb_swap=3, other_mutation=PermutationSwap),
+                         PermutationMutationRCPSP.build(model, dummy, proportion=0.2,
+                                                        other_mutation=PermutationPartialShuffleMutation)]
+        mixed_mutation = BasicPortfolioMutation(list_mutation, np.ones((len(list_mutation))))
+        restart_handler = RestartHandlerLimit(200, cur_solution=dummy, cur_objective=aggreg_sol(dummy))
+        if name == "SimulatedAnnealing":
+            solver = SimulatedAnnealing(evaluator=model,
+                                        mutator=mixed_mutation,
+                                        restart_handler=restart_handler,
+                                        temperature_handler=TemperatureSchedulingFactor(temperature=2,
+                                                                                        restart_handler=
+                                                                                        restart_handler,
+                                                                                        coefficient=0.9999),
+                                        mode_mutation=ModeMutation.MUTATE,
+                                        params_objective_function=params_objective_function)
+        else:
+            solver = HillClimber(evaluator=model,
+                                 mutator=mixed_mutation,
+                                 restart_handler=restart_handler,
+                                 mode_mutation=ModeMutation.MUTATE,
+                                 params_objective_function=params_objective_function)
+        t = time.perf_counter()
+        result_storage = solver.solve(dummy, nb_iteration_max=nb_iteration)
+        duration = time.perf_counter()-t
+        results[name] = {"evaluations_per_second": nb_iteration/duration,
+                         "makespan": model.evaluate(result_storage.get_best_solution())["makespan"]}
+    try:
+        import deap
+    except ImportError:
+        return results
+    from discrete_optimization.generic_tools.ea.ga import Ga
+    random.seed(seed)
+    np.random.seed(seed)
+    if isinstance(model, MultiModeRCPSPModel):
+        # the permutation encoding of the multimode model is evaluated with its fixed modes
+        model = model.copy()
+        model.set_fixed_modes(modes)
+    ga = Ga(problem=model, encoding="rcpsp_permutation",
+            objective_handling=ObjectiveHandling.AGGREGATE, objectives=["makespan"], objective_weights=[-1],
+            pop_size=50, max_evals=nb_iteration, deap_verbose=False)
+    # number of individuals really evaluated (deap only evaluates the modified ones)
+    nb_evaluations = [0]
+    ga_map = ga._toolbox.map
+
+    def counting_map(func, individuals):
+        individuals = list(individuals)
+        nb_evaluations[0] += len(individuals)
+        return ga_map(func, individuals)
+    ga._toolbox.register("map", counting_map)
+    t = time.perf_counter()
+    result_storage = ga.solve()
+    duration = time.perf_counter()-t
+    results["Ga"] = {"evaluations_per_second": nb_evaluations[0]/duration,
+                     "makespan": model.evaluate(result_storage.get_best_solution())["makespan"]}
+    return results
+
+
+def benchmark_time_to_target(model, target_gap: float = 0.5, time_limit: int = 20) -> Dict[str, Dict[str, Any]]:
+    """
+    Time to reach a target makespan, (1+target_gap)*critical path length, for the CPM heuristic,
+    the CP solver (CP_RCPSP_MZN / CP_MRCPSP_MZN) and LNS_CP on the preemptive model, each given time_limit seconds.
+    "time" is the solve time when the makespan found reaches the target, None otherwise.
+    The CP based solvers need minizinc, they are reported with an "error" entry when it is not available.
+    """
+    from discrete_optimization.rcpsp.solver.cpm import CPM
+    cpm = CPM(model)
+    critical_path = cpm.run_classic_cpm()
+    target = int(math.ceil((1+target_gap)*cpm.map_node[critical_path[-1]]._EFD))
+    results = {}
+
+    def record(name, solve: Callable[[], Any], evaluation_model=model):
+        t = time.perf_counter()
+        try:
+            solution = solve()
+        except Exception as e:
+            results[name] = {"error": type(e).__name__+": "+str(e)[:200]}
+            return
+        duration = time.perf_counter()-t
+        makespan = evaluation_model.evaluate(solution)["makespan"] if solution is not None else None
+        results[name] = {"target": target,
+                         "makespan": makespan,
+                         "time": duration if makespan is not None and makespan <= target else None}
+
+    record("CPM", lambda: CPM(model).solve().get_best_solution())
+    if type(model) not in PLAIN_RCPSP_CLASSES:
+        return results
+
+    def solve_cp():
+        from discrete_optimization.generic_tools.cp_tools import ParametersCP
+        from discrete_optimization.rcpsp.solver.cp_solvers import CP_RCPSP_MZN, CP_MRCPSP_MZN
+        solver = CP_MRCPSP_MZN(model) if model.is_rcpsp_multimode() else CP_RCPSP_MZN(model)
+        solver.init_model()
+        parameters_cp = ParametersCP.default()
+        parameters_cp.TimeLimit = time_limit
+        return solver.solve(parameters_cp=parameters_cp).get_best_solution()
+    record("CP", solve_cp)
+
+    from discrete_optimization.rcpsp.rcpsp_model_preemptive import get_rcpsp_modelp_preemptive
+    preemptive_model = get_rcpsp_modelp_preemptive(model)
+
+    def solve_lns():
+        from discrete_optimization.generic_tools.cp_tools import ParametersCP
+        from discrete_optimization.generic_tools.lns_cp import LNS_CP
+        from discrete_optimization.generic_tools.lns_mip import TrivialInitialSolution
+        from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+        from discrete_optimization.generic_rcpsp_tools.solution_repair import NeighborRepairProblems
+        from discrete_optimization.rcpsp.solver.cp_solvers import CP_RCPSP_MZN_PREEMMPTIVE
+        cp_solver = CP_RCPSP_MZN_PREEMMPTIVE(preemptive_model)
+        cp_solver.init_model(max_time=preemptive_model.horizon)
+        parameters_cp = ParametersCP.default()
+        parameters_cp.TimeLimit = max(1, time_limit//10)
+        parameters_cp.TimeLimit_iter0 = max(1, time_limit//10)
+        dummy = preemptive_model.get_dummy_solution()
+        initial_solution = ResultStorage(list_solution_fits=[(dummy, cp_solver.aggreg_sol(dummy))],
+                                         mode_optim=cp_solver.params_objective_function.sense_function)
+        lns = LNS_CP(problem=preemptive_model,
+                     cp_solver=cp_solver,
+                     initial_solution_provider=TrivialInitialSolution(initial_solution),
+                     constraint_handler=NeighborRepairProblems(preemptive_model))
+        return lns.solve_lns(parameters_cp=parameters_cp, nb_iteration_lns=1000,
+                             max_time_seconds=time_limit).get_best_solution()
+    record("LNS_CP", solve_lns, evaluation_model=preemptive_model)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_REPOSITORY,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(nb_instances_per_family: int = 2,
+                  sections=("decoders", "metaheuristics", "time_to_target"),
+                  nb_permutations: int = 500,
+                  nb_iteration: int = 2000,
+                  time_limit: int = 20,
+                  target_gap: float = 0.5) -> Dict[str, Any]:
+    """
+    Run the sections of the benchmark on load_benchmark_instances, returns a record
+    {"date", "commit", "python", "numpy", "numba", "results": {section: {instance: {solver: {metric: value}}},
+    "loading": {"time": loading time of the instances}, "memory": {section: {"peak_rss_mb": after the section}}}}.
+    """
+    import numba
+    t = time.perf_counter()
+    instances = load_benchmark_instances(nb_instances_per_family)
+    results = {"loading": {"time": time.perf_counter()-t},
+               "memory": {"loading": {"peak_rss_mb": peak_rss_mb()}}}
+    for section in sections:
+        results[section] = {}
+        for name, model in instances.items():
+            print(section, name)
+            if section == "decoders":
+                results[section][name] = benchmark_decoders(model, nb_permutations=nb_permutations)
+            elif section == "metaheuristics":
+                results[section][name] = benchmark_metaheuristics(model, nb_iteration=nb_iteration)
+            elif section == "time_to_target":
+                results[section][name] = benchmark_time_to_target(model, target_gap=target_gap,
+                                                                  time_limit=time_limit)
+        results["memory"][section] = {"peak_rss_mb": peak_rss_mb()}
+    return {"date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": numba.__version__,
+            "results": results}
+
+
+def load_history(history_file: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, "r") as file:
+        return json.load(file)
+
+
+def append_to_history(record: Dict[str, Any], history_file: str = DEFAULT_HISTORY):
+    history = load_history(history_file)
+    history += [record]
+    with open(history_file, "w") as file:
+        json.dump(history, file, indent=1)
+
+
+def flatten_metrics(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    # {"a": {"b": {"time": 1.}}} -> {"a/b/time": 1.}
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, prefix+key+"/"))
+        else:
+            flat[prefix+key] = value
+    return flat
+
+
+def compare_records(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.2) -> List[Tuple[str, Any, Any]]:
+    """
+    Metrics of current that are worse than in baseline by more than threshold (relative),
+    the direction being given by the name of the metric (HIGHER_IS_BETTER, LOWER_IS_BETTER).
+    A time that became None (target not reached anymore) is a regression.
+    Returns the list of (metric, baseline value, current value).
+    """
+    baseline_metrics = flatten_metrics(baseline["results"])
+    current_metrics = flatten_metrics(current["results"])
+    regressions = []
+    for key in sorted(set(baseline_metrics).intersection(current_metrics)):
+        metric = key.split("/")[-1]
+        old, new = baseline_metrics[key], current_metrics[key]
+        if metric not in HIGHER_IS_BETTER and metric not in LOWER_IS_BETTER:
+            continue
+        if old is None:
+            continue
+        if new is None:
+            regressions += [(key, old, new)]
+        elif metric in HIGHER_IS_BETTER and new < old*(1-threshold):
+            regressions += [(key, old, new)]
+        elif metric in LOWER_IS_BETTER and new > old*(1+threshold):
+            regressions += [(key, old, new)]
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Performance benchmark of the sgs kernels and solvers")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="json history file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmark and append the results to the history")
+    run_parser.add_argument("--instances-per-family", type=int, default=2)
+    run_parser.add_argument("--sections", nargs="+", default=["decoders", "metaheuristics", "time_to_target"],
+                            choices=["decoders", "metaheuristics", "time_to_target"])
+    run_parser.add_argument("--nb-permutations", type=int, default=500)
+    run_parser.add_argument("--nb-iteration", type=int, default=2000)
+    run_parser.add_argument("--time-limit", type=int, default=20)
+    run_parser.add_argument("--target-gap", type=float, default=0.5)
+    compare_parser = subparsers.add_parser("compare", help="compare two runs of the history")
+    compare_parser.add_argument("--baseline", type=int, default=-2, help="index of the reference run in the history")
+    compare_parser.add_argument("--current", type=int, default=-1, help="index of the compared run in the history")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="relative degradation flagged")
+    args = parser.parse_args(args)
+    if args.command == "run":
+        record = run_benchmark(nb_instances_per_family=args.instances_per_family,
+                               sections=args.sections,
+                               nb_permutations=args.nb_permutations,
+                               nb_iteration=args.nb_iteration,
+                               time_limit=args.time_limit,
+                               target_gap=args.target_gap)
+        append_to_history(record, args.history)
+        print("Results added to ", args.history)
+        return 0
+    history = load_history(args.history)
+    if len(history) < 2:
+        print("Less than 2 runs in ", args.history)
+        return 0
+    baseline, current = history[args.baseline], history[args.current]
+    regressions = compare_records(baseline, current, threshold=args.threshold)
+    print("Baseline ", baseline["date"], baseline["commit"], " current ", current["date"], current["commit"])
+    for key, old, new in regressions:
+        print("REGRESSION ", key, " : ", old, " -> ", new)
+    print(len(regressions), " regressions above ", args.threshold)
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
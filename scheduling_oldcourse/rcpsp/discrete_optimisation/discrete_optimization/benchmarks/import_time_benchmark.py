@@ -0,0 +1,65 @@
+import os
+import sys
+import subprocess
+from typing import Dict, List
+
+# modules that the core model/solution path should only load on first use
+# (plots, EA, CP solvers, networkx graph algorithms, web service)
+LAZY_MODULES = ["matplotlib", "seaborn", "scipy.stats", "networkx", "shapely",
+                "deap", "minizinc", "mip", "cv2", "uvicorn", "fastapi"]
+CORE_MODULES = ["discrete_optimization.rcpsp.rcpsp_parser",
+                "discrete_optimization.rcpsp.rcpsp_model",
+                "discrete_optimization.rcpsp.rcpsp_model_preemptive",
+                "discrete_optimization.rcpsp_multiskill.rcpsp_multiskill",
+                "discrete_optimization.generic_tools.ls.simulated_annealing",
+                "discrete_optimization.generic_tools.ls.hill_climber"]
+
+
+def import_time(module: str) -> Dict[str, float]:
+    """
+    Import module in a fresh interpreter with python -X importtime,
+    returns the cumulative import time (in seconds) of each module loaded.
+    """
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = root+os.pathsep+env.get("PYTHONPATH", "")
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import "+module],
+                            env=env, capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)/1e6
+    return times
+
+
+def check_import_budget(modules: List[str] = None,
+                        budget_seconds: float = 1.,
+                        lazy_modules: List[str] = None):
+    """
+    Import time regression check : each module has to import in less than budget_seconds
+    and without loading any of the lazy_modules. Returns the list of failures (empty if ok).
+    """
+    if modules is None:
+        modules = CORE_MODULES
+    if lazy_modules is None:
+        lazy_modules = LAZY_MODULES
+    failures = []
+    for module in modules:
+        times = import_time(module)
+        loaded = [m for m in lazy_modules if m in times]
+        print(module, " : ", round(times[module], 3), " sec",
+              (", loads "+str(loaded)) if len(loaded) > 0 else "")
+        if times[module] > budget_seconds:
+            failures += [module+" imports in "+str(round(times[module], 3))+" sec > "+str(budget_seconds)]
+        if len(loaded) > 0:
+            failures += [module+" loads "+str(loaded)]
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_import_budget()
+    for f in failures:
+        print("FAILED : ", f)
+    sys.exit(1 if len(failures) > 0 else 0)
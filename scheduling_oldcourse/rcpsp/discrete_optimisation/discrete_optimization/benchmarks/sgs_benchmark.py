@@ -0,0 +1,74 @@
+import os
+import time
+from typing import List, Dict
+import numpy as np
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file, get_data_available
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, ScheduleGenerationScheme, \
+    permutation_do_to_permutation_sgs_fast
+
+
+def get_psplib_families(families=("j30", "j60", "j120")) -> Dict[str, List[str]]:
+    # bundled psplib single mode instances are named j301_1.sm, j601_1.sm, j1201_1.sm...
+    files = get_data_available()
+    return {family: sorted([f for f in files
+                            if os.path.basename(f).startswith(family+"1_") and f.endswith(".sm")])
+            for family in families}
+
+
+def benchmark_decoder(model: RCPSPModel,
+                      sgs: ScheduleGenerationScheme,
+                      permutations: np.array,
+                      modes: np.array):
+    model.set_sgs(sgs)
+    permutations_task = [permutation_do_to_permutation_sgs_fast(model, p) for p in permutations]
+    modes_array = np.array(model.build_mode_array(list(modes)), dtype=np.int32)-1
+    model.func_sgs_array(permutation_task=permutations_task[0], modes_array=modes_array)  # compilation
+    index_sink = model.index_task[model.sink_task]
+    makespans = []
+    t = time.perf_counter()
+    for permutation_task in permutations_task:
+        starts, ends, scheduled_order, unfeasible = model.func_sgs_array(permutation_task=permutation_task,
+                                                                         modes_array=modes_array)
+        makespans += [ends[index_sink]]
+    decode_time = (time.perf_counter()-t)/len(permutations_task)
+    return decode_time, np.array(makespans)
+
+
+def benchmark_serial_vs_parallel_sgs(nb_permutations: int = 200,
+                                     families=("j30", "j60", "j120"),
+                                     seed: int = 0):
+    """
+    Decode the same random permutations with the serial and the parallel sgs on the bundled psplib
+    instances, report the mean decode time, the mean makespan and the best makespan found
+    (i.e. quality of a random search with the same number of evaluations).
+    """
+    rng = np.random.RandomState(seed)
+    results = {}
+    for family, files in get_psplib_families(families).items():
+        results[family] = {}
+        for f in files:
+            model = parse_file(f)
+            permutations = np.array([rng.permutation(model.n_jobs_non_dummy) for i in range(nb_permutations)])
+            modes = np.ones(model.n_jobs_non_dummy, dtype=np.int32)
+            results[family][os.path.basename(f)] = {}
+            for sgs in [ScheduleGenerationScheme.SERIAL_SGS, ScheduleGenerationScheme.PARALLEL_SGS]:
+                decode_time, makespans = benchmark_decoder(model, sgs, permutations, modes)
+                results[family][os.path.basename(f)][sgs.name] = {"decode_time": decode_time,
+                                                                  "mean_makespan": float(np.mean(makespans)),
+                                                                  "best_makespan": int(np.min(makespans))}
+            model.set_sgs(ScheduleGenerationScheme.SERIAL_SGS)
+    for family in results:
+        print(family, "(", len(results[family]), " instances )")
+        for sgs in [ScheduleGenerationScheme.SERIAL_SGS, ScheduleGenerationScheme.PARALLEL_SGS]:
+            res = [results[family][f][sgs.name] for f in results[family]]
+            if len(res) == 0:
+                continue
+            print("   ", sgs.name,
+                  " decode time (ms) : ", round(1000*np.mean([r["decode_time"] for r in res]), 4),
+                  " mean makespan : ", round(np.mean([r["mean_makespan"] for r in res]), 2),
+                  " best makespan : ", round(np.mean([r["best_makespan"] for r in res]), 2))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_serial_vs_parallel_sgs()
@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+import subprocess
+import tempfile
+
+_startup_script = """
+import time, json
+t = time.perf_counter()
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file, get_data_available
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPSolution
+t_import = time.perf_counter()-t
+model = parse_file([f for f in get_data_available() if f.endswith("j301_1.sm")][0])
+t = time.perf_counter()
+model.evaluate(model.get_dummy_solution())
+t_first_evaluate = time.perf_counter()-t
+t = time.perf_counter()
+import discrete_optimization
+timings = discrete_optimization.warmup(verbose=False)
+t_warmup = time.perf_counter()-t
+print(json.dumps({"import": t_import, "first_evaluate": t_first_evaluate,
+                  "warmup": t_warmup, "warmup_detail": timings}))
+"""
+
+
+def run_startup(cache_dir: str):
+    env = dict(os.environ)
+    env["NUMBA_CACHE_DIR"] = cache_dir
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = root+os.pathsep+env.get("PYTHONPATH", "")
+    output = subprocess.run([sys.executable, "-c", _startup_script], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark_startup():
+    """
+    Startup time of a fresh process (import, first evaluation of a j30 instance, full warmup),
+    with an empty numba cache (cold) then with the cache written by the first run (warm).
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {"cold": run_startup(cache_dir),
+                   "warm": run_startup(cache_dir)}
+    for key in results:
+        print(key, " : import ", round(results[key]["import"], 3),
+              " sec, first evaluate ", round(results[key]["first_evaluate"], 3),
+              " sec, warmup ", round(results[key]["warmup"], 3), " sec")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_startup()
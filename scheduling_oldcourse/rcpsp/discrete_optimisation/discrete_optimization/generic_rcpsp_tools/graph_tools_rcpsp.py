@@ -20,25 +20,42 @@ class GraphRCPSP:
         self.problem = problem
         self.graph = self.problem.compute_graph()
         self.graph_nx = self.graph.graph_nx
-        self.ancestors_map = {}
-        self.descendants_map = {}
-        descendants = {n: nx.algorithms.descendants(self.graph_nx, n)
-                       for n in self.graph_nx.nodes()}
+        self.closure = self.graph.closure
+        self._ancestors_map = None
+        self._descendants_map = None
         self.source = self.problem.source_task
         self.sink = self.problem.sink_task
         self.all_activities = set(self.problem.tasks_list)
-        for k in descendants:
-            self.descendants_map[k] = {"succs": descendants[k],
-                                       "nb": len(descendants[k])}
-        ancestors = {n: nx.algorithms.ancestors(self.graph_nx, n)
-                     for n in self.graph_nx.nodes()}
-        for k in ancestors:
-            self.ancestors_map[k] = {"succs": ancestors[k],
-                                     "nb": len(ancestors[k])}
         self.graph_without_source_sink = nx.subgraph(self.graph_nx, [n for n in self.graph_nx
                                                                      if n not in {self.problem.sink_task,
                                                                                   self.problem.source_task}])
 
+    @property
+    def descendants_map(self):
+        # {task: {"succs": descendants, "nb": number of descendants}}, built from the closure on first use
+        # (from networkx when the precedence graph has a cycle and no closure)
+        if self._descendants_map is None:
+            if self.closure is None:
+                self._descendants_map = {n: {"succs": succs, "nb": len(succs)}
+                                         for n, succs in self.graph.descendants_map().items()}
+            else:
+                self._descendants_map = {n: {"succs": self.closure.descendants(n),
+                                             "nb": self.closure.nb_descendants(n)}
+                                         for n in self.closure.nodes}
+        return self._descendants_map
+
+    @property
+    def ancestors_map(self):
+        if self._ancestors_map is None:
+            if self.closure is None:
+                self._ancestors_map = {n: {"succs": succs, "nb": len(succs)}
+                                       for n, succs in self.graph.ancestors_map().items()}
+            else:
+                self._ancestors_map = {n: {"succs": self.closure.ancestors(n),
+                                           "nb": self.closure.nb_ancestors(n)}
+                                       for n in self.closure.nodes}
+        return self._ancestors_map
+
     def get_next_activities(self, task):
         return self.graph.get_neighbors(task)
 
@@ -46,10 +63,18 @@ class GraphRCPSP:
         return self.graph.get_predecessors(task)
 
     def get_descendants_activities(self, task):
-        return self.descendants_map.get(task, {"succs": set()})["succs"]
+        if self.closure is None:
+            return self.descendants_map.get(task, {"succs": set()})["succs"]
+        if task not in self.closure.index:
+            return set()
+        return self.closure.descendants(task)
 
     def get_ancestors_activities(self, task):
-        return self.ancestors_map.get(task, {"succs": set()})["succs"]
+        if self.closure is None:
+            return self.ancestors_map.get(task, {"succs": set()})["succs"]
+        if task not in self.closure.index:
+            return set()
+        return self.closure.ancestors(task)
 
     def check_loop(self):
         try:
@@ -103,11 +128,14 @@ class GraphRCPSPSpecialConstraints(GraphRCPSP):
 
 
 def build_unrelated_task(graph: GraphRCPSP):
-    ancestors = graph.ancestors_map
-    descendants = graph.descendants_map
-    all_tasks = set(descendants)
-    unrel = {n: all_tasks.difference(set(ancestors[n]["succs"]).union(set(descendants[n]["succs"])).union({n}))
-             for n in all_tasks}
+    if graph.closure is not None:
+        unrel = {n: graph.closure.unrelated(n) for n in graph.closure.nodes}
+    else:
+        ancestors = graph.ancestors_map
+        descendants = graph.descendants_map
+        all_tasks = set(descendants)
+        unrel = {n: all_tasks.difference(set(ancestors[n]["succs"]).union(set(descendants[n]["succs"])).union({n}))
+                 for n in all_tasks}
     set_pairs = set()
     for task in unrel:
         for other_task in unrel[task]:
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+from typing import Callable, List, Any, Dict, Tuple
+
+# (absolute path, parser) -> (modification time of the file, parsed instance)
+_instances_cache: Dict[Tuple[str, Any], Tuple[int, Any]] = {}
+
+
+def parse_any_file(path: str):
+    """
+    Default parser of load_instances, chosen on the extension of the file :
+    .npz -> rcpsp_binary_format.load_binary (model),
+    .def -> imopse multiskill instance, rcpsp_multiskill_parser.parse_file (model, new_name_to_original_task_id),
+    others -> psplib instance (.sm, .mm ...), rcpsp_parser.parse_file (model).
+    """
+    extension = os.path.splitext(path)[1]
+    if extension == ".npz":
+        from discrete_optimization.rcpsp.rcpsp_binary_format import load_binary
+        return load_binary(path)
+    if extension == ".def":
+        from discrete_optimization.rcpsp_multiskill.rcpsp_multiskill_parser import parse_file
+        return parse_file(path)
+    from discrete_optimization.rcpsp.rcpsp_parser import parse_file
+    return parse_file(path)
+
+
+def load_instances(paths: List[str],
+                   workers: int = 1,
+                   parser: Callable[[str], Any] = None,
+                   use_cache: bool = True) -> List[Any]:
+    """
+    Parse the instance files of paths, in a pool of workers processes when workers > 1.
+    parser : function path -> instance (parse_any_file if None), it should be picklable (module level function
+    or functools.partial of one) to be run in the pool.
+    The parsed instances are kept in memory per path and modification time of the file, a file that did not
+    change since its last loading is not parsed again and the same object is returned
+    (copy it before modifying it). use_cache=False always parses the files.
+    Returns the instances in the order of paths.
+    """
+    if parser is None:
+        parser = parse_any_file
+    keys = [(os.path.abspath(path), parser) for path in paths]
+    mtimes = [os.stat(path).st_mtime_ns for path in paths]
+    to_parse = [i for i in range(len(paths))
+                if not use_cache or keys[i] not in _instances_cache or _instances_cache[keys[i]][0] != mtimes[i]]
+    if workers > 1 and len(to_parse) > 1:
+        with multiprocessing.Pool(processes=min(workers, len(to_parse))) as p:
+            parsed = p.map(parser, [paths[i] for i in to_parse])
+    else:
+        parsed = [parser(paths[i]) for i in to_parse]
+    instances = {}
+    for i, instance in zip(to_parse, parsed):
+        instances[i] = instance
+        if use_cache:
+            _instances_cache[keys[i]] = (mtimes[i], instance)
+    return [instances[i] if i in instances else _instances_cache[keys[i]][1] for i in range(len(paths))]
+
+
+def clear_instances_cache():
+    _instances_cache.clear()
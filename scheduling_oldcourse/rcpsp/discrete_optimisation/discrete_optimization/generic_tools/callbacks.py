@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Union
+
+from discrete_optimization.generic_tools.do_problem import ModeOptim
+
+logger = logging.getLogger(__name__)
+
+
+class Callback:
+    """
+    Hooks called by the solvers (SimulatedAnnealing, HillClimber, Ga, Nsga, AlternatingGa, LNS_CP, LNS_MILP, CPM)
+    given with the callbacks keyword argument of their solve function.
+    on_solve_start : once at the beginning of the solve, mode_optim is the sense of the objective values
+    given to the other hooks (the aggregated fitness of the solver, e.g. deap fitness for Ga).
+    on_iteration : after each iteration (generation for the genetic algorithms, lns iteration...),
+    best_objective is None when the solver has no single best objective (Nsga).
+    on_new_best : when the solver finds a better solution than its incumbent.
+    should_stop : after each iteration, the solver stops when one of its callbacks returns True.
+    """
+    def on_solve_start(self, solver, mode_optim: ModeOptim):
+        pass
+
+    def on_iteration(self, solver, iteration: int, best_objective):
+        pass
+
+    def on_new_best(self, solver, iteration: int, solution, objective):
+        pass
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        return False
+
+    def remaining_time(self) -> Optional[float]:
+        # seconds before this callback stops the solver, None if it is not a time limit.
+        # used by the solvers calling a cp/milp solver to cut its time limit.
+        return None
+
+
+class CallbackList(Callback):
+    def __init__(self, callbacks: Union[None, Callback, List[Callback]] = None):
+        if callbacks is None:
+            callbacks = []
+        elif isinstance(callbacks, Callback):
+            callbacks = [callbacks]
+        self.callbacks = list(callbacks)
+
+    def append(self, callback: Callback):
+        self.callbacks.append(callback)
+
+    def on_solve_start(self, solver, mode_optim: ModeOptim):
+        for callback in self.callbacks:
+            callback.on_solve_start(solver, mode_optim)
+
+    def on_iteration(self, solver, iteration: int, best_objective):
+        for callback in self.callbacks:
+            callback.on_iteration(solver, iteration, best_objective)
+
+    def on_new_best(self, solver, iteration: int, solution, objective):
+        for callback in self.callbacks:
+            callback.on_new_best(solver, iteration, solution, objective)
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        # all the callbacks are asked, e.g. to log the reason of the stop.
+        stop = False
+        for callback in self.callbacks:
+            if callback.should_stop(solver, iteration):
+                stop = True
+        return stop
+
+    def remaining_time(self) -> Optional[float]:
+        remaining_times = [t for t in [callback.remaining_time() for callback in self.callbacks] if t is not None]
+        return min(remaining_times) if len(remaining_times) > 0 else None
+
+    def __len__(self):
+        return len(self.callbacks)
+
+
+def build_callbacks(callbacks: Union[None, Callback, List[Callback]] = None,
+                    max_time_seconds: Optional[float] = None) -> CallbackList:
+    """
+    CallbackList of the callbacks keyword argument of a solve function,
+    with a TimeLimitStopper when the solver is given max_time_seconds.
+    """
+    callback_list = CallbackList(callbacks)
+    if max_time_seconds is not None:
+        callback_list.append(TimeLimitStopper(max_time_seconds))
+    return callback_list
+
+
+class TimeLimitStopper(Callback):
+    """
+    Stops the solver max_time_seconds (wall clock) after the start of the solve.
+    """
+    def __init__(self, max_time_seconds: float):
+        self.max_time_seconds = max_time_seconds
+        self.start_time = None
+
+    def on_solve_start(self, solver, mode_optim: ModeOptim):
+        self.start_time = time.perf_counter()
+
+    def remaining_time(self) -> Optional[float]:
+        if self.start_time is None:
+            return self.max_time_seconds
+        return self.max_time_seconds - (time.perf_counter() - self.start_time)
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        if self.remaining_time() <= 0:
+            logger.info("Stop : time limit of %s seconds reached", self.max_time_seconds)
+            return True
+        return False
+
+
+class StagnationStopper(Callback):
+    """
+    Stops the solver after nb_iteration_no_improvement iterations without new best solution.
+    """
+    def __init__(self, nb_iteration_no_improvement: int):
+        self.nb_iteration_no_improvement = nb_iteration_no_improvement
+        self.last_improvement = 0
+
+    def on_solve_start(self, solver, mode_optim: ModeOptim):
+        self.last_improvement = 0
+
+    def on_new_best(self, solver, iteration: int, solution, objective):
+        self.last_improvement = iteration
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        if iteration - self.last_improvement >= self.nb_iteration_no_improvement:
+            logger.info("Stop : %s iterations without improvement", self.nb_iteration_no_improvement)
+            return True
+        return False
+
+
+class TargetObjectiveStopper(Callback):
+    """
+    Stops the solver when its best objective reaches target, or is within relative_gap of it
+    (e.g. target = lower bound of the makespan, relative_gap=0.01 to stop at 1% of the bound).
+    The target is in the sense and scale of the objective given by the solver to its callbacks
+    (for Ga, the deap fitness : objective_weights * objectives).
+    """
+    def __init__(self, target: float, relative_gap: float = 0.):
+        self.target = target
+        self.relative_gap = relative_gap
+        self.mode_optim = ModeOptim.MAXIMIZATION
+        self.reached = False
+
+    def on_solve_start(self, solver, mode_optim: ModeOptim):
+        self.mode_optim = mode_optim
+        self.reached = False
+
+    def on_iteration(self, solver, iteration: int, best_objective):
+        if best_objective is None:
+            return
+        tolerance = self.relative_gap * abs(self.target)
+        if self.mode_optim == ModeOptim.MAXIMIZATION:
+            self.reached = best_objective >= self.target - tolerance
+        else:
+            self.reached = best_objective <= self.target + tolerance
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        if self.reached:
+            logger.info("Stop : target objective %s reached", self.target)
+        return self.reached
+
+
+class CancellationStopper(Callback):
+    """
+    Stops the solver when cancel() is called (e.g. from another thread), or when the given event is set.
+    """
+    def __init__(self, event: threading.Event = None):
+        self.event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        if self.event.is_set():
+            logger.info("Stop : cancelled")
+            return True
+        return False
+
+
+class SubSolverCallback(Callback):
+    """
+    Given to the solvers run inside another solver (e.g. the Ga of AlternatingGa),
+    they stop when the should_stop of the callbacks of the parent solver says so.
+    """
+    def __init__(self, parent_solver, parent_callbacks: CallbackList, parent_iteration: int = 0):
+        self.parent_solver = parent_solver
+        self.parent_callbacks = parent_callbacks
+        self.parent_iteration = parent_iteration
+
+    def should_stop(self, solver, iteration: int) -> bool:
+        return self.parent_callbacks.should_stop(self.parent_solver, self.parent_iteration)
+
+    def remaining_time(self) -> Optional[float]:
+        return self.parent_callbacks.remaining_time()
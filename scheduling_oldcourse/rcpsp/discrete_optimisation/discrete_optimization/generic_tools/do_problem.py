@@ -1,7 +1,8 @@
 from enum import Enum
 from abc import abstractmethod
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional, Hashable
 from discrete_optimization.generic_tools.result_storage.multiobj_utils import TupleFitness
+from discrete_optimization.generic_tools.evaluation_cache import EvaluationCache
 import numpy as np
 
 
@@ -75,6 +76,8 @@ class ObjectiveRegister:
 
 
 class Solution:
+    __slots__ = ()
+
     @abstractmethod
     def copy(self):
         ...
@@ -125,6 +128,106 @@ class Problem:
     def get_objective_register(self) -> ObjectiveRegister:
         ...
 
+    # Set by generic_tools.profiling.SolverProfiler.start_run during a profiled solve,
+    # problems can time their inner phases with it (e.g. the sgs decoding of rcpsp).
+    profiler = None
+
+    # Opt-in evaluation cache, used by the metaheuristics (Ga, Nsga, SimulatedAnnealing, HillClimber)
+    # through evaluate_cached and evaluate_from_encoding(_batch)_cached.
+    # Without enable_evaluation_cache, those functions just call the non cached ones.
+    def enable_evaluation_cache(self, max_size: int = 10000):
+        self.evaluation_cache = EvaluationCache(max_size=max_size)
+
+    def disable_evaluation_cache(self):
+        self.evaluation_cache = None
+
+    def clear_evaluation_cache(self):
+        # to call when something else than the encoding changes the evaluation (e.g. fixed attributes)
+        if getattr(self, "evaluation_cache", None) is not None:
+            self.evaluation_cache.clear()
+
+    def get_evaluation_cache_key(self, variable: Solution) -> Optional[Hashable]:
+        # None means that the evaluation of this solution is not cached,
+        # problems supporting the cache override it with a cheap key of the solution encoding.
+        return None
+
+    def get_evaluation_cache_state(self, variable: Solution) -> Any:
+        # what is stored along the objective values to restore an evaluated solution (e.g. its schedule)
+        return None
+
+    def set_evaluation_cache_state(self, variable: Solution, state: Any):
+        pass
+
+    def get_evaluation_cache_key_from_encoding(self, int_vector, encoding_name: str) -> Optional[Hashable]:
+        return encoding_name, np.asarray(int_vector).tobytes()
+
+    def evaluate_cached(self, variable: Solution, evaluate_function=None) -> Dict[str, float]:
+        if evaluate_function is None:
+            evaluate_function = self.evaluate
+        cache = getattr(self, "evaluation_cache", None)
+        key = self.get_evaluation_cache_key(variable) if cache is not None else None
+        if key is None:
+            return evaluate_function(variable)
+        entry = cache.get(key)
+        if entry is not None:
+            self.set_evaluation_cache_state(variable, entry[1])
+            return dict(entry[0])
+        values = evaluate_function(variable)
+        cache.put(key, (dict(values), self.get_evaluation_cache_state(variable)))
+        return values
+
+    def evaluate_from_encoding_cached(self, int_vector, encoding_name: str) -> Dict[str, float]:
+        cache = getattr(self, "evaluation_cache", None)
+        key = self.get_evaluation_cache_key_from_encoding(int_vector, encoding_name) if cache is not None else None
+        if key is None:
+            return self.evaluate_from_encoding(int_vector, encoding_name)
+        values = cache.get(key)
+        if values is not None:
+            return dict(values)
+        values = self.evaluate_from_encoding(int_vector, encoding_name)
+        if values is not None:
+            cache.put(key, dict(values))
+        return values
+
+    def evaluate_from_encoding_batch_cached(self, int_vectors, encoding_name: str) -> List[Dict[str, float]]:
+        int_vectors = list(int_vectors)
+        cache = getattr(self, "evaluation_cache", None)
+        if cache is None:
+            return self._evaluate_from_encoding_batch_or_loop(int_vectors, encoding_name)
+        results = [None] * len(int_vectors)
+        index_to_compute = []
+        key_to_indexes = {}
+        for i in range(len(int_vectors)):
+            key = self.get_evaluation_cache_key_from_encoding(int_vectors[i], encoding_name)
+            if key is None:
+                index_to_compute += [(i, None)]
+            elif key in key_to_indexes:
+                # same individual twice in the batch, it is decoded once.
+                key_to_indexes[key] += [i]
+                cache.hits += 1
+            else:
+                values = cache.get(key)
+                if values is not None:
+                    results[i] = dict(values)
+                else:
+                    key_to_indexes[key] = [i]
+                    index_to_compute += [(i, key)]
+        if len(index_to_compute) > 0:
+            computed = self._evaluate_from_encoding_batch_or_loop([int_vectors[i] for i, key in index_to_compute],
+                                                                  encoding_name)
+            for (i, key), values in zip(index_to_compute, computed):
+                results[i] = values
+                if key is not None and values is not None:
+                    cache.put(key, dict(values))
+                    for j in key_to_indexes[key][1:]:
+                        results[j] = dict(values)
+        return results
+
+    def _evaluate_from_encoding_batch_or_loop(self, int_vectors, encoding_name: str):
+        if hasattr(self, "evaluate_from_encoding_batch"):
+            return self.evaluate_from_encoding_batch(int_vectors, encoding_name)
+        return [self.evaluate_from_encoding(int_vector, encoding_name) for int_vector in int_vectors]
+
 
 class BaseMethodAggregating(Enum):
     MEAN = 0
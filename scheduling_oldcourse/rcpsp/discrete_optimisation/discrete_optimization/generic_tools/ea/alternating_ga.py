@@ -1,5 +1,4 @@
 from discrete_optimization.generic_tools.do_problem import Problem, EncodingRegister, TypeAttribute, ObjectiveHandling
-from deap import creator, base, tools, algorithms
 import random
 from typing import Union, Optional, Any, Dict, List
 import numpy as np
@@ -10,6 +9,7 @@ from discrete_optimization.generic_tools.result_storage.result_storage import Re
 from discrete_optimization.generic_tools.do_problem import build_evaluate_function_aggregated, ParamsObjectiveFunction, \
     ModeOptim, get_default_objective_setup, build_aggreg_function_and_params_objective
 from discrete_optimization.generic_tools.ea.ga import DeapMutation, DeapSelection, DeapCrossover, Ga
+from discrete_optimization.generic_tools.callbacks import build_callbacks, SubSolverCallback
 
 
 class AlternatingGa:
@@ -64,6 +64,12 @@ class AlternatingGa:
         # Initialise the population (here at random)
         count_evals = 0
         current_encoding_index = 0
+        # optional generic_tools.callbacks.Callback(s) (and max_time_seconds), called after each Ga run,
+        # they can also stop a Ga run in the middle.
+        callbacks = build_callbacks(kwargs.get("callbacks", None), kwargs.get("max_time_seconds", None))
+        callbacks.on_solve_start(self, self.params_objective_function.sense_function)
+        best_objective = None
+        iteration = 0
         for i in range(len(self.encodings)):
             self.problem.set_fixed_attributes(self.encodings[i], self.problem.get_dummy_solution())
         while count_evals < self.max_evals:
@@ -74,10 +80,22 @@ class AlternatingGa:
                            objective_weights=self.objective_weights,
                            mutation=self.mutations[current_encoding_index],
                            max_evals=self.sub_evals[current_encoding_index])
-            tmp_sol = ga_solver.solve().get_best_solution()
+            tmp_sol = ga_solver.solve(callbacks=SubSolverCallback(self, callbacks, iteration)).get_best_solution()
             count_evals += self.sub_evals[current_encoding_index]
             # TODO: implement function below (1 in rcpsp domains, 1 in rcpsp solutions)
             self.problem.set_fixed_attributes(self.encodings[current_encoding_index], tmp_sol)
+            objective = self.aggreg_from_sol(tmp_sol)
+            if best_objective is None \
+                    or self.params_objective_function.sense_function == ModeOptim.MAXIMIZATION \
+                    and objective > best_objective \
+                    or self.params_objective_function.sense_function == ModeOptim.MINIMIZATION \
+                    and objective < best_objective:
+                best_objective = objective
+                callbacks.on_new_best(self, iteration, tmp_sol, objective)
+            callbacks.on_iteration(self, iteration, best_objective)
+            if callbacks.should_stop(self, iteration):
+                break
+            iteration += 1
         problem_sol = tmp_sol
         result_storage = ResultStorage(list_solution_fits=[(problem_sol,
                                                             self.aggreg_from_sol(problem_sol))],
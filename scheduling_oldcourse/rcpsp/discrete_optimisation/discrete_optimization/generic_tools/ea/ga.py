@@ -1,5 +1,4 @@
 from discrete_optimization.generic_tools.do_problem import Problem, EncodingRegister, TypeAttribute, ObjectiveHandling
-from deap import creator, base, tools, algorithms
 import random
 from typing import Union, Optional, Any, Dict, List
 import numpy as np
@@ -7,6 +6,8 @@ from enum import Enum
 from discrete_optimization.generic_tools.ea.deap_wrappers import generic_mutate_wrapper
 from discrete_optimization.generic_tools.do_mutation import Mutation
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.generic_tools.profiling import profile_toolbox
+from discrete_optimization.generic_tools.callbacks import build_callbacks
 from discrete_optimization.generic_tools.do_problem import build_evaluate_function_aggregated, ParamsObjectiveFunction, \
     ModeOptim, get_default_objective_setup, build_aggreg_function_and_params_objective
 
@@ -203,6 +204,7 @@ class Ga():
             self._selection_type = selection
 
         # DEAP toolbox setup
+        from deap import creator, base, tools, algorithms
         self._toolbox = base.Toolbox()
 
         # Define representation
@@ -244,6 +246,9 @@ class Ga():
             "evaluate",
             self.evaluate_problem,
         )
+        if hasattr(self.problem, "evaluate_from_encoding_batch"):
+            # the whole (invalid part of the) population is decoded in one call per generation
+            self._toolbox.register("map", self.map_evaluate_batch)
 
         # Define crossover
         if crossover is None:
@@ -311,7 +316,20 @@ class Ga():
 
     def evaluate_problem(self, int_vector):
         # encoding_name = self._encoding_name
-        objective_values = self.problem.evaluate_from_encoding(int_vector, self._encoding_variable_name)
+        objective_values = self.problem.evaluate_from_encoding_cached(int_vector, self._encoding_variable_name)
+        return self.objective_values_to_fitness(objective_values)
+
+    def map_evaluate_batch(self, func, individuals):
+        if func is not self._toolbox.evaluate:
+            return list(map(func, individuals))
+        individuals = list(individuals)
+        if len(individuals) == 0:
+            return []
+        objective_values_list = self.problem.evaluate_from_encoding_batch_cached(individuals,
+                                                                                 self._encoding_variable_name)
+        return [self.objective_values_to_fitness(objective_values) for objective_values in objective_values_list]
+
+    def objective_values_to_fitness(self, objective_values):
         if self._objective_handling == ObjectiveHandling.SINGLE:
             if (self._objectives is None) or (self._objectives[0] not in list(objective_values.keys())):
                 default_key = list(objective_values.keys())[0]
@@ -334,7 +352,24 @@ class Ga():
             pop.append(newind)
         return pop
 
-    def solve(self, **kwargs):
+    def _run_generations(self, **kwargs):
+        from deap import tools, algorithms
+        #  Define the statistics to collect at each generation
+        hof = tools.HallOfFame(1)
+        stats = tools.Statistics(lambda ind: ind.fitness.values)
+        stats.register("avg", np.mean)
+        stats.register("std", np.std)
+        stats.register("min", np.min)
+        stats.register("max", np.max)
+        logbook = tools.Logbook()
+        logbook.header = ["gen", "nevals"] + stats.fields
+
+        # optional generic_tools.callbacks.Callback(s) (and max_time_seconds), the objective given to them
+        # is the deap fitness (maximized). Started before the evaluation of the initial population, which is
+        # counted in the time limit.
+        callbacks = build_callbacks(kwargs.get("callbacks", None), kwargs.get("max_time_seconds", None))
+        callbacks.on_solve_start(self, ModeOptim.MAXIMIZATION)
+
         if self.initial_population is None:
             # Initialise the population (here at random)
             population = self._toolbox.population()
@@ -346,27 +381,61 @@ class Ga():
         for fit, ind in zip(fits, population):
             ind.fitness.values = fit
 
-        #  Define the statistics to collect at each generation
-        hof = tools.HallOfFame(1)
-        stats = tools.Statistics(lambda ind: ind.fitness.values)
-        stats.register("avg", np.mean)
-        stats.register("std", np.std)
-        stats.register("min", np.min)
-        stats.register("max", np.max)
+        # Run the GA, same generations as algorithms.eaSimple (the initial population is already evaluated)
+        # with a check of the callbacks between each of them.
+        hof.update(population)
+        record = stats.compile(population)
+        logbook.record(gen=0, nevals=len(population), **record)
+        if self._deap_verbose:
+            print(logbook.stream)
+        if len(callbacks) > 0:
+            callbacks.on_new_best(self, 0,
+                                  self.problem.get_solution_type()(**{self._encoding_variable_name: list(hof[0]),
+                                                                      'problem': self.problem}),
+                                  hof[0].fitness.values[0])
+        callbacks.on_iteration(self, 0, hof[0].fitness.values[0])
+        if callbacks.should_stop(self, 0):
+            return hof[0]
+        ngen = int(self._max_evals / self._pop_size)
+        for gen in range(1, ngen + 1):
+            offspring = self._toolbox.select(population, len(population))
+            offspring = algorithms.varAnd(offspring, self._toolbox, self._crossover_rate, self._mut_rate)
+            invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            fitnesses = self._toolbox.map(self._toolbox.evaluate, invalid_ind)
+            for ind, fit in zip(invalid_ind, fitnesses):
+                ind.fitness.values = fit
+            best_fitness = hof[0].fitness.values[0]
+            hof.update(offspring)
+            population[:] = offspring
+            record = stats.compile(population)
+            logbook.record(gen=gen, nevals=len(invalid_ind), **record)
+            if self._deap_verbose:
+                print(logbook.stream)
+            if hof[0].fitness.values[0] > best_fitness and len(callbacks) > 0:
+                callbacks.on_new_best(self, gen,
+                                      self.problem.get_solution_type()(**{self._encoding_variable_name: list(hof[0]),
+                                                                          'problem': self.problem}),
+                                      hof[0].fitness.values[0])
+            callbacks.on_iteration(self, gen, hof[0].fitness.values[0])
+            if callbacks.should_stop(self, gen):
+                break
+
+        return hof[0]
 
-        # Run the GA: final population and statistics logbook are created
-        pop_vector, logbook = algorithms.eaSimple(
-            population=population,
-            toolbox=self._toolbox,
-            cxpb=self._crossover_rate,
-            mutpb=self._mut_rate,
-            ngen=int(self._max_evals / self._pop_size),
-            stats=stats,
-            halloffame=hof,
-            verbose=self._deap_verbose,
-        )
-
-        best_vector = hof[0]
+    def solve(self, **kwargs):
+        # optional generic_tools.profiling.SolverProfiler timing the genetic operators and the evaluations,
+        # sampled once per generation.
+        profiler = kwargs.get("profiler", None)
+        if profiler is not None:
+            profiler.start_run(self.problem)
+            toolbox_functions = profile_toolbox(self._toolbox, profiler)
+        try:
+            best_vector = self._run_generations(**kwargs)
+        finally:
+            if profiler is not None:
+                for name, function in toolbox_functions.items():
+                    setattr(self._toolbox, name, function)
+                profiler.end_run()
 
         s_pure_int = [i for i in best_vector]
         kwargs = {self._encoding_variable_name: s_pure_int, 'problem': self.problem}
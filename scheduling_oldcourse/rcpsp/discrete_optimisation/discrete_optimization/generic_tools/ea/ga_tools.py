@@ -1,5 +1,4 @@
 from discrete_optimization.generic_tools.do_problem import Problem, EncodingRegister, TypeAttribute, ObjectiveHandling
-from deap import creator, base, tools, algorithms
 import random
 from typing import Union, Optional, Any, Dict, List
 import numpy as np
@@ -1,6 +1,5 @@
 from discrete_optimization.generic_tools.do_problem import Problem, EncodingRegister, TypeAttribute, ObjectiveHandling, \
     ParamsObjectiveFunction, ModeOptim, build_evaluate_function_aggregated
-from deap import creator, base, tools, algorithms
 import random
 from typing import Union, Optional, Any, Dict, List
 import numpy as np
@@ -9,6 +8,7 @@ from discrete_optimization.generic_tools.do_mutation import Mutation
 from discrete_optimization.generic_tools.ea.ga import DeapCrossover, DeapMutation, DeapSelection
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
 from discrete_optimization.generic_tools.result_storage.multiobj_utils import TupleFitness
+from discrete_optimization.generic_tools.callbacks import build_callbacks
 
 class Nsga():
     """NSGA
@@ -167,6 +167,7 @@ class Nsga():
             self._selection_type = selection
 
         nobj = len(self._objectives)
+        from deap import creator, base, tools, algorithms
         ref_points = tools.uniform_reference_points(nobj=nobj)
 
         # DEAP toolbox setup
@@ -205,6 +206,9 @@ class Nsga():
             "evaluate",
             self.evaluate_problem,
         )
+        if hasattr(self.problem, "evaluate_from_encoding_batch"):
+            # the whole (invalid part of the) population is decoded in one call per generation
+            self._toolbox.register("map", self.map_evaluate_batch)
 
         # Define crossover
         if crossover is None:
@@ -251,14 +255,26 @@ class Nsga():
         self._toolbox.register("select", tools.selNSGA3, ref_points=ref_points)
 
     def evaluate_problem(self, int_vector):
-        objective_values = self.problem.evaluate_from_encoding(int_vector, self._encoding_variable_name)
+        objective_values = self.problem.evaluate_from_encoding_cached(int_vector, self._encoding_variable_name)
         # print('objective_values:', objective_values)
         # val = tuple([objective_values[obj_name] for obj_name in objective_values.keys()])
         val = tuple([objective_values[obj_name] for obj_name in self._objectives])
 
         return val
 
+    def map_evaluate_batch(self, func, individuals):
+        if func is not self._toolbox.evaluate:
+            return list(map(func, individuals))
+        individuals = list(individuals)
+        if len(individuals) == 0:
+            return []
+        objective_values_list = self.problem.evaluate_from_encoding_batch_cached(individuals,
+                                                                                 self._encoding_variable_name)
+        return [tuple([objective_values[obj_name] for obj_name in self._objectives])
+                for objective_values in objective_values_list]
+
     def solve(self, **kwargs):
+        from deap import creator, base, tools, algorithms
 
         #  Define the statistics to collect at each generation
         stats = tools.Statistics(lambda ind: ind.fitness.values)
@@ -270,6 +286,11 @@ class Nsga():
         logbook = tools.Logbook()
         logbook.header = "gen", "evals", "std", "min", "avg", "max"
 
+        # optional generic_tools.callbacks.Callback(s) (and max_time_seconds), there is no single best objective
+        # in nsga, the callbacks only get the generations (best_objective None) and can stop the run.
+        callbacks = build_callbacks(kwargs.get("callbacks", None), kwargs.get("max_time_seconds", None))
+        callbacks.on_solve_start(self, self.params_objective_function.sense_function)
+
         # Initialise the population (here at random)
         pop = self._toolbox.population()
 
@@ -302,6 +323,9 @@ class Nsga():
             record = stats.compile(pop)
             logbook.record(gen=gen, evals=len(invalid_ind), **record)
             print(logbook.stream)
+            callbacks.on_iteration(self, gen, None)
+            if callbacks.should_stop(self, gen):
+                break
 
         sols = []
         for s in pop:
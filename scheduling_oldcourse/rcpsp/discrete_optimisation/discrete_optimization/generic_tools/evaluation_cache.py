@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from typing import Hashable, Any, Optional
+
+
+class EvaluationCache:
+    """
+    Bounded LRU cache of evaluations, see Problem.enable_evaluation_cache.
+    Keys are built by the problem from the encoding of the solutions (typically bytes of the encoding arrays),
+    values are whatever the problem needs to give back the evaluation without recomputing it.
+    """
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self.entries.get(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        # hits and misses are kept, they count over the whole life of the cache
+        self.entries.clear()
+
+    def hit_rate(self) -> float:
+        nb_calls = self.hits + self.misses
+        return self.hits / nb_calls if nb_calls > 0 else 0.
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return "Evaluation cache : " + str(len(self.entries)) + "/" + str(self.max_size) + " entries, " \
+               + str(self.hits) + " hits, " + str(self.misses) + " misses"
@@ -1,5 +1,5 @@
-import networkx as nx
-from typing import Dict, List, Any, Tuple, Hashable
+from typing import Dict, List, Any, Tuple, Hashable, Optional
+from discrete_optimization.generic_tools.transitive_closure import TransitiveClosure
 
 
 class Graph:
@@ -18,7 +18,9 @@ class Graph:
         self.build_nodes_infos_dict()
         self.build_edges()
         self.nodes_name = list(self.nodes_infos_dict)
-        self.graph_nx = self.to_networkx()
+        self._graph_nx = None
+        self._closure = None
+        self._closure_computed = False
         if compute_predecessors:
             self.full_predecessors = self.ancestors_map()
             self.full_successors = self.descendants_map()
@@ -66,13 +68,34 @@ class Graph:
     def get_attr_edge(self, node1, node2, attr):
         return self.edges_infos_dict.get((node1, node2), {}).get(attr, None)
 
+    @property
+    def graph_nx(self):
+        # networkx is only imported (and the networkx graph built) on first use
+        if self._graph_nx is None:
+            self._graph_nx = self.to_networkx()
+        return self._graph_nx
+
+    @property
+    def closure(self) -> Optional[TransitiveClosure]:
+        # bitset ancestors/descendants, None for undirected or cyclic graphs (networkx is then used)
+        if not self._closure_computed:
+            self._closure_computed = True
+            if not self.undirected:
+                try:
+                    self._closure = TransitiveClosure(self.nodes_name, self.edges_infos_dict.keys())
+                except ValueError:
+                    self._closure = None
+        return self._closure
+
     def to_networkx(self):
+        import networkx as nx
         graph_nx = nx.DiGraph() if not self.undirected else nx.Graph()
         graph_nx.add_nodes_from(self.nodes)
         graph_nx.add_edges_from(self.edges)
         return graph_nx
 
     def check_loop(self):
+        import networkx as nx
         try:
             cycles = nx.find_cycle(self.graph_nx, orientation='original')
         except:
@@ -80,17 +103,27 @@ class Graph:
         return cycles
 
     def precedessors_nodes(self, n):
+        if self.closure is not None:
+            return self.closure.ancestors(n)
+        import networkx as nx
         return nx.algorithms.ancestors(self.graph_nx, n)
 
     def ancestors_map(self):
+        if self.closure is not None:
+            return self.closure.ancestors_map()
+        import networkx as nx
         return {n: nx.algorithms.ancestors(self.graph_nx, n)
                 for n in self.graph_nx.nodes()}
 
     def descendants_map(self):
+        if self.closure is not None:
+            return self.closure.descendants_map()
+        import networkx as nx
         return {n: nx.algorithms.descendants(self.graph_nx, n)
                 for n in self.graph_nx.nodes()}
 
     def successors_map(self):
+        import networkx as nx
         return {n: list(nx.neighbors(self.graph_nx, n))
                 for n in self.graph_nx.nodes()}
 
@@ -100,6 +133,7 @@ class Graph:
 
 
 if __name__ == "__main__":
+    import networkx as nx
     nodes = [(0, {"name": 0}), (1, {"name":1})]
     edges = [(0, 1, {"weight": 1.1}), (1, 0, {"weight": 2})]
     graph = Graph(nodes, edges, False)
@@ -4,10 +4,12 @@ from discrete_optimization.generic_tools.do_problem import Solution, Problem, bu
     ParamsObjectiveFunction, ModeOptim, build_aggreg_function_and_params_objective
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
 from discrete_optimization.generic_tools.lns_mip import InitialSolution, PostProcessSolution, TrivialPostProcessSolution
-from abc import abstractmethod
+from discrete_optimization.generic_tools.profiling import NO_PROFILER
+from discrete_optimization.generic_tools.callbacks import build_callbacks
+from abc import ABC, abstractmethod
 from typing import Any, Iterable, Optional
 from datetime import timedelta
-from minizinc import Status
+import math
 import random
 from typing import Union, Iterable, Any, List
 import numpy as np
@@ -15,7 +17,7 @@ import numpy as np
 import time
 
 
-class ConstraintHandler:
+class ConstraintHandler(ABC):
     @abstractmethod
     def adding_constraint_from_results_store(self,
                                              cp_solver: CPSolver,
@@ -61,110 +63,138 @@ class LNS_CP(SolverDO):
                   skip_first_iteration: bool=False,
                   stop_first_iteration_if_optimal: bool=True,
                   **args)->ResultStorage:
+        from minizinc import Status
         sense = self.params_objective_function.sense_function
-        if max_time_seconds is None:
-            max_time_seconds = 3600*24  # One day
-        if nb_iteration_no_improvement is None:
-            nb_iteration_no_improvement = 2*nb_iteration_lns
-        current_nb_iteration_no_improvement = 0
-        deb_time = time.time()
-        if not skip_first_iteration:
-            store_lns = self.initial_solution_provider.get_starting_solution()
-            store_lns = self.post_process_solution.build_other_solution(store_lns)
-            init_solution, objective = store_lns.get_best_solution_fit()
-            satisfy = self.problem.satisfy(init_solution)
-            print("Satisfy Initial solution", satisfy)
-            try:
-                print("Nb task preempted = ", init_solution.get_nb_task_preemption())
-                print("Nb max preemption = ", init_solution.get_max_preempted())
-            except:
-                pass
-            best_objective = objective
-        else:
-            best_objective = float('inf') if sense == ModeOptim.MINIMIZATION else -float("inf")
-            store_lns = None
-        for iteration in range(nb_iteration_lns):
-            print('Starting iteration n°', iteration,
-                  " current objective ", best_objective)
-            with self.cp_solver.instance.branch() as child:
-                if iteration == 0 and not skip_first_iteration or iteration >= 1:
-                    constraint_iterable = self.constraint_handler \
-                        .adding_constraint_from_results_store(cp_solver=self.cp_solver,
-                                                              child_instance=child,
-                                                              result_storage=store_lns,
-                                                              last_result_store=
-                                                              store_lns if iteration == 0
-                                                              else result_store)
-                #if True:
+        # optional generic_tools.profiling.SolverProfiler timing the phases of the lns iterations
+        profiler = args.get("profiler", None) or NO_PROFILER
+        profiler.start_run(self.problem)
+        try:
+            # optional generic_tools.callbacks.Callback(s), max_time_seconds is a TimeLimitStopper among them,
+            # the time limit of the cp solves is cut to the remaining time.
+            callbacks = build_callbacks(args.get("callbacks", None), max_time_seconds)
+            callbacks.on_solve_start(self, sense)
+            # optional ls.parallel_local_search.IncumbentExchange, shares the best solution with the other workers
+            # of a ParallelLNS, a better shared solution is added to store_lns and becomes the next neighbourhood center.
+            incumbent_exchange = args.get("incumbent_exchange", None)
+            if nb_iteration_no_improvement is None:
+                nb_iteration_no_improvement = 2*nb_iteration_lns
+            current_nb_iteration_no_improvement = 0
+            if not skip_first_iteration:
+                with profiler.phase("initial_solution"):
+                    store_lns = self.initial_solution_provider.get_starting_solution()
+                with profiler.phase("post_process"):
+                    store_lns = self.post_process_solution.build_other_solution(store_lns)
+                init_solution, objective = store_lns.get_best_solution_fit()
+                satisfy = self.problem.satisfy(init_solution)
+                print("Satisfy Initial solution", satisfy)
                 try:
-                    if iteration == 0:
-                        result = child.solve(timeout=
-                                             timedelta(seconds=parameters_cp.TimeLimit_iter0),
-                                             intermediate_solutions=parameters_cp.intermediate_solution,
-                                             free_search=parameters_cp.free_search,
-                                             processes=None if not parameters_cp.multiprocess
-                                             else parameters_cp.nb_process)
-                    else:
-                        result = child.solve(timeout=
-                                             timedelta(seconds=parameters_cp.TimeLimit),
-                                             intermediate_solutions=parameters_cp.intermediate_solution,
-                                             free_search=parameters_cp.free_search,
-                                             processes=None if not parameters_cp.multiprocess
-                                             else parameters_cp.nb_process)
-                    result_store = self.cp_solver.retrieve_solutions(result,
-                                                                     parameters_cp=parameters_cp)
-                    print("iteration n°", iteration, "Solved !!!")
-                    print(result.status)
-                    if len(result_store.list_solution_fits) > 0:
-                        print("Solved !!!")
-                        bsol, fit = result_store.get_best_solution_fit()
-                        print("Fitness Before = ", fit)
-                        print("Satisfaction Before = ", self.problem.satisfy(bsol))
-                        print("Post Process..")
-                        result_store = self.post_process_solution.build_other_solution(result_store)
-                        bsol, fit = result_store.get_best_solution_fit()
-                        print("Satisfy after : ", self.problem.satisfy(bsol))
-                        if sense == ModeOptim.MAXIMIZATION and fit >= best_objective:
-                            if fit > best_objective:
-                                current_nb_iteration_no_improvement = 0
-                            else:
+                    print("Nb task preempted = ", init_solution.get_nb_task_preemption())
+                    print("Nb max preemption = ", init_solution.get_max_preempted())
+                except:
+                    pass
+                best_objective = objective
+            else:
+                best_objective = float('inf') if sense == ModeOptim.MINIMIZATION else -float("inf")
+                store_lns = None
+            for iteration in range(nb_iteration_lns):
+                print('Starting iteration n°', iteration,
+                      " current objective ", best_objective)
+                with self.cp_solver.instance.branch() as child:
+                    if iteration == 0 and not skip_first_iteration or iteration >= 1:
+                        with profiler.phase("constraints"):
+                            constraint_iterable = self.constraint_handler \
+                                .adding_constraint_from_results_store(cp_solver=self.cp_solver,
+                                                                      child_instance=child,
+                                                                      result_storage=store_lns,
+                                                                      last_result_store=
+                                                                      store_lns if iteration == 0
+                                                                      else result_store)
+                    #if True:
+                    try:
+                        time_limit = parameters_cp.TimeLimit_iter0 if iteration == 0 else parameters_cp.TimeLimit
+                        remaining_time = callbacks.remaining_time()
+                        if remaining_time is not None:
+                            time_limit = max(1, min(time_limit, math.ceil(remaining_time)))
+                        with profiler.phase("cp_solve"):
+                            result = child.solve(timeout=timedelta(seconds=time_limit),
+                                                 intermediate_solutions=parameters_cp.intermediate_solution,
+                                                 free_search=parameters_cp.free_search,
+                                                 processes=None if not parameters_cp.multiprocess
+                                                 else parameters_cp.nb_process)
+                        with profiler.phase("retrieve"):
+                            result_store = self.cp_solver.retrieve_solutions(result,
+                                                                             parameters_cp=parameters_cp)
+                        print("iteration n°", iteration, "Solved !!!")
+                        print(result.status)
+                        if len(result_store.list_solution_fits) > 0:
+                            print("Solved !!!")
+                            bsol, fit = result_store.get_best_solution_fit()
+                            print("Fitness Before = ", fit)
+                            print("Satisfaction Before = ", self.problem.satisfy(bsol))
+                            print("Post Process..")
+                            with profiler.phase("post_process"):
+                                result_store = self.post_process_solution.build_other_solution(result_store)
+                            bsol, fit = result_store.get_best_solution_fit()
+                            print("Satisfy after : ", self.problem.satisfy(bsol))
+                            if sense == ModeOptim.MAXIMIZATION and fit >= best_objective:
+                                if fit > best_objective:
+                                    current_nb_iteration_no_improvement = 0
+                                    callbacks.on_new_best(self, iteration, bsol, fit)
+                                else:
+                                    current_nb_iteration_no_improvement += 1
+                                best_objective = fit
+                            elif sense == ModeOptim.MAXIMIZATION:
                                 current_nb_iteration_no_improvement += 1
-                            best_objective = fit
-                        elif sense == ModeOptim.MAXIMIZATION:
-                            current_nb_iteration_no_improvement += 1
-                        elif sense == ModeOptim.MINIMIZATION and fit <= best_objective:
-                            if fit < best_objective:
-                                current_nb_iteration_no_improvement = 0
-                            else:
+                            elif sense == ModeOptim.MINIMIZATION and fit <= best_objective:
+                                if fit < best_objective:
+                                    current_nb_iteration_no_improvement = 0
+                                    callbacks.on_new_best(self, iteration, bsol, fit)
+                                else:
+                                    current_nb_iteration_no_improvement += 1
+                                best_objective = fit
+                            elif sense == ModeOptim.MINIMIZATION:
                                 current_nb_iteration_no_improvement += 1
-                            best_objective = fit
-                        elif sense == ModeOptim.MINIMIZATION:
-                            current_nb_iteration_no_improvement += 1
-                        if skip_first_iteration and iteration == 0:
-                            store_lns = result_store
+                            if skip_first_iteration and iteration == 0:
+                                store_lns = result_store
+                            else:
+                                with profiler.phase("store"):
+                                    for s, f in list(result_store.list_solution_fits):
+                                        store_lns.add_solution(solution=s, fitness=f)
                         else:
-                            for s, f in list(result_store.list_solution_fits):
-                                store_lns.add_solution(solution=s, fitness=f)
-                    else:
+                            current_nb_iteration_no_improvement += 1
+                        if skip_first_iteration \
+                                and result.status == Status.OPTIMAL_SOLUTION \
+                                and iteration == 0\
+                                and self.problem.satisfy(bsol)\
+                                and stop_first_iteration_if_optimal:
+                            print("Finish LNS because found optimal solution")
+                            break
+                    # else:
+                    except Exception as e:
                         current_nb_iteration_no_improvement += 1
-                    if skip_first_iteration \
-                            and result.status == Status.OPTIMAL_SOLUTION \
-                            and iteration == 0\
-                            and self.problem.satisfy(bsol)\
-                            and stop_first_iteration_if_optimal:
-                        print("Finish LNS because found optimal solution")
+                        print("Failed ! reason : ", e)
+                    if incumbent_exchange is not None and store_lns is not None \
+                            and (iteration+1) % incumbent_exchange.nb_iteration_sync == 0:
+                        with profiler.phase("exchange"):
+                            bsol, fit = store_lns.get_best_solution_fit()
+                            shared = incumbent_exchange.exchange(bsol, fit)
+                            if shared is not None:
+                                bsol, fit = shared
+                                store_lns.add_solution(solution=bsol, fitness=fit)
+                                best_objective = fit
+                                current_nb_iteration_no_improvement = 0
+                                callbacks.on_new_best(self, iteration, bsol, fit)
+                    profiler.end_iteration(iteration, best_objective)
+                    callbacks.on_iteration(self, iteration, best_objective)
+                    if callbacks.should_stop(self, iteration):
+                        print("Finish LNS, stopped by callbacks")
                         break
-                # else:
-                except Exception as e:
-                    current_nb_iteration_no_improvement += 1
-                    print("Failed ! reason : ", e)
-                if time.time() - deb_time > max_time_seconds:
-                    print("Finish LNS with time limit reached")
-                    break
-                print(current_nb_iteration_no_improvement, "/", nb_iteration_no_improvement)
-                if current_nb_iteration_no_improvement > nb_iteration_no_improvement:
-                    print("Finish LNS with maximum no improvement iteration ")
-                    break
+                    print(current_nb_iteration_no_improvement, "/", nb_iteration_no_improvement)
+                    if current_nb_iteration_no_improvement > nb_iteration_no_improvement:
+                        print("Finish LNS with maximum no improvement iteration ")
+                        break
+        finally:
+            profiler.end_run()
         return store_lns
 
     def solve(self, **kwargs) -> ResultStorage:
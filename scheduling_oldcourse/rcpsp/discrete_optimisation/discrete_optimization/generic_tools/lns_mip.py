@@ -3,8 +3,11 @@ from discrete_optimization.generic_tools.do_solver import SolverDO
 from discrete_optimization.generic_tools.do_problem import Solution, Problem, build_evaluate_function_aggregated, \
     ParamsObjectiveFunction, ModeOptim, build_aggreg_function_and_params_objective
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.generic_tools.callbacks import build_callbacks
 from abc import abstractmethod
 from typing import Any, Iterable, Optional
+import copy
+import math
 import time
 
 class ConstraintHandler:
@@ -92,12 +95,13 @@ class LNS_MILP(SolverDO):
                   skip_first_iteration: Optional[bool]=False,
                   **args)->ResultStorage:
         sense = self.params_objective_function.sense_function
-        if max_time_seconds is None:
-            max_time_seconds = 3600*24  # One day
+        # optional generic_tools.callbacks.Callback(s), max_time_seconds is a TimeLimitStopper among them,
+        # the time limit of the milp solves is cut to the remaining time.
+        callbacks = build_callbacks(args.pop("callbacks", None), max_time_seconds)
+        callbacks.on_solve_start(self, sense)
         if nb_iteration_no_improvement is None:
             nb_iteration_no_improvement = 2*nb_iteration_lns
         current_nb_iteration_no_improvement = 0
-        deb_time = time.time()
         if not skip_first_iteration:
             store_lns = self.initial_solution_provider.get_starting_solution()
             init_solution, objective = store_lns.get_best_solution_fit()
@@ -112,7 +116,12 @@ class LNS_MILP(SolverDO):
             constraint_iterable = {"empty": []}
             store_lns = None
         for iteration in range(nb_iteration_lns):
-            result_store = self.milp_solver.solve(parameters_milp=parameters_milp,
+            parameters_milp_iteration = parameters_milp
+            remaining_time = callbacks.remaining_time()
+            if remaining_time is not None and remaining_time < parameters_milp.TimeLimit:
+                parameters_milp_iteration = copy.copy(parameters_milp)
+                parameters_milp_iteration.TimeLimit = max(1, math.ceil(remaining_time))
+            result_store = self.milp_solver.solve(parameters_milp=parameters_milp_iteration,
                                                   **args)
             print("Solved !!!")
             bsol, fit = result_store.get_best_solution_fit()
@@ -124,6 +133,7 @@ class LNS_MILP(SolverDO):
             if sense == ModeOptim.MAXIMIZATION and fit >= best_objective:
                 if fit > best_objective:
                     current_nb_iteration_no_improvement = 0
+                    callbacks.on_new_best(self, iteration, bsol, fit)
                 else:
                     current_nb_iteration_no_improvement += 1
                 best_solution = bsol
@@ -131,6 +141,7 @@ class LNS_MILP(SolverDO):
             if sense == ModeOptim.MINIMIZATION and fit <= best_objective:
                 if fit < best_objective:
                     current_nb_iteration_no_improvement = 0
+                    callbacks.on_new_best(self, iteration, bsol, fit)
                 else:
                     current_nb_iteration_no_improvement += 1
                 best_solution = bsol
@@ -147,8 +158,9 @@ class LNS_MILP(SolverDO):
                                                                                                self.milp_solver,
                                                                                                result_storage=
                                                                                                result_store)
-            if time.time()-deb_time > max_time_seconds:
-                print("Finish LNS with time limit reached")
+            callbacks.on_iteration(self, iteration, best_objective)
+            if callbacks.should_stop(self, iteration):
+                print("Finish LNS, stopped by callbacks")
                 break
             if current_nb_iteration_no_improvement > nb_iteration_no_improvement:
                 print("Finish LNS with maximum no improvement iteration ")
@@ -0,0 +1,168 @@
+import multiprocessing
+import random
+import math
+import time
+from typing import Callable, Tuple, Optional, Union
+import numpy as np
+from discrete_optimization.generic_tools.do_problem import Problem, Solution, ModeOptim
+from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.generic_tools.ls.simulated_annealing import SimulatedAnnealing
+from discrete_optimization.generic_tools.ls.hill_climber import HillClimber
+
+
+class IncumbentExchange:
+    """
+    Given to SimulatedAnnealing.solve / HillClimber.solve (incumbent_exchange=...),
+    every nb_iteration_sync iterations the chain publishes its best solution if it is better than the shared one,
+    or gets the shared one when another chain found better.
+    The objective of the shared incumbent is in shared memory (multiprocessing.Value), so the check is cheap,
+    the solution itself goes through a manager dict only when it changes.
+    """
+    def __init__(self,
+                 problem: Problem,
+                 nb_iteration_sync: int,
+                 mode_optim: ModeOptim,
+                 best_objective,
+                 version,
+                 lock,
+                 shared_solution):
+        self.problem = problem
+        self.nb_iteration_sync = nb_iteration_sync
+        self.maximize = mode_optim == ModeOptim.MAXIMIZATION
+        self.best_objective = best_objective
+        self.version = version
+        self.lock = lock
+        self.shared_solution = shared_solution
+        self.known_version = 0
+        self.nb_published = 0
+        self.nb_received = 0
+
+    def is_better(self, objective_1, objective_2):
+        return objective_1 > objective_2 if self.maximize else objective_1 < objective_2
+
+    def exchange(self, best_variable: Solution, best_objective) -> Optional[Tuple[Solution, float]]:
+        objective = float(best_objective)
+        if self.version.value == 0 or self.is_better(objective, self.best_objective.value):
+            with self.lock:
+                if self.version.value == 0 or self.is_better(objective, self.best_objective.value):
+                    self.shared_solution["solution"] = detach_problem(best_variable.copy())
+                    self.best_objective.value = objective
+                    self.version.value += 1
+                    self.known_version = self.version.value
+                    self.nb_published += 1
+            return None
+        if self.version.value != self.known_version and self.is_better(self.best_objective.value, objective):
+            with self.lock:
+                solution = self.shared_solution["solution"]
+                shared_objective = self.best_objective.value
+                self.known_version = self.version.value
+            self.nb_received += 1
+            return attach_problem(solution, self.problem), shared_objective
+        return None
+
+
+def detach_problem(solution: Solution):
+    # the problem is not sent with the solutions exchanged between processes
+    if hasattr(solution, "problem"):
+        solution.problem = None
+    return solution
+
+
+def attach_problem(solution: Solution, problem: Problem):
+    if hasattr(solution, "problem"):
+        solution.problem = problem
+    return solution
+
+
+_parallel_context = {}
+
+
+def _init_worker(context):
+    _parallel_context.update(context)
+
+
+def _run_chain(index_chain: int):
+    context = _parallel_context
+    seed = context["seed"] + index_chain
+    random.seed(seed)
+    np.random.seed(seed)
+    local_search, initial_solution = context["build_chain"](context["problem"], index_chain)
+    incumbent_exchange = IncumbentExchange(problem=context["problem"],
+                                           nb_iteration_sync=context["nb_iteration_sync"],
+                                           mode_optim=local_search.mode_optim,
+                                           best_objective=context["best_objective"],
+                                           version=context["version"],
+                                           lock=context["lock"],
+                                           shared_solution=context["shared_solution"])
+    t = time.time()
+    result_storage = local_search.solve(initial_solution,
+                                        nb_iteration_max=context["nb_iteration_max"],
+                                        max_time_seconds=context["max_time_seconds"],
+                                        incumbent_exchange=incumbent_exchange)
+    chain_stats = {"chain": index_chain,
+                   "time": time.time()-t,
+                   "nb_published": incumbent_exchange.nb_published,
+                   "nb_received": incumbent_exchange.nb_received}
+    return [(detach_problem(s), f) for s, f in result_storage.list_solution_fits], result_storage.mode_optim, \
+        chain_stats
+
+
+class ParallelLocalSearch:
+    """
+    Multi-start local search : nb_chains independent SimulatedAnnealing/HillClimber chains
+    run in a pool of processes, sharing the best solution found every nb_iteration_sync iterations.
+
+        Args:
+            problem: the problem to solve
+            build_chain: function (problem, index_chain) -> (local_search, initial_solution),
+                called in the worker process after seeding random and np.random with seed+index_chain.
+                This is where each chain gets its own mutation portfolio, temperature schedule, restart handler...
+                With the "spawn" start method, it has to be picklable (module level function).
+            nb_chains: number of chains
+            nb_process: size of the pool (default : number of cpus)
+            nb_iteration_sync: number of iterations between two exchanges of the incumbent
+            seed: seed of the first chain
+        After solve, chains_stats has the solve time and the number of incumbents published/received of each chain.
+    """
+    def __init__(self,
+                 problem: Problem,
+                 build_chain: Callable[[Problem, int], Tuple[Union[SimulatedAnnealing, HillClimber], Solution]],
+                 nb_chains: int = None,
+                 nb_process: int = None,
+                 nb_iteration_sync: int = 1000,
+                 seed: int = 0):
+        self.problem = problem
+        self.build_chain = build_chain
+        self.nb_process = nb_process if nb_process is not None else multiprocessing.cpu_count()
+        self.nb_chains = nb_chains if nb_chains is not None else self.nb_process
+        self.nb_iteration_sync = nb_iteration_sync
+        self.seed = seed
+        self.chains_stats = []
+
+    def solve(self,
+              nb_iteration_max: int,
+              max_time_seconds: int = None) -> ResultStorage:
+        manager = multiprocessing.Manager()
+        context = {"problem": self.problem,
+                   "build_chain": self.build_chain,
+                   "seed": self.seed,
+                   "nb_iteration_max": nb_iteration_max,
+                   "max_time_seconds": max_time_seconds,
+                   "nb_iteration_sync": self.nb_iteration_sync,
+                   "best_objective": multiprocessing.Value("d", math.nan, lock=False),
+                   "version": multiprocessing.Value("i", 0, lock=False),
+                   "lock": multiprocessing.Lock(),
+                   "shared_solution": manager.dict()}
+        try:
+            with multiprocessing.Pool(processes=min(self.nb_process, self.nb_chains),
+                                      initializer=_init_worker, initargs=(context,)) as p:
+                results = p.map(_run_chain, range(self.nb_chains))
+        finally:
+            manager.shutdown()
+        self.chains_stats = [chain_stats for solution_fits, mode_optim, chain_stats in results]
+        list_solution_fits = [(attach_problem(s, self.problem), f)
+                              for solution_fits, mode_optim, chain_stats in results
+                              for s, f in solution_fits]
+        return ResultStorage(list_solution_fits=list_solution_fits,
+                             mode_optim=results[0][1],
+                             limit_store=False)
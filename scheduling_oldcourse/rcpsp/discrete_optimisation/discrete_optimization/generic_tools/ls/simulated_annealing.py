@@ -6,6 +6,8 @@ from discrete_optimization.generic_tools.do_problem import Problem, Solution, \
 from discrete_optimization.generic_tools.ls.local_search import RestartHandler, ModeMutation, ResultLS
 from discrete_optimization.generic_tools.do_mutation import Mutation
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.generic_tools.profiling import NO_PROFILER
+from discrete_optimization.generic_tools.callbacks import build_callbacks
 from abc import abstractmethod
 import numpy as np
 import time
@@ -50,88 +52,128 @@ class SimulatedAnnealing:
               pickle_result=False,
               pickle_name="debug", **kwargs) -> ResultStorage:
         verbose=kwargs.get("verbose", False)
-        use_max_time_cut = max_time_seconds is not None
-        init_time = time.time()
-        objective = self.aggreg_from_dict_values(self.evaluator.evaluate(initial_variable))
-        cur_variable = initial_variable.copy()
-        cur_best_variable = initial_variable.copy()
-        cur_objective = objective
-        cur_best_objective = objective
-        if self.store_solution:
-            store = ResultStorage(list_solution_fits=[(initial_variable, objective)],
-                                  best_solution=initial_variable.copy(),
-                                  limit_store=True,
-                                  mode_optim=self.params_objective_function.sense_function,
-                                  nb_best_store=1000)
-        else:
-            store = ResultStorage(list_solution_fits=[(initial_variable,
-                                                       objective)],
-                                  best_solution=initial_variable.copy(),
-                                  limit_store=True,
-                                  mode_optim=self.params_objective_function.sense_function,
-                                  nb_best_store=1)
-        self.restart_handler.best_fitness = objective
-        iteration = 0
-        while iteration < nb_iteration_max:
-            local_improvement = False
-            global_improvement = False
-            local_move_accepted = False
-            if self.mode_mutation == ModeMutation.MUTATE:
-                nv, move = self.mutator.mutate(cur_variable)
-                objective = self.aggreg_from_dict_values(self.evaluator.evaluate(nv))
-            elif self.mode_mutation == ModeMutation.MUTATE_AND_EVALUATE:
-                nv, move, objective = self.mutator.mutate_and_compute_obj(cur_variable)
-                objective = self.aggreg_from_dict_values(objective)
-            if verbose:
-                print(iteration, "/", nb_iteration_max,  objective, cur_objective)
-            if self.mode_optim == ModeOptim.MINIMIZATION and objective < cur_objective:
-                accept = True 
-                local_improvement = True
-                global_improvement = objective < cur_best_objective
-            elif self.mode_optim == ModeOptim.MAXIMIZATION and objective > cur_objective:
-                accept = True 
-                local_improvement = True
-                global_improvement = objective > cur_best_objective
+        incumbent_exchange = kwargs.get("incumbent_exchange", None)
+        # optional generic_tools.profiling.SolverProfiler timing the phases of the iterations
+        profiler = kwargs.get("profiler", None) or NO_PROFILER
+        profiler.start_run(self.evaluator)
+        try:
+            # optional generic_tools.callbacks.Callback(s), max_time_seconds is a TimeLimitStopper among them
+            callbacks = build_callbacks(kwargs.get("callbacks", None), max_time_seconds)
+            callbacks.on_solve_start(self, self.mode_optim)
+            objective = self.aggreg_from_dict_values(self.evaluator.evaluate(initial_variable))
+            cur_variable = initial_variable.copy()
+            cur_best_variable = initial_variable.copy()
+            cur_objective = objective
+            cur_best_objective = objective
+            if self.store_solution:
+                store = ResultStorage(list_solution_fits=[(initial_variable, objective)],
+                                      best_solution=initial_variable.copy(),
+                                      limit_store=True,
+                                      mode_optim=self.params_objective_function.sense_function,
+                                      nb_best_store=1000)
             else:
-                r = random.random()
-                fac = 1 if self.mode_optim == ModeOptim.MAXIMIZATION else -1
-                p = np.exp(fac*(objective-cur_objective)/self.temperature_handler.temperature)
-                accept = p > r
-                local_move_accepted = accept
-            if accept:
-                cur_objective = objective
-                cur_variable = nv
+                store = ResultStorage(list_solution_fits=[(initial_variable,
+                                                           objective)],
+                                      best_solution=initial_variable.copy(),
+                                      limit_store=True,
+                                      mode_optim=self.params_objective_function.sense_function,
+                                      nb_best_store=1)
+            self.restart_handler.best_fitness = objective
+            iteration = 0
+            while iteration < nb_iteration_max:
+                local_improvement = False
+                global_improvement = False
+                local_move_accepted = False
+                if self.mode_mutation == ModeMutation.MUTATE:
+                    profiler.start("mutate")
+                    nv, move = self.mutator.mutate(cur_variable)
+                    profiler.stop()
+                    profiler.start("evaluate")
+                    objective = self.aggreg_from_dict_values(self.evaluator.evaluate_cached(nv))
+                    profiler.stop()
+                elif self.mode_mutation == ModeMutation.MUTATE_AND_EVALUATE:
+                    profiler.start("mutate_and_evaluate")
+                    nv, move, objective = self.mutator.mutate_and_compute_obj(cur_variable)
+                    objective = self.aggreg_from_dict_values(objective)
+                    profiler.stop()
                 if verbose:
-                    print("iter accepted ", iteration)
-                    print("acceptance ", objective)
-            else:
-                cur_variable = move.backtrack_local_move(nv)
-            if self.store_solution:
-                store.add_solution(nv.copy(), objective)
-            if global_improvement: 
-                print("iter ", iteration)
-                # print(cur_variable)
-                print("new obj ", objective, " better than ", cur_best_objective)
-                cur_best_objective = objective
-                cur_best_variable = cur_variable.copy()
-                if not self.store_solution:
-                    store.add_solution(cur_variable.copy(),
-                                       objective)
-            self.temperature_handler.next_temperature() 
-            # Update the temperature
-            self.restart_handler.update(nv, objective, 
-                                        global_improvement,
-                                        local_improvement)
-            # Update info in restart handler
-            cur_variable, cur_objective = self.restart_handler.restart(cur_variable, cur_objective)
-            # possibly restart somewhere
-            iteration += 1
-            if pickle_result and iteration % 20000 == 0:
-                pickle.dump(cur_best_variable, open(pickle_name+".pk", "wb"))
-            if use_max_time_cut and iteration % 1000 == 0:
-                if time.time()-init_time > max_time_seconds:
+                    print(iteration, "/", nb_iteration_max,  objective, cur_objective)
+                profiler.start("acceptance")
+                if self.mode_optim == ModeOptim.MINIMIZATION and objective < cur_objective:
+                    accept = True 
+                    local_improvement = True
+                    global_improvement = objective < cur_best_objective
+                elif self.mode_optim == ModeOptim.MAXIMIZATION and objective > cur_objective:
+                    accept = True 
+                    local_improvement = True
+                    global_improvement = objective > cur_best_objective
+                else:
+                    r = random.random()
+                    fac = 1 if self.mode_optim == ModeOptim.MAXIMIZATION else -1
+                    p = np.exp(fac*(objective-cur_objective)/self.temperature_handler.temperature)
+                    accept = p > r
+                    local_move_accepted = accept
+                if accept:
+                    profiler.count("accepted")
+                    cur_objective = objective
+                    cur_variable = nv
+                    if verbose:
+                        print("iter accepted ", iteration)
+                        print("acceptance ", objective)
+                else:
+                    cur_variable = move.backtrack_local_move(nv)
+                profiler.stop()
+                profiler.start("copy")
+                stored_variable = nv.copy() if self.store_solution else None
+                if global_improvement:
+                    cur_best_variable = cur_variable.copy()
+                    if not self.store_solution:
+                        stored_variable = cur_variable.copy()
+                profiler.stop()
+                profiler.start("store")
+                if self.store_solution:
+                    store.add_solution(stored_variable, objective)
+                if global_improvement: 
+                    profiler.count("global_improvement")
+                    print("iter ", iteration)
+                    # print(cur_variable)
+                    print("new obj ", objective, " better than ", cur_best_objective)
+                    cur_best_objective = objective
+                    callbacks.on_new_best(self, iteration, cur_best_variable, cur_best_objective)
+                    if not self.store_solution:
+                        store.add_solution(stored_variable,
+                                           objective)
+                profiler.stop()
+                profiler.start("restart")
+                self.temperature_handler.next_temperature() 
+                # Update the temperature
+                self.restart_handler.update(nv, objective, 
+                                            global_improvement,
+                                            local_improvement)
+                # Update info in restart handler
+                cur_variable, cur_objective = self.restart_handler.restart(cur_variable, cur_objective)
+                # possibly restart somewhere
+                profiler.stop()
+                profiler.end_iteration(iteration, cur_best_objective)
+                callbacks.on_iteration(self, iteration, cur_best_objective)
+                if callbacks.should_stop(self, iteration):
                     break
-        store.finalize()
+                iteration += 1
+                if incumbent_exchange is not None and iteration % incumbent_exchange.nb_iteration_sync == 0:
+                    # share the best solution of this chain / adopt a better one found by another chain
+                    shared = incumbent_exchange.exchange(cur_best_variable, cur_best_objective)
+                    if shared is not None:
+                        cur_variable, cur_objective = shared
+                        cur_best_variable = cur_variable.copy()
+                        cur_best_objective = cur_objective
+                        self.restart_handler.solution_best = cur_variable.copy()
+                        self.restart_handler.best_fitness = cur_objective
+                        store.add_solution(cur_variable.copy(), cur_objective)
+                if pickle_result and iteration % 20000 == 0:
+                    pickle.dump(cur_best_variable, open(pickle_name+".pk", "wb"))
+            store.finalize()
+        finally:
+            profiler.end_run()
         return store
 
 
@@ -0,0 +1,119 @@
+import multiprocessing
+import random
+import math
+import time
+from typing import Callable, Tuple, Optional, List, Dict, Any
+import numpy as np
+from discrete_optimization.generic_tools.cp_tools import ParametersCP
+from discrete_optimization.generic_tools.do_problem import Problem
+from discrete_optimization.generic_tools.lns_cp import LNS_CP
+from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.generic_tools.ls.parallel_local_search import IncumbentExchange, detach_problem, \
+    attach_problem
+
+
+_parallel_lns_context = {}
+
+
+def _init_worker(context):
+    _parallel_lns_context.update(context)
+
+
+def _run_worker(index_worker: int):
+    context = _parallel_lns_context
+    seed = context["seed"] + index_worker
+    random.seed(seed)
+    np.random.seed(seed)
+    lns_solver, parameters_cp = context["build_worker"](context["problem"], index_worker)
+    incumbent_exchange = IncumbentExchange(problem=lns_solver.problem,
+                                           nb_iteration_sync=context["nb_iteration_sync"],
+                                           mode_optim=lns_solver.params_objective_function.sense_function,
+                                           best_objective=context["best_objective"],
+                                           version=context["version"],
+                                           lock=context["lock"],
+                                           shared_solution=context["shared_solution"])
+    t = time.time()
+    result_storage = lns_solver.solve_lns(parameters_cp=parameters_cp,
+                                          nb_iteration_lns=context["nb_iteration_lns"],
+                                          nb_iteration_no_improvement=context["nb_iteration_no_improvement"],
+                                          max_time_seconds=context["max_time_seconds"],
+                                          incumbent_exchange=incumbent_exchange)
+    stats = {"index_worker": index_worker,
+             "constraint_handler": lns_solver.constraint_handler.__class__.__name__,
+             "cp_solver": lns_solver.cp_solver.__class__.__name__,
+             "cp_solver_name": str(getattr(lns_solver.cp_solver, "cp_solver_name", None)),
+             "time": time.time()-t,
+             "nb_published": incumbent_exchange.nb_published,
+             "nb_received": incumbent_exchange.nb_received}
+    if result_storage is None:
+        return [], None, stats
+    return [(detach_problem(s), f) for s, f in result_storage.list_solution_fits], result_storage.mode_optim, stats
+
+
+class ParallelLNS:
+    """
+    Portfolio of LNS_CP : nb_workers LNS run in a pool of processes, each one with its own constraint handler
+    (neighbourhood) and cp solver (backend, seed...), sharing the best solution found every nb_iteration_sync
+    lns iterations (see IncumbentExchange) : a worker adopts a better shared solution as the center of its next
+    neighbourhood. A new solution is only published when it is better than the shared one at that time, so the
+    results of a worker that were computed from an older incumbent are rejected (they stay in its own results).
+    The solutions of all the workers are merged in the returned ResultStorage.
+
+        Args:
+            problem: the problem to solve
+            build_worker: function (problem, index_worker) -> (lns_solver, parameters_cp), called in the worker
+                process after seeding random and np.random with seed+index_worker. This is where each worker gets
+                its constraint handler, cp solver and time limits (e.g. rcpsp.solver.rcpsp_lns_cp.build_rcpsp_lns_worker).
+                With the "spawn" start method, it has to be picklable (module level function).
+            nb_workers: number of workers
+            nb_process: size of the pool (default : number of cpus). Each cp solve also uses parameters_cp.nb_process
+                threads when parameters_cp.multiprocess.
+            nb_iteration_sync: number of lns iterations between two exchanges of the incumbent
+            seed: seed of the first worker
+        After solve, workers_stats has the constraint handler, cp solver, solve time and the number of incumbents
+        published/received of each worker.
+    """
+    def __init__(self,
+                 problem: Problem,
+                 build_worker: Callable[[Problem, int], Tuple[LNS_CP, ParametersCP]],
+                 nb_workers: int = None,
+                 nb_process: int = None,
+                 nb_iteration_sync: int = 1,
+                 seed: int = 0):
+        self.problem = problem
+        self.build_worker = build_worker
+        self.nb_process = nb_process if nb_process is not None else multiprocessing.cpu_count()
+        self.nb_workers = nb_workers if nb_workers is not None else self.nb_process
+        self.nb_iteration_sync = nb_iteration_sync
+        self.seed = seed
+        self.workers_stats: List[Dict[str, Any]] = []
+
+    def solve(self,
+              nb_iteration_lns: int,
+              nb_iteration_no_improvement: Optional[int] = None,
+              max_time_seconds: int = None) -> ResultStorage:
+        manager = multiprocessing.Manager()
+        context = {"problem": self.problem,
+                   "build_worker": self.build_worker,
+                   "seed": self.seed,
+                   "nb_iteration_lns": nb_iteration_lns,
+                   "nb_iteration_no_improvement": nb_iteration_no_improvement,
+                   "max_time_seconds": max_time_seconds,
+                   "nb_iteration_sync": self.nb_iteration_sync,
+                   "best_objective": multiprocessing.Value("d", math.nan, lock=False),
+                   "version": multiprocessing.Value("i", 0, lock=False),
+                   "lock": multiprocessing.Lock(),
+                   "shared_solution": manager.dict()}
+        try:
+            with multiprocessing.Pool(processes=min(self.nb_process, self.nb_workers),
+                                      initializer=_init_worker, initargs=(context,)) as p:
+                results = p.map(_run_worker, range(self.nb_workers))
+        finally:
+            manager.shutdown()
+        self.workers_stats = [stats for _, _, stats in results]
+        list_solution_fits = [(attach_problem(s, self.problem), f)
+                              for solution_fits, mode_optim, stats in results
+                              for s, f in solution_fits]
+        return ResultStorage(list_solution_fits=list_solution_fits,
+                             mode_optim=next(mode_optim for _, mode_optim, _ in results if mode_optim is not None),
+                             limit_store=False)
@@ -4,4 +4,17 @@ def get_directory(file):
     return os.path.dirname(file)
 
 def abspath_from_file(file, relative_path):
-    return os.path.join(os.path.dirname(os.path.abspath(file)), relative_path)
\ No newline at end of file
+    return os.path.join(os.path.dirname(os.path.abspath(file)), relative_path)
+
+# directory -> (modification time, content) of the directories listed with listdir_cached
+_listdir_cache = {}
+
+
+def listdir_cached(directory):
+    """
+    os.listdir, the directory being only rescanned when its modification time changed.
+    """
+    mtime = os.stat(directory).st_mtime_ns
+    if directory not in _listdir_cache or _listdir_cache[directory][0] != mtime:
+        _listdir_cache[directory] = (mtime, os.listdir(directory))
+    return list(_listdir_cache[directory][1])
@@ -0,0 +1,202 @@
+import json
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Callable, Dict, Any, Optional
+
+
+class SolverProfiler:
+    """
+    Opt-in per phase timers and counters of a solver run, given to the metaheuristics
+    (SimulatedAnnealing, HillClimber, HillClimberPareto, Ga, LNS_CP) with the profiler keyword argument
+    of their solve function.
+    Phases are nested : a phase started while another one is running is recorded under the path "outer;inner"
+    (e.g. "evaluate;sgs" for the decoding done by the problem during the evaluation), which is directly
+    the collapsed stack format of flame graph tools (see to_folded).
+    sample_every : every sample_every iterations (0 for never), the times spent in each phase since the previous
+    sample are given to callback and/or kept in samples.
+    """
+    def __init__(self,
+                 name: str = "solver",
+                 sample_every: int = 0,
+                 callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 keep_samples: bool = True):
+        self.name = name
+        self.sample_every = sample_every
+        self.callback = callback
+        self.keep_samples = keep_samples
+        self.times: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.samples = []
+        self.nb_iterations = 0
+        self.total_time = 0.
+        self._stack = []
+        self._last_sample_times: Dict[str, float] = {}
+        self._start_run_time = None
+        self._problem = None
+
+    def start(self, phase: str):
+        path = self._stack[-1][0] + ";" + phase if self._stack else phase
+        self._stack.append((path, perf_counter()))
+
+    def stop(self):
+        path, t0 = self._stack.pop()
+        self.times[path] = self.times.get(path, 0.) + perf_counter() - t0
+        self.counts[path] = self.counts.get(path, 0) + 1
+
+    @contextmanager
+    def phase(self, phase: str):
+        # for phases that can raise, the stack of phases is restored. start/stop are cheaper in the inner loops.
+        depth = len(self._stack)
+        self.start(phase)
+        try:
+            yield
+        finally:
+            while len(self._stack) > depth:
+                self.stop()
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def start_run(self, problem=None):
+        # the problem gets the profiler too, so that it can time its own phases (e.g. the sgs of rcpsp).
+        self._start_run_time = perf_counter()
+        self._problem = problem
+        if problem is not None:
+            problem.profiler = self
+
+    def end_run(self):
+        while self._stack:
+            self.stop()
+        if self._start_run_time is not None:
+            self.total_time += perf_counter() - self._start_run_time
+            self._start_run_time = None
+        if self._problem is not None:
+            self._problem.profiler = None
+            self._problem = None
+
+    def end_iteration(self, iteration: int, objective=None):
+        self.nb_iterations += 1
+        if self.sample_every <= 0 or iteration % self.sample_every != 0:
+            return
+        sample = {"iteration": iteration,
+                  "time": perf_counter() - self._start_run_time if self._start_run_time is not None else None,
+                  "objective": objective,
+                  "phases": {path: self.times[path] - self._last_sample_times.get(path, 0.)
+                             for path in self.times},
+                  "counters": dict(self.counters)}
+        self._last_sample_times = dict(self.times)
+        if self.callback is not None:
+            self.callback(sample)
+        if self.keep_samples:
+            self.samples.append(sample)
+
+    def self_times(self) -> Dict[str, float]:
+        # time of each phase without the time of its sub-phases
+        self_times = dict(self.times)
+        for path, t in self.times.items():
+            if ";" in path:
+                parent = path.rsplit(";", 1)[0]
+                if parent in self_times:
+                    self_times[parent] -= t
+        return self_times
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name,
+                "total_time": self.total_time,
+                "nb_iterations": self.nb_iterations,
+                "phases": {path: {"time": self.times[path], "count": self.counts[path]}
+                           for path in sorted(self.times)},
+                "counters": dict(self.counters),
+                "samples": list(self.samples)}
+
+    def to_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def to_folded(self) -> str:
+        """
+        Collapsed stacks "name;phase;sub_phase microseconds", one line per phase, for flamegraph.pl or speedscope.
+        The time of the run outside of any phase is given to the name of the profiler.
+        """
+        self_times = self.self_times()
+        outside = self.total_time - sum(t for path, t in self.times.items() if ";" not in path)
+        lines = [self.name + " " + str(int(max(outside, 0.) * 1e6))]
+        lines += [self.name + ";" + path + " " + str(int(max(t, 0.) * 1e6))
+                  for path, t in sorted(self_times.items())]
+        return "\n".join(lines)
+
+    def report(self) -> str:
+        lines = [self.name + " : " + str(self.nb_iterations) + " iterations in " + str(round(self.total_time, 3)) + "s"]
+        for path in sorted(self.times, key=lambda p: -self.times[p]):
+            percent = 100 * self.times[path] / self.total_time if self.total_time > 0 else 0.
+            lines.append("  " + path + " : " + str(round(self.times[path], 4)) + "s, " + str(self.counts[path])
+                         + " calls, " + str(round(percent, 1)) + "%")
+        for name, value in self.counters.items():
+            lines.append("  " + name + " : " + str(value))
+        return "\n".join(lines)
+
+
+# deap toolbox operator -> profiler phase
+TOOLBOX_PHASES = {"select": "select", "clone": "copy", "mate": "mate", "mutate": "mutate", "map": "evaluate"}
+
+
+def profile_toolbox(toolbox, profiler: SolverProfiler) -> Dict[str, Callable]:
+    """
+    Replace the operators of a deap toolbox by timed ones (see TOOLBOX_PHASES), a profiler iteration ends after
+    each evaluation of a population (toolbox.map, once per generation in the deap algorithms).
+    Returns the original operators, to put back with setattr(toolbox, name, function) after the run.
+    """
+    originals = {}
+    generation = [0]
+
+    def timed(function, phase):
+        def timed_function(*args, **kwargs):
+            profiler.start(phase)
+            try:
+                result = function(*args, **kwargs)
+                if phase == "evaluate":
+                    # the default map of deap is lazy
+                    result = list(result)
+            finally:
+                profiler.stop()
+            if phase == "evaluate":
+                profiler.end_iteration(generation[0])
+                generation[0] += 1
+            return result
+        return timed_function
+
+    for name, phase in TOOLBOX_PHASES.items():
+        if hasattr(toolbox, name):
+            originals[name] = getattr(toolbox, name)
+            setattr(toolbox, name, timed(originals[name], phase))
+    return originals
+
+
+class NoProfiler:
+    """
+    Profiler doing nothing, used by the solvers when no profiler is given.
+    """
+    def start(self, phase: str):
+        pass
+
+    def stop(self):
+        pass
+
+    def phase(self, phase: str):
+        return nullcontext()
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def start_run(self, problem=None):
+        pass
+
+    def end_run(self):
+        pass
+
+    def end_iteration(self, iteration: int, objective=None):
+        pass
+
+
+NO_PROFILER = NoProfiler()
@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from typing import List, Any
+import numpy as np
+
+
+class ParetoArchive(ABC):
+    """
+    Incremental archive of the non dominated points (maximization of all the objectives,
+    give -vector for minimization). A point is added if no point of the archive dominates it,
+    the points it dominates are then removed. Equal points are all kept.
+    Each point comes with a payload (for ParetoFront, the (solution, fitness) tuple).
+    """
+    def __init__(self, nb_objectives: int):
+        self.nb_objectives = nb_objectives
+
+    @abstractmethod
+    def add(self, point: np.array, payload: Any) -> bool:
+        ...
+
+    @abstractmethod
+    def is_dominated(self, point: np.array) -> bool:
+        ...
+
+    @abstractmethod
+    def get_points(self) -> np.array:
+        ...
+
+    @abstractmethod
+    def get_payloads(self) -> List[Any]:
+        ...
+
+    @abstractmethod
+    def __len__(self):
+        ...
+
+
+def build_pareto_archive(nb_objectives: int) -> ParetoArchive:
+    if nb_objectives == 2:
+        return SortedFront2D()
+    return ArrayParetoArchive(nb_objectives)
+
+
+class SortedFront2D(ParetoArchive):
+    """
+    2 objectives : the front is kept sorted by increasing first objective, the second objective is then
+    non increasing, so the dominance check and the range of dominated points are found by bisection.
+    """
+    def __init__(self):
+        super().__init__(nb_objectives=2)
+        self.keys = []  # (f0, -f1), increasing
+        self.neg_f1 = []  # -f1, non decreasing
+        self.payloads = []
+
+    def is_dominated(self, point: np.array) -> bool:
+        a, b = float(point[0]), float(point[1])
+        k = bisect_left(self.keys, (a, -np.inf))
+        if k == len(self.keys):
+            return False
+        # point of the front with the highest f1 among the ones with f0 >= a
+        f0, f1 = self.keys[k][0], -self.keys[k][1]
+        return f1 > b or (f1 == b and f0 > a)
+
+    def add(self, point: np.array, payload: Any) -> bool:
+        if self.is_dominated(point):
+            return False
+        a, b = float(point[0]), float(point[1])
+        key = (a, -b)
+        start = bisect_left(self.neg_f1, -b)
+        end = bisect_right(self.keys, (a, np.inf))
+        start_equal = bisect_left(self.keys, key)
+        end_equal = bisect_right(self.keys, key)
+        # [start, end) are the points with f0 <= a and f1 <= b, the equal ones are kept
+        for l in (self.keys, self.neg_f1, self.payloads):
+            del l[end_equal:end]
+        self.keys.insert(end_equal, key)
+        self.neg_f1.insert(end_equal, -b)
+        self.payloads.insert(end_equal, payload)
+        for l in (self.keys, self.neg_f1, self.payloads):
+            del l[start:start_equal]
+        return True
+
+    def get_points(self) -> np.array:
+        return np.array([[k[0], -k[1]] for k in self.keys], dtype=np.float64).reshape((-1, 2))
+
+    def get_payloads(self) -> List[Any]:
+        return self.payloads
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class ArrayParetoArchive(ParetoArchive):
+    """
+    Any number of objectives : the points are stored in a contiguous float array (grown by doubling)
+    and compared to a new point in one vectorised pass.
+    """
+    def __init__(self, nb_objectives: int, initial_capacity: int = 64):
+        super().__init__(nb_objectives=nb_objectives)
+        self.points = np.zeros((initial_capacity, nb_objectives), dtype=np.float64)
+        self.size = 0
+        self.payloads = []
+
+    def is_dominated(self, point: np.array) -> bool:
+        points = self.points[:self.size]
+        return bool(np.any(np.all(points >= point, axis=1) & np.any(points > point, axis=1)))
+
+    def add(self, point: np.array, payload: Any) -> bool:
+        point = np.asarray(point, dtype=np.float64)
+        points = self.points[:self.size]
+        greater_equal = np.all(points >= point, axis=1)
+        if np.any(greater_equal & np.any(points > point, axis=1)):
+            return False
+        dominated = np.all(points <= point, axis=1) & ~greater_equal
+        if np.any(dominated):
+            kept = np.flatnonzero(~dominated)
+            self.points[:kept.shape[0]] = points[kept]
+            self.payloads = [self.payloads[i] for i in kept]
+            self.size = kept.shape[0]
+        if self.size == self.points.shape[0]:
+            self.points = np.concatenate([self.points, np.zeros_like(self.points)])
+        self.points[self.size] = point
+        self.payloads.append(payload)
+        self.size += 1
+        return True
+
+    def get_points(self) -> np.array:
+        return self.points[:self.size]
+
+    def get_payloads(self) -> List[Any]:
+        return self.payloads
+
+    def __len__(self):
+        return self.size
@@ -1,15 +1,40 @@
 from discrete_optimization.generic_tools.do_problem import Problem, Solution, TupleFitness, \
     ModeOptim, ParamsObjectiveFunction, build_aggreg_function_and_params_objective
 from typing import List, Tuple, Dict, Union, Optional
-from heapq import heappushpop, heappush, heapify, \
-     nlargest, nsmallest
-import matplotlib.pyplot as plt
+from heapq import heappush, heappop, heapify
+from discrete_optimization.generic_tools.result_storage.pareto_archive import ParetoArchive, \
+    build_pareto_archive
+import numpy as np
 import random
 
 fitness_class = Union[float, TupleFitness]
 
 
+class _StoredFitness:
+    # item of the heap of ResultStorage : the worst stored solution is at the top of the heap,
+    # between equal fitnesses the most recent one is considered worst (first found solutions are kept).
+    __slots__ = ("fitness", "order", "position", "maximize")
+
+    def __init__(self, fitness, order, position, maximize):
+        self.fitness = fitness
+        self.order = order
+        self.position = position
+        self.maximize = maximize
+
+    def __lt__(self, other):
+        if self.fitness == other.fitness:
+            return self.order > other.order
+        return self.fitness < other.fitness if self.maximize else self.fitness > other.fitness
+
+
 class ResultStorage:
+    """
+    Store of (solution, fitness).
+    list_solution_fits is kept in insertion order, a solution already stored (same hash/eq) is not added again.
+    When limit_store is True, only the nb_best_store best solutions are kept (the worst one is evicted from
+    the heap and from list_solution_fits), otherwise everything is kept.
+    The best solution(s) are followed at each insertion so the get_*best* queries don't scan the list.
+    """
     list_solution_fits: List[Tuple[Solution,
                                    fitness_class]]
     best_solution: Solution
@@ -22,117 +47,162 @@ class ResultStorage:
                  mode_optim: ModeOptim = ModeOptim.MAXIMIZATION,
                  limit_store: bool = True,
                  nb_best_store: int = 1000):
-        self.list_solution_fits = list_solution_fits
-        self.best_solution = best_solution
         self.mode_optim = mode_optim
         self.maximize = mode_optim == ModeOptim.MAXIMIZATION
-        self.size_heap = 0
-        self.heap = []
         self.limit_store = limit_store
         self.nb_best_score = nb_best_store
+        self.reset(list_solution_fits)
+        if best_solution is not None:
+            self.best_solution = best_solution
+
+    def reset(self, list_solution_fits: List[Tuple[Solution, fitness_class]]):
+        self._list = []
+        self._nb_evicted = 0
+        self._heap = []
+        self._heap_ordered = True
+        self._nb_added = 0
+        self._best_items = []
         self.map_solutions = {}
-        for i in range(len(self.list_solution_fits)):
-            if self.list_solution_fits[i][0] not in self.map_solutions:
-                self.map_solutions[self.list_solution_fits[i][0]] = self.list_solution_fits[i][1]
-                heappush(self.heap, self.list_solution_fits[i][1])
-                self.size_heap += 1
-        if self.size_heap >= self.nb_best_score and self.limit_store:
-            self.heap = nsmallest(self.nb_best_score, self.heap) if not self.maximize else \
-                nlargest(self.nb_best_score, self.heap)
-            heapify(self.heap)
-            self.size_heap = self.nb_best_score
-        if len(self.heap) > 0:
-            self.min = min(self.heap)
-            self.max = max(self.heap)
-            if self.best_solution is None:
-                f = min if not self.maximize else max
-                self.best_solution = f(self.list_solution_fits, key=lambda x: x[1])[0]
+        self.best_solution = None
+        for solution, fitness in list_solution_fits:
+            self.add_solution(solution, fitness)
+
+    @property
+    def list_solution_fits(self) -> List[Tuple[Solution, fitness_class]]:
+        if self._nb_evicted > 0:
+            self._compact()
+        return self._list
+
+    @list_solution_fits.setter
+    def list_solution_fits(self, list_solution_fits):
+        self.reset(list(list_solution_fits))
+
+    def _ordered_heap(self):
+        # without limit_store, the heap order is only needed by min/max, it is restored on demand
+        if not self._heap_ordered:
+            heapify(self._heap)
+            self._heap_ordered = True
+        return self._heap
+
+    @property
+    def heap(self):
+        # fitness of the stored solutions, best first
+        return [item.fitness for item in sorted(self._heap, reverse=True)]
+
+    @property
+    def size_heap(self):
+        return len(self._heap)
+
+    @property
+    def min(self):
+        if len(self._heap) == 0:
+            return None
+        return self._best_items[0].fitness if not self.maximize else self._ordered_heap()[0].fitness
+
+    @property
+    def max(self):
+        if len(self._heap) == 0:
+            return None
+        return self._best_items[0].fitness if self.maximize else self._ordered_heap()[0].fitness
+
+    def _compact(self):
+        positions = {}
+        new_list = []
+        for k in range(len(self._list)):
+            if self._list[k] is not None:
+                positions[k] = len(new_list)
+                new_list.append(self._list[k])
+        for item in self._heap:
+            item.position = positions[item.position]
+        self._list = new_list
+        self._nb_evicted = 0
 
     def add_solution(self, solution: Solution,
                      fitness: fitness_class):
-        self.list_solution_fits += [(solution, fitness)]
-        if solution not in self.map_solutions:
-            self.map_solutions[solution] = fitness
-            self.list_solution_fits += [(solution, fitness)]
-        if self.maximize and fitness > self.max \
-                or (not self.maximize and fitness < self.min):
+        if solution in self.map_solutions:
+            return
+        self.map_solutions[solution] = fitness
+        item = _StoredFitness(fitness, self._nb_added, len(self._list), self.maximize)
+        self._nb_added += 1
+        self._list.append((solution, fitness))
+        if self.limit_store:
+            heappush(self._ordered_heap(), item)
+        else:
+            self._heap.append(item)
+            self._heap_ordered = False
+        if len(self._best_items) == 0 or self._is_better(fitness, self._best_items[0].fitness):
+            self._best_items = [item]
             self.best_solution = solution
-        if self.maximize and fitness >= self.min or \
-                (not self.maximize and fitness <= self.max):
-            if self.size_heap >= self.nb_best_score and self.limit_store:
-                heappushpop(self.heap, fitness)
-                self.min = min(fitness, self.min)
-                self.max = max(fitness, self.max)
-            else:
-                heappush(self.heap, fitness)
-                self.size_heap += 1
-                self.min = min(fitness, self.min)
-                self.max = max(fitness, self.max)
+        elif fitness == self._best_items[0].fitness:
+            self._best_items.append(item)
+        if self.limit_store and len(self._heap) > self.nb_best_score:
+            self._evict()
+
+    def _is_better(self, fitness_1, fitness_2):
+        return fitness_1 > fitness_2 if self.maximize else fitness_1 < fitness_2
+
+    def _evict(self):
+        item = heappop(self._ordered_heap())
+        solution, fitness = self._list[item.position]
+        self._list[item.position] = None
+        self._nb_evicted += 1
+        del self.map_solutions[solution]
+        if item in self._best_items:
+            self._best_items.remove(item)
+            if len(self._best_items) == 0 and len(self._heap) > 0:
+                best = max(self._heap)
+                self._best_items = [i for i in self._heap if i.fitness == best.fitness]
+                self._best_items.sort(key=lambda i: i.order)
+        if self._nb_evicted > self.nb_best_score:
+            # bounded memory, even when the list is not read
+            self._compact()
 
     def finalize(self):
-        self.heap = sorted(self.heap, reverse=self.maximize)
+        if self._nb_evicted > 0:
+            self._compact()
 
     def get_best_solution_fit(self):
-        if len(self.list_solution_fits) == 0:
+        if len(self._best_items) == 0:
             return None, None
-        f = max if self.maximize else min
-        return f(self.list_solution_fits, key=lambda x: x[1])
+        return self.list_solution_fits[self._best_items[0].position]
 
     def get_last_best_solution(self):
-        f = max if self.maximize else min
-        best = f(self.list_solution_fits, key=lambda x: x[1])[1]
-        sol = max([i
-                   for i in range(len(self.list_solution_fits))
-                   if self.list_solution_fits[i][1] == best])
-        return self.list_solution_fits[sol]
+        return self.list_solution_fits[self._best_items[-1].position]
 
     def get_random_best_solution(self):
-        f = max if self.maximize else min
-        best = f(self.list_solution_fits, key=lambda x: x[1])[1]
-        sol = random.choice([i
-                            for i in range(len(self.list_solution_fits))
-                            if self.list_solution_fits[i][1] == best])
-        return self.list_solution_fits[sol]
+        return self.list_solution_fits[random.choice(self._best_items).position]
 
     def get_random_solution(self):
+        best_fit = self.get_best_solution_fit()[1]
         s = [l for l in self.list_solution_fits
-             if l[1] != self.get_best_solution_fit()[1]]
+             if l[1] != best_fit]
         if len(s) > 0:
             return random.choice(s)
         else:
             return random.choice(self.list_solution_fits)
 
     def get_best_solution(self):
-        f = max if self.maximize else min
-        if len(self.list_solution_fits) == 0:
+        if len(self._best_items) == 0:
             return None
-        return f(self.list_solution_fits, key=lambda x: x[1])[0]
+        return self.list_solution_fits[self._best_items[0].position][0]
 
     def get_n_best_solution(self, n_solutions: int):
-        f = max if self.maximize else min
         n = min(n_solutions, len(self.list_solution_fits))
         l = sorted(self.list_solution_fits, key=lambda x: x[1])[:n]
         return l
 
     def remove_duplicate_solutions(self, var_name):
-        index_to_remove = []
-        for i in range(len(self.list_solution_fits)-1):
-            sol1 = getattr(self.list_solution_fits[i][0], var_name)
-            for j in range(i+1, len(self.list_solution_fits)):
-                sol2 = getattr(self.list_solution_fits[j][0], var_name)
-                # print('sol1: ', sol1)
-                # print('sol2: ', sol2)
-                all_similar = True
-                for k in range(len(sol1)):
-                    if sol1[k] != sol2[k]:
-                        all_similar = False
-                        break
-                if all_similar:
-                    if j not in index_to_remove:
-                        index_to_remove.append(j)
-        print('number of duplicate solutions in result storage: ', len(index_to_remove))
-
-        self.list_solution_fits = [self.list_solution_fits[i] for i in range(len(self.list_solution_fits)) if i not in index_to_remove]
+        kept = []
+        seen = set()
+        for solution, fitness in self.list_solution_fits:
+            key = tuple(getattr(solution, var_name))
+            if key not in seen:
+                seen.add(key)
+                kept.append((solution, fitness))
+        print('number of duplicate solutions in result storage: ', len(self.list_solution_fits)-len(kept))
+        best_solution = self.best_solution
+        self.reset(kept)
+        self.best_solution = best_solution
 
 
 def merge_results_storage(result_1: ResultStorage, result_2: ResultStorage):
@@ -168,6 +238,12 @@ def result_storage_to_pareto_front(result_storage: ResultStorage, problem: Probl
 
 
 class ParetoFront(ResultStorage):
+    """
+    ResultStorage of tuple fitnesses, the non dominated ones are maintained incrementally
+    in a ParetoArchive (sorted front for 2 objectives, vectorised array otherwise) at each add_solution.
+    limit_store is ignored (forced to False) : tuple fitnesses are only partially ordered, there is no worst
+    solution to evict, all the solutions added are kept.
+    """
     def __init__(self,
                  list_solution_fits: List[Tuple[Solution,
                                                 fitness_class]],
@@ -178,55 +254,37 @@ class ParetoFront(ResultStorage):
         super().__init__(list_solution_fits=list_solution_fits,
                          best_solution=best_solution,
                          mode_optim=mode_optim,
-                         limit_store=limit_store,
+                         limit_store=False,
                          nb_best_store=nb_best_store)
-        self.paretos: List[Tuple[Solution, TupleFitness]] = []
-        for s, t in list_solution_fits:
-            self.add_solution(solution=s, fitness=t)
+
+    def reset(self, list_solution_fits: List[Tuple[Solution, fitness_class]]):
+        self.archive: Optional[ParetoArchive] = None
+        super().reset(list_solution_fits)
+
+    @property
+    def paretos(self) -> List[Tuple[Solution, TupleFitness]]:
+        if self.archive is None:
+            return []
+        return self.archive.get_payloads()
 
     def add_solution(self, solution: Solution,
                      fitness: fitness_class):
+        if solution in self.map_solutions:
+            return
         super().add_solution(solution=solution, fitness=fitness)
-        # self.add_point(solution, fitness)
+        self.add_point(solution, fitness)
 
     def add_point(self,
                   solution,
                   tuple_fitness: TupleFitness):
-        # self.list_solution_fits += [(solution, tuple_fitness)]
-        if self.maximize:
-            if all(tuple_fitness >= t[1] for t in self.paretos):
-                self.paretos += [(solution, tuple_fitness)]
-                pp = []
-                for p in self.paretos:
-                    if p[1] < tuple_fitness:
-                        continue
-                    else:
-                        pp += [p]
-                self.paretos = pp
-        if not self.maximize:
-            if all(tuple_fitness <= t[1] for t in self.paretos):
-                self.paretos += [(solution, tuple_fitness)]
-                pp = []
-                for p in self.paretos:
-                    if p[1] > tuple_fitness:
-                        continue
-                    else:
-                        pp += [p]
-                self.paretos = pp
+        if self.archive is None:
+            self.archive = build_pareto_archive(tuple_fitness.size)
+        point = np.asarray(tuple_fitness.vector_fitness, dtype=np.float64)
+        self.archive.add(point if self.maximize else -point, (solution, tuple_fitness))
 
     def len_pareto_front(self):
         return len(self.paretos)
 
-    def finalize(self):
-        super().finalize()
-        # print("Number of solutions : ",
-        #       len(self.map_solutions))
-        self.paretos = []
-        # print("Number : ", len(self.list_solution_fits))
-        for s, t in self.list_solution_fits:
-            self.add_point(solution=s,
-                           tuple_fitness=t)
-
     def compute_extreme_points(self):
         function_used = max if self.maximize else min
         number_fitness = self.list_solution_fits[0][1].size
@@ -239,6 +297,7 @@ class ParetoFront(ResultStorage):
 
 def plot_storage_2d(result_storage: ResultStorage, name_axis: List[str], ax=None, color="r"):
     if ax is None:
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(1)
     ax.scatter(x=[p[1].vector_fitness[0]
                   for p in result_storage.list_solution_fits],
@@ -251,6 +310,7 @@ def plot_storage_2d(result_storage: ResultStorage, name_axis: List[str], ax=None
 
 def plot_pareto_2d(pareto_front: ParetoFront, name_axis: List[str], ax=None, color="b"):
     if ax is None:
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(1)
     ax.scatter(x=[p[1].vector_fitness[0]
                   for p in pareto_front.paretos],
@@ -264,6 +324,7 @@ def plot_pareto_2d(pareto_front: ParetoFront, name_axis: List[str], ax=None, col
 
 def plot_fitness(result_storage: ResultStorage, ax=None, color="b", title=""):
     if ax is None:
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(1)
     ax.set_title(title)
     ax.plot([x[1] for x in result_storage.list_solution_fits], color=color)
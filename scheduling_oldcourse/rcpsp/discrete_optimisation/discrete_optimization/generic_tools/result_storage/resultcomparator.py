@@ -91,9 +91,7 @@ class ResultComparator:
         for rs in self.list_result_storage:
             for s in rs.list_solution_fits:
                 sols.append(s)
-        rs = ResultStorage(list_solution_fits=sols, best_solution=None)
-        # print('len(rs): ', len(rs.list_solution_fits))
-        pareto_store = result_storage_to_pareto_front(result_storage=rs, problem=None)
+        pareto_store = ParetoFront(list_solution_fits=sols, best_solution=None)
         # print('len(pareto_store): ', len(pareto_store.list_solution_fits))
         # print('hhhh: ', [x[1].vector_fitness for x in pareto_store.list_solution_fits])
         return pareto_store
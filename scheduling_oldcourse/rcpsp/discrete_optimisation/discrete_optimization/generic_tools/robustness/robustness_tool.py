@@ -3,8 +3,6 @@ from discrete_optimization.generic_tools.do_problem import MethodAggregating, Ba
 from typing import List
 import numpy as np
 import random
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from discrete_optimization.generic_tools.ls.hill_climber import HillClimberPareto
 from discrete_optimization.generic_tools.ls.local_search import RestartHandlerLimit, ModeMutation
@@ -93,6 +91,8 @@ class RobustnessTool:
         return results
 
     def plot(self, results, image_tag=""):
+        import seaborn as sns
+        import matplotlib.pyplot as plt
         feasible = np.sum(results[:, :, 0], axis=1)
         mean_makespan = np.mean(results[:, :, 1], axis=1)
         max_makespan = np.max(results[:, :, 1], axis=1)
@@ -0,0 +1,160 @@
+from typing import List, Hashable, Iterable, Tuple, Set, Dict
+import numpy as np
+from numba import njit
+
+_one = np.uint64(1)
+
+
+def build_csr(nb_nodes: int, sources: np.array, targets: np.array):
+    # arcs sources[k] -> targets[k] in csr format, duplicated arcs removed, targets sorted
+    keys = np.unique(sources.astype(np.int64)*nb_nodes+targets.astype(np.int64))
+    indices = keys % max(nb_nodes, 1)
+    indptr = np.zeros(nb_nodes+1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(keys // max(nb_nodes, 1), minlength=nb_nodes))
+    return indptr, indices
+
+
+@njit(cache=True)
+def topological_order_csr(indptr, indices):
+    # Kahn's algorithm, the returned order is shorter than the number of nodes if the graph has a cycle
+    nb_nodes = indptr.shape[0]-1
+    in_degree = np.zeros(nb_nodes, dtype=np.int64)
+    for k in range(indices.shape[0]):
+        in_degree[indices[k]] += 1
+    order = np.zeros(nb_nodes, dtype=np.int64)
+    tail = 0
+    for i in range(nb_nodes):
+        if in_degree[i] == 0:
+            order[tail] = i
+            tail += 1
+    head = 0
+    while head < tail:
+        i = order[head]
+        head += 1
+        for k in range(indptr[i], indptr[i+1]):
+            s = indices[k]
+            in_degree[s] -= 1
+            if in_degree[s] == 0:
+                order[tail] = s
+                tail += 1
+    return order[:tail]
+
+
+@njit(cache=True)
+def closure_bitsets(indptr, indices, order):
+    # reachable[i] : bitset of the nodes reachable from i (i excluded),
+    # filled in reverse order so that the rows of the successors are complete when they are merged.
+    nb_nodes = indptr.shape[0]-1
+    nb_words = (nb_nodes+63) // 64
+    reachable = np.zeros((nb_nodes, nb_words), dtype=np.uint64)
+    one = np.uint64(1)
+    for j in range(order.shape[0]-1, -1, -1):
+        i = order[j]
+        for k in range(indptr[i], indptr[i+1]):
+            s = indices[k]
+            reachable[i, s >> 6] |= one << np.uint64(s & 63)
+            for w in range(nb_words):
+                reachable[i, w] |= reachable[s, w]
+    return reachable
+
+
+@njit(cache=True)
+def popcount_rows(bitsets):
+    counts = np.zeros(bitsets.shape[0], dtype=np.int64)
+    m1 = np.uint64(0x5555555555555555)
+    m2 = np.uint64(0x3333333333333333)
+    m4 = np.uint64(0x0f0f0f0f0f0f0f0f)
+    h01 = np.uint64(0x0101010101010101)
+    for i in range(bitsets.shape[0]):
+        c = 0
+        for w in range(bitsets.shape[1]):
+            x = bitsets[i, w]
+            x = x - ((x >> np.uint64(1)) & m1)
+            x = (x & m2) + ((x >> np.uint64(2)) & m2)
+            x = (x + (x >> np.uint64(4))) & m4
+            c += np.int64((x * h01) >> np.uint64(56))
+        counts[i] = c
+    return counts
+
+
+class TransitiveClosure:
+    """
+    Ancestors and descendants of every node of a directed acyclic graph, stored as packed bitsets :
+    bit j of descendants_bits[i] (word j//64, bit j%64) is set if node j can be reached from node i.
+    Both closures are computed in one pass each over a topological order (O(e*n/64) word operations),
+    membership queries are O(1) and the counts come from a popcount of the rows.
+    Raises a ValueError if the graph has a cycle.
+    """
+    def __init__(self, nodes: List[Hashable], edges: Iterable[Tuple[Hashable, Hashable]]):
+        self.nodes = list(nodes)
+        self.index = {self.nodes[i]: i for i in range(len(self.nodes))}
+        edges = list(edges)
+        for e in edges:
+            for n in e[:2]:
+                if n not in self.index:
+                    self.index[n] = len(self.nodes)
+                    self.nodes.append(n)
+        self.nb_nodes = len(self.nodes)
+        sources = np.array([self.index[e[0]] for e in edges], dtype=np.int64)
+        targets = np.array([self.index[e[1]] for e in edges], dtype=np.int64)
+        self.successors_indptr, self.successors_indices = build_csr(self.nb_nodes, sources, targets)
+        self.predecessors_indptr, self.predecessors_indices = build_csr(self.nb_nodes, targets, sources)
+        self.topological_order = topological_order_csr(self.successors_indptr, self.successors_indices)
+        if self.topological_order.shape[0] < self.nb_nodes:
+            raise ValueError("The graph has a cycle, no transitive closure")
+        self.topological_position = np.argsort(self.topological_order)
+        self.descendants_bits = closure_bitsets(self.successors_indptr, self.successors_indices,
+                                                self.topological_order)
+        self.ancestors_bits = closure_bitsets(self.predecessors_indptr, self.predecessors_indices,
+                                              self.topological_order[::-1].copy())
+        self.nb_descendants_array = popcount_rows(self.descendants_bits)
+        self.nb_ancestors_array = popcount_rows(self.ancestors_bits)
+
+    @staticmethod
+    def _has_bit(row: np.array, j: int) -> bool:
+        return bool((row[j >> 6] >> np.uint64(j & 63)) & _one)
+
+    def _bits_to_indexes(self, row: np.array) -> np.array:
+        return np.flatnonzero(np.unpackbits(row.astype("<u8").view(np.uint8),
+                                            bitorder="little")[:self.nb_nodes])
+
+    def _bits_to_nodes(self, row: np.array) -> List[Hashable]:
+        return [self.nodes[i] for i in self._bits_to_indexes(row)]
+
+    def is_descendant(self, node: Hashable, other: Hashable) -> bool:
+        # True if other can be reached from node
+        return self._has_bit(self.descendants_bits[self.index[node]], self.index[other])
+
+    def is_ancestor(self, node: Hashable, other: Hashable) -> bool:
+        # True if node can be reached from other
+        return self._has_bit(self.ancestors_bits[self.index[node]], self.index[other])
+
+    def nb_descendants(self, node: Hashable) -> int:
+        return int(self.nb_descendants_array[self.index[node]])
+
+    def nb_ancestors(self, node: Hashable) -> int:
+        return int(self.nb_ancestors_array[self.index[node]])
+
+    def descendants(self, node: Hashable) -> Set[Hashable]:
+        return set(self._bits_to_nodes(self.descendants_bits[self.index[node]]))
+
+    def ancestors(self, node: Hashable) -> Set[Hashable]:
+        return set(self._bits_to_nodes(self.ancestors_bits[self.index[node]]))
+
+    def ancestors_sorted(self, node: Hashable) -> List[Hashable]:
+        # ancestors of node in topological order
+        indexes = self._bits_to_indexes(self.ancestors_bits[self.index[node]])
+        return [self.nodes[i] for i in indexes[np.argsort(self.topological_position[indexes])]]
+
+    def unrelated(self, node: Hashable) -> Set[Hashable]:
+        # nodes that are neither ancestors nor descendants of node (node excluded)
+        i = self.index[node]
+        related = self.descendants_bits[i] | self.ancestors_bits[i]
+        related[i >> 6] |= _one << np.uint64(i & 63)
+        return set(self._bits_to_nodes(~related))
+
+    def descendants_map(self) -> Dict[Hashable, Set[Hashable]]:
+        return {n: self.descendants(n) for n in self.nodes}
+
+    def ancestors_map(self) -> Dict[Hashable, Set[Hashable]]:
+        return {n: self.ancestors(n) for n in self.nodes}
@@ -1,19 +1,21 @@
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, UploadFile, HTTPException
 from starlette.responses import StreamingResponse
-from uvicorn.loops import asyncio
+from starlette.concurrency import run_in_threadpool
 from discrete_optimization.generic_tools.do_solver import SolverDO
 from discrete_optimization.generic_tools.do_problem import Problem
+from discrete_optimization.generic_tools.webservice.job_queue import JobManager, ProgressCallback, accepts_callbacks
+from discrete_optimization.generic_tools.webservice.instance_store import InstanceStore
+from discrete_optimization.generic_tools.webservice.solver_registry import solver_registry
+import asyncio
+import json
+import queue
 import time
+import tempfile
 import os
-import cv2
 import io
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Optional
 from enum import Enum
-FILEDIR = os.path.dirname(os.path.abspath(__file__))
-output_image_directory = os.path.join(FILEDIR, "output/")
-if not os.path.exists(output_image_directory):
-    os.makedirs(output_image_directory)
 app = FastAPI()
 
 
@@ -43,17 +45,26 @@ class StaticSolverService:
     def __init__(self, tag: str, problem_type: ProblemType):
         self.tag = tag
         self.problem_type = problem_type
-        self.do_domain: Problem = None
+        # key of the model in the instance_store, do_domain is then taken from the store
+        self.instance_key: str = None
+        self._do_domain: Problem = None
         self.do_solver: SolverDO = None
         self.params_solver: Dict[Any, Any] = None
         self.results: ResultStorage = None
-        x = find_right_module_solvers(self.problem_type)
-        if x is not None:
-            self.solvers_map = x[1]
-            self.solvers_list = [k.__name__ for k in self.solvers_map]
-        else:
-            self.solvers_map = None
-            self.solvers_list = None
+        # new best solutions of the last solve : job of the job_manager, or incumbents of solve_domain
+        self.job_id: str = None
+        self.incumbents: List[Dict[str, Any]] = None
+
+    @property
+    def do_domain(self) -> Problem:
+        if self.instance_key is not None:
+            return instance_store.get(self.instance_key)
+        return self._do_domain
+
+    @do_domain.setter
+    def do_domain(self, do_domain: Problem):
+        self.instance_key = None
+        self._do_domain = do_domain
 
     def __str__(self):
         s = "Solver service id="+str(self.tag)
@@ -74,86 +85,40 @@ class StaticSolverService:
         return s
 
     def get_available_solvers(self):
-        return self.solvers_list
+        return [entry.name for entry in solver_registry.entries(self.problem_type.value)]
 
-    def init_solver(self, solver_string, **args):
-        right_solvers = [k for k in self.solvers_map if k.__name__ == solver_string]
-        if len(right_solvers) == 0:
-            raise SolverNameException("Error, please choose among this : "+str(self.solvers_list))
-        else:
-            solver_class = right_solvers[0]
+    def get_solver_class_and_args(self, solver_string, **args):
+        try:
+            solver_class, default_args = solver_registry.get(self.problem_type.value, solver_string)
+        except KeyError:
+            raise SolverNameException("Error, please choose among this : "+str(self.get_available_solvers()))
         if len(args) == 0 or args is None:
-            args = self.solvers_map[solver_class][1]
+            args = default_args
+        return solver_class, args
+
+    def init_solver(self, solver_string, **args):
+        solver_class, args = self.get_solver_class_and_args(solver_string, **args)
         solver = solver_class(self.do_domain, **args)
         self.do_solver = solver
         self.params_solver = args
         return solver
 
     def get_params(self, solver_string):
-        right_solvers = [k for k in self.solvers_map if k.__name__ == solver_string]
-        if len(right_solvers) == 0:
-            raise SolverNameException("Error, please choose among this : " + str(self.solvers_list))
-        else:
-            solver_class = right_solvers[0]
-        return self.solvers_map[solver_class][1]
+        return self.get_solver_class_and_args(solver_string)[1]
 
     def solve_domain(self, **args):
         for k in args:
             self.params_solver[k] = args[k]
-        result = self.do_solver.solve(**self.params_solver)
+        params_solver = dict(self.params_solver)
+        incumbents = queue.Queue()
+        if accepts_callbacks(self.do_solver.solve):
+            params_solver["callbacks"] = [ProgressCallback({}, str(self.tag), incumbents=incumbents)]
+        result = self.do_solver.solve(**params_solver)
+        self.job_id = None
+        self.incumbents = list(incumbents.queue)
         return result
 
 
-def find_right_module_solvers(problem_type: ProblemType):
-    if problem_type.value == problem_type.COLORING.value:
-        import discrete_optimization.coloring.coloring_solvers as coloring_solvers
-        from discrete_optimization.coloring.coloring_parser import parse, parse_file
-        module = coloring_solvers
-        return module, module.solvers_map,\
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.FACILITY_LOCATION.value:
-        import discrete_optimization.facility.facility_solvers as facility_solvers
-        module = facility_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.FLEET_ALLOCATION.value:
-        return None # TODO
-    if problem_type.value == problem_type.FLEET_ROTATION.value:
-        import discrete_optimization.fleet_rotation.solver.fleet_rotation_solvers as fleet_rotation_solvers
-        module = fleet_rotation_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.KNAPSACK.value:
-        import discrete_optimization.knapsack.knapsack_solvers as knapsack_solvers
-        module = knapsack_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.PICKUP_VRP.value:
-        return None  # TODO
-    if problem_type.value == problem_type.RCPSP.value:
-        import discrete_optimization.rcpsp.rcpsp_solvers as rcpsp_solvers
-        module = rcpsp_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.MS_RCPSP.value:
-        import discrete_optimization.rcpsp_multiskill.rcpsp_multiskill_solvers as rcpsp_multiskill_solvers
-        module = rcpsp_multiskill_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.TSP.value:
-        import discrete_optimization.tsp.tsp_solvers as tsp_solvers
-        module = tsp_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-    if problem_type.value == problem_type.TTP.value:
-        return None  # TODO
-    if problem_type.value == problem_type.VRP.value:
-        import discrete_optimization.vrp.vrp_solvers as vrp_solvers
-        module = vrp_solvers
-        return module, module.solvers_map, \
-               module.solvers_compatibility, module.look_for_solver
-
-
 def find_right_parser(problem_type: ProblemType):
     if problem_type.value == problem_type.COLORING.value:
         import discrete_optimization.coloring.coloring_parser as coloring_parser
@@ -197,6 +162,14 @@ def find_right_parser(problem_type: ProblemType):
 
 
 static_solver_service_dict: Dict[int, StaticSolverService] = {}
+# parsed instances, keyed by the hash of their content, kept in a memory bounded cache with snapshots on disk
+instance_store = InstanceStore(os.environ.get("DO_WEB_SERVICE_STORE",
+                                              os.path.join(tempfile.gettempdir(), "do_web_service_instance_store")),
+                               max_memory_bytes=int(os.environ.get("DO_WEB_SERVICE_CACHE_MB", 1024))*1024**2)
+# (key of the instance, tag) -> id_instance of its solver service
+services_by_instance: Dict[Tuple[str, Optional[str]], int] = {}
+# solves submitted to /jobs, run in a pool of processes
+job_manager = JobManager()
 
 
 @app.post("/init_problem")
@@ -205,24 +178,40 @@ def init_problem(file: UploadFile = File(...),
                  tag: str = None):
     """
     Init a solver service instance with a given problem.
+    Posting again the same instance (same content and problem type) with the same tag returns the id of the
+    existing solver service, without parsing the instance again.
     :param file: file input
     :param problem_type: problem type implemented in DO
     :param tag: name of the solver service instance you want to give.
     :return:
     """
+    payload = file.file.read()
+    if problem_type.value == problem_type.FLEET_ROTATION.value:
+        import pickle
+        parse_function = pickle.loads
+    else:
+        parser = find_right_parser(problem_type=problem_type)[0]
+
+        def parse_function(data: bytes):
+            return parser(data.decode("utf-8"))
+    instance_key, do_domain, _ = instance_store.get_or_create(problem_type.value, payload, parse_function)
+    service_key = (instance_key, None if tag is None else str(tag))
+    if service_key in services_by_instance and services_by_instance[service_key] in static_solver_service_dict:
+        id_instance = services_by_instance[service_key]
+        return id_instance, str(do_domain)
     id_instance = time.time_ns()
     if tag is None:
         tag = id_instance
     tag = str(tag)
     static_solver_service_dict[id_instance] = StaticSolverService(tag=tag, problem_type=problem_type)
-    parse_function = find_right_parser(problem_type=problem_type)
-    if problem_type.value == problem_type.FLEET_ROTATION.value:
-        import pickle
-        static_solver_service_dict[id_instance].do_domain = pickle.load(file.file)
-    else:
-        f = file.file.read()
-        static_solver_service_dict[id_instance].do_domain = parse_function[0](f.decode("utf-8"))
-    return id_instance, str(static_solver_service_dict[id_instance].do_domain)
+    static_solver_service_dict[id_instance].instance_key = instance_key
+    services_by_instance[service_key] = id_instance
+    return id_instance, str(do_domain)
+
+
+@app.get("/instance_store")
+def get_instance_store_stats():
+    return instance_store.stats()
 
 
 @app.post("/get_available_solvers")
@@ -250,6 +239,7 @@ def solve_domain(solver_string: str,
     by calling get_params_solver() service
     :return: evaluation of the best solution found.
     """
+    from uvicorn.loops import asyncio
     asyncio.asyncio_setup()
     if id_instance is None:
         id_instance = max(static_solver_service_dict)
@@ -267,27 +257,189 @@ def solve_domain(solver_string: str,
            {k: int(best_evaluation[k]) for k in best_evaluation}
 
 
-@app.post("/get_fitness_evolution", description="plot the fitness evolution inside the algorithm")
-def get_fitness_evolution(id_instance: int = None,
-                          file_name_png: str = None):
+@app.post("/jobs")
+def submit_job(solver_string: str,
+               params: Dict[str, Any] = None,
+               id_instance: int = None,
+               stream_schedules: bool = False):
+    """
+    Same as solve_domain, but the solve runs in the background in the pool of the job manager.
+    :param stream_schedules: the new best solutions streamed by /jobs/{job_id}/stream come with their schedule
+    :return: id of the job, to follow with GET /jobs/{job_id} and cancel with DELETE /jobs/{job_id}.
+    """
     if id_instance is None:
         id_instance = max(static_solver_service_dict)
-    if file_name_png is None:
-        file_name_png = str(id_instance)+"temp_fitness_image.png"
+    service = static_solver_service_dict[id_instance]
+    if params is None:
+        params = {}
+    try:
+        solver_class, args = service.get_solver_class_and_args(solver_string=solver_string, **params)
+    except SolverNameException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    solve_args = dict(args)
+    solve_args.update(params)
+
+    def on_result(result):
+        service.results = result
+    job_id = job_manager.submit(service.do_domain, solver_class,
+                                solver_args=args, solve_args=solve_args, on_result=on_result,
+                                description={"solver": solver_string, "id_instance": id_instance},
+                                with_schedule=stream_schedules)
+    service.job_id = job_id
+    service.incumbents = None
+    return {"job_id": job_id, "status": job_manager.get_status(job_id).value}
+
+
+@app.get("/jobs")
+def get_jobs():
+    return [job_manager.status(job_id) for job_id in list(job_manager.jobs)]
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Status of the job (PENDING, RUNNING, CANCELLING, DONE, FAILED, CANCELLED), current best fitness while it runs,
+    number of solutions and evaluation of the best one when it is finished.
+    """
+    if job_id not in job_manager.jobs:
+        raise HTTPException(status_code=404, detail="Unknown job "+job_id)
+    return job_manager.status(job_id)
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """
+    Cancel the job : a pending job never runs, a running one stops at its next iteration
+    (solvers supporting callbacks) and keeps the solutions found so far.
+    A job already finished is deleted (its result is dropped), its last status is returned.
+    """
+    if job_id not in job_manager.jobs:
+        raise HTTPException(status_code=404, detail="Unknown job "+job_id)
+    if job_manager.cancel(job_id):
+        return job_manager.status(job_id)
+    status = job_manager.status(job_id)
+    status["deleted"] = job_manager.forget(job_id)
+    return status
+
+
+@app.get("/jobs/{job_id}/incumbents")
+def get_job_incumbents(job_id: str, start: int = 0):
+    """
+    New best solutions of the job found so far (fitness, time, elapsed, iteration, index, schedule).
+    """
+    if job_id not in job_manager.jobs:
+        raise HTTPException(status_code=404, detail="Unknown job "+job_id)
+    return job_manager.get_incumbents(job_id, start=start)
+
+
+def server_sent_event(event: str, data: Any) -> str:
+    return "event: "+event+"\ndata: "+json.dumps(data)+"\n\n"
+
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str, min_interval: float = 0.5, start: int = 0):
+    """
+    Server-sent events of the job : an "incumbent" event for each new best solution, at most one every
+    min_interval seconds (the latest one, the skipped ones stay available in /jobs/{job_id}/incumbents),
+    and an "end" event with the final status of the job.
+    :param start: index of the first incumbent to send (to resume a stream).
+    """
+    if job_id not in job_manager.jobs:
+        raise HTTPException(status_code=404, detail="Unknown job "+job_id)
+
+    async def events():
+        next_index = start
+        while True:
+            finished = job_manager.jobs[job_id].future.done()
+            # the job manager calls (manager queue and dict, lock shared with the executor threads) block,
+            # they run in the threadpool instead of the event loop
+            incumbents = await run_in_threadpool(job_manager.get_incumbents, job_id, start=next_index)
+            if len(incumbents) > 0:
+                next_index = incumbents[-1]["index"]+1
+                yield server_sent_event("incumbent", incumbents[-1])
+            if finished:
+                status = await run_in_threadpool(job_manager.status, job_id)
+                yield server_sent_event("end", status)
+                return
+            await asyncio.sleep(min_interval)
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+def fitness_png(x: List[float], y: List[float], xlabel: str, step: bool = False) -> io.BytesIO:
+    """
+    Png image of a fitness curve, rendered in memory.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
     import matplotlib.pyplot as plt
     fig, ax = plt.subplots(1)
-    results = static_solver_service_dict[id_instance].results
-    fitness = [x[1] for x in results.list_solution_fits]
-    ax.plot(fitness)
+    if step:
+        ax.step(x, y, where="post")
+    else:
+        ax.plot(x, y)
     ax.set_title("Fitness evolution")
-    ax.set_xlabel("Iteration or #solutions")
+    ax.set_xlabel(xlabel)
     ax.set_ylabel("Fitness ")
-    fig.savefig(os.path.join(output_image_directory, file_name_png), dpi=300,
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=150,
                 facecolor=fig.get_facecolor(),
                 edgecolor='none')
-    img = cv2.imread(os.path.join(output_image_directory, file_name_png))
-    res, im_png = cv2.imencode(".png", img)
-    return StreamingResponse(io.BytesIO(im_png.tobytes()), media_type="image/png")
+    plt.close(fig)
+    buffer.seek(0)
+    return buffer
+
+
+def incumbents_png_response(incumbents: List[Dict[str, Any]]) -> StreamingResponse:
+    # best fitness along the time, the multi objective fitnesses are skipped
+    incumbents = [incumbent for incumbent in incumbents if not isinstance(incumbent["fitness"], list)]
+    return StreamingResponse(fitness_png([incumbent["elapsed"] for incumbent in incumbents],
+                                         [incumbent["fitness"] for incumbent in incumbents],
+                                         xlabel="Time (s)", step=True),
+                             media_type="image/png")
+
+
+@app.get("/jobs/{job_id}/fitness_evolution", description="plot the best fitness of the job along the time")
+def get_job_fitness_evolution(job_id: str):
+    if job_id not in job_manager.jobs:
+        raise HTTPException(status_code=404, detail="Unknown job "+job_id)
+    return incumbents_png_response(job_manager.get_incumbents(job_id))
+
+
+@app.get("/solvers")
+def get_solvers(problem_type: ProblemType = None):
+    """
+    Solvers of each problem type and their default params, without importing them.
+    """
+    return solver_registry.schema(problem_type.value if problem_type is not None else None)
+
+
+@app.on_event("startup")
+def warm_up_solvers():
+    # DO_WEB_SERVICE_WARM_SOLVERS=1 : import the solvers in the background instead of at their first use
+    if os.environ.get("DO_WEB_SERVICE_WARM_SOLVERS", "0") == "1":
+        solver_registry.warm_up(background=True)
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    job_manager.shutdown()
+
+
+@app.post("/get_fitness_evolution", description="plot the fitness evolution inside the algorithm")
+def get_fitness_evolution(id_instance: int = None):
+    """
+    Best fitness along the time of the last solve of the instance (solve_domain or job), from its new best
+    solutions (the result storage only keeps the best solutions, not their order of discovery).
+    """
+    if id_instance is None:
+        id_instance = max(static_solver_service_dict)
+    service = static_solver_service_dict[id_instance]
+    if service.job_id is not None and service.job_id in job_manager.jobs:
+        return incumbents_png_response(job_manager.get_incumbents(service.job_id))
+    if service.incumbents is None:
+        raise HTTPException(status_code=404, detail="No solve of the instance "+str(id_instance))
+    return incumbents_png_response(service.incumbents)
 
 
 @app.get("/get_instanciated_problems")
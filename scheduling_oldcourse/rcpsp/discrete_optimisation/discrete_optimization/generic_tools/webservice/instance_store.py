@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+
+def canonical_payload(payload: bytes) -> bytes:
+    """
+    Payload of an instance with its formatting removed, so that the same instance posted twice has the same
+    content hash : json is re-serialized with sorted keys, text gets unix line endings without trailing spaces.
+    Binary payloads (e.g. pickled models) are kept as is.
+    """
+    try:
+        text = payload.decode("utf-8")
+    except UnicodeDecodeError:
+        return payload
+    try:
+        return json.dumps(json.loads(text), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    while len(lines) > 0 and lines[-1] == "":
+        lines.pop()
+    return "\n".join(lines).encode("utf-8")
+
+
+def content_hash(problem_type: str, payload: bytes) -> str:
+    h = hashlib.sha256(problem_type.encode("utf-8"))
+    h.update(b"\0")
+    h.update(canonical_payload(payload))
+    return h.hexdigest()
+
+
+class InstanceStore:
+    """
+    Instances of the web service keyed by the content hash of their payload (problem type + canonical_payload) :
+    posting an instance already known returns the stored model without parsing it again.
+    Models are kept in memory in a LRU cache bounded by max_memory_bytes, and each one has a snapshot in
+    snapshot_directory : the binary format of rcpsp (save_binary) when the model supports it, a pickle otherwise.
+    Evicted models are reloaded from their snapshot when they are needed again.
+    The memory size of a model is estimated by the size of its snapshot file (arrays of the npz, or pickle).
+    """
+    def __init__(self, snapshot_directory: str, max_memory_bytes: int = 1024**3):
+        self.snapshot_directory = snapshot_directory
+        self.max_memory_bytes = max_memory_bytes
+        if not os.path.exists(self.snapshot_directory):
+            os.makedirs(self.snapshot_directory)
+        self.entries: OrderedDict = OrderedDict()  # key -> (model, estimated size)
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.snapshot_loads = 0
+        self._lock = threading.RLock()
+
+    def snapshot_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.snapshot_directory, key+extension)
+
+    def get_or_create(self, problem_type: str, payload: bytes,
+                      parse_function: Callable[[bytes], Any]) -> Tuple[str, Any, bool]:
+        """
+        Returns the key of the instance, the model, and whether it was parsed (False if it was already stored).
+        parse_function : payload -> model, only called for new instances.
+        """
+        key = content_hash(problem_type, payload)
+        with self._lock:
+            if key in self.entries or self.has_snapshot(key):
+                self.hits += 1
+                return key, self.get(key), False
+            self.misses += 1
+        # parsing out of the lock, another thread may store the same instance meanwhile (same key, same content)
+        problem = parse_function(payload)
+        with self._lock:
+            if key not in self.entries:
+                self.write_snapshot(key, problem)
+                self.put(key, problem, self.snapshot_size(key))
+            return key, self.entries[key][0], True
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            problem = self.read_snapshot(key)
+            self.snapshot_loads += 1
+            self.put(key, problem, self.snapshot_size(key))
+            return problem
+
+    def put(self, key: str, problem, size: int):
+        self.entries[key] = (problem, size)
+        self.memory_bytes += size
+        # the last inserted model stays in memory even when it is bigger than the budget
+        while self.memory_bytes > self.max_memory_bytes and len(self.entries) > 1:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.memory_bytes -= evicted_size
+
+    def has_snapshot(self, key: str) -> bool:
+        return os.path.exists(self.snapshot_path(key, ".npz")) or os.path.exists(self.snapshot_path(key, ".pkl"))
+
+    def snapshot_size(self, key: str) -> int:
+        for extension in [".npz", ".pkl"]:
+            if os.path.exists(self.snapshot_path(key, extension)):
+                return os.path.getsize(self.snapshot_path(key, extension))
+        return 0
+
+    def write_snapshot(self, key: str, problem):
+        if hasattr(problem, "save_binary"):
+            path = self.snapshot_path(key, ".npz")
+            try:
+                # written under a temporary name : a snapshot that exists is complete
+                problem.save_binary(path+".tmp.npz")
+                os.replace(path+".tmp.npz", path)
+                return
+            except (TypeError, ValueError, NotImplementedError):
+                # special constraints, ids of other types... not handled by the binary format
+                if os.path.exists(path+".tmp.npz"):
+                    os.remove(path+".tmp.npz")
+        path = self.snapshot_path(key, ".pkl")
+        with open(path+".tmp", "wb") as f:
+            pickle.dump(problem, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path+".tmp", path)
+
+    def read_snapshot(self, key: str):
+        if os.path.exists(self.snapshot_path(key, ".npz")):
+            from discrete_optimization.rcpsp.rcpsp_binary_format import load_binary
+            return load_binary(self.snapshot_path(key, ".npz"))
+        with open(self.snapshot_path(key, ".pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def stats(self):
+        return {"nb_in_memory": len(self.entries),
+                "memory_bytes": self.memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "snapshot_loads": self.snapshot_loads}
@@ -0,0 +1,337 @@
+import inspect
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, Future
+from enum import Enum
+from typing import Dict, Any, Callable, List
+
+from discrete_optimization.generic_tools.callbacks import Callback, CancellationStopper
+from discrete_optimization.generic_tools.do_problem import ModeOptim
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    # cancel requested, the job stops at its next iteration (or as soon as a worker picks it)
+    CANCELLING = "CANCELLING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class ProgressCallback(Callback):
+    """
+    Publishes the progress of a solve running in a worker process in the shared progress dict of the JobManager.
+    The dict is a multiprocessing manager proxy (one inter process call per update) : it is updated on each
+    new best solution, and otherwise at most every min_interval seconds.
+    Each new best solution is also put in the incumbents queue of the job (fitness, timestamp, iteration and,
+    with_schedule, compact_solution of the solution), see JobManager.get_incumbents.
+    """
+    def __init__(self, progress, job_id: str, min_interval: float = 0.5,
+                 incumbents=None, with_schedule: bool = False):
+        self.progress = progress
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self.incumbents = incumbents
+        self.with_schedule = with_schedule
+        self.start_time = time.time()
+        self.last_update = 0.
+        self.state = {}
+
+    def on_solve_start(self, solver, mode_optim: ModeOptim):
+        self.state = {"solver": solver.__class__.__name__,
+                      "start_time": self.start_time,
+                      "iteration": 0,
+                      "best_fitness": None,
+                      "nb_new_best": 0}
+        self.publish()
+
+    def on_new_best(self, solver, iteration: int, solution, objective):
+        self.state["best_fitness"] = objective_to_json(objective)
+        self.state["nb_new_best"] += 1
+        self.state["iteration"] = iteration
+        self.publish()
+        if self.incumbents is not None:
+            incumbent = {"fitness": self.state["best_fitness"],
+                         "time": self.last_update,
+                         "elapsed": self.state["elapsed"],
+                         "iteration": iteration}
+            if self.with_schedule:
+                incumbent["schedule"] = compact_solution(solution)
+            self.incumbents.put(incumbent)
+
+    def on_iteration(self, solver, iteration: int, best_objective):
+        self.state["iteration"] = iteration
+        if best_objective is not None:
+            self.state["best_fitness"] = objective_to_json(best_objective)
+        if time.time() - self.last_update >= self.min_interval:
+            self.publish()
+
+    def publish(self):
+        self.last_update = time.time()
+        self.state["elapsed"] = self.last_update - self.start_time
+        self.progress[self.job_id] = dict(self.state)
+
+
+def objective_to_json(objective):
+    # aggregated fitness of the solvers : number (numpy or not) or TupleFitness
+    if hasattr(objective, "vector_fitness"):
+        return [float(x) for x in objective.vector_fitness]
+    return float(objective)
+
+
+def compact_solution(solution):
+    """
+    Small json representation of a solution sent with the incumbents :
+    {task: [start, end]} for scheduling solutions, None when the solution type is not handled.
+    """
+    tasks = getattr(getattr(solution, "problem", None), "tasks_list", None)
+    if tasks is None or not hasattr(solution, "get_start_time") or not hasattr(solution, "get_end_time"):
+        return None
+    schedule = {}
+    for task in tasks:
+        start, end = solution.get_start_time(task), solution.get_end_time(task)
+        # None for the tasks not scheduled
+        schedule[str(task)] = [int(start) if start is not None else None, int(end) if end is not None else None]
+    return schedule
+
+
+def downsample(points: List[Any], max_points: int) -> List[Any]:
+    # keeps one point out of two (and always the last one) until there are at most max_points
+    while len(points) > max_points > 1:
+        points = points[:-1:2] + [points[-1]]
+    return points
+
+
+def accepts_callbacks(solve_function) -> bool:
+    parameters = inspect.signature(solve_function).parameters.values()
+    return any(p.kind == inspect.Parameter.VAR_KEYWORD or p.name == "callbacks" for p in parameters)
+
+
+def run_job(job_id: str,
+            problem,
+            solver_class,
+            solver_args: Dict[str, Any],
+            solve_args: Dict[str, Any],
+            cancel_event,
+            progress,
+            incumbents=None,
+            with_schedule: bool = False):
+    """
+    Solve run by the workers of the JobManager, with a CancellationStopper on the cancel event of the job
+    and a ProgressCallback. Solvers without callbacks support ignore them and are not cancellable once started.
+    Returns the result storage and the evaluation of its best solution.
+    """
+    if cancel_event.is_set():
+        return None, None
+    # the job is running as soon as it has an entry in progress
+    progress[job_id] = {"start_time": time.time()}
+    solver = solver_class(problem, **solver_args)
+    if accepts_callbacks(solver.solve):
+        solve_args = dict(solve_args)
+        solve_args["callbacks"] = [CancellationStopper(cancel_event),
+                                   ProgressCallback(progress, job_id, incumbents=incumbents,
+                                                    with_schedule=with_schedule)]
+    result = solver.solve(**solve_args)
+    best_solution = result.get_best_solution()
+    best_evaluation = problem.evaluate(best_solution) if best_solution is not None else None
+    return result, best_evaluation
+
+
+class Job:
+    def __init__(self, job_id: str, future: Future, cancel_event, description: Dict[str, Any]):
+        self.job_id = job_id
+        self.future = future
+        self.cancel_event = cancel_event
+        self.description = description
+        self.submit_time = time.time()
+        self.end_time = None
+        self.cancel_requested = False
+        self.incumbents_queue = None
+        # incumbents received from the worker, downsampled to max_incumbents points
+        self.incumbents = []
+        self.nb_incumbents = 0
+
+
+class JobManager:
+    """
+    Runs the solves of the web service in a bounded pool of max_workers processes (default : number of cpus,
+    or DO_WEB_SERVICE_WORKERS). submit returns a job id immediately, status gives the state and the current best
+    fitness of the job, cancel stops it cooperatively (a pending job never starts, a running one stops at
+    its next iteration through its callbacks).
+    The pool and the multiprocessing manager sharing the progress of the jobs are started on the first submit.
+    Finished jobs (with their result storage) are kept until forget is called, at most max_finished_jobs of them
+    (default 100, or DO_WEB_SERVICE_MAX_FINISHED_JOBS) : the oldest ones are forgotten on the next submit.
+    """
+    def __init__(self, max_workers: int = None, max_incumbents: int = 2000, max_finished_jobs: int = None):
+        self.max_incumbents = max_incumbents
+        if max_workers is None:
+            max_workers = int(os.environ.get("DO_WEB_SERVICE_WORKERS", os.cpu_count() or 1))
+        self.max_workers = max_workers
+        if max_finished_jobs is None:
+            max_finished_jobs = int(os.environ.get("DO_WEB_SERVICE_MAX_FINISHED_JOBS", 100))
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._progress = None
+
+    def _start(self):
+        if self._executor is None:
+            # spawned workers : forking the process of the service after numba has started its threads can deadlock
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._progress = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def submit(self,
+               problem,
+               solver_class,
+               solver_args: Dict[str, Any] = None,
+               solve_args: Dict[str, Any] = None,
+               on_result: Callable[[Any], None] = None,
+               description: Dict[str, Any] = None,
+               with_schedule: bool = False) -> str:
+        """
+        on_result : called with the result storage when the job finishes without error (in a thread of the executor).
+        with_schedule : the incumbents of the job come with the compact_solution of the solution.
+        """
+        with self._lock:
+            self._start()
+            self._evict_finished_jobs()
+            job_id = uuid.uuid4().hex
+            cancel_event = self._manager.Event()
+            incumbents_queue = self._manager.Queue()
+            future = self._executor.submit(run_job, job_id, problem, solver_class,
+                                           solver_args or {}, solve_args or {},
+                                           cancel_event, self._progress, incumbents_queue, with_schedule)
+            job = Job(job_id, future, cancel_event, description or {"solver": solver_class.__name__})
+            job.incumbents_queue = incumbents_queue
+            self.jobs[job_id] = job
+
+        def done(f: Future):
+            job.end_time = time.time()
+            if on_result is not None and not f.cancelled() and f.exception() is None and f.result()[0] is not None:
+                on_result(f.result()[0])
+        future.add_done_callback(done)
+        return job_id
+
+    def get_status(self, job_id: str) -> JobStatus:
+        job = self.jobs[job_id]
+        future = job.future
+        if future.cancelled():
+            return JobStatus.CANCELLED
+        if future.done():
+            if future.exception() is not None:
+                return JobStatus.FAILED
+            return JobStatus.CANCELLED if job.cancel_requested else JobStatus.DONE
+        if job.cancel_requested:
+            return JobStatus.CANCELLING
+        if job_id in self._progress:
+            return JobStatus.RUNNING
+        return JobStatus.PENDING
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        job = self.jobs[job_id]
+        status = self.get_status(job_id)
+        answer = {"id": job_id,
+                  "status": status.value,
+                  "submit_time": job.submit_time,
+                  "end_time": job.end_time,
+                  "cancel_requested": job.cancel_requested}
+        answer.update(job.description)
+        progress = self._progress.get(job_id, None)
+        if progress is not None:
+            answer["progress"] = dict(progress)
+            answer["best_fitness"] = progress.get("best_fitness", None)
+        if status in {JobStatus.DONE, JobStatus.CANCELLED} and not job.future.cancelled():
+            result, best_evaluation = job.future.result()
+            if result is not None:
+                answer["nb_solutions"] = len(result.list_solution_fits)
+                answer["best_evaluation"] = {k: float(best_evaluation[k]) for k in best_evaluation}
+        if status == JobStatus.FAILED:
+            exception = job.future.exception()
+            answer["error"] = "".join(traceback.format_exception_only(type(exception), exception))
+        return answer
+
+    def get_incumbents(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        """
+        New best solutions of the job received so far, from the index start in the sequence of all incumbents
+        (each incumbent has its index). Once more than max_incumbents are received, the history kept
+        is downsampled, the indexes of the dropped incumbents are missing.
+        """
+        job = self.jobs[job_id]
+        with self._lock:
+            received = []
+            while True:
+                try:
+                    received.append(job.incumbents_queue.get_nowait())
+                except queue.Empty:
+                    break
+            for incumbent in received:
+                incumbent["index"] = job.nb_incumbents
+                job.nb_incumbents += 1
+            if len(received) > 0:
+                job.incumbents = downsample(job.incumbents + received, self.max_incumbents)
+            return [incumbent for incumbent in job.incumbents if incumbent["index"] >= start]
+
+    def result(self, job_id: str):
+        # result storage of a finished job (None if it was cancelled before starting)
+        return self.jobs[job_id].future.result()[0]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Returns False when the job was already finished.
+        """
+        job = self.jobs[job_id]
+        if job.future.done():
+            return False
+        job.cancel_requested = True
+        job.cancel_event.set()
+        if not job.future.cancel():
+            # already running, or already in the call queue of the pool : the worker sees the cancel event
+            # (run_job returns immediately if it was set before the start), the job is CANCELLING until then.
+            logger.info("Job %s cancelled through its cancel event", job_id)
+        return True
+
+    def forget(self, job_id: str) -> bool:
+        """
+        Drop a finished job, its progress, incumbents and result. Returns False when the job is not finished.
+        """
+        with self._lock:
+            if self.jobs[job_id].end_time is None:
+                return False
+            self._forget(job_id)
+            return True
+
+    def _forget(self, job_id: str):
+        self.jobs.pop(job_id)
+        self._progress.pop(job_id, None)
+
+    def _evict_finished_jobs(self):
+        # forgets the oldest finished jobs above max_finished_jobs (called with the lock)
+        finished = sorted([job for job in self.jobs.values() if job.end_time is not None],
+                          key=lambda job: job.end_time)
+        for job in finished[:max(0, len(finished)-self.max_finished_jobs)]:
+            self._forget(job.job_id)
+
+    def shutdown(self):
+        with self._lock:
+            for job in self.jobs.values():
+                if not job.future.done():
+                    job.cancel_requested = True
+                    job.cancel_event.set()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._manager.shutdown()
+            self._executor = None
+            self._manager = None
@@ -0,0 +1,220 @@
+import importlib
+import threading
+import traceback
+from typing import Dict, Any, List, Optional, Tuple
+
+
+def import_object(path: str):
+    """
+    Object from its path "package.module:attribute" (the attribute can be dotted, e.g. "cp_tools:ParametersCP.default").
+    """
+    module_name, attribute = path.split(":")
+    obj = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+class SolverEntry:
+    """
+    Declarative description of a solver of the web service : name, class ("package.module:Class"), method
+    ("cp", "ga"...) and default parameters. Nothing is imported until load is called.
+    params : json default parameters.
+    lazy_params : parameters that are python objects, parameter name -> path of the default value, imported by
+    default_params. Functions are called to build the value (e.g. "...cp_tools:ParametersCP.default"),
+    other objects (e.g. "...cp_tools:CPSolverName.CHUFFED") are used as is.
+    """
+    def __init__(self,
+                 name: str,
+                 solver_class: str,
+                 method: str,
+                 params: Dict[str, Any] = None,
+                 lazy_params: Dict[str, Any] = None):
+        self.name = name
+        self.solver_class = solver_class
+        self.method = method
+        self.params = params if params is not None else {}
+        self.lazy_params = lazy_params if lazy_params is not None else {}
+        # default params of python objects already built (see SolverModule)
+        self.built_params: Dict[str, Any] = {}
+        self.loaded_class = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        # the first call imports the module of the solver, the next ones return the cached class
+        with self._lock:
+            if self.loaded_class is None:
+                try:
+                    self.loaded_class = import_object(self.solver_class)
+                    self.error = None
+                except Exception as e:
+                    self.error = "".join(traceback.format_exception_only(type(e), e)).strip()
+                    raise
+            return self.loaded_class
+
+    def default_params(self) -> Dict[str, Any]:
+        params = dict(self.params)
+        params.update(self.built_params)
+        for name, path in self.lazy_params.items():
+            value = import_object(path)
+            params[name] = value() if callable(value) else value
+        return params
+
+    def schema(self) -> Dict[str, Any]:
+        return {"name": self.name,
+                "class": self.solver_class,
+                "method": self.method,
+                "params": dict(self.params),
+                "lazy_params": dict(self.lazy_params),
+                "loaded": self.loaded_class is not None,
+                "error": self.error}
+
+
+class SolverModule:
+    """
+    Solvers of a problem type listed by a solvers module of the library ("solvers_map" : solver class ->
+    (method, default params)), the module is imported on first use. Its solvers are not known before.
+    """
+    def __init__(self, module: str):
+        self.module = module
+        self.entries: Optional[List[SolverEntry]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> List[SolverEntry]:
+        with self._lock:
+            if self.entries is None:
+                try:
+                    module = importlib.import_module(self.module)
+                    self.error = None
+                except Exception as e:
+                    self.error = "".join(traceback.format_exception_only(type(e), e)).strip()
+                    raise
+                entries = []
+                for solver_class, (method, params) in module.solvers_map.items():
+                    entry = SolverEntry(solver_class.__name__,
+                                        solver_class.__module__+":"+solver_class.__name__,
+                                        method)
+                    entry.loaded_class = solver_class
+                    entry.built_params = dict(params)
+                    entries.append(entry)
+                self.entries = entries
+            return self.entries
+
+    def schema(self) -> Dict[str, Any]:
+        return {"module": self.module,
+                "loaded": self.entries is not None,
+                "error": self.error,
+                "solvers": [e.name for e in self.entries] if self.entries is not None else None}
+
+
+CP_PARAMS = {"parameters_cp": "discrete_optimization.generic_tools.cp_tools:ParametersCP.default",
+             "cp_solver_name": "discrete_optimization.generic_tools.cp_tools:CPSolverName.CHUFFED"}
+
+# problem type (value of ProblemType) -> SolverEntry list, or SolverModule
+SOLVERS_TABLE = {
+    "COLORING": SolverModule("discrete_optimization.coloring.coloring_solvers"),
+    "FACILITY_LOCATION": SolverModule("discrete_optimization.facility.facility_solvers"),
+    "FLEET_ROTATION": SolverModule("discrete_optimization.fleet_rotation.solver.fleet_rotation_solvers"),
+    "KNAPSACK": SolverModule("discrete_optimization.knapsack.knapsack_solvers"),
+    "RCPSP": [SolverEntry("CPM", "discrete_optimization.rcpsp.solver.cpm:CPM", "cpm"),
+              SolverEntry("CP_RCPSP_MZN", "discrete_optimization.rcpsp.solver.cp_solvers:CP_RCPSP_MZN", "cp",
+                          lazy_params=CP_PARAMS),
+              SolverEntry("CP_MRCPSP_MZN", "discrete_optimization.rcpsp.solver.cp_solvers:CP_MRCPSP_MZN", "cp",
+                          lazy_params=CP_PARAMS),
+              SolverEntry("Ga", "discrete_optimization.generic_tools.ea.ga:Ga", "ga",
+                          params={"encoding": "rcpsp_permutation", "objectives": ["makespan"],
+                                  "objective_weights": [-1], "pop_size": 100, "max_evals": 10000,
+                                  "deap_verbose": False},
+                          lazy_params={"objective_handling":
+                                       "discrete_optimization.generic_tools.do_problem:ObjectiveHandling.AGGREGATE"})],
+    "MS_RCPSP": SolverModule("discrete_optimization.rcpsp_multiskill.rcpsp_multiskill_solvers"),
+    "TSP": SolverModule("discrete_optimization.tsp.tsp_solvers"),
+    "VRP": SolverModule("discrete_optimization.vrp.vrp_solvers"),
+}
+
+
+class SolverRegistry:
+    """
+    Solvers available for each problem type, from a declarative table (see SOLVERS_TABLE). The table is read
+    without importing any solver : the modules of the solvers (minizinc, deap, mip...) are imported on first use
+    of the solver (get), or in the background by warm_up.
+    """
+    def __init__(self, table: Dict[str, Any] = None):
+        self.table = table if table is not None else SOLVERS_TABLE
+        self._warm_up_thread = None
+
+    def problem_types(self) -> List[str]:
+        return list(self.table)
+
+    def entries(self, problem_type: str) -> List[SolverEntry]:
+        # imports the solvers module of the problem types without declared solvers
+        solvers = self.table.get(problem_type, None)
+        if solvers is None:
+            return []
+        if isinstance(solvers, SolverModule):
+            return solvers.load()
+        return solvers
+
+    def names(self, problem_type: str) -> Optional[List[str]]:
+        """
+        Names of the solvers of the problem type, None if they are not known without importing their module.
+        """
+        solvers = self.table.get(problem_type, None)
+        if solvers is None:
+            return []
+        if isinstance(solvers, SolverModule):
+            return [e.name for e in solvers.entries] if solvers.entries is not None else None
+        return [e.name for e in solvers]
+
+    def entry(self, problem_type: str, name: str) -> SolverEntry:
+        for entry in self.entries(problem_type):
+            if entry.name == name:
+                return entry
+        raise KeyError(name)
+
+    def get(self, problem_type: str, name: str) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Solver class and default params of the solver name of the problem type.
+        """
+        entry = self.entry(problem_type, name)
+        return entry.load(), entry.default_params()
+
+    def schema(self, problem_type: str = None) -> Dict[str, Any]:
+        # listing of the table, never imports a solver
+        problem_types = [problem_type] if problem_type is not None else self.problem_types()
+        schema = {}
+        for p in problem_types:
+            solvers = self.table.get(p, None)
+            if solvers is None:
+                schema[p] = []
+            elif isinstance(solvers, SolverModule):
+                schema[p] = solvers.schema()
+            else:
+                schema[p] = [e.schema() for e in solvers]
+        return schema
+
+    def warm_up(self, problem_types: List[str] = None, background: bool = True):
+        """
+        Import the solvers of the problem types (default all), in a daemon thread when background.
+        Solvers that can't be imported (e.g. minizinc not installed) get their error in schema.
+        """
+        def run():
+            for p in problem_types if problem_types is not None else self.problem_types():
+                try:
+                    for entry in self.entries(p):
+                        try:
+                            entry.load()
+                        except Exception:
+                            pass
+                except Exception:
+                    pass
+        if not background:
+            run()
+            return
+        self._warm_up_thread = threading.Thread(target=run, name="solver_registry_warm_up", daemon=True)
+        self._warm_up_thread.start()
+
+
+solver_registry = SolverRegistry()
@@ -0,0 +1,98 @@
+import time
+import numpy as np
+
+
+def build_warmup_rcpsp_model():
+    from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel
+    mode_details = {1: {1: {"duration": 0}},
+                    2: {1: {"duration": 2, "R1": 1, "N1": 1}, 2: {"duration": 1, "R1": 2, "N1": 0}},
+                    3: {1: {"duration": 1, "R1": 2, "N1": 1}, 2: {"duration": 3, "R1": 1, "N1": 0}},
+                    4: {1: {"duration": 2, "R1": 1, "N1": 0}, 2: {"duration": 2, "R1": 2, "N1": 1}},
+                    5: {1: {"duration": 0}}}
+    successors = {1: [2, 3], 2: [4], 3: [5], 4: [5], 5: []}
+    return RCPSPModel(resources={"R1": 2, "N1": 10}, non_renewable_resources=["N1"],
+                      mode_details=mode_details, successors=successors, horizon=20)
+
+
+def build_warmup_ms_model(preemptive: bool):
+    from discrete_optimization.rcpsp_multiskill.rcpsp_multiskill import MS_RCPSPModel, Employee, SkillDetail
+    mode_details = {1: {1: {"duration": 0}},
+                    2: {1: {"duration": 2, "R1": 1, "S1": 1}},
+                    3: {1: {"duration": 1, "R1": 1, "S1": 1}},
+                    4: {1: {"duration": 2, "R1": 1}},
+                    5: {1: {"duration": 0}}}
+    successors = {1: [2, 3], 2: [4], 3: [5], 4: [5], 5: []}
+    employees = {i: Employee(dict_skill={"S1": SkillDetail(1, 1, 1)}, calendar_employee=[True]*20)
+                 for i in range(2)}
+    return MS_RCPSPModel(skills_set={"S1"}, resources_set={"R1"}, non_renewable_resources=set(),
+                         resources_availability={"R1": [2]*20}, employees=employees,
+                         mode_details=mode_details, successors=successors, horizon=20,
+                         source_task=1, sink_task=5, preemptive=preemptive).to_variant_model()
+
+
+def warmup_rcpsp():
+    from discrete_optimization.rcpsp.rcpsp_model import RCPSPSolution, ScheduleGenerationScheme, \
+        permutation_do_to_permutation_sgs_fast
+    model = build_warmup_rcpsp_model()
+    model.graph.closure.nb_descendants(model.source_task)
+    for sgs in [ScheduleGenerationScheme.SERIAL_SGS, ScheduleGenerationScheme.PARALLEL_SGS]:
+        model.set_sgs(sgs)
+        solution = RCPSPSolution(problem=model, rcpsp_permutation=[0, 1, 2], rcpsp_modes=[1, 2, 1])
+        solution.compute_mean_resource_reserve()
+        solution.generate_schedule_from_permutation_serial_sgs_2(current_t=0, completed_tasks={},
+                                                                 scheduled_tasks_start_times={})
+        model.evaluate_batch(np.array([[0, 1, 2], [2, 1, 0]]), np.array([[1, 1, 1], [2, 2, 2]]))
+        modes_array = np.array(model.build_mode_array([1, 2, 1]), dtype=np.int32)-1
+        for dtype in [np.int32, np.int64]:
+            permutation_task = permutation_do_to_permutation_sgs_fast(model, [0, 1, 2]).astype(dtype)
+            model.func_sgs(permutation_task=permutation_task, modes_array=modes_array.astype(dtype))
+            model.func_sgs_array(permutation_task=permutation_task, modes_array=modes_array.astype(dtype))
+    model.set_sgs(ScheduleGenerationScheme.SERIAL_SGS)
+    solution = RCPSPSolution(problem=model, rcpsp_permutation=[0, 1, 2], rcpsp_modes=[1, 1, 1])
+    model.evaluate_incremental(solution)
+    solution = RCPSPSolution(problem=model, rcpsp_permutation=[1, 0, 2], rcpsp_modes=[1, 1, 1])
+    solution._schedule_to_recompute = True
+    model.evaluate_incremental(solution)
+
+
+def warmup_rcpsp_preemptive():
+    from discrete_optimization.rcpsp.rcpsp_model_preemptive import get_rcpsp_modelp_preemptive, \
+        RCPSPSolutionPreemptive, ScheduleGenerationScheme
+    model = get_rcpsp_modelp_preemptive(build_warmup_rcpsp_model())
+    for sgs in [ScheduleGenerationScheme.SERIAL_SGS, ScheduleGenerationScheme.PARALLEL_SGS]:
+        model.set_sgs(sgs)
+        solution = RCPSPSolutionPreemptive(problem=model, rcpsp_permutation=[0, 1, 2], rcpsp_modes=[1, 2, 1])
+        model.evaluate(solution)
+
+
+def warmup_ms_rcpsp():
+    from discrete_optimization.rcpsp_multiskill.rcpsp_multiskill import ScheduleGenerationScheme
+    model = build_warmup_ms_model(preemptive=False)
+    for sgs in [ScheduleGenerationScheme.SERIAL_SGS, ScheduleGenerationScheme.PARALLEL_SGS]:
+        model.set_sgs(sgs)
+        solution = model.get_dummy_solution()
+        solution.run_sgs_partial(current_t=0, completed_tasks={}, scheduled_tasks_start_times={})
+    model = build_warmup_ms_model(preemptive=True)
+    solution = model.get_dummy_solution()
+    solution.run_sgs_partial(current_t=0, completed_tasks={}, scheduled_tasks_start_times={})
+
+
+def warmup(verbose: bool = True):
+    """
+    Compile all the numba kernels (sgs of the rcpsp, preemptive and multiskill models, serial and parallel schemes,
+    transitive closure of the precedence graph)
+    on tiny instances, with the argument types used by the models.
+    The kernels are compiled with cache=True : a first warmup writes the compiled code in the __pycache__ folders
+    (or NUMBA_CACHE_DIR), then warmup only loads it. Calling it in a parent process before forking workers
+    (multiprocessing.Pool, web service workers) spares the compilation in each of them.
+    """
+    timings = {}
+    for name, function in [("rcpsp", warmup_rcpsp),
+                           ("rcpsp_preemptive", warmup_rcpsp_preemptive),
+                           ("ms_rcpsp", warmup_ms_rcpsp)]:
+        t = time.perf_counter()
+        function()
+        timings[name] = time.perf_counter()-t
+        if verbose:
+            print("Warmup ", name, " : ", round(timings[name], 3), " sec")
+    return timings
@@ -1,14 +1,105 @@
 import numpy as np
-from numba import njit, jit
+import heapq
+from numba import njit, jit, prange
 
 
-@njit
+def build_successors_csr(tasks_list, successors):
+    # Precedence graph in csr format : the successors of the task of index i are
+    # successors_indices[successors_indptr[i]:successors_indptr[i+1]] (sorted task indexes).
+    index_task = {tasks_list[i]: i for i in range(len(tasks_list))}
+    successors_indptr = np.zeros(len(tasks_list)+1, dtype=np.int64)
+    indices = []
+    for i in range(len(tasks_list)):
+        succ = sorted(set(index_task[s] for s in successors.get(tasks_list[i], [])))
+        indices += succ
+        successors_indptr[i+1] = successors_indptr[i]+len(succ)
+    successors_indices = np.array(indices, dtype=np.int64)
+    return successors_indptr, successors_indices
+
+
+@njit(cache=True)
+def count_predecessors(successors_indptr, successors_indices):
+    pred_links = np.zeros(successors_indptr.shape[0]-1, dtype=np.int64)
+    for k in range(successors_indices.shape[0]):
+        pred_links[successors_indices[k]] += 1
+    return pred_links
+
+
+@njit(cache=True)
+def transpose_csr(successors_indptr, successors_indices):
+    # predecessors of the task of index i : predecessors_indices[predecessors_indptr[i]:predecessors_indptr[i+1]]
+    nb_task_total = successors_indptr.shape[0]-1
+    predecessors_indptr = np.zeros(nb_task_total+1, dtype=np.int64)
+    predecessors_indptr[1:] = np.cumsum(count_predecessors(successors_indptr, successors_indices))
+    predecessors_indices = np.zeros(successors_indices.shape[0], dtype=np.int64)
+    filled = np.copy(predecessors_indptr[:-1])
+    for i in range(nb_task_total):
+        for s in successors_indices[successors_indptr[i]:successors_indptr[i+1]]:
+            predecessors_indices[filled[s]] = i
+            filled[s] += 1
+    return predecessors_indptr, predecessors_indices
+
+
+@njit(cache=True)
+def cpm_forward_backward(topological_order,
+                         successors_indptr,
+                         successors_indices,
+                         predecessors_indptr,
+                         predecessors_indices,
+                         durations,
+                         fixed_starts,  # -1 if the task is not fixed
+                         fixed_ends):
+    # Critical path method over the tasks sorted in topological order : earliest dates in one forward pass,
+    # latest dates in one backward pass (the tasks without successors finish at the makespan).
+    nb_task_total = topological_order.shape[0]
+    esd = np.zeros(nb_task_total, dtype=np.int64)
+    efd = np.zeros(nb_task_total, dtype=np.int64)
+    lsd = np.zeros(nb_task_total, dtype=np.int64)
+    lfd = np.zeros(nb_task_total, dtype=np.int64)
+    for j in range(nb_task_total):
+        i = topological_order[j]
+        if fixed_starts[i] >= 0:
+            esd[i] = fixed_starts[i]
+            efd[i] = fixed_ends[i]
+            continue
+        start = 0
+        for k in range(predecessors_indptr[i], predecessors_indptr[i+1]):
+            start = max(start, efd[predecessors_indices[k]])
+        esd[i] = start
+        efd[i] = start+durations[i]
+    makespan = 0
+    for i in range(nb_task_total):
+        makespan = max(makespan, efd[i])
+    for j in range(nb_task_total-1, -1, -1):
+        i = topological_order[j]
+        if fixed_starts[i] >= 0:
+            lsd[i] = fixed_starts[i]
+            lfd[i] = fixed_ends[i]
+            continue
+        end = makespan
+        for k in range(successors_indptr[i], successors_indptr[i+1]):
+            end = min(end, lsd[successors_indices[k]])
+        lfd[i] = end
+        lsd[i] = end-durations[i]
+    return esd, efd, lsd, lfd
+
+
+@njit(cache=True)
+def position_in_permutation(permutation_task, nb_task_total):
+    # position[task index] = index in permutation_task, -1 if the task is not in the permutation
+    position = np.full(nb_task_total, -1, dtype=np.int64)
+    for j in range(permutation_task.shape[0]):
+        position[permutation_task[j]] = j
+    return position
+
+
+@njit(cache=True)
 def sgs_fast(permutation_task,
              modes_array,          # permutzation_task=array(task)->task index
              consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
              duration_array,
-             predecessors,         # array(task, task) -> bool
-             successors,           # array(task, task)->bool
+             successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+             successors_indices,   # array(nb_precedences)->successor task index
              horizon,
              ressource_available,
              ressource_renewable,
@@ -24,7 +115,8 @@ def sgs_fast(permutation_task,
         minimum_starting_time[permutation_task[act]] = minimum_starting_time_array[act]
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors[permutation_task, :], axis=1)
+    position = position_in_permutation(permutation_task, successors_indptr.shape[0]-1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)[permutation_task]
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int32)
     while done < nb_task and not unfeasible_non_renewable_resources:
         act_id = 0
@@ -64,7 +156,7 @@ def sgs_fast(permutation_task,
                     resource_avail_in_time[res][current_min_time:end_t] -= consumption_array[act_id, modes_array[act_id], res]
                 else:
                     resource_avail_in_time[res][current_min_time:] -= consumption_array[act_id, modes_array[act_id], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             if unfeasible_non_renewable_resources:
@@ -72,12 +164,11 @@ def sgs_fast(permutation_task,
             activity_end_times[act_id] = end_t
             done_np[index_id] = 1
             done += 1
-            # for s in range(successors.shape[1]):
-            for j in range(nb_task):
-                if successors[act_id, permutation_task[j]] == 1:
-                    minimum_starting_time[permutation_task[j]] = max(int(minimum_starting_time[permutation_task[j]]),
-                                                                     int(activity_end_times[act_id]))
-                    pred_links[j] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                if position[s] >= 0:
+                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                                   int(activity_end_times[act_id]))
+                    pred_links[position[s]] -= 1
     rcpsp_schedule = {}
     for act_id in activity_end_times:
         rcpsp_schedule[act_id] = (activity_end_times[act_id] - duration_array[act_id, modes_array[act_id]],
@@ -85,14 +176,492 @@ def sgs_fast(permutation_task,
     return rcpsp_schedule, unfeasible_non_renewable_resources
 
 
-@njit
+@njit(cache=True)
+def sgs_fast_event_core(permutation_task,
+                        modes_array,          # permutation_task=array(task)->task index
+                        consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
+                        duration_array,
+                        successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                        successors_indices,   # array(nb_precedences)->successor task index
+                        horizon,
+                        ressource_available,
+                        ressource_renewable,
+                        minimum_starting_time_array):
+    # Same schedule as sgs_fast, but the start time of an activity is not searched by increments of 1 :
+    # the window [start, start+duration) is scanned backward, and on the latest time step t lacking resource
+    # the candidate start jumps directly to t+1 (any start <= t would overlap t as well).
+    # Time steps already validated for the previous candidate are not scanned again, so the cost of placing
+    # an activity is linear in the distance between its earliest start and its final start.
+    # Returns arrays indexed by task index (-1 for tasks that could not be scheduled)
+    # and the task indexes in the order they were scheduled.
+    # The eligible activities are kept in a heap of their positions in the permutation, so picking the
+    # next one and releasing the successors (csr precedence) cost O(log n) and O(out-degree).
+    unfeasible_non_renewable_resources = False
+    new_horizon = horizon
+    nb_res = ressource_available.shape[0]
+    resource_avail_in_time = np.copy(ressource_available[:, :new_horizon+1])
+    nb_task = permutation_task.shape[0]
+    nb_task_total = successors_indptr.shape[0]-1
+    minimum_starting_time = np.zeros(nb_task_total, dtype=np.int64)
+    for act in range(nb_task):
+        minimum_starting_time[permutation_task[act]] = minimum_starting_time_array[act]
+    starts = np.full(nb_task_total, -1, dtype=np.int64)
+    ends = np.full(nb_task_total, -1, dtype=np.int64)
+    scheduled_order = np.full(nb_task, -1, dtype=np.int64)
+    done = 0
+    position = position_in_permutation(permutation_task, nb_task_total)
+    pred_links = count_predecessors(successors_indptr, successors_indices)[permutation_task]
+    eligible = [i for i in range(nb_task) if pred_links[i] == 0]
+    heapq.heapify(eligible)
+    while done < nb_task and not unfeasible_non_renewable_resources:
+        if len(eligible) == 0:
+            break
+        act_id = permutation_task[heapq.heappop(eligible)]
+        mode = modes_array[act_id]
+        duration = duration_array[act_id, mode]
+        current_min_time = minimum_starting_time[act_id]
+        checked_until = current_min_time  # [current_min_time, checked_until) is known to be feasible
+        while True:
+            last_t = min(current_min_time + duration, new_horizon) - 1
+            conflict = -1
+            t = last_t
+            while t >= checked_until:
+                for res in range(nb_res):
+                    if resource_avail_in_time[res, t] < consumption_array[act_id, mode, res]:
+                        conflict = t
+                        break
+                if conflict >= 0:
+                    break
+                t -= 1
+            if conflict < 0:
+                break
+            current_min_time = conflict + 1
+            checked_until = max(last_t + 1, current_min_time)
+        if duration > 0 and current_min_time + duration > new_horizon:
+            unfeasible_non_renewable_resources = True
+        if not unfeasible_non_renewable_resources:
+            end_t = current_min_time + duration
+            for res in range(nb_res):
+                if ressource_renewable[res]:
+                    resource_avail_in_time[res, current_min_time:end_t] -= consumption_array[act_id, mode, res]
+                else:
+                    resource_avail_in_time[res, current_min_time:] -= consumption_array[act_id, mode, res]
+                    if resource_avail_in_time[res, -1] < 0:
+                        unfeasible_non_renewable_resources = True
+                        break
+            if unfeasible_non_renewable_resources:
+                break
+            starts[act_id] = current_min_time
+            ends[act_id] = end_t
+            scheduled_order[done] = act_id
+            done += 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                j = position[s]
+                if j >= 0:
+                    minimum_starting_time[s] = max(minimum_starting_time[s], end_t)
+                    pred_links[j] -= 1
+                    if pred_links[j] == 0:
+                        heapq.heappush(eligible, j)
+    return starts, ends, scheduled_order, unfeasible_non_renewable_resources
+
+
+@njit(cache=True)
+def sgs_fast_event(permutation_task,
+                   modes_array,          # permutation_task=array(task)->task index
+                   consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
+                   duration_array,
+                   successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                   successors_indices,   # array(nb_precedences)->successor task index
+                   horizon,
+                   ressource_available,
+                   ressource_renewable,
+                   minimum_starting_time_array):
+    # Event-driven version of sgs_fast (see sgs_fast_event_core), same output format.
+    starts, ends, scheduled_order, unfeasible_non_renewable_resources = \
+        sgs_fast_event_core(permutation_task, modes_array, consumption_array, duration_array,
+                            successors_indptr, successors_indices, horizon, ressource_available,
+                            ressource_renewable, minimum_starting_time_array)
+    rcpsp_schedule = {}
+    for i in range(scheduled_order.shape[0]):
+        act_id = scheduled_order[i]
+        if act_id == -1:
+            break
+        rcpsp_schedule[act_id] = (starts[act_id], ends[act_id])
+    return rcpsp_schedule, unfeasible_non_renewable_resources
+
+
+@njit(cache=True)
+def sgs_fast_event_incremental(permutation_task,
+                               modes_array,          # permutation_task=array(task)->task index
+                               consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
+                               duration_array,
+                               successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                               successors_indices,   # array(nb_precedences)->successor task index
+                               horizon,
+                               ressource_available,
+                               ressource_renewable,
+                               minimum_starting_time_array,
+                               predecessors_indptr,      # array(task+1), csr of the transposed precedence graph
+                               predecessors_indices,     # array(nb_precedences)->predecessor task index
+                               # state of the previous run, updated in place :
+                               stored_position,          # array(task)->position in the permutation of the run
+                               starts,                   # array(task)
+                               ends,                     # array(task)
+                               scheduled_order,          # array(task)->task index, -1 after the last scheduled task
+                               scheduled_modes,          # array(task)->mode the task was scheduled with
+                               eligible_step,            # array(task)->step at which the task became eligible
+                               pred_links,               # array(task)->nb of predecessors not scheduled, -1 once scheduled
+                               resource_avail_in_time):  # array(res, horizon)
+    # Same schedule as sgs_fast_event_core, starting from the state left by the previous run.
+    # The sgs on the new permutation goes through the same steps as the previous run until it picks a different
+    # activity : either a task that moved or changed mode is scheduled, or a task that moved forward in the
+    # permutation is eligible and now comes before the task picked by the previous run.
+    # The tasks scheduled from this step are unscheduled (in reverse order, giving back their resources)
+    # and the sgs resumes from there, so the cost is proportional to the part of the schedule that changes.
+    # A fresh state (stored_position at -1) gives a full run.
+    unfeasible_non_renewable_resources = False
+    new_horizon = horizon
+    nb_res = ressource_available.shape[0]
+    nb_task = permutation_task.shape[0]
+    nb_task_total = successors_indptr.shape[0]-1
+    position = position_in_permutation(permutation_task, nb_task_total)
+    last = 0
+    while last < nb_task and scheduled_order[last] != -1:
+        last += 1
+    step = np.full(nb_task_total, nb_task, dtype=np.int64)
+    for i in range(last):
+        step[scheduled_order[i]] = i
+    done = last
+    for t in range(nb_task_total):
+        if position[t] != stored_position[t] or (step[t] < last and modes_array[t] != scheduled_modes[t]):
+            done = min(done, step[t])
+    moved_forward = [t for t in range(nb_task_total)
+                     if position[t] >= 0 and position[t] < stored_position[t] and eligible_step[t] < done]
+    if len(moved_forward) > 0:
+        moved_forward_np = np.array(moved_forward)
+        moved_forward_np = moved_forward_np[np.argsort(eligible_step[moved_forward_np])]
+        k = 0
+        min_position = nb_task
+        for i in range(eligible_step[moved_forward_np[0]], done):
+            while k < moved_forward_np.shape[0] and eligible_step[moved_forward_np[k]] <= i:
+                min_position = min(min_position, position[moved_forward_np[k]])
+                k += 1
+            if min_position < position[scheduled_order[i]]:
+                done = i
+                break
+    # done is a lower bound of the first step that differs (a moved task can still be picked at the same step) :
+    # from there, the choices of the sgs on the new permutation are replayed (heap only, no resource) and
+    # compared to the previous run.
+    if done < last:
+        eligible = [position[t] for t in range(nb_task_total)
+                    if position[t] >= 0 and eligible_step[t] <= done < step[t]]
+        heapq.heapify(eligible)
+        released = np.array([t for t in range(nb_task_total) if done < eligible_step[t] <= last],
+                            dtype=np.int64)
+        released = released[np.argsort(eligible_step[released])]
+        k = 0
+        while done < last:
+            act_id = scheduled_order[done]
+            if modes_array[act_id] != scheduled_modes[act_id] \
+                    or minimum_starting_time_array[position[act_id]] \
+                    != minimum_starting_time_array[stored_position[act_id]]:
+                break
+            if len(eligible) == 0 or permutation_task[heapq.heappop(eligible)] != act_id:
+                break
+            done += 1
+            while k < released.shape[0] and eligible_step[released[k]] == done:
+                if position[released[k]] >= 0:
+                    heapq.heappush(eligible, position[released[k]])
+                k += 1
+    for i in range(last-1, done-1, -1):
+        act_id = scheduled_order[i]
+        mode = scheduled_modes[act_id]
+        for res in range(nb_res):
+            if ressource_renewable[res]:
+                resource_avail_in_time[res, starts[act_id]:ends[act_id]] += consumption_array[act_id, mode, res]
+            else:
+                resource_avail_in_time[res, starts[act_id]:] += consumption_array[act_id, mode, res]
+        pred_links[act_id] = 0
+        for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+            pred_links[s] += 1
+            eligible_step[s] = nb_task
+        starts[act_id] = -1
+        ends[act_id] = -1
+        scheduled_order[i] = -1
+    stored_position[:] = position
+    eligible = [position[t] for t in range(nb_task_total) if position[t] >= 0 and pred_links[t] == 0]
+    heapq.heapify(eligible)
+    while done < nb_task and not unfeasible_non_renewable_resources:
+        if len(eligible) == 0:
+            break
+        j = heapq.heappop(eligible)
+        act_id = permutation_task[j]
+        mode = modes_array[act_id]
+        duration = duration_array[act_id, mode]
+        current_min_time = minimum_starting_time_array[j]
+        for p in predecessors_indices[predecessors_indptr[act_id]:predecessors_indptr[act_id+1]]:
+            current_min_time = max(current_min_time, ends[p])
+        checked_until = current_min_time  # [current_min_time, checked_until) is known to be feasible
+        while True:
+            last_t = min(current_min_time + duration, new_horizon) - 1
+            conflict = -1
+            t = last_t
+            while t >= checked_until:
+                for res in range(nb_res):
+                    if resource_avail_in_time[res, t] < consumption_array[act_id, mode, res]:
+                        conflict = t
+                        break
+                if conflict >= 0:
+                    break
+                t -= 1
+            if conflict < 0:
+                break
+            current_min_time = conflict + 1
+            checked_until = max(last_t + 1, current_min_time)
+        if duration > 0 and current_min_time + duration > new_horizon:
+            unfeasible_non_renewable_resources = True
+        for res in range(nb_res):
+            # checked before touching the resources, so that the stored state stays consistent.
+            if not ressource_renewable[res] \
+                    and resource_avail_in_time[res, -1] < consumption_array[act_id, mode, res]:
+                unfeasible_non_renewable_resources = True
+        if unfeasible_non_renewable_resources:
+            break
+        end_t = current_min_time + duration
+        for res in range(nb_res):
+            if ressource_renewable[res]:
+                resource_avail_in_time[res, current_min_time:end_t] -= consumption_array[act_id, mode, res]
+            else:
+                resource_avail_in_time[res, current_min_time:] -= consumption_array[act_id, mode, res]
+        starts[act_id] = current_min_time
+        ends[act_id] = end_t
+        scheduled_order[done] = act_id
+        scheduled_modes[act_id] = mode
+        done += 1
+        pred_links[act_id] = -1
+        for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+            pred_links[s] -= 1
+            if pred_links[s] == 0:
+                eligible_step[s] = done
+                if position[s] >= 0:
+                    heapq.heappush(eligible, position[s])
+    return unfeasible_non_renewable_resources
+
+
+@njit(parallel=True, cache=True)
+def sgs_fast_batch(permutations_task,   # array(N, task)->task index, one permutation per row
+                   modes_arrays,        # array(N, task)->0, 1...
+                   consumption_array,
+                   duration_array,
+                   successors_indptr,
+                   successors_indices,
+                   horizon,
+                   ressource_available,
+                   ressource_renewable,
+                   minimum_starting_time_array):
+    # Decode a whole population of (permutation, modes) with the event-driven serial sgs,
+    # the individuals being spread over all the available threads.
+    nb_individuals = permutations_task.shape[0]
+    nb_task = successors_indptr.shape[0]-1
+    starts = np.full((nb_individuals, nb_task), -1, dtype=np.int64)
+    ends = np.full((nb_individuals, nb_task), -1, dtype=np.int64)
+    unfeasible = np.zeros(nb_individuals, dtype=np.bool_)
+    for k in prange(nb_individuals):
+        s, e, order, unf = sgs_fast_event_core(permutations_task[k], modes_arrays[k], consumption_array,
+                                               duration_array, successors_indptr, successors_indices, horizon,
+                                               ressource_available, ressource_renewable,
+                                               minimum_starting_time_array)
+        starts[k, :] = s
+        ends[k, :] = e
+        unfeasible[k] = unf
+    return starts, ends, unfeasible
+
+
+@njit(cache=True)
+def sgs_fast_parallel_core(permutation_task,
+                           modes_array,          # permutation_task=array(task)->task index
+                           consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
+                           duration_array,
+                           successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                           successors_indices,   # array(nb_precedences)->successor task index
+                           horizon,
+                           ressource_available,
+                           ressource_renewable,
+                           minimum_starting_time_array):
+    # Parallel sgs : the schedule advances over decision points t (0, the end times of the scheduled activities,
+    # the release dates of the eligible ones). At each t, the eligible activities released at t are started at t
+    # in the order of the permutation when the resources allow it, the other ones wait for the next decision point.
+    # The resources only get consumed along the way : an activity lacking resources at time c of its window
+    # can't start before c+1, which is used as its release date.
+    # When no activity runs and none can start, the next decision point is t+1 (varying resource availability).
+    # Same inputs and outputs as sgs_fast_event_core.
+    unfeasible_non_renewable_resources = False
+    new_horizon = horizon
+    nb_res = ressource_available.shape[0]
+    resource_avail_in_time = np.copy(ressource_available[:, :new_horizon+1])
+    nb_task = permutation_task.shape[0]
+    nb_task_total = successors_indptr.shape[0]-1
+    minimum_starting_time = np.zeros(nb_task_total, dtype=np.int64)
+    for act in range(nb_task):
+        minimum_starting_time[permutation_task[act]] = minimum_starting_time_array[act]
+    starts = np.full(nb_task_total, -1, dtype=np.int64)
+    ends = np.full(nb_task_total, -1, dtype=np.int64)
+    scheduled_order = np.full(nb_task, -1, dtype=np.int64)
+    done = 0
+    position = position_in_permutation(permutation_task, nb_task_total)
+    pred_links = count_predecessors(successors_indptr, successors_indices)[permutation_task]
+    # positions in the permutation of the eligible activities, kept sorted in eligible[:nb_eligible]
+    eligible = np.zeros(nb_task, dtype=np.int64)
+    nb_eligible = 0
+    for i in range(nb_task):
+        if pred_links[i] == 0:
+            eligible[nb_eligible] = i
+            nb_eligible += 1
+    end_events = [np.int64(0)]
+    end_events.pop()
+    current_time = 0
+    while done < nb_task and not unfeasible_non_renewable_resources:
+        if nb_eligible == 0:
+            break
+        next_release = -1
+        index = 0
+        while index < nb_eligible:
+            j = eligible[index]
+            act_id = permutation_task[j]
+            mode = modes_array[act_id]
+            duration = duration_array[act_id, mode]
+            if minimum_starting_time[act_id] > current_time:
+                if next_release < 0 or minimum_starting_time[act_id] < next_release:
+                    next_release = minimum_starting_time[act_id]
+                index += 1
+                continue
+            if duration > 0 and current_time + duration > new_horizon:
+                unfeasible_non_renewable_resources = True
+                break
+            conflict = -1
+            t = current_time + duration - 1
+            while t >= current_time:
+                for res in range(nb_res):
+                    if resource_avail_in_time[res, t] < consumption_array[act_id, mode, res]:
+                        conflict = t
+                        break
+                if conflict >= 0:
+                    break
+                t -= 1
+            if conflict >= 0:
+                minimum_starting_time[act_id] = conflict + 1
+                if next_release < 0 or conflict + 1 < next_release:
+                    next_release = conflict + 1
+                index += 1
+                continue
+            end_t = current_time + duration
+            for res in range(nb_res):
+                if ressource_renewable[res]:
+                    resource_avail_in_time[res, current_time:end_t] -= consumption_array[act_id, mode, res]
+                else:
+                    resource_avail_in_time[res, current_time:] -= consumption_array[act_id, mode, res]
+                    if resource_avail_in_time[res, -1] < 0:
+                        unfeasible_non_renewable_resources = True
+                        break
+            if unfeasible_non_renewable_resources:
+                break
+            starts[act_id] = current_time
+            ends[act_id] = end_t
+            scheduled_order[done] = act_id
+            done += 1
+            if end_t > current_time:
+                heapq.heappush(end_events, end_t)
+            eligible[index:nb_eligible-1] = eligible[index+1:nb_eligible]
+            nb_eligible -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                k = position[s]
+                if k >= 0:
+                    minimum_starting_time[s] = max(minimum_starting_time[s], end_t)
+                    pred_links[k] -= 1
+                    if pred_links[k] == 0:
+                        insert = np.searchsorted(eligible[:nb_eligible], k)
+                        eligible[insert+1:nb_eligible+1] = eligible[insert:nb_eligible].copy()
+                        eligible[insert] = k
+                        nb_eligible += 1
+                        # an activity released at current_time with a higher priority is tried before the next ones
+                        if insert < index:
+                            index = insert
+        if unfeasible_non_renewable_resources:
+            break
+        while len(end_events) > 0 and end_events[0] <= current_time:
+            heapq.heappop(end_events)
+        next_time = current_time + 1
+        if len(end_events) > 0:
+            next_time = end_events[0]
+        if next_release > current_time and (len(end_events) == 0 or next_release < next_time):
+            next_time = next_release
+        current_time = next_time
+        if nb_eligible > 0 and current_time > new_horizon:
+            unfeasible_non_renewable_resources = True
+    return starts, ends, scheduled_order, unfeasible_non_renewable_resources
+
+
+@njit(cache=True)
+def sgs_fast_parallel(permutation_task,
+                      modes_array,          # permutation_task=array(task)->task index
+                      consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
+                      duration_array,
+                      successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                      successors_indices,   # array(nb_precedences)->successor task index
+                      horizon,
+                      ressource_available,
+                      ressource_renewable,
+                      minimum_starting_time_array):
+    # Parallel sgs (see sgs_fast_parallel_core), same output format as sgs_fast.
+    starts, ends, scheduled_order, unfeasible_non_renewable_resources = \
+        sgs_fast_parallel_core(permutation_task, modes_array, consumption_array, duration_array,
+                               successors_indptr, successors_indices, horizon, ressource_available,
+                               ressource_renewable, minimum_starting_time_array)
+    rcpsp_schedule = {}
+    for i in range(scheduled_order.shape[0]):
+        act_id = scheduled_order[i]
+        if act_id == -1:
+            break
+        rcpsp_schedule[act_id] = (starts[act_id], ends[act_id])
+    return rcpsp_schedule, unfeasible_non_renewable_resources
+
+
+@njit(parallel=True, cache=True)
+def sgs_fast_parallel_batch(permutations_task,   # array(N, task)->task index, one permutation per row
+                            modes_arrays,        # array(N, task)->0, 1...
+                            consumption_array,
+                            duration_array,
+                            successors_indptr,
+                            successors_indices,
+                            horizon,
+                            ressource_available,
+                            ressource_renewable,
+                            minimum_starting_time_array):
+    # Same as sgs_fast_batch with the parallel sgs.
+    nb_individuals = permutations_task.shape[0]
+    nb_task = successors_indptr.shape[0]-1
+    starts = np.full((nb_individuals, nb_task), -1, dtype=np.int64)
+    ends = np.full((nb_individuals, nb_task), -1, dtype=np.int64)
+    unfeasible = np.zeros(nb_individuals, dtype=np.bool_)
+    for k in prange(nb_individuals):
+        s, e, order, unf = sgs_fast_parallel_core(permutations_task[k], modes_arrays[k], consumption_array,
+                                                  duration_array, successors_indptr, successors_indices, horizon,
+                                                  ressource_available, ressource_renewable,
+                                                  minimum_starting_time_array)
+        starts[k, :] = s
+        ends[k, :] = e
+        unfeasible[k] = unf
+    return starts, ends, unfeasible
+
+
+@njit(cache=True)
 def sgs_fast_preemptive(permutation_task,
                         modes_array,          # permutzation_task=array(task)->task index
                         consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
                         duration_array,
                         preemptive_tag,       # array(task)->bool
-                        predecessors,         # array(task, task) -> bool
-                        successors,           # array(task, task)->bool
+                        successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                        successors_indices,   # array(nb_precedences)->successor task index
                         horizon,
                         ressource_available,
                         ressource_renewable): # array(res)->bool
@@ -109,7 +678,7 @@ def sgs_fast_preemptive(permutation_task,
         minimum_starting_time[act] = 0
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     done_duration = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     while done < nb_task and not unfeasible_non_renewable_resources:
@@ -187,21 +756,153 @@ def sgs_fast_preemptive(permutation_task,
             ends_dict[act_id] = np.array(ends)
             done_np[act_id] = 1
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))
+                pred_links[s] -= 1
+    return starts_dict, ends_dict, unfeasible_non_renewable_resources
+
+@njit(cache=True)
+def sgs_fast_preemptive_parallel(permutation_task,
+                                 modes_array,          # permutzation_task=array(task)->task index
+                                 consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
+                                 duration_array,
+                                 preemptive_tag,       # array(task)->bool
+                                 successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                                 successors_indices,   # array(nb_precedences)->successor task index
+                                 horizon,
+                                 ressource_available,
+                                 ressource_renewable): # array(res)->bool
+    # Parallel sgs version of sgs_fast_preemptive : at each decision point t, the eligible activities
+    # (in the order of the permutation) for which the resources are available at t are scheduled from t,
+    # their parts being placed as in sgs_fast_preemptive. The next decision point is the next end of a part
+    # or release date, t+1 if there is none.
+    unfeasible_non_renewable_resources = False
+    new_horizon = horizon
+    resource_avail_in_time = {}
+    starts_dict = {}
+    ends_dict = {}
+    for index in range(ressource_available.shape[0]):
+        resource_avail_in_time[index] = np.copy(ressource_available[index][:new_horizon+1])
+    minimum_starting_time = np.zeros(permutation_task.shape[0], dtype=np.int64)
+    done = 0
+    nb_task = permutation_task.shape[0]
+    pred_links = count_predecessors(successors_indptr, successors_indices)
+    done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
+    done_duration = np.zeros((permutation_task.shape[0]), dtype=np.int64)
+    current_time = 0
+    while done < nb_task and not unfeasible_non_renewable_resources:
+        next_time = -1
+        scheduled_at_t = True
+        while scheduled_at_t and not unfeasible_non_renewable_resources:
+            scheduled_at_t = False
+            for i in range(nb_task):
+                act_id = np.int64(permutation_task[i])
+                if pred_links[act_id] != 0 or done_np[act_id] == 1:
+                    continue
+                if minimum_starting_time[act_id] > current_time:
+                    if next_time < 0 or minimum_starting_time[act_id] < next_time:
+                        next_time = minimum_starting_time[act_id]
+                    continue
+                if duration_array[act_id, modes_array[act_id]] > 0:
+                    if current_time >= new_horizon:
+                        unfeasible_non_renewable_resources = True
+                        break
+                    available = True
+                    for res in range(ressource_available.shape[0]):
+                        if resource_avail_in_time[res][current_time] < consumption_array[act_id, modes_array[act_id], res]:
+                            available = False
+                            break
+                    if not available:
+                        continue
+                current_min_time = current_time
+                valid = False
+                starts = []
+                ends = []
+                while not valid:
+                    valid = True
+                    reached_t = None
+                    reached_end = True
+                    if duration_array[act_id, modes_array[act_id]] == 0:
+                        starts.append(current_min_time)
+                        ends.append(current_min_time)
+                        done_duration[act_id] = 0
+                    else:
+                        for t in range(current_min_time,
+                                       current_min_time+duration_array[act_id, modes_array[act_id]]
+                                       - done_duration[act_id]):
+                            if t >= new_horizon:
+                                reached_end = False
+                                unfeasible_non_renewable_resources = True
+                                break
+                            for res in range(ressource_available.shape[0]):
+                                if resource_avail_in_time[res][t] < consumption_array[act_id, modes_array[act_id], res]:
+                                    reached_end = False
+                                    break
+                            if reached_end:
+                                reached_t = t
+                            else:
+                                break
+                        if reached_t is not None and preemptive_tag[act_id] \
+                                and (reached_t + 1-current_min_time >= duration_array[act_id, modes_array[act_id]]/8 or reached_end):
+                            starts.append(current_min_time)
+                            ends.append(reached_t + 1)
+                            done_duration[act_id] += ends[-1] - starts[-1]
+                        if reached_end and not preemptive_tag[act_id]:
+                            starts.append(current_min_time)
+                            ends.append(reached_t + 1)
+                            done_duration[act_id] += ends[-1] - starts[-1]
+                        valid = (done_duration[act_id] == duration_array[act_id, modes_array[act_id]])
+                        if not valid:
+                            current_min_time = reached_t + 2 if reached_t is not None else current_min_time + 1
+                            if unfeasible_non_renewable_resources:
+                                break
+                if unfeasible_non_renewable_resources:
+                    break
+                for j in range(len(starts)):
+                    for res in range(ressource_available.shape[0]):
+                        if ressource_renewable[res]:
+                            resource_avail_in_time[res][starts[j]:ends[j]] -= \
+                                consumption_array[act_id, modes_array[act_id], res]
+                        else:
+                            if j == 0:
+                                resource_avail_in_time[res][starts[j]:] -= \
+                                    consumption_array[act_id, modes_array[act_id], res]
+                            if resource_avail_in_time[res][-1] < 0:
+                                unfeasible_non_renewable_resources = True
+                                break
+                if unfeasible_non_renewable_resources:
+                    break
+                end_t = ends[-1]
+                starts_dict[act_id] = np.array(starts)
+                ends_dict[act_id] = np.array(ends)
+                done_np[act_id] = 1
+                done += 1
+                scheduled_at_t = True
+                for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                    minimum_starting_time[s] = max(minimum_starting_time[s], end_t)
                     pred_links[s] -= 1
+        if done == nb_task or unfeasible_non_renewable_resources:
+            break
+        # decision point : first end of a part or release date after current_time
+        for key in ends_dict:
+            for e in ends_dict[key]:
+                if e > current_time and (next_time < 0 or e < next_time):
+                    next_time = e
+        current_time = next_time if next_time > current_time else current_time + 1
+        if current_time > new_horizon:
+            unfeasible_non_renewable_resources = True
     return starts_dict, ends_dict, unfeasible_non_renewable_resources
 
-@njit
+
+@njit(cache=True)
 def sgs_fast_preemptive_some_special_constraints(permutation_task,
                                                  modes_array,       # permutation_task=array(task)->task index
                                                  consumption_array, # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
                                                  duration_array,
                                                  preemptive_tag,    # array(task)->bool
-                                                 predecessors,      # array(task, task) -> bool
-                                                 successors,        # array(task, task)->bool
+                                                 successors_indptr, # array(task+1), csr row pointer of the precedence graph
+                                                 successors_indices, # array(nb_precedences)->successor task index
                                                  start_at_end_plus_offset, # array(N, 3) -> (task1, task2, offset)
                                                  start_after_nunit,        # array(N, 3) -> (task1, task2, offset)
                                                  minimum_starting_time_array,
@@ -231,7 +932,7 @@ def sgs_fast_preemptive_some_special_constraints(permutation_task,
 
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     done_duration = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     while done < nb_task and not unfeasible_non_renewable_resources:
@@ -318,11 +1019,10 @@ def sgs_fast_preemptive_some_special_constraints(permutation_task,
             ends_dict[act_id] = np.array(ends)
             done_np[act_id] = 1
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
 
             for t in range(start_after_nunit.shape[0]):
                 if start_after_nunit[t, 0] == act_id:
@@ -346,8 +1046,8 @@ def sgs_fast_preemptive_minduration(permutation_task,
                                     consumption_array,    # modes=array(task)->0, 1... # consumption_array=array3D(task, mode, res),
                                     duration_array,
                                     preemptive_tag,       # array(task)->bool
-                                    predecessors,         # array(task, task) -> bool
-                                    successors,           # array(task, task)->bool
+                                    successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                                    successors_indices,   # array(nb_precedences)->successor task index
                                     horizon,
                                     ressource_available,
                                     ressource_renewable,
@@ -366,7 +1066,7 @@ def sgs_fast_preemptive_minduration(permutation_task,
         minimum_starting_time[act] = 0
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     done_duration = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     while done < nb_task and not unfeasible_non_renewable_resources:
@@ -440,7 +1140,7 @@ def sgs_fast_preemptive_minduration(permutation_task,
                         if i == 0:
                             resource_avail_in_time[res][starts[i]:] -=\
                                 consumption_array[act_id, modes_array[act_id], res]
-                        if resource_avail_in_time[res][horizon] < 0:
+                        if resource_avail_in_time[res][-1] < 0:
                             unfeasible_non_renewable_resources = True
                             break
             if unfeasible_non_renewable_resources:
@@ -450,15 +1150,14 @@ def sgs_fast_preemptive_minduration(permutation_task,
             ends_dict[act_id] = np.array(ends)
             done_np[act_id] = 1
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
     return starts_dict, ends_dict, unfeasible_non_renewable_resources
 
 
-@njit
+@njit(cache=True)
 def sgs_fast_partial_schedule(current_time,
                               permutation_task,
                               modes_array,
@@ -467,8 +1166,8 @@ def sgs_fast_partial_schedule(current_time,
                               scheduled_task,
                               consumption_array,
                               duration_array,
-                              predecessors,
-                              successors,
+                              successors_indptr,
+                              successors_indices,
                               horizon,
                               ressource_available,
                               ressource_renewable, minimum_starting_time_array):
@@ -483,7 +1182,7 @@ def sgs_fast_partial_schedule(current_time,
         minimum_starting_time[act] = max(minimum_starting_time_array[act], current_time)
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((nb_task), dtype=np.int64)
     for t in range(nb_task):
         if scheduled_task[t] != -1:
@@ -494,27 +1193,25 @@ def sgs_fast_partial_schedule(current_time,
                         -= consumption_array[t, modes_array[t], res]
                 else:
                     resource_avail_in_time[res][scheduled_task[t]:] -= consumption_array[t, modes_array[t], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             if unfeasible_non_renewable_resources:
                 break
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[t]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[t]))
+                pred_links[s] -= 1
             done += 1
             done_np[t] = 1
         if completed_task_indicator[t] == 1:
             done += 1
             done_np[t] = 1
             activity_end_times[t] = completed_task_times[t]
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[t]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[t]))
+                pred_links[s] -= 1
 
     while done < nb_task and not unfeasible_non_renewable_resources:
         act_id = 0
@@ -547,7 +1244,7 @@ def sgs_fast_partial_schedule(current_time,
                     resource_avail_in_time[res][current_min_time:end_t] -= consumption_array[act_id, modes_array[act_id], res]
                 else:
                     resource_avail_in_time[res][current_min_time:] -= consumption_array[act_id, modes_array[act_id], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             if unfeasible_non_renewable_resources:
@@ -555,11 +1252,10 @@ def sgs_fast_partial_schedule(current_time,
             activity_end_times[act_id] = end_t
             done_np[act_id] = 1
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
     rcpsp_schedule = {}
     for act_id in activity_end_times:
         rcpsp_schedule[act_id] = (activity_end_times[act_id] - duration_array[act_id, modes_array[act_id]],
@@ -567,7 +1263,7 @@ def sgs_fast_partial_schedule(current_time,
 
     return rcpsp_schedule, unfeasible_non_renewable_resources
 
-@njit
+@njit(cache=True)
 def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
                                                            permutation_task,
                                                            modes_array,
@@ -576,8 +1272,8 @@ def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
                                                            scheduled_task,
                                                            consumption_array,
                                                            duration_array,
-                                                           predecessors,
-                                                           successors,
+                                                           successors_indptr,
+                                                           successors_indices,
                                                            horizon,
                                                            ressource_available,
                                                            ressource_renewable, minimum_starting_time_array):
@@ -592,8 +1288,9 @@ def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
         minimum_starting_time[permutation_task[act]] = max(current_time, minimum_starting_time_array[act])
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors[permutation_task, :], axis=1)
-    done_np = np.zeros((predecessors.shape[0]), dtype=np.int32)
+    position = position_in_permutation(permutation_task, successors_indptr.shape[0]-1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)[permutation_task]
+    done_np = np.zeros((successors_indptr.shape[0]-1), dtype=np.int32)
     for t in range(nb_task):
         activity_end_times[t] = 0
     for t in range(nb_task):
@@ -605,29 +1302,27 @@ def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
                         -= consumption_array[t, modes_array[t], res]
                 else:
                     resource_avail_in_time[res][scheduled_task[t]:] -= consumption_array[t, modes_array[t], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             if unfeasible_non_renewable_resources:
                 break
-            for j in range(nb_task):
-                s = permutation_task[j]
-                if successors[t, s] == 1:
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                if position[s] >= 0:
                     minimum_starting_time[s] = max(int(minimum_starting_time[s]),
                                                    int(activity_end_times[t]))
-                    pred_links[j] -= 1
+                    pred_links[position[s]] -= 1
             done += 1
             done_np[t] = 1
         if completed_task_indicator[t] == 1:
             done += 1
             done_np[t] = 1
             activity_end_times[t] = completed_task_times[t]
-            for j in range(nb_task):
-                s = permutation_task[j]
-                if successors[t, s] == 1:
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                if position[s] >= 0:
                     minimum_starting_time[s] = max(int(minimum_starting_time[s]),
                                                    int(activity_end_times[t]))
-                    pred_links[j] -= 1
+                    pred_links[position[s]] -= 1
 
     while done < nb_task and not unfeasible_non_renewable_resources:
         act_id = 0
@@ -667,7 +1362,7 @@ def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
                     resource_avail_in_time[res][current_min_time:end_t] -= consumption_array[act_id, modes_array[act_id], res]
                 else:
                     resource_avail_in_time[res][current_min_time:] -= consumption_array[act_id, modes_array[act_id], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             if unfeasible_non_renewable_resources:
@@ -675,11 +1370,11 @@ def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
             activity_end_times[act_id] = end_t
             done_np[act_id] = 1
             done += 1
-            for j in range(nb_task):
-                if successors[act_id, permutation_task[j]] == 1:
-                    minimum_starting_time[permutation_task[j]] = max(int(minimum_starting_time[permutation_task[j]]),
-                                                                     int(activity_end_times[act_id]))
-                    pred_links[j] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                if position[s] >= 0:
+                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                                   int(activity_end_times[act_id]))
+                    pred_links[position[s]] -= 1
     rcpsp_schedule = {}
     for act_id in activity_end_times:
         rcpsp_schedule[act_id] = (activity_end_times[act_id] - duration_array[act_id, modes_array[act_id]],
@@ -687,7 +1382,7 @@ def sgs_fast_partial_schedule_incomplete_permutation_tasks(current_time,
 
     return rcpsp_schedule, unfeasible_non_renewable_resources
 
-@njit
+@njit(cache=True)
 def sgs_fast_partial_schedule_preemptive(current_time,
                                          permutation_task,
                                          modes_array,
@@ -697,8 +1392,8 @@ def sgs_fast_partial_schedule_preemptive(current_time,
                                          preemptive_tag,
                                          consumption_array,
                                          duration_array,
-                                         predecessors,
-                                         successors,
+                                         successors_indptr,
+                                         successors_indices,
                                          horizon,
                                          ressource_available,
                                          ressource_renewable, minimum_starting_time_array):
@@ -715,7 +1410,7 @@ def sgs_fast_partial_schedule_preemptive(current_time,
     ends_dict = {}
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((nb_task), dtype=np.int64)
     done_duration = np.zeros((nb_task), dtype=np.int64)
     for t in range(nb_task):
@@ -732,7 +1427,7 @@ def sgs_fast_partial_schedule_preemptive(current_time,
                         if done_duration[t] == duration_array[t, modes_array[t]]:
                             resource_avail_in_time[res][partial_schedule_starts[t, i]:] -= \
                                 consumption_array[t, modes_array[t], res]
-                            if resource_avail_in_time[res][horizon] < 0:
+                            if resource_avail_in_time[res][-1] < 0:
                                 unfeasible_non_renewable_resources = True
                                 break
                 if unfeasible_non_renewable_resources:
@@ -740,10 +1435,9 @@ def sgs_fast_partial_schedule_preemptive(current_time,
         if done_duration[t] == duration_array[t, modes_array[t]] and duration_array[t, modes_array[t]] >= 1:
             completed_task_indicator[t] = 1
         if end is not None:
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   end)
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               end)
         if completed_task_indicator[t] == 1:
             done += 1
             done_np[t] = 1
@@ -752,11 +1446,10 @@ def sgs_fast_partial_schedule_preemptive(current_time,
                                       if k != -1])
             ends_dict[t] = np.array([k for k in partial_schedule_ends[t, :]
                                      if k != -1])
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[t]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[t]))
+                pred_links[s] -= 1
     while done < nb_task and not unfeasible_non_renewable_resources:
         act_id = 0
         for i in range(nb_task):
@@ -817,7 +1510,7 @@ def sgs_fast_partial_schedule_preemptive(current_time,
                         if i == 0:
                             resource_avail_in_time[res][starts[i]:] -=\
                                 consumption_array[act_id, modes_array[act_id], res]
-                        if resource_avail_in_time[res][horizon] < 0:
+                        if resource_avail_in_time[res][-1] < 0:
                             unfeasible_non_renewable_resources = True
                             break
             if unfeasible_non_renewable_resources:
@@ -829,14 +1522,13 @@ def sgs_fast_partial_schedule_preemptive(current_time,
                                           if k != -1]+ends)
             done_np[act_id] = 1
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
     return starts_dict, ends_dict, unfeasible_non_renewable_resources
 
-@njit
+@njit(cache=True)
 def sgs_fast_partial_schedule_preemptive_minduration(current_time,
                                                      permutation_task,
                                                      modes_array,
@@ -846,8 +1538,8 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
                                                      preemptive_tag,
                                                      consumption_array,
                                                      duration_array,
-                                                     predecessors,
-                                                     successors,
+                                                     successors_indptr,
+                                                     successors_indices,
                                                      horizon,
                                                      ressource_available,
                                                      ressource_renewable,
@@ -866,7 +1558,7 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
     ends_dict = {}
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((nb_task), dtype=np.int64)
     done_duration = np.zeros((nb_task), dtype=np.int64)
     for t in range(nb_task):
@@ -883,7 +1575,7 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
                         if done_duration[t] == duration_array[t, modes_array[t]]:
                             resource_avail_in_time[res][partial_schedule_starts[t, i]:] -= \
                                 consumption_array[t, modes_array[t], res]
-                            if resource_avail_in_time[res][horizon] < 0:
+                            if resource_avail_in_time[res][-1] < 0:
                                 unfeasible_non_renewable_resources = True
                                 break
                 if unfeasible_non_renewable_resources:
@@ -891,10 +1583,9 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
         if done_duration[t] == duration_array[t, modes_array[t]] and duration_array[t, modes_array[t]] >= 1:
             completed_task_indicator[t] = 1
         if end is not None:
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   end)
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               end)
         if completed_task_indicator[t] == 1:
             done += 1
             done_np[t] = 1
@@ -903,11 +1594,10 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
                                       if k != -1])
             ends_dict[t] = np.array([k for k in partial_schedule_ends[t, :]
                                      if k != -1])
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[t]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[t]))
+                pred_links[s] -= 1
 
     while done < nb_task and not unfeasible_non_renewable_resources:
         act_id = 0
@@ -979,7 +1669,7 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
                         if i == 0:
                             resource_avail_in_time[res][starts[i]:] -=\
                                 consumption_array[act_id, modes_array[act_id], res]
-                        if resource_avail_in_time[res][horizon] < 0:
+                        if resource_avail_in_time[res][-1] < 0:
                             unfeasible_non_renewable_resources = True
                             break
             if unfeasible_non_renewable_resources:
@@ -993,15 +1683,14 @@ def sgs_fast_partial_schedule_preemptive_minduration(current_time,
             done_np[act_id] = 1
             done += 1
             # print('scheduled to complete at: ', activity_end_times[act_id])
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
     return starts_dict, ends_dict, unfeasible_non_renewable_resources
 
 
-@njit
+@njit(cache=True)
 def compute_mean_ressource(modes_array,
                            consumption_array,
                            start_array,
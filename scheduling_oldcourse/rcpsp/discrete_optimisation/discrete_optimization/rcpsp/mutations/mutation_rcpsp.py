@@ -34,13 +34,19 @@ class PermutationMutationRCPSP(Mutation):
         return s, lm
 
     def mutate_and_compute_obj(self, solution: Solution) -> Tuple[Solution, LocalMove, Dict[str, float]]:
-        s, lm, fit = self.other_mutation.mutate_and_compute_obj(solution)
-        try:
-            s._schedule_to_recompute = True
-            s.standardised_permutation = s.generate_permutation_from_schedule()
-        except:
-            s._schedule_to_recompute = True
-            pass
+        # the schedule is flagged before the evaluation (some moves modify the permutation in place),
+        # evaluate_incremental only replays the sgs from the first position touched by the move
+        # (when the evaluation cache of the problem is enabled, a revisited solution is not decoded at all).
+        s, lm = self.other_mutation.mutate(solution)
+        s._schedule_to_recompute = True
+        if isinstance(self.problem, RCPSPModel):
+            fit = self.problem.evaluate_cached(s, evaluate_function=self.problem.evaluate_incremental)
+        else:
+            fit = self.problem.evaluate(s)
+            try:
+                s.standardised_permutation = s.generate_permutation_from_schedule()
+            except:
+                pass
         return s, lm, fit
 
 
@@ -62,7 +68,9 @@ class DeadlineMutationRCPSP(Mutation):
             if len(attributes) > 0:
                 self.attribute = attributes[0]
         self.length = len(self.register.dict_attribute_to_type[self.attribute]["range"])
-        self.full_predecessors = self.problem.graph.ancestors_map()
+        self.closure = self.problem.graph.closure
+        # networkx ancestors when the precedence graph has a cycle and no closure
+        self.full_predecessors = self.problem.graph.ancestors_map() if self.closure is None else None
 
     def mutate(self, solution: Solution) -> Tuple[Solution, LocalMove]:
         if "special_constraints" in self.problem.__dict__.keys():
@@ -74,7 +82,10 @@ class DeadlineMutationRCPSP(Mutation):
                 x = random.choice(ls)
                 t = x[0]
                 if True:
-                    pred = [tt for tt in self.full_predecessors[t]]+[t]
+                    if self.closure is not None:
+                        pred = self.closure.ancestors_sorted(t)+[t]
+                    else:
+                        pred = [tt for tt in self.full_predecessors[t]]+[t]
                     previous = list(getattr(solution, self.attribute))
                     new = [self.problem.index_task_non_dummy[tt] for tt in pred if tt in self.problem.index_task_non_dummy]
                     for x in previous:
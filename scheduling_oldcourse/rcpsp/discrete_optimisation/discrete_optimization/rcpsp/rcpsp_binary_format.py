@@ -0,0 +1,234 @@
+import struct
+import zipfile
+from typing import Dict, List, Hashable
+import numpy as np
+
+# Binary format of the rcpsp and multiskill rcpsp instances : an uncompressed .npz archive holding
+# the arrays used by the sgs kernels (model.np_data, stored under "np_data/<name>") and the few arrays
+# needed to rebuild the dictionaries of the model (task, mode, resource, skill and employee ids).
+# Loading it skips the parsing and the construction of the arrays, and the big arrays can be memory-mapped.
+# The version is increased whenever the layout changes, files of a newer version are rejected.
+FORMAT_VERSION = 1
+RCPSP_CLASSES = ["RCPSPModel", "SingleModeRCPSPModel", "MultiModeRCPSPModel", "RCPSPModelCalendar"]
+MS_RCPSP_CLASSES = ["MS_RCPSPModel", "MS_RCPSPModel_Variant"]
+
+
+def ids_to_array(ids: List[Hashable], name: str) -> np.array:
+    # ids of tasks/resources/employees are stored as int64 or unicode arrays
+    if all(isinstance(x, (int, np.integer)) and not isinstance(x, bool) for x in ids):
+        return np.array(ids, dtype=np.int64)
+    if all(isinstance(x, str) for x in ids):
+        return np.array(ids, dtype=str)
+    raise TypeError("Binary format only stores int or str ids, "+name+" has other types")
+
+
+def modes_to_array(model) -> np.array:
+    # modes[i, j] : id of the j-th mode (sorted, as in np_data) of the task of index i, -1 if none
+    modes = np.full((model.n_jobs, model.max_number_of_mode), -1, dtype=np.int64)
+    for i in range(model.n_jobs):
+        sorted_modes = sorted(model.mode_details[model.tasks_list[i]])
+        modes[i, :len(sorted_modes)] = sorted_modes
+    return modes
+
+
+def save_binary(model, path: str):
+    """
+    Write the instance in the binary format (see load_binary).
+    Supports the rcpsp models in RCPSP_CLASSES and the multiskill models in MS_RCPSP_CLASSES,
+    without special constraints nor resource blocking data.
+    Resource and employee calendars are stored up to the horizon.
+    """
+    class_name = model.__class__.__name__
+    if class_name not in RCPSP_CLASSES+MS_RCPSP_CLASSES:
+        raise NotImplementedError("Binary format not available for "+class_name)
+    if getattr(model, "do_special_constraints", False) or len(getattr(model, "resource_blocking_data", [])) > 0:
+        raise NotImplementedError("Binary format not available for models with special constraints")
+    arrays = {"np_data/"+key: np.asarray(model.np_data[key]) for key in model.np_data}
+    arrays["format_version"] = np.array(FORMAT_VERSION)
+    arrays["model_class"] = np.array(class_name)
+    arrays["tasks"] = ids_to_array(model.tasks_list, "tasks_list")
+    arrays["modes"] = modes_to_array(model)
+    arrays["resources"] = ids_to_array(model.resources_list, "resources_list")
+    arrays["horizon_multiplier"] = np.array(model.horizon_multiplier)
+    arrays["source_index"] = np.array(model.index_task[model.source_task])
+    arrays["sink_index"] = np.array(model.index_task[model.sink_task])
+    if class_name in RCPSP_CLASSES:
+        arrays["is_calendar"] = np.array(model.is_calendar)
+    else:
+        arrays["skills"] = ids_to_array(model.skills_list, "skills_list")
+        arrays["employees"] = ids_to_array(model.employees_list, "employees_list")
+        skills = np.zeros((model.nb_employees, len(model.skills_list), 3), dtype=np.float64)
+        has_skill = np.zeros((model.nb_employees, len(model.skills_list)), dtype=bool)
+        for e in range(model.nb_employees):
+            employee = model.employees[model.employees_list[e]]
+            for s in range(len(model.skills_list)):
+                if model.skills_list[s] in employee.dict_skill:
+                    detail = employee.dict_skill[model.skills_list[s]]
+                    skills[e, s, :] = [detail.skill_value, detail.efficiency_ratio, detail.experience]
+                    has_skill[e, s] = True
+        arrays["employee_skills"] = skills
+        arrays["employee_has_skill"] = has_skill
+        arrays["employee_salary"] = np.array([model.employees[e].salary for e in model.employees_list],
+                                             dtype=np.float64)
+        if model.employees_availability is not None:
+            arrays["employees_availability"] = np.array(model.employees_availability, dtype=np.int64)
+        arrays["preemptive"] = np.array(model.preemptive)
+        arrays["preemptive_indicator"] = np.array([model.preemptive_indicator.get(t, False)
+                                                   for t in model.tasks_list], dtype=bool)
+        arrays["one_unit_per_task_max"] = np.array(model.one_unit_per_task_max)
+        arrays["strictly_disjunctive_subtasks"] = np.array(model.strictly_disjunctive_subtasks)
+    with open(path, "wb") as file:
+        np.savez(file, **arrays)
+
+
+def read_npz(path: str, mmap_mode: str = None) -> Dict[str, np.array]:
+    """
+    Arrays of an .npz archive. With mmap_mode ("r", "c", "r+" as in np.load), the non-empty arrays
+    of the uncompressed members are memory-mapped from the file instead of being read.
+    """
+    if mmap_mode is None:
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as file:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type == zipfile.ZIP_STORED:
+                # the member data starts after its local header (30 bytes, then the file name and extra field)
+                file.seek(info.header_offset+26)
+                name_length, extra_length = struct.unpack("<HH", file.read(4))
+                file.seek(info.header_offset+30+name_length+extra_length)
+                version = np.lib.format.read_magic(file)
+                if version in [(1, 0), (2, 0)]:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file) \
+                        if version == (1, 0) else np.lib.format.read_array_header_2_0(file)
+                    if len(shape) > 0 and np.prod(shape) > 0 and not dtype.hasobject:
+                        arrays[name] = np.memmap(file, dtype=dtype, mode=mmap_mode, shape=shape,
+                                                 order="F" if fortran_order else "C",
+                                                 offset=file.tell()).view(np.ndarray)
+                        continue
+            with archive.open(info) as member:
+                arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+    return arrays
+
+
+def load_binary(path: str, mmap_mode: str = None):
+    """
+    Model saved with save_binary. The arrays of the sgs kernels are taken from the file (np_data of the model)
+    and only the dictionaries of the model are rebuilt.
+    mmap_mode : None to read the arrays in memory, "c" to memory-map them copy-on-write
+    (useful for big instances or many processes reading the same file), "r" gives read-only arrays
+    for which numba compiles a separate version of the kernels.
+    """
+    arrays = read_npz(path, mmap_mode=mmap_mode)
+    if "format_version" not in arrays:
+        raise ValueError(path+" is not an rcpsp binary instance")
+    version = int(arrays["format_version"])
+    if version > FORMAT_VERSION:
+        raise ValueError(path+" has format version "+str(version)+", this reader supports up to "
+                         + str(FORMAT_VERSION))
+    class_name = str(arrays["model_class"])
+    np_data = {key[len("np_data/"):]: arrays[key] for key in arrays if key.startswith("np_data/")}
+    np_data["horizon"] = int(np_data["horizon"])
+    if "consider_partial_preemptive" in np_data:
+        np_data["consider_partial_preemptive"] = bool(np_data["consider_partial_preemptive"])
+    tasks_list = arrays["tasks"].tolist()
+    modes = arrays["modes"].tolist()
+    resources_list = arrays["resources"].tolist()
+    durations = np_data["duration_array"].tolist()
+    consumptions = np_data["consumption_array"].tolist()
+    ressource_available = np_data["ressource_available"]
+    non_renewable_resources = [resources_list[k] for k in range(len(resources_list))
+                               if not np_data["ressource_renewable"][k]]
+    indptr = np_data["successors_indptr"].tolist()
+    indices = np_data["successors_indices"].tolist()
+    successors = {tasks_list[i]: [tasks_list[j] for j in indices[indptr[i]:indptr[i+1]]]
+                  for i in range(len(tasks_list))}
+    source_task = tasks_list[int(arrays["source_index"])]
+    sink_task = tasks_list[int(arrays["sink_index"])]
+    horizon_multiplier = arrays["horizon_multiplier"].item()
+    if class_name in RCPSP_CLASSES:
+        from discrete_optimization.rcpsp import rcpsp_model
+        mode_details = {tasks_list[i]: {modes[i][j]: dict(zip(resources_list, consumptions[i][j]),
+                                                          duration=durations[i][j])
+                                        for j in range(len(modes[i])) if modes[i][j] != -1}
+                        for i in range(len(tasks_list))}
+        if bool(arrays["is_calendar"]):
+            resources = {resources_list[k]: np.array(ressource_available[k]) for k in range(len(resources_list))}
+        else:
+            resources = {resources_list[k]: int(ressource_available[k, 0]) for k in range(len(resources_list))}
+        return getattr(rcpsp_model, class_name)(resources=resources,
+                                                non_renewable_resources=non_renewable_resources,
+                                                mode_details=mode_details,
+                                                successors=successors,
+                                                horizon=np_data["horizon"],
+                                                horizon_multiplier=horizon_multiplier,
+                                                tasks_list=tasks_list,
+                                                source_task=source_task,
+                                                sink_task=sink_task,
+                                                np_data=np_data)
+    if class_name in MS_RCPSP_CLASSES:
+        from discrete_optimization.rcpsp_multiskill import rcpsp_multiskill
+        skills_list = arrays["skills"].tolist()
+        employees_list = arrays["employees"].tolist()
+        skills_needs = np_data["skills_needs"].tolist()
+        is_releasable = np_data["is_releasable"].tolist()
+        mode_details = {}
+        partial_preemption_data = {}
+        for i in range(len(tasks_list)):
+            mode_details[tasks_list[i]] = {}
+            partial_preemption_data[tasks_list[i]] = {}
+            for j in range(len(modes[i])):
+                if modes[i][j] == -1:
+                    continue
+                details = {"duration": durations[i][j]}
+                details.update({resources_list[k]: consumptions[i][j][k]
+                                for k in range(len(resources_list)) if consumptions[i][j][k] != 0})
+                details.update({skills_list[s]: skills_needs[i][j][s]
+                                for s in range(len(skills_list)) if skills_needs[i][j][s] != 0})
+                mode_details[tasks_list[i]][modes[i][j]] = details
+                partial_preemption_data[tasks_list[i]][modes[i][j]] = \
+                    {resources_list[k]: bool(is_releasable[i][j][k]) for k in range(len(resources_list))}
+        skills = arrays["employee_skills"].tolist()
+        has_skill = arrays["employee_has_skill"].tolist()
+        salary = arrays["employee_salary"].tolist()
+        worker_available = np_data["worker_available"].astype(bool)
+        employees = {employees_list[e]:
+                     rcpsp_multiskill.Employee(dict_skill={skills_list[s]: rcpsp_multiskill.SkillDetail(*skills[e][s])
+                                                           for s in range(len(skills_list)) if has_skill[e][s]},
+                                               calendar_employee=worker_available[e].tolist(),
+                                               salary=salary[e])
+                     for e in range(len(employees_list))}
+        preemptive_indicator = arrays["preemptive_indicator"].tolist()
+        # the model takes its resources in the order of list(resources_set) : the resource axis
+        # of the arrays is permuted to this order
+        resources_set = set(resources_list)
+        order = [resources_list.index(r) for r in resources_set]
+        for key in ["consumption_array", "is_releasable"]:
+            np_data[key] = np_data[key][:, :, order]
+        for key in ["ressource_available", "ressource_renewable"]:
+            np_data[key] = np_data[key][order]
+        return getattr(rcpsp_multiskill, class_name)(
+            skills_set=set(skills_list),
+            resources_set=resources_set,
+            non_renewable_resources=set(non_renewable_resources),
+            resources_availability={resources_list[k]: np.array(ressource_available[k])
+                                    for k in range(len(resources_list))},
+            employees=employees,
+            employees_availability=arrays["employees_availability"].tolist()
+            if "employees_availability" in arrays else None,
+            mode_details=mode_details,
+            successors=successors,
+            horizon=np_data["horizon"],
+            tasks_list=tasks_list,
+            employees_list=employees_list,
+            horizon_multiplier=horizon_multiplier,
+            sink_task=sink_task,
+            source_task=source_task,
+            one_unit_per_task_max=bool(arrays["one_unit_per_task_max"]),
+            preemptive=bool(arrays["preemptive"]),
+            preemptive_indicator={tasks_list[i]: preemptive_indicator[i] for i in range(len(tasks_list))},
+            partial_preemption_data=partial_preemption_data,
+            strictly_disjunctive_subtasks=bool(arrays["strictly_disjunctive_subtasks"]),
+            np_data=np_data)
+    raise NotImplementedError("Binary format not available for "+class_name)
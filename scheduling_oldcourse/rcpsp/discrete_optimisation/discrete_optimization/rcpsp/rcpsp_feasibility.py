@@ -0,0 +1,141 @@
+from typing import List, Dict, Hashable, Any, Union, Optional
+import numpy as np
+
+
+class ViolationReport:
+    """
+    Violations of the constraints found in a schedule, built by get_violation_report
+    of RCPSPModel, RCPSPModelPreemptive and MS_RCPSPModel (satisfy is report.is_feasible()).
+    Each violation is a dict with a "type" key among
+    "flagged_infeasible", "missing_task", "resource", "non_renewable", "precedence",
+    "skill", "employee_availability", "employee_overlap", and the details of the violation.
+    For a renewable resource, only the first time step where the capacity is exceeded is reported.
+    """
+    def __init__(self):
+        self.violations: List[Dict[str, Any]] = []
+
+    def add(self, type_violation: str, **details):
+        details["type"] = type_violation
+        self.violations.append(details)
+
+    def is_feasible(self) -> bool:
+        return len(self.violations) == 0
+
+    def get_violations(self, type_violation: Optional[str] = None) -> List[Dict[str, Any]]:
+        if type_violation is None:
+            return self.violations
+        return [v for v in self.violations if v["type"] == type_violation]
+
+    def first_violation_per_resource(self) -> Dict[str, Dict[str, Any]]:
+        return {v["resource"]: v for v in self.violations if v["type"] == "resource"}
+
+    def __str__(self):
+        if self.is_feasible():
+            return "No violation"
+        return "\n".join([str(v) for v in self.violations])
+
+
+def check_resource_usage(report: ViolationReport,
+                         interval_starts: np.array,
+                         interval_ends: np.array,
+                         interval_consumption: np.array,
+                         interval_tasks: List[Hashable],
+                         resources_names: List[str],
+                         capacities: List[Union[int, List[int], np.array]]):
+    """
+    Cumulative usage of the resources through a difference array, O(N + T.R).
+    interval_starts, interval_ends : (N,) arrays of the [start, end) intervals where tasks are executed
+    interval_consumption : (R, N) array, consumption of each resource during each interval
+    interval_tasks : task of each interval (only used in the report)
+    capacities : for each resource, a constant capacity or an availability in time
+    (missing time steps at the end of an availability array count as 0).
+    """
+    interval_starts = np.asarray(interval_starts, dtype=np.int64)
+    interval_ends = np.asarray(interval_ends, dtype=np.int64)
+    positive = interval_ends > interval_starts
+    if not np.any(positive):
+        return
+    index_intervals = np.flatnonzero(positive)
+    starts = np.maximum(interval_starts[index_intervals], 0)
+    ends = interval_ends[index_intervals]
+    consumption = np.asarray(interval_consumption, dtype=np.int64)[:, index_intervals]
+    horizon = int(ends.max())
+    usage = np.zeros((len(resources_names), horizon+1), dtype=np.int64)
+    np.add.at(usage, (slice(None), starts), consumption)
+    np.add.at(usage, (slice(None), ends), -consumption)
+    usage = np.cumsum(usage[:, :horizon], axis=1)
+    for k in range(len(resources_names)):
+        if np.isscalar(capacities[k]):
+            available = np.full(horizon, capacities[k], dtype=np.int64)
+        else:
+            available = np.zeros(horizon, dtype=np.int64)
+            capacity = np.asarray(capacities[k], dtype=np.int64)[:horizon]
+            available[:capacity.shape[0]] = capacity
+        violated = np.flatnonzero(usage[k] > available)
+        if violated.shape[0] > 0:
+            t = int(violated[0])
+            active = np.flatnonzero((starts <= t) & (t < ends) & (consumption[k] > 0))
+            report.add("resource", resource=resources_names[k], time=t,
+                       usage=int(usage[k, t]), available=int(available[t]),
+                       nb_time_steps_violated=int(violated.shape[0]),
+                       tasks=[interval_tasks[index_intervals[i]] for i in active])
+
+
+def check_non_renewable_usage(report: ViolationReport,
+                              consumption: np.array,
+                              resources_names: List[str],
+                              capacities: List[int]):
+    """
+    consumption : (R, n) array, consumption of the non renewable resources by each task
+    """
+    total = np.asarray(consumption, dtype=np.int64).sum(axis=1)
+    for k in np.flatnonzero(total > np.asarray(capacities, dtype=np.int64)):
+        report.add("non_renewable", resource=resources_names[k],
+                   usage=int(total[k]), available=int(capacities[k]))
+
+
+def check_precedences(report: ViolationReport,
+                      starts: np.array,
+                      ends: np.array,
+                      scheduled: np.array,
+                      successors_indptr: np.array,
+                      successors_indices: np.array,
+                      tasks_list: List[Hashable]):
+    """
+    starts, ends, scheduled : arrays indexed like tasks_list (start of the first part, end of the last part)
+    the precedence graph is given in csr format (see build_successors_csr)
+    """
+    predecessors = np.repeat(np.arange(len(tasks_list)), np.diff(successors_indptr))
+    successors = np.asarray(successors_indices, dtype=np.int64)
+    broken = np.flatnonzero(scheduled[predecessors] & scheduled[successors]
+                            & (starts[successors] < ends[predecessors]))
+    for k in broken:
+        report.add("precedence", task=tasks_list[predecessors[k]], successor=tasks_list[successors[k]],
+                   end=int(ends[predecessors[k]]), successor_start=int(starts[successors[k]]))
+
+
+def check_no_overlap(report: ViolationReport,
+                     employee: Hashable,
+                     interval_starts: np.array,
+                     interval_ends: np.array,
+                     interval_tasks: List[Hashable]):
+    """
+    A worker can't be on two intervals at the same time : sort by start and compare
+    each start with the latest end of the intervals before it, O(N log N).
+    """
+    interval_starts = np.asarray(interval_starts, dtype=np.int64)
+    interval_ends = np.asarray(interval_ends, dtype=np.int64)
+    index_intervals = np.flatnonzero(interval_ends > interval_starts)
+    if index_intervals.shape[0] < 2:
+        return
+    index_intervals = index_intervals[np.argsort(interval_starts[index_intervals], kind="stable")]
+    starts = interval_starts[index_intervals]
+    ends = interval_ends[index_intervals]
+    latest_end = np.maximum.accumulate(ends)
+    overlaps = np.flatnonzero(starts[1:] < latest_end[:-1])
+    if overlaps.shape[0] > 0:
+        k = int(overlaps[0]) + 1
+        previous = int(np.argmax(ends[:k]))
+        report.add("employee_overlap", employee=employee,
+                   tasks=(interval_tasks[index_intervals[previous]], interval_tasks[index_intervals[k]]),
+                   time=int(starts[k]))
@@ -5,11 +5,13 @@ from typing import List, Union, Tuple, Dict, Iterable, Hashable
 import numpy as np
 from enum import Enum
 from copy import deepcopy
-import matplotlib.pyplot as plt
-from scipy.stats import poisson, rv_discrete, randint
 from collections import defaultdict
-from discrete_optimization.rcpsp.fast_function_rcpsp import sgs_fast, sgs_fast_partial_schedule, compute_mean_ressource, \
-    sgs_fast_partial_schedule_incomplete_permutation_tasks
+from discrete_optimization.rcpsp.fast_function_rcpsp import sgs_fast, sgs_fast_event, sgs_fast_event_core, \
+    sgs_fast_event_incremental, sgs_fast_batch, sgs_fast_partial_schedule, compute_mean_ressource, \
+    sgs_fast_partial_schedule_incomplete_permutation_tasks, build_successors_csr, count_predecessors, transpose_csr, \
+    sgs_fast_parallel, sgs_fast_parallel_core, sgs_fast_parallel_batch
+from discrete_optimization.rcpsp.rcpsp_feasibility import ViolationReport, check_resource_usage, \
+    check_non_renewable_usage, check_precedences
 from functools import partial
 from sortedcontainers import SortedDict
 
@@ -30,6 +32,12 @@ class TaskDetails:
 
 
 class RCPSPSolution(Solution):
+    # The schedule coming out of the fast sgs is kept in int32 arrays indexed like problem.tasks_list
+    # (-1 for tasks not scheduled), the rcpsp_schedule dict is only built when it is accessed.
+    # Once built (or given), the dict is the reference and the arrays are dropped.
+    __slots__ = ("problem", "_rcpsp_permutation", "_rcpsp_schedule", "rcpsp_modes", "rcpsp_schedule_feasible",
+                 "_standardised_permutation", "_schedule_to_recompute", "fast",
+                 "_starts", "_ends", "_modes_array", "_scheduled_order")
     rcpsp_permutation: Union[List[int], np.array]
     rcpsp_schedule: Dict[Hashable, Dict]
     rcpsp_modes: List[int]
@@ -48,6 +56,7 @@ class RCPSPSolution(Solution):
         self.rcpsp_modes = rcpsp_modes
         self.rcpsp_schedule_feasible = rcpsp_schedule_feasible
         self.standardised_permutation = standardised_permutation
+        self._modes_array = None
 
         if self.rcpsp_modes is None:
             if not self.problem.is_rcpsp_multimode():
@@ -66,22 +75,87 @@ class RCPSPSolution(Solution):
                 self.generate_schedule_from_permutation_serial_sgs(do_fast=fast)
             # if isinstance(problem, RCPSP_H_Model):
             #     self.rcpsp_schedule = problem.rcpsp_pre_helper_correction(self)
-        if self.standardised_permutation is None:
-            if not isinstance(problem, Aggreg_RCPSPModel):
-                self.standardised_permutation = self.generate_permutation_from_schedule()
+        # standardised_permutation is computed on first access.
         self.fast = fast
 
+    @property
+    def rcpsp_permutation(self):
+        return self._rcpsp_permutation
+
+    @rcpsp_permutation.setter
+    def rcpsp_permutation(self, value):
+        self._rcpsp_permutation = value
+        self._schedule_to_recompute = True
+
+    @property
+    def rcpsp_schedule(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            self._rcpsp_schedule = self._build_schedule_dict()
+            self._starts = None
+            self._ends = None
+            self._scheduled_order = None
+        return self._rcpsp_schedule
+
+    @rcpsp_schedule.setter
+    def rcpsp_schedule(self, value):
+        self._rcpsp_schedule = value
+        self._starts = None
+        self._ends = None
+        self._scheduled_order = None
+
+    @property
+    def standardised_permutation(self):
+        if self._standardised_permutation is None:
+            if isinstance(self.problem, Aggreg_RCPSPModel) or self._schedule_is_empty():
+                return None
+            self._standardised_permutation = self.generate_permutation_from_schedule()
+        return self._standardised_permutation
+
+    @standardised_permutation.setter
+    def standardised_permutation(self, value):
+        self._standardised_permutation = value
+
+    def _schedule_is_empty(self):
+        return self._rcpsp_schedule is None and self._starts is None
+
+    def _build_schedule_dict(self):
+        rcpsp_schedule = {}
+        for k in self._scheduled_order:
+            if k == -1:
+                break
+            rcpsp_schedule[self.problem.tasks_list[k]] = {"start_time": int(self._starts[k]),
+                                                          "end_time": int(self._ends[k])}
+        if self.problem.sink_task not in rcpsp_schedule:
+            rcpsp_schedule[self.problem.sink_task] = {"start_time": 99999999,
+                                                      "end_time": 99999999}
+        return rcpsp_schedule
+
+    def _copy_from_arrays(self, rcpsp_permutation, rcpsp_modes):
+        # the arrays are never modified in place (a new decoding replaces them), they can be shared.
+        sol = object.__new__(self.__class__)
+        sol.problem = self.problem
+        sol._rcpsp_permutation = rcpsp_permutation
+        sol.rcpsp_modes = rcpsp_modes
+        sol._rcpsp_schedule = None
+        sol._starts = self._starts
+        sol._ends = self._ends
+        sol._scheduled_order = self._scheduled_order
+        sol._modes_array = self._modes_array
+        sol.rcpsp_schedule_feasible = self.rcpsp_schedule_feasible
+        sol._standardised_permutation = self._standardised_permutation
+        sol._schedule_to_recompute = self._schedule_to_recompute
+        sol.fast = self.fast
+        return sol
+
     def change_problem(self, new_problem: Problem):
         self.__init__(problem=new_problem,
                       rcpsp_permutation=self.rcpsp_permutation,
                       rcpsp_modes=self.rcpsp_modes)
 
-    def __setattr__(self, key, value):
-        super.__setattr__(self, key, value)
-        if key == "rcpsp_permutation":
-            self._schedule_to_recompute = True
-
     def copy(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            return self._copy_from_arrays(rcpsp_permutation=copy_vector(self.rcpsp_permutation),
+                                          rcpsp_modes=copy_vector(self.rcpsp_modes))
         return RCPSPSolution(problem=self.problem,
                              rcpsp_permutation=deepcopy(self.rcpsp_permutation),
                              rcpsp_modes=deepcopy(self.rcpsp_modes),
@@ -91,6 +165,9 @@ class RCPSPSolution(Solution):
                              fast=self.fast)
 
     def lazy_copy(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            return self._copy_from_arrays(rcpsp_permutation=self.rcpsp_permutation,
+                                          rcpsp_modes=self.rcpsp_modes)
         return RCPSPSolution(problem=self.problem,
                              rcpsp_permutation=self.rcpsp_permutation,
                              rcpsp_modes=self.rcpsp_modes,
@@ -109,6 +186,12 @@ class RCPSPSolution(Solution):
         return val
 
     def generate_permutation_from_schedule(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            order = self._scheduled_order[self._scheduled_order >= 0]
+            order = order[np.argsort(self._starts[order], kind="stable")]
+            return [self.problem.index_task_non_dummy[self.problem.tasks_list[k]]
+                    for k in order
+                    if self.problem.tasks_list[k] in self.problem.index_task_non_dummy]
         sorted_task = [self.problem.index_task_non_dummy[i]
                        for i in sorted(self.rcpsp_schedule,
                                        key=lambda x: self.rcpsp_schedule[x]["start_time"])
@@ -121,6 +204,11 @@ class RCPSPSolution(Solution):
         else:
             if not self.rcpsp_schedule_feasible:
                 return 0.
+            if self._rcpsp_schedule is None and self._starts is not None:
+                return self.problem.compute_mean_resource(horizon=self.get_end_time(self.problem.sink_task),
+                                                          modes_array=self._modes_array,
+                                                          start_array=self._starts,
+                                                          end_array=self._ends)
             last_activity = self.problem.sink_task
             makespan = self.rcpsp_schedule[last_activity]['end_time']
             return self.problem.compute_mean_resource(horizon=makespan,
@@ -133,18 +221,25 @@ class RCPSPSolution(Solution):
 
     def generate_schedule_from_permutation_serial_sgs(self, do_fast=True):
         if do_fast:
-            schedule, unfeasible = \
-                self.problem.func_sgs(permutation_task=
-                                      permutation_do_to_permutation_sgs_fast(self.problem, self.rcpsp_permutation),
-                                      modes_array=np.array(self.problem.build_mode_array(self.rcpsp_modes))-1)
+            modes_array = np.array(self.problem.build_mode_array(self.rcpsp_modes), dtype=np.int32)-1
+            starts, ends, scheduled_order, unfeasible = \
+                self.problem.func_sgs_array(permutation_task=
+                                            permutation_do_to_permutation_sgs_fast(self.problem,
+                                                                                   self.rcpsp_permutation),
+                                            modes_array=modes_array)
+            starts = starts.astype(np.int32)
+            ends = ends.astype(np.int32)
+            index_sink = self.problem.index_task[self.problem.sink_task]
+            if ends[index_sink] < 0:
+                starts[index_sink] = 99999999
+                ends[index_sink] = 99999999
+            self.rcpsp_schedule = None
+            self._starts = starts
+            self._ends = ends
+            self._scheduled_order = scheduled_order.astype(np.int32)
+            self._modes_array = modes_array
+            self._standardised_permutation = None
             self.rcpsp_schedule_feasible = not unfeasible
-            self.rcpsp_schedule = {}
-            for k in schedule:
-                self.rcpsp_schedule[self.problem.tasks_list[k]] = {"start_time": schedule[k][0],
-                                                                   "end_time": schedule[k][1]}
-            if self.problem.sink_task not in self.rcpsp_schedule:
-                self.rcpsp_schedule[self.problem.sink_task] = {"start_time": 99999999,
-                                                               "end_time": 99999999}
             self._schedule_to_recompute = False
         else:
             schedule, feasible = generate_schedule_from_permutation_serial_sgs(solution=self,
@@ -207,12 +302,20 @@ class RCPSPSolution(Solution):
             self._schedule_to_recompute = False
 
     def get_max_end_time(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            return int(np.max(self._ends))
         return max([self.get_end_time(x) for x in self.rcpsp_schedule])
 
     def get_start_time(self, task):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            value = self._starts[self.problem.index_task[task]] if task in self.problem.index_task else -1
+            return int(value) if value >= 0 else None
         return self.rcpsp_schedule.get(task, {"start_time": None})["start_time"]
 
     def get_end_time(self, task):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            value = self._ends[self.problem.index_task[task]] if task in self.problem.index_task else -1
+            return int(value) if value >= 0 else None
         return self.rcpsp_schedule.get(task, {"end_time": None})["end_time"]
 
     def get_start_times_list(self, task):
@@ -319,12 +422,38 @@ class RCPSPModel(Problem):
                                     for res in self.resources]) > 1
             if not self.is_calendar:
                 self.resources = {r: int(self.resources[r][0]) for r in self.resources}
-        self.func_sgs, self.func_sgs_2, self.compute_mean_resource = create_np_data_and_jit_functions(self)
+        self.sgs = args.get("sgs", ScheduleGenerationScheme.SERIAL_SGS)
+        # arrays of the instance given by load_binary, computed from the dictionaries otherwise
+        self.np_data = args.get("np_data", None)
+        if self.np_data is None:
+            self.np_data = create_np_data(self)
+        self.func_sgs, self.func_sgs_2, self.compute_mean_resource, self.func_sgs_batch, self.func_sgs_array = \
+            create_np_data_and_jit_functions(self, np_data=self.np_data)
+        self.incremental_sgs = None
         self.costs = {"makespan": True, "mean_resource_reserve": args.get("mean_resource_reserve", False)}
         self.graph = self.compute_graph()
 
     def update_functions(self):
-        self.func_sgs, self.func_sgs_2, self.compute_mean_resource = create_np_data_and_jit_functions(rcpsp_problem=self)
+        self.np_data = create_np_data(self)
+        self.func_sgs, self.func_sgs_2, self.compute_mean_resource, self.func_sgs_batch, self.func_sgs_array = \
+            create_np_data_and_jit_functions(rcpsp_problem=self, np_data=self.np_data)
+        self.incremental_sgs = None
+        self.clear_evaluation_cache()
+
+    def set_sgs(self, sgs: ScheduleGenerationScheme):
+        # the schedules of the solutions are decoded with the serial or the parallel sgs
+        self.sgs = sgs
+        self.update_functions()
+
+    def save_binary(self, path: str):
+        # see discrete_optimization.rcpsp.rcpsp_binary_format
+        from discrete_optimization.rcpsp.rcpsp_binary_format import save_binary
+        save_binary(self, path)
+
+    @staticmethod
+    def load_binary(path: str, mmap_mode: str = None):
+        from discrete_optimization.rcpsp.rcpsp_binary_format import load_binary
+        return load_binary(path, mmap_mode=mmap_mode)
 
     def is_rcpsp_multimode(self):
         return self.is_multimode
@@ -364,8 +493,13 @@ class RCPSPModel(Problem):
 
     def evaluate_function(self, rcpsp_sol: RCPSPSolution):
         if rcpsp_sol._schedule_to_recompute:
-            rcpsp_sol.generate_schedule_from_permutation_serial_sgs()
-        makespan = rcpsp_sol.rcpsp_schedule[self.sink_task]['end_time']
+            if self.profiler is not None:
+                self.profiler.start("sgs")
+                rcpsp_sol.generate_schedule_from_permutation_serial_sgs()
+                self.profiler.stop()
+            else:
+                rcpsp_sol.generate_schedule_from_permutation_serial_sgs()
+        makespan = rcpsp_sol.get_end_time(self.sink_task)
         if self.costs["mean_resource_reserve"]:
             obj_mean_resource_reserve = rcpsp_sol.compute_mean_resource_reserve()
             return makespan, obj_mean_resource_reserve
@@ -381,10 +515,97 @@ class RCPSPModel(Problem):
             return objectives
         return None
 
+    def evaluate_batch(self, permutations, modes):
+        """
+        Decode N individuals in one numba call.
+        permutations : array (N, n_jobs_non_dummy) of permutations in the DO encoding (as rcpsp_permutation)
+        modes : array (N, n_jobs_non_dummy) of modes (1, 2...) of the non dummy tasks (as rcpsp_modes)
+        Returns starts and ends arrays (N, n_jobs) indexed like tasks_list (-1 for task not scheduled),
+        and the array of makespans (99999999 when the sink could not be scheduled).
+        """
+        permutations = np.asarray(permutations, dtype=np.int32)
+        modes = np.asarray(modes, dtype=np.int32)
+        nb_individuals = permutations.shape[0]
+        index_non_dummy = np.array([self.index_task[t] for t in self.tasks_list_non_dummy], dtype=np.int32)
+        permutations_task = np.zeros((nb_individuals, self.n_jobs), dtype=np.int32)
+        permutations_task[:, 0] = self.index_task[self.source_task]
+        permutations_task[:, 1:-1] = index_non_dummy[permutations]
+        permutations_task[:, -1] = self.index_task[self.sink_task]
+        modes_arrays = np.zeros((nb_individuals, self.n_jobs), dtype=np.int32)
+        modes_arrays[:, index_non_dummy] = modes - 1
+        if self.profiler is not None:
+            self.profiler.start("sgs_batch")
+        starts, ends, unfeasible = self.func_sgs_batch(permutations_task=permutations_task,
+                                                       modes_arrays=modes_arrays)
+        if self.profiler is not None:
+            self.profiler.stop()
+        makespans = ends[:, self.index_task[self.sink_task]]
+        makespans = np.where(makespans >= 0, makespans, 99999999)
+        return starts, ends, makespans
+
+    def evaluate_from_encoding_batch(self, int_vectors, encoding_name):
+        if type(self).evaluate is not RCPSPModel.evaluate \
+                or type(self).evaluate_from_encoding is not RCPSPModel.evaluate_from_encoding \
+                or encoding_name != 'rcpsp_permutation' \
+                or self.costs["mean_resource_reserve"]:
+            return [self.evaluate_from_encoding(int_vector, encoding_name) for int_vector in int_vectors]
+        permutations = np.array(int_vectors, dtype=np.int32)
+        modes = np.ones(permutations.shape, dtype=np.int32)
+        starts, ends, makespans = self.evaluate_batch(permutations, modes)
+        return [{'makespan': makespan, 'mean_resource_reserve': 0} for makespan in makespans.tolist()]
+
     def evaluate(self, rcpsp_sol: RCPSPSolution) -> Dict[str, float]:
         obj_makespan, obj_mean_resource_reserve = self.evaluate_function(rcpsp_sol)
         return {'makespan': obj_makespan, 'mean_resource_reserve': obj_mean_resource_reserve}
 
+    def evaluate_incremental(self, rcpsp_sol: RCPSPSolution) -> Dict[str, float]:
+        """
+        Same as evaluate, but the schedule is decoded with the incremental sgs (see IncrementalSGS) :
+        when the solution is a local move away from the previously decoded one, only the end of the schedule
+        that changes is recomputed. Used by the rcpsp mutations in mutate_and_compute_obj.
+        """
+        if self.is_incremental_sgs_available(rcpsp_sol) and rcpsp_sol._schedule_to_recompute:
+            if getattr(self, "incremental_sgs", None) is None:
+                self.incremental_sgs = IncrementalSGS(self)
+            if self.profiler is not None:
+                self.profiler.start("sgs_incremental")
+            self.incremental_sgs.generate_schedule(rcpsp_sol)
+            if self.profiler is not None:
+                self.profiler.stop()
+        return self.evaluate(rcpsp_sol)
+
+    def is_incremental_sgs_available(self, rcpsp_sol: RCPSPSolution):
+        return "func_sgs_array" in self.__dict__ \
+               and isinstance(rcpsp_sol, RCPSPSolution) \
+               and type(rcpsp_sol).generate_schedule_from_permutation_serial_sgs \
+               is RCPSPSolution.generate_schedule_from_permutation_serial_sgs \
+               and rcpsp_sol.fast \
+               and self.func_sgs_array.func is sgs_fast_event_core
+
+    def get_evaluation_cache_key(self, rcpsp_sol: RCPSPSolution):
+        # only the solutions that need a (fast) sgs decoding are cached, the key is the raw encoding.
+        if not rcpsp_sol._schedule_to_recompute or not self.is_incremental_sgs_available(rcpsp_sol):
+            return None
+        return np.asarray(rcpsp_sol.rcpsp_permutation, dtype=np.int32).tobytes(), \
+            np.asarray(rcpsp_sol.rcpsp_modes, dtype=np.int32).tobytes()
+
+    def get_evaluation_cache_state(self, rcpsp_sol: RCPSPSolution):
+        if rcpsp_sol._starts is None:
+            return None
+        return rcpsp_sol._starts, rcpsp_sol._ends, rcpsp_sol._scheduled_order, rcpsp_sol._modes_array, \
+            rcpsp_sol.rcpsp_schedule_feasible
+
+    def set_evaluation_cache_state(self, rcpsp_sol: RCPSPSolution, state):
+        if state is None:
+            rcpsp_sol.generate_schedule_from_permutation_serial_sgs()
+            return
+        # the arrays are never modified in place, they are shared with the cache.
+        rcpsp_sol.rcpsp_schedule = None
+        rcpsp_sol._starts, rcpsp_sol._ends, rcpsp_sol._scheduled_order, rcpsp_sol._modes_array, \
+            rcpsp_sol.rcpsp_schedule_feasible = state
+        rcpsp_sol._standardised_permutation = None
+        rcpsp_sol._schedule_to_recompute = False
+
     def evaluate_mobj(self, rcpsp_sol: RCPSPSolution):
         return self.evaluate_mobj_from_dict(self.evaluate(rcpsp_sol))
 
@@ -411,52 +632,54 @@ class RCPSPModel(Problem):
         return self.index_task[task]+offset
 
     def satisfy(self, rcpsp_sol: RCPSPSolution)->bool:
+        return self.get_violation_report(rcpsp_sol).is_feasible()
+
+    def get_violation_report(self, rcpsp_sol: RCPSPSolution) -> ViolationReport:
+        report = ViolationReport()
         if rcpsp_sol.rcpsp_schedule_feasible is False:
-            print('Schedule flagged as infeasible when generated')
-            return False
+            report.add("flagged_infeasible")
+            return report
+        if rcpsp_sol._rcpsp_schedule is None and rcpsp_sol._starts is not None:
+            # schedule still in the arrays of the fast sgs, no need to build the dict.
+            starts = rcpsp_sol._starts.astype(np.int64)
+            ends = rcpsp_sol._ends.astype(np.int64)
+            scheduled = np.zeros(self.n_jobs, dtype=bool)
+            scheduled[rcpsp_sol._scheduled_order[rcpsp_sol._scheduled_order >= 0]] = True
+            scheduled[self.index_task[self.sink_task]] = True
         else:
-            modes_dict = self.build_mode_dict(rcpsp_modes_from_solution=rcpsp_sol.rcpsp_modes)
-            start_times = [rcpsp_sol.rcpsp_schedule[t]["start_time"] for t in rcpsp_sol.rcpsp_schedule]
-            for t in start_times:
-                resource_usage = {}
-                for res in self.resources_list:
-                    resource_usage[res] = 0
-                for act_id in rcpsp_sol.rcpsp_schedule:
-                    start = rcpsp_sol.rcpsp_schedule[act_id]['start_time']
-                    end = rcpsp_sol.rcpsp_schedule[act_id]['end_time']
-                    mode = modes_dict[act_id]
-                    for res in self.resources_list:
-                        if start <= t < end:
-                            resource_usage[res] += self.mode_details[act_id][mode].get(res, 0)
-                for res in self.resources.keys():
-                    if resource_usage[res] > self.get_resource_available(res, t):
-                        print([act for act in rcpsp_sol.rcpsp_schedule
-                               if rcpsp_sol.rcpsp_schedule[act]['start_time']
-                               <= t < rcpsp_sol.rcpsp_schedule[act]['end_time']])
-                        print('Time step resource violation: time: ', t, 'res', res,
-                              'res_usage: ', resource_usage[res], 'res_avail: ', self.resources[res])
-                        return False
-
-            # Check for non-renewable resource violation
-            for res in self.non_renewable_resources:
-                usage = 0
-                for act_id in rcpsp_sol.rcpsp_schedule:
-                    mode = modes_dict[act_id]
-                    usage += self.mode_details[act_id][mode][res]
-                    if usage > self.resources[res]:
-                        print('Non-renewable resource violation: act_id: ', act_id,
-                              'res', res, 'res_usage: ', usage, 'res_avail: ', self.resources[res])
-                        return False
-            # Check precedences / successors
-            for act_id in list(self.successors.keys()):
-                for succ_id in self.successors[act_id]:
-                    start_succ = rcpsp_sol.rcpsp_schedule[succ_id]['start_time']
-                    end_pred = rcpsp_sol.rcpsp_schedule[act_id]['end_time']
-                    if start_succ < end_pred:
-                        print('Precedence relationship broken: ', act_id, 'end at ', end_pred, 'while ', succ_id, 'start at', start_succ)
-                        return False
-
-            return True
+            schedule = rcpsp_sol.rcpsp_schedule
+            starts = np.array([schedule[t]["start_time"] if t in schedule else 0 for t in self.tasks_list],
+                              dtype=np.int64)
+            ends = np.array([schedule[t]["end_time"] if t in schedule else 0 for t in self.tasks_list],
+                            dtype=np.int64)
+            scheduled = np.array([t in schedule for t in self.tasks_list], dtype=bool)
+        for i in np.flatnonzero(~scheduled):
+            report.add("missing_task", task=self.tasks_list[i])
+        modes = self.build_mode_array(rcpsp_sol.rcpsp_modes)
+        index_scheduled = np.flatnonzero(scheduled)
+        consumption = np.array([[self.mode_details[self.tasks_list[i]][modes[i]].get(res, 0)
+                                 for i in index_scheduled]
+                                for res in self.resources_list], dtype=np.int64).reshape((len(self.resources_list),
+                                                                                          len(index_scheduled)))
+        check_resource_usage(report,
+                             interval_starts=starts[index_scheduled],
+                             interval_ends=ends[index_scheduled],
+                             interval_consumption=consumption,
+                             interval_tasks=[self.tasks_list[i] for i in index_scheduled],
+                             resources_names=self.resources_list,
+                             capacities=[self.resources[res] for res in self.resources_list])
+        index_non_renewable = [k for k in range(len(self.resources_list))
+                               if self.resources_list[k] in self.non_renewable_resources]
+        check_non_renewable_usage(report,
+                                  consumption=consumption[index_non_renewable, :],
+                                  resources_names=[self.resources_list[k] for k in index_non_renewable],
+                                  capacities=[self.get_resource_available(self.resources_list[k], 0)
+                                              for k in index_non_renewable])
+        successors_indptr, successors_indices = build_successors_csr(self.tasks_list, self.successors)
+        check_precedences(report, starts=starts, ends=ends, scheduled=scheduled,
+                          successors_indptr=successors_indptr, successors_indices=successors_indices,
+                          tasks_list=self.tasks_list)
+        return report
 
     def __str__(self):
         val = "I'm a RCPSP model with "+str(self.n_jobs)+" tasks.."+" and ressources ="+str(self.resources_list)
@@ -512,6 +735,7 @@ class RCPSPModel(Problem):
         return consumptions
 
     def plot_ressource_view(self, rcpsp_sol: RCPSPSolution):
+        import matplotlib.pyplot as plt
         consumption = self.compute_resource_consumption(rcpsp_sol=rcpsp_sol)
         fig, ax = plt.subplots(nrows=len(self.resources_list), sharex=True)
         for i in range(len(self.resources_list)):
@@ -525,7 +749,8 @@ class RCPSPModel(Problem):
                           mode_details=deepcopy(self.mode_details),
                           successors=deepcopy(self.successors),
                           horizon=self.horizon,
-                          horizon_multiplier=self.horizon_multiplier)
+                          horizon_multiplier=self.horizon_multiplier,
+                          sgs=self.sgs)
 
     def get_dummy_solution(self):
         sol = RCPSPSolution(problem=self,
@@ -558,7 +783,8 @@ class RCPSPModelCalendar(RCPSPModel):
                  sink_task=None,
                  name_task: Dict[int, str] = None,
                  calendar_details: Dict[str, List[List[int]]]=None,
-                 name_ressource_to_index: Dict[str, int]=None):
+                 name_ressource_to_index: Dict[str, int]=None,
+                 **args):
         super().__init__(resources=resources,
                          non_renewable_resources=non_renewable_resources,
                          mode_details=mode_details,
@@ -568,7 +794,8 @@ class RCPSPModelCalendar(RCPSPModel):
                          tasks_list=tasks_list,
                          source_task=source_task,
                          sink_task=sink_task,
-                         name_task=name_task)
+                         name_task=name_task,
+                         **args)
         self.calendar_details = calendar_details
         self.name_ressource_to_index = name_ressource_to_index
 
@@ -591,12 +818,14 @@ class RCPSPModelCalendar(RCPSPModel):
                                   name_ressource_to_index=self.name_ressource_to_index)
 
 
-def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModel, RCPSPModelCalendar]):
+def create_np_data(rcpsp_problem: Union[RCPSPModel, RCPSPModelCalendar]) -> Dict[str, np.array]:
+    """
+    Arrays describing the instance, as taken by the numba sgs kernels
+    (tasks in the order of tasks_list, modes sorted, resources in the order of resources_list).
+    """
     consumption_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode,
                                   len(rcpsp_problem.resources_list)), dtype=np.int32)
     duration_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode), dtype=np.int)
-    predecessors = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.n_jobs), dtype=np.int)
-    successors = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.n_jobs), dtype=np.int)
     horizon = rcpsp_problem.horizon
     ressource_available = np.zeros((len(rcpsp_problem.resources_list), horizon), dtype=np.int32)
     ressource_renewable = np.ones((len(rcpsp_problem.resources_list)), dtype=bool)
@@ -611,7 +840,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModel, RCPSPModel
             duration_array[i, index_mode] = rcpsp_problem.mode_details[task][mode]["duration"]
             index_mode += 1
 
-    task_index = {rcpsp_problem.tasks_list[i]: i for i in range(rcpsp_problem.n_jobs)}
     for k in range(len(rcpsp_problem.resources_list)):
         if rcpsp_problem.is_varying_resource():
             ressource_available[k, :] = \
@@ -623,41 +851,46 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModel, RCPSPModel
         if rcpsp_problem.resources_list[k] in rcpsp_problem.non_renewable_resources:
             ressource_renewable[k] = False
 
-    for i in range(len(rcpsp_problem.tasks_list)):
-        task = rcpsp_problem.tasks_list[i]
-        for s in rcpsp_problem.successors[task]:
-            index_s = task_index[s]
-            predecessors[index_s, i] = 1
-            successors[i, index_s] = 1
+    successors_indptr, successors_indices = build_successors_csr(rcpsp_problem.tasks_list,
+                                                                 rcpsp_problem.successors)
     minimum_starting_time_array = np.zeros(rcpsp_problem.n_jobs, dtype=int)
     if "special_constraints" in rcpsp_problem.__dict__.keys():
         for t in rcpsp_problem.special_constraints.start_times_window:
             if rcpsp_problem.special_constraints.start_times_window[t][0] is not None:
                 minimum_starting_time_array[rcpsp_problem.index_task[t]] = \
                     rcpsp_problem.special_constraints.start_times_window[t][0]
-    func_sgs = partial(sgs_fast,
-                       consumption_array=consumption_array,
-                       duration_array=duration_array,
-                       predecessors=predecessors,
-                       successors=successors,
-                       horizon=horizon,
-                       ressource_available=ressource_available,
-                       ressource_renewable=ressource_renewable,
-                       minimum_starting_time_array=minimum_starting_time_array)
-    func_sgs_2 = partial(sgs_fast_partial_schedule_incomplete_permutation_tasks,
-                         consumption_array=consumption_array,
-                         duration_array=duration_array,
-                         predecessors=predecessors,
-                         successors=successors,
-                         horizon=horizon,
-                         ressource_available=ressource_available,
-                         ressource_renewable=ressource_renewable,
-                         minimum_starting_time_array=minimum_starting_time_array)
+    return {"consumption_array": consumption_array,
+            "duration_array": duration_array,
+            "successors_indptr": successors_indptr,
+            "successors_indices": successors_indices,
+            "horizon": horizon,
+            "ressource_available": ressource_available,
+            "ressource_renewable": ressource_renewable,
+            "minimum_starting_time_array": minimum_starting_time_array}
+
+
+def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModel, RCPSPModelCalendar],
+                                     np_data: Dict[str, np.array] = None):
+    # np_data : output of create_np_data, recomputed from the model if not given
+    if np_data is None:
+        np_data = create_np_data(rcpsp_problem)
+    parallel_sgs = getattr(rcpsp_problem, "sgs", ScheduleGenerationScheme.SERIAL_SGS) \
+        == ScheduleGenerationScheme.PARALLEL_SGS
+    func_sgs = partial(sgs_fast_parallel if parallel_sgs else sgs_fast_event, **np_data)
+    func_sgs_2 = partial(sgs_fast_partial_schedule_incomplete_permutation_tasks, **np_data)
     func_compute_mean_resource = partial(compute_mean_ressource,
-                                         consumption_array=consumption_array,
-                                         ressource_available=ressource_available,
-                                         ressource_renewable=ressource_renewable)
-    return func_sgs, func_sgs_2, func_compute_mean_resource
+                                         consumption_array=np_data["consumption_array"],
+                                         ressource_available=np_data["ressource_available"],
+                                         ressource_renewable=np_data["ressource_renewable"])
+    func_sgs_batch = partial(sgs_fast_parallel_batch if parallel_sgs else sgs_fast_batch, **np_data)
+    func_sgs_array = partial(sgs_fast_parallel_core if parallel_sgs else sgs_fast_event_core, **np_data)
+    return func_sgs, func_sgs_2, func_compute_mean_resource, func_sgs_batch, func_sgs_array
+
+
+def copy_vector(vector):
+    if vector is None:
+        return None
+    return vector.copy()
 
 
 def permutation_do_to_permutation_sgs_fast(rcpsp_problem: RCPSPModel, permutation_do):
@@ -668,6 +901,69 @@ def permutation_do_to_permutation_sgs_fast(rcpsp_problem: RCPSPModel, permutatio
     return np.array(perm_extended, dtype=np.int32)
 
 
+class IncrementalSGS:
+    """
+    Serial sgs keeping the state of its last run (schedule, resource profile, remaining predecessors).
+    A local move on the permutation or the modes leaves the beginning of the schedule unchanged :
+    the next decoding only unschedules and replays the tasks from the first step where the sgs
+    takes a different decision (see sgs_fast_event_incremental).
+    """
+    def __init__(self, rcpsp_model: RCPSPModel):
+        self.rcpsp_model = rcpsp_model
+        self.keywords = rcpsp_model.func_sgs_array.keywords
+        n_jobs = rcpsp_model.n_jobs
+        self.predecessors_indptr, self.predecessors_indices = \
+            transpose_csr(self.keywords["successors_indptr"], self.keywords["successors_indices"])
+        self.index_non_dummy = np.array([rcpsp_model.index_task[t] for t in rcpsp_model.tasks_list_non_dummy],
+                                        dtype=np.int32)
+        self.stored_position = np.full(n_jobs, -1, dtype=np.int64)
+        self.starts = np.full(n_jobs, -1, dtype=np.int64)
+        self.ends = np.full(n_jobs, -1, dtype=np.int64)
+        self.scheduled_order = np.full(n_jobs, -1, dtype=np.int64)
+        self.scheduled_modes = np.zeros(n_jobs, dtype=np.int64)
+        self.pred_links = count_predecessors(self.keywords["successors_indptr"], self.keywords["successors_indices"])
+        self.eligible_step = np.where(self.pred_links == 0, 0, n_jobs)
+        self.resource_avail_in_time = np.copy(self.keywords["ressource_available"][:, :self.keywords["horizon"]+1])
+        self.unfeasible = False
+
+    def generate_schedule(self, rcpsp_sol: RCPSPSolution):
+        # same arrays as build_mode_array and permutation_do_to_permutation_sgs_fast, without python loops
+        modes_array = np.zeros(self.rcpsp_model.n_jobs, dtype=np.int32)
+        modes_array[self.index_non_dummy] = np.asarray(rcpsp_sol.rcpsp_modes, dtype=np.int32)-1
+        permutation_task = np.empty(self.rcpsp_model.n_jobs, dtype=np.int32)
+        permutation_task[0] = self.rcpsp_model.index_task[self.rcpsp_model.source_task]
+        permutation_task[1:-1] = self.index_non_dummy[np.asarray(rcpsp_sol.rcpsp_permutation, dtype=np.int32)]
+        permutation_task[-1] = self.rcpsp_model.index_task[self.rcpsp_model.sink_task]
+        self.unfeasible = sgs_fast_event_incremental(permutation_task=permutation_task,
+                                                     modes_array=modes_array,
+                                                     predecessors_indptr=self.predecessors_indptr,
+                                                     predecessors_indices=self.predecessors_indices,
+                                                     stored_position=self.stored_position,
+                                                     starts=self.starts,
+                                                     ends=self.ends,
+                                                     scheduled_order=self.scheduled_order,
+                                                     scheduled_modes=self.scheduled_modes,
+                                                     eligible_step=self.eligible_step,
+                                                     pred_links=self.pred_links,
+                                                     resource_avail_in_time=self.resource_avail_in_time,
+                                                     **self.keywords)
+        # the solution gets its own copy, the arrays of the sgs are updated in place.
+        starts = self.starts.astype(np.int32)
+        ends = self.ends.astype(np.int32)
+        index_sink = self.rcpsp_model.index_task[self.rcpsp_model.sink_task]
+        if ends[index_sink] < 0:
+            starts[index_sink] = 99999999
+            ends[index_sink] = 99999999
+        rcpsp_sol.rcpsp_schedule = None
+        rcpsp_sol._starts = starts
+        rcpsp_sol._ends = ends
+        rcpsp_sol._scheduled_order = self.scheduled_order.astype(np.int32)
+        rcpsp_sol._modes_array = modes_array
+        rcpsp_sol._standardised_permutation = None
+        rcpsp_sol.rcpsp_schedule_feasible = not self.unfeasible
+        rcpsp_sol._schedule_to_recompute = False
+
+
 # TODO : Delete.
 class SingleModeRCPSPModel(RCPSPModel):
     def copy(self):
@@ -689,13 +985,15 @@ class MultiModeRCPSPModel(RCPSPModel):
                  mode_details,
                  successors,
                  horizon,
-                 horizon_multiplier=1):
+                 horizon_multiplier=1,
+                 **args):
         RCPSPModel.__init__(self, resources=resources,
                             non_renewable_resources=non_renewable_resources,
                             mode_details=mode_details,
                             successors=successors,
                             horizon=horizon,
-                            horizon_multiplier=horizon_multiplier)
+                            horizon_multiplier=horizon_multiplier,
+                            **args)
         self.fixed_modes = None
         self.fixed_permutation = None
 
@@ -710,9 +1008,11 @@ class MultiModeRCPSPModel(RCPSPModel):
 
     def set_fixed_modes(self, fixed_modes):
         self.fixed_modes = fixed_modes
+        self.clear_evaluation_cache()
 
     def set_fixed_permutation(self, fixed_permutation):
         self.fixed_permutation = fixed_permutation
+        self.clear_evaluation_cache()
 
     def evaluate_from_encoding(self, int_vector, encoding_name):
         if encoding_name == 'rcpsp_permutation':
@@ -729,6 +1029,21 @@ class MultiModeRCPSPModel(RCPSPModel):
         objectives = self.evaluate(rcpsp_sol)
         return objectives
 
+    def evaluate_from_encoding_batch(self, int_vectors, encoding_name):
+        if type(self).evaluate is not RCPSPModel.evaluate \
+                or type(self).evaluate_from_encoding is not MultiModeRCPSPModel.evaluate_from_encoding \
+                or encoding_name not in {'rcpsp_permutation', 'rcpsp_modes'} \
+                or self.costs["mean_resource_reserve"]:
+            return [self.evaluate_from_encoding(int_vector, encoding_name) for int_vector in int_vectors]
+        if encoding_name == 'rcpsp_permutation':
+            permutations = np.array(int_vectors, dtype=np.int32)
+            modes = np.tile(np.array(self.fixed_modes, dtype=np.int32), (permutations.shape[0], 1))
+        else:
+            modes = np.array(int_vectors, dtype=np.int32)+1
+            permutations = np.tile(np.array(self.fixed_permutation, dtype=np.int32), (modes.shape[0], 1))
+        starts, ends, makespans = self.evaluate_batch(permutations, modes)
+        return [{'makespan': makespan, 'mean_resource_reserve': 0} for makespan in makespans.tolist()]
+
     def copy(self):
         mm = MultiModeRCPSPModel(resources=self.resources,
                                  non_renewable_resources=self.non_renewable_resources,
@@ -900,6 +1215,7 @@ class UncertainRCPSPModel:
                  poisson_laws: Dict[int,
                                     Dict[int, Dict[str, Tuple[int, int, int]]]],
                  uniform_law=True):
+        from scipy.stats import poisson, rv_discrete, randint
         self.base_rcpsp_model = base_rcpsp_model
         self.poisson_laws = poisson_laws
         self.probas = {}
@@ -5,13 +5,14 @@ from typing import List, Union, Tuple, Dict, Iterable, Any, Hashable
 import numpy as np
 from enum import Enum
 from copy import deepcopy
-import matplotlib.pyplot as plt
 from collections import defaultdict
-from discrete_optimization.rcpsp.fast_function_rcpsp import compute_mean_ressource, \
+from discrete_optimization.rcpsp.fast_function_rcpsp import compute_mean_ressource, build_successors_csr, \
     sgs_fast_preemptive,\
     sgs_fast_partial_schedule_preemptive, \
     sgs_fast_partial_schedule_preemptive_minduration, \
-    sgs_fast_preemptive_minduration
+    sgs_fast_preemptive_minduration, sgs_fast_preemptive_parallel
+from discrete_optimization.rcpsp.rcpsp_feasibility import ViolationReport, check_resource_usage, \
+    check_non_renewable_usage, check_precedences
 from functools import partial
 
 
@@ -338,6 +339,7 @@ class RCPSPModelPreemptive(Problem):
                                     for res in self.resources]) > 1
             if not self.is_calendar:
                 self.resources = {r: int(self.resources[r][0]) for r in self.resources}
+        self.sgs = ScheduleGenerationScheme.SERIAL_SGS
         self.func_sgs, self.func_sgs_2, self.compute_mean_resource = create_np_data_and_jit_functions(self)
 
     def get_resource_names(self):
@@ -363,6 +365,11 @@ class RCPSPModelPreemptive(Problem):
     def update_function(self):
         self.func_sgs, self.func_sgs_2, self.compute_mean_resource = create_np_data_and_jit_functions(self)
 
+    def set_sgs(self, sgs: ScheduleGenerationScheme):
+        # the parallel sgs is not available with a minimum duration of the preempted parts (serial sgs used)
+        self.sgs = sgs
+        self.update_function()
+
     def is_rcpsp_multimode(self):
         return self.is_multimode
 
@@ -438,64 +445,55 @@ class RCPSPModelPreemptive(Problem):
         return self.index_task[task]+offset
 
     def satisfy(self, rcpsp_sol: RCPSPSolutionPreemptive)->bool:
+        return self.get_violation_report(rcpsp_sol).is_feasible()
+
+    def get_violation_report(self, rcpsp_sol: RCPSPSolutionPreemptive) -> ViolationReport:
+        report = ViolationReport()
         if rcpsp_sol.rcpsp_schedule_feasible is False:
-            print('Schedule flagged as infeasible when generated')
-            return False
-        else:
-            modes_dict = self.build_mode_dict(rcpsp_modes_from_solution=rcpsp_sol.rcpsp_modes)
-            if not self.is_varying_resource():
-                start_times = [rcpsp_sol.rcpsp_schedule[t]["starts"][k]
-                               for t in rcpsp_sol.rcpsp_schedule
-                               for k in range(len(rcpsp_sol.rcpsp_schedule[t]["starts"]))]
-            else:
-                start_times = range(rcpsp_sol.rcpsp_schedule[self.sink_task]["ends"][-1])
-
-            if False:
-                for t in start_times:
-                    resource_usage = {}
-                    for res in self.resources_list:
-                        resource_usage[res] = 0
-                    for act_id in rcpsp_sol.rcpsp_schedule:
-                        start = rcpsp_sol.rcpsp_schedule[act_id]['starts']
-                        end = rcpsp_sol.rcpsp_schedule[act_id]['ends']
-                        mode = modes_dict[act_id]
-                        for s, e in zip(start, end):
-                            for res in self.resources_list:
-                                if s <= t < e:
-                                    resource_usage[res] += self.mode_details[act_id][mode].get(res, 0)
-                    for res in self.resources.keys():
-                        if resource_usage[res] > self.get_resource_available(res, t):
-                            print('Time step resource violation: time: ', t, 'res', res,
-                                  'res_usage: ', resource_usage[res], 'res_avail: ', self.resources[res])
-                            return False
-            else:
-                resource_avail_in_time = compute_resource(solution=rcpsp_sol, rcpsp_problem=self)
-                for r in resource_avail_in_time:
-                    if np.any(resource_avail_in_time[r] < 0):
-                        return False
-            # Check for non-renewable resource violation
-            for res in self.non_renewable_resources:
-                usage = 0
-                for act_id in rcpsp_sol.rcpsp_schedule:
-                    mode = modes_dict[act_id]
-                    usage += self.mode_details[act_id][mode][res]
-                    if usage > self.resources[res]:
-                        print('Non-renewable resource violation: act_id: ', act_id,
-                              'res', res, 'res_usage: ', usage, 'res_avail: ', self.resources[res])
-                        return False
-            # Check precedences / successors
-            for act_id in self.successors:
-                for succ_id in self.successors[act_id]:
-                    start_succ = rcpsp_sol.rcpsp_schedule[succ_id]['starts'][0]
-                    end_pred = rcpsp_sol.rcpsp_schedule[act_id]['ends'][-1]
-                    if start_succ < end_pred:
-                        print('Precedence relationship broken: ', act_id,
-                              'end at ', end_pred,
-                              'while ', succ_id,
-                              'start at', start_succ)
-                        return False
-
-            return True
+            report.add("flagged_infeasible")
+            return report
+        schedule = rcpsp_sol.rcpsp_schedule
+        modes_dict = self.build_mode_dict(rcpsp_modes_from_solution=rcpsp_sol.rcpsp_modes)
+        scheduled = np.array([t in schedule for t in self.tasks_list], dtype=bool)
+        for i in np.flatnonzero(~scheduled):
+            report.add("missing_task", task=self.tasks_list[i])
+        # one interval per part of the preempted tasks
+        interval_tasks = [t for t in self.tasks_list if t in schedule for k in range(len(schedule[t]["starts"]))]
+        interval_starts = np.array([s for t in self.tasks_list if t in schedule for s in schedule[t]["starts"]],
+                                   dtype=np.int64)
+        interval_ends = np.array([e for t in self.tasks_list if t in schedule for e in schedule[t]["ends"]],
+                                 dtype=np.int64)
+        consumption_task = {t: [self.mode_details[t][modes_dict[t]].get(res, 0) for res in self.resources_list]
+                            for t in self.tasks_list if t in schedule}
+        consumption = np.array([consumption_task[t] for t in interval_tasks],
+                               dtype=np.int64).reshape((len(interval_tasks), len(self.resources_list))).T
+        check_resource_usage(report,
+                             interval_starts=interval_starts,
+                             interval_ends=interval_ends,
+                             interval_consumption=consumption,
+                             interval_tasks=interval_tasks,
+                             resources_names=self.resources_list,
+                             capacities=[self.resources[res] for res in self.resources_list])
+        index_non_renewable = [k for k in range(len(self.resources_list))
+                               if self.resources_list[k] in self.non_renewable_resources]
+        consumption_non_renewable = np.array([[consumption_task[t][k] for t in consumption_task]
+                                              for k in index_non_renewable],
+                                             dtype=np.int64).reshape((len(index_non_renewable),
+                                                                      len(consumption_task)))
+        check_non_renewable_usage(report,
+                                  consumption=consumption_non_renewable,
+                                  resources_names=[self.resources_list[k] for k in index_non_renewable],
+                                  capacities=[self.get_resource_available(self.resources_list[k], 0)
+                                              for k in index_non_renewable])
+        starts = np.array([schedule[t]["starts"][0] if t in schedule else 0 for t in self.tasks_list],
+                          dtype=np.int64)
+        ends = np.array([schedule[t]["ends"][-1] if t in schedule else 0 for t in self.tasks_list],
+                        dtype=np.int64)
+        successors_indptr, successors_indices = build_successors_csr(self.tasks_list, self.successors)
+        check_precedences(report, starts=starts, ends=ends, scheduled=scheduled,
+                          successors_indptr=successors_indptr, successors_indices=successors_indices,
+                          tasks_list=self.tasks_list)
+        return report
 
     def get_solution_type(self):
         return RCPSPSolutionPreemptive
@@ -547,6 +545,7 @@ class RCPSPModelPreemptive(Problem):
         return consumptions
 
     def plot_ressource_view(self, rcpsp_sol: RCPSPSolutionPreemptive):
+        import matplotlib.pyplot as plt
         consumption = self.compute_resource_consumption(rcpsp_sol=rcpsp_sol)
         fig, ax = plt.subplots(nrows=len(self.resources_list), sharex=True)
         for i in range(len(self.resources_list)):
@@ -944,8 +943,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelPreemptive])
     consumption_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode,
                                   len(rcpsp_problem.resources_list)), dtype=np.int32)
     duration_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode), dtype=np.int)
-    predecessors = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.n_jobs), dtype=np.int)
-    successors = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.n_jobs), dtype=np.int)
     preemptive_tag = np.zeros((rcpsp_problem.n_jobs), dtype=np.bool)
     horizon = rcpsp_problem.horizon
     ressource_available = np.zeros((len(rcpsp_problem.resources_list), horizon), dtype=np.int32)
@@ -968,7 +965,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelPreemptive])
             duration_array[i, index_mode] = rcpsp_problem.mode_details[task][mode]["duration"]
             index_mode += 1
 
-    task_index = {rcpsp_problem.tasks_list[i]: i for i in range(rcpsp_problem.n_jobs)}
     for k in range(len(rcpsp_problem.resources_list)):
         if rcpsp_problem.is_varying_resource():
             ressource_available[k, :] = \
@@ -980,19 +976,17 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelPreemptive])
         if rcpsp_problem.resources_list[k] in rcpsp_problem.non_renewable_resources:
             ressource_renewable[k] = False
 
-    for i in range(len(rcpsp_problem.tasks_list)):
-        task = rcpsp_problem.tasks_list[i]
-        for s in rcpsp_problem.successors[task]:
-            index_s = task_index[s]
-            predecessors[index_s, i] = 1
-            successors[i, index_s] = 1
+    successors_indptr, successors_indices = build_successors_csr(rcpsp_problem.tasks_list,
+                                                                 rcpsp_problem.successors)
     if not rcpsp_problem.is_duration_minimum_preemption():
-        func_sgs = partial(sgs_fast_preemptive,
+        parallel_sgs = getattr(rcpsp_problem, "sgs", ScheduleGenerationScheme.SERIAL_SGS) \
+            == ScheduleGenerationScheme.PARALLEL_SGS
+        func_sgs = partial(sgs_fast_preemptive_parallel if parallel_sgs else sgs_fast_preemptive,
                            consumption_array=consumption_array,
                            preemptive_tag=preemptive_tag,
                            duration_array=duration_array,
-                           predecessors=predecessors,
-                           successors=successors,
+                           successors_indptr=successors_indptr,
+                           successors_indices=successors_indices,
                            horizon=horizon,
                            ressource_available=ressource_available,
                            ressource_renewable=ressource_renewable)
@@ -1000,8 +994,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelPreemptive])
                              consumption_array=consumption_array,
                              preemptive_tag=preemptive_tag,
                              duration_array=duration_array,
-                             predecessors=predecessors,
-                             successors=successors,
+                             successors_indptr=successors_indptr,
+                             successors_indices=successors_indices,
                              horizon=horizon,
                              ressource_available=ressource_available,
                              ressource_renewable=ressource_renewable)
@@ -1010,8 +1004,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelPreemptive])
                            consumption_array=consumption_array,
                            preemptive_tag=preemptive_tag,
                            duration_array=duration_array,
-                           predecessors=predecessors,
-                           successors=successors,
+                           successors_indptr=successors_indptr,
+                           successors_indices=successors_indices,
                            horizon=horizon,
                            ressource_available=ressource_available,
                            ressource_renewable=ressource_renewable,
@@ -1021,8 +1015,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelPreemptive])
                              consumption_array=consumption_array,
                              preemptive_tag=preemptive_tag,
                              duration_array=duration_array,
-                             predecessors=predecessors,
-                             successors=successors,
+                             successors_indptr=successors_indptr,
+                             successors_indices=successors_indices,
                              horizon=horizon,
                              ressource_available=ressource_available,
                              ressource_renewable=ressource_renewable,
@@ -3,8 +3,9 @@ sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),"../"))
 from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, SingleModeRCPSPModel, \
     MultiModeRCPSPModel, RCPSPSolution
 import os
-from discrete_optimization.generic_tools.path_tools import abspath_from_file
+from discrete_optimization.generic_tools.path_tools import abspath_from_file, listdir_cached
 import csv
+import numpy as np
 path_to_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/rcpsp/")
 files_available = [os.path.join(path_to_data, f) for f in os.listdir(path_to_data)]
 #path_to_results = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/rcpsp_sols/")
@@ -12,10 +13,17 @@ files_available = [os.path.join(path_to_data, f) for f in os.listdir(path_to_dat
 
 
 def get_data_available():
-    files = [f for f in os.listdir(path_to_data) if "pk" not in f and "json" not in f]
+    files = [f for f in listdir_cached(path_to_data) if "pk" not in f and "json" not in f]
     return [os.path.join(path_to_data, f) for f in files]
 
 
+def section_to_int_array(lines):
+    # all the integers of a block of lines in reading order, and the number of integers of each non-empty line
+    lines = [line for line in lines if line.strip()]
+    counts = np.array([len(line.split()) for line in lines], dtype=np.int64)
+    return np.fromstring(" ".join(lines), dtype=np.int64, sep=" "), counts
+
+
 def parse_psplib(input_data):
     # parse the input
     # print('input_data\n',input_data)
@@ -48,41 +56,29 @@ def parse_psplib(input_data):
     tmp1 = lines[res_start_line_index].split()
     tmp2 = lines[res_start_line_index+1].split()
     resources = {str(tmp1[(i*2)])+str(tmp1[(i*2)+1]): int(tmp2[i]) for i in range(len(tmp2))}
-    non_renewable_resources = [name for name in list(resources.keys()) if name.startswith('N')]
-    n_resources = len(resources.keys())
-
-    # Parsing precedence relationship
-    multi_mode = False
-    successors = {}
-    for i in range(prec_start_line_index, prec_end_line_index+1):
-        tmp = lines[i].split()
-        task_id = int(tmp[0])
-        n_modes = int(tmp[1])
-        n_successors = int(tmp[2])
-        successors[task_id] = [int(x) for x in tmp[3:(3+n_successors)]]
-
-    # Parsing mode and duration information
+    resources_names = list(resources.keys())
+    non_renewable_resources = [name for name in resources_names if name.startswith('N')]
+    n_resources = len(resources_names)
+
+    # Parsing precedence relationship : each line is task_id, n_modes, n_successors, successors...
+    prec_tokens, counts = section_to_int_array(lines[prec_start_line_index:prec_end_line_index+1])
+    starts = (np.cumsum(counts)-counts).tolist()
+    prec_tokens = prec_tokens.tolist()
+    successors = {prec_tokens[start]: prec_tokens[start+3:start+3+prec_tokens[start+2]] for start in starts}
+
+    # Parsing mode and duration information : the first line of a task is task_id, mode_id, duration,
+    # resources usage, the following ones (other modes of a multimode instance) start at mode_id
+    duration_tokens, counts = section_to_int_array(lines[duration_start_line_index:duration_end_line_index+1])
+    first_line_of_task = counts == 3+n_resources
+    multi_mode = not np.all(first_line_of_task)
+    ends = np.cumsum(counts)
+    rows = duration_tokens[ends[:, None]-(2+n_resources)+np.arange(2+n_resources)[None, :]].tolist()
+    task_ids = duration_tokens[(ends-counts)[first_line_of_task]][np.cumsum(first_line_of_task)-1].tolist()
     mode_details = {}
-    for i in range(duration_start_line_index, duration_end_line_index + 1):
-        tmp = lines[i].split()
-        if len(tmp) == 3+n_resources:
-            task_id = int(tmp[0])
-            mode_id = int(tmp[1])
-            duration = int(tmp[2])
-            resources_usage = [int(x) for x in tmp[3:(3+n_resources)]]
-        else:
-            multi_mode = True
-            mode_id = int(tmp[0])
-            duration = int(tmp[1])
-            # resources_usage = tmp[2:(3 + n_resources)]
-            resources_usage = [int(x) for x in tmp[2:(3 + n_resources)]]
-
-        if int(task_id) not in list(mode_details.keys()):
-            mode_details[int(task_id)] = {}
-        mode_details[int(task_id)][mode_id] = {}  #Dict[int, Dict[str, int]]
-        mode_details[int(task_id)][mode_id]['duration'] = duration
-        for i in range(n_resources):
-            mode_details[int(task_id)][mode_id][list(resources.keys())[i]] = resources_usage[i]
+    for task_id, row in zip(task_ids, rows):
+        if task_id not in mode_details:
+            mode_details[task_id] = {}
+        mode_details[task_id][row[0]] = {"duration": row[1], **dict(zip(resources_names, row[2:]))}
 
     if multi_mode:
         problem = MultiModeRCPSPModel(resources=resources,
@@ -1,14 +1,8 @@
 from discrete_optimization.generic_tools.graph_api import Graph
 from discrete_optimization.rcpsp.rcpsp_model import RCPSPSolution, RCPSPModel, RCPSPModelCalendar
 from typing import List, Union
-import matplotlib.pyplot as plt
 from copy import deepcopy
 import numpy as np
-from shapely.geometry import Polygon
-from matplotlib.patches import Polygon as pp
-from matplotlib.collections import PatchCollection
-import matplotlib.cm
-import scipy.stats
 
 
 def compute_resource_consumption(rcpsp_model: RCPSPModel,
@@ -65,6 +59,11 @@ def plot_ressource_view(rcpsp_model: RCPSPModel,
                         x_lim=None,
                         fig=None,
                         ax=None):
+    import matplotlib.pyplot as plt
+    from shapely.geometry import Polygon
+    from matplotlib.patches import Polygon as pp
+    from matplotlib.collections import PatchCollection
+    import matplotlib.cm
     modes_extended = deepcopy(rcpsp_sol.rcpsp_modes)
     modes_extended.insert(0, 1)
     modes_extended.append(1)
@@ -137,6 +136,10 @@ def plot_task_gantt(rcpsp_model: RCPSPModel,
                     x_lim=None,
                     title=None,
                     current_t=None):
+    import matplotlib.pyplot as plt
+    from shapely.geometry import Polygon
+    from matplotlib.patches import Polygon as pp
+    from matplotlib.collections import PatchCollection
     if fig is None or ax is None:
         fig, ax = plt.subplots(1,
                                figsize=(10, 10))
@@ -293,6 +296,10 @@ def plot_resource_individual_gantt(rcpsp_model: RCPSPModel,
                                    fig=None,
                                    ax=None,
                                    current_t=None):
+    import matplotlib.pyplot as plt
+    from shapely.geometry import Polygon
+    from matplotlib.patches import Polygon as pp
+    from matplotlib.collections import PatchCollection
     array_ressource_usage = compute_schedule_per_resource_individual(rcpsp_model,
                                                                      rcpsp_sol,
                                                                      resource_types_to_consider=
@@ -359,6 +366,7 @@ def kendall_tau_similarity(rcpsp_sols: (RCPSPSolution, RCPSPSolution)):
     perm1 = sol1.generate_permutation_from_schedule()
     perm2 = sol2.generate_permutation_from_schedule()
 
+    import scipy.stats
     ktd, p_value = scipy.stats.kendalltau(perm1, perm2)
     return ktd
 
@@ -1,14 +1,15 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 from discrete_optimization.generic_tools.do_problem import build_aggreg_function_and_params_objective, \
-    ParamsObjectiveFunction
+    ParamsObjectiveFunction, ModeOptim
 
 from discrete_optimization.generic_tools.do_solver import SolverDO
+from discrete_optimization.generic_tools.callbacks import build_callbacks
 from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, SingleModeRCPSPModel, \
     MultiModeRCPSPModel, RCPSPModelCalendar, RCPSPSolution
 from discrete_optimization.rcpsp.rcpsp_utils import compute_graph_rcpsp
-import networkx as nx
-from heapq import heappop, heappush
+from discrete_optimization.rcpsp.fast_function_rcpsp import build_successors_csr, transpose_csr, cpm_forward_backward
+from discrete_optimization.generic_tools.transitive_closure import TransitiveClosure, topological_order_csr
 import numpy as np
 
 from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
@@ -38,100 +39,134 @@ class CPMObject:
 
 
 class CPM(SolverDO):
+    """
+    Critical path method on the precedence graph (minimum duration of each task). The forward and backward
+    passes run on arrays indexed like rcpsp_model.tasks_list (compute_cpm_arrays), the CPMObject of each task
+    (map_node) is filled from them by run_classic_cpm.
+    """
     def __init__(self, rcpsp_model: RCPSPModel,
                  params_objective_function: ParamsObjectiveFunction=None):
         self.rcpsp_model = rcpsp_model
-        self.graph = compute_graph_rcpsp(self.rcpsp_model)
-        self.graph_nx = self.graph.to_networkx()
         self.source = rcpsp_model.source_task
         self.sink = rcpsp_model.sink_task
         self.aggreg_sol, self.aggreg_from_dict_values, self.params_objective_function = \
             build_aggreg_function_and_params_objective(self.rcpsp_model,
                                                        params_objective_function=params_objective_function)
+        self.tasks_list = list(self.rcpsp_model.tasks_list)
+        self.index_task = {self.tasks_list[i]: i for i in range(len(self.tasks_list))}
+        self.successors_indptr, self.successors_indices = build_successors_csr(self.tasks_list,
+                                                                               self.rcpsp_model.successors)
+        self.predecessors_indptr, self.predecessors_indices = transpose_csr(self.successors_indptr,
+                                                                            self.successors_indices)
+        self.topological_order = topological_order_csr(self.successors_indptr, self.successors_indices)
+        self.min_durations = np.array([min([self.rcpsp_model.mode_details[t][m]["duration"]
+                                            for m in self.rcpsp_model.mode_details[t]])
+                                       for t in self.tasks_list], dtype=np.int64)
         self.map_node: Dict[Any, CPMObject] = {n: CPMObject(None, None, None, None)
-                                               for n in self.graph_nx.nodes()}
-        successors = {n: nx.algorithms.descendants(self.graph_nx, n)
-                      for n in self.graph_nx.nodes()}
-        self.immediate_successors = {n: set(nx.neighbors(self.graph_nx, n))
-                                     for n in self.graph_nx.nodes()}
-        self.immediate_predecessors = {n: set(self.graph_nx.predecessors(n))
-                                       for n in self.graph_nx.nodes()}
-        self.successors_map = {}
-        self.predecessors_map = {}
-        for k in successors:
-            self.successors_map[k] = {"succs": successors[k], "nb": len(successors[k])}
-        predecessors = {n: nx.algorithms.ancestors(self.graph_nx, n)
-                        for n in self.graph_nx.nodes()}
-        for k in predecessors:
-            self.predecessors_map[k] = {"succs": predecessors[k], "nb": len(predecessors[k])}
+                                               for n in self.tasks_list}
+        self.esd, self.efd, self.lsd, self.lfd = None, None, None, None
+        self._graph = None
+        self._closure = None
+        self._immediate_successors = None
+        self._immediate_predecessors = None
+        self._successors_map = None
+        self._predecessors_map = None
 
-    def run_classic_cpm(self):
-        done_forward = set()
-        done_backward = set()
-        current_succ = {k: {"succs": set(self.successors_map[k]["succs"]),
-                            "nb": self.successors_map[k]["nb"]} for k in self.successors_map}
-        current_pred = {k: {"succs": set(self.predecessors_map[k]["succs"]),
-                            "nb": self.predecessors_map[k]["nb"]} for k in self.predecessors_map}
-        available_activities = {n for n in current_pred
-                                if n not in done_forward
-                                and current_pred[n]["nb"] == 0}
-        queue = [(0, n) for n in available_activities]
-        forward = True
-        while queue:
-            time, node = heappop(queue)
-            if forward and node in done_forward:
-                continue
-            elif not forward and node in done_backward:
-                continue
-            if forward:
-                self.map_node[node].set_earliest_start_date(time)
-                done_forward.add(node)
-            else:
-                self.map_node[node].set_latest_finish_date(-time)
-                done_backward.add(node)
-            min_duration = min([self.rcpsp_model.mode_details[node][k]["duration"]
-                                for k in self.rcpsp_model.mode_details[node]])
-            if forward:
-                self.map_node[node].set_earliest_finish_date(time+min_duration)
-            else:
-                self.map_node[node].set_latest_start_date(-time-min_duration)
-            if forward:
-                next_nodes = self.immediate_successors[node]
-            else:
-                next_nodes = self.immediate_predecessors[node]
-            for next_node in next_nodes:
-                pred = self.immediate_predecessors[next_node]\
-                        if forward else self.immediate_successors[next_node]
-                if forward:
-                    if all(self.map_node[n]._ESD is not None
-                           for n in pred):
-                        max_esd = max([self.map_node[n]._EFD for n in pred])
-                        heappush(queue, (max_esd, next_node))
-                else:
-                    if all(self.map_node[n]._LSD is not None
-                           for n in pred):
-                        max_esd = min([self.map_node[n]._LSD
-                                       for n in pred])
-                        heappush(queue, (-max_esd, next_node))
-            if node == self.sink:
-                forward = False
-                heappush(queue, (-self.map_node[node]._EFD, node))
+    @property
+    def graph(self):
+        if self._graph is None:
+            self._graph = compute_graph_rcpsp(self.rcpsp_model)
+        return self._graph
+
+    @property
+    def closure(self) -> TransitiveClosure:
+        if self._closure is None:
+            self._closure = TransitiveClosure(self.tasks_list,
+                                              [(t, s) for t in self.rcpsp_model.successors
+                                               for s in self.rcpsp_model.successors[t]])
+        return self._closure
+
+    @property
+    def immediate_successors(self):
+        if self._immediate_successors is None:
+            self._immediate_successors = {self.tasks_list[i]:
+                                          set(self.tasks_list[j] for j in
+                                              self.successors_indices[self.successors_indptr[i]:
+                                                                      self.successors_indptr[i+1]])
+                                          for i in range(len(self.tasks_list))}
+        return self._immediate_successors
+
+    @property
+    def immediate_predecessors(self):
+        if self._immediate_predecessors is None:
+            self._immediate_predecessors = {self.tasks_list[i]:
+                                            set(self.tasks_list[j] for j in
+                                                self.predecessors_indices[self.predecessors_indptr[i]:
+                                                                          self.predecessors_indptr[i+1]])
+                                            for i in range(len(self.tasks_list))}
+        return self._immediate_predecessors
+
+    @property
+    def successors_map(self):
+        if self._successors_map is None:
+            self._successors_map = {n: {"succs": self.closure.descendants(n), "nb": self.closure.nb_descendants(n)}
+                                    for n in self.tasks_list}
+        return self._successors_map
+
+    @property
+    def predecessors_map(self):
+        if self._predecessors_map is None:
+            self._predecessors_map = {n: {"succs": self.closure.ancestors(n), "nb": self.closure.nb_ancestors(n)}
+                                      for n in self.tasks_list}
+        return self._predecessors_map
 
+    def compute_cpm_arrays(self, partial_schedule: Dict[Any, Tuple[int, int]] = None):
+        """
+        Earliest/latest start and finish dates (ESD, EFD, LSD, LFD) as arrays indexed like rcpsp_model.tasks_list.
+        The tasks of partial_schedule ({task: (start, end)}) are fixed at their dates.
+        The slack of the tasks is LSD-ESD, LFD of the sink is the critical path length.
+        """
+        fixed_starts = np.full(len(self.tasks_list), -1, dtype=np.int64)
+        fixed_ends = np.full(len(self.tasks_list), -1, dtype=np.int64)
+        if partial_schedule is not None:
+            for task in partial_schedule:
+                fixed_starts[self.index_task[task]] = partial_schedule[task][0]
+                fixed_ends[self.index_task[task]] = partial_schedule[task][1]
+        return cpm_forward_backward(self.topological_order,
+                                    self.successors_indptr, self.successors_indices,
+                                    self.predecessors_indptr, self.predecessors_indices,
+                                    self.min_durations, fixed_starts, fixed_ends)
+
+    def build_map_node(self, esd, efd, lsd, lfd) -> Dict[Any, CPMObject]:
+        esd, efd, lsd, lfd = esd.tolist(), efd.tolist(), lsd.tolist(), lfd.tolist()
+        return {self.tasks_list[i]: CPMObject(esd[i], efd[i], lsd[i], lfd[i])
+                for i in range(len(self.tasks_list))}
+
+    def compute_critical_path(self, esd, efd, lsd):
+        # from the sink, go back through predecessors with no slack that end when the current task starts
         critical_path = [self.sink]
-        cur_node = self.sink
-        while cur_node is not self.source:
-            nodes = [n for n in
-                     self.immediate_predecessors[cur_node]
-                     if self.map_node[n]._ESD == self.map_node[n]._LSD
-                     and self.map_node[n]._EFD == self.map_node[cur_node]._ESD]
-            cur_node = nodes[0]
-            critical_path += [cur_node]
+        cur = self.index_task[self.sink]
+        index_source = self.index_task[self.source]
+        while cur != index_source:
+            preds = self.predecessors_indices[self.predecessors_indptr[cur]:self.predecessors_indptr[cur+1]]
+            preds = preds[(esd[preds] == lsd[preds]) & (efd[preds] == esd[cur])]
+            if len(preds) == 0:
+                break
+            cur = preds[0]
+            critical_path += [self.tasks_list[cur]]
         return critical_path[::-1]
 
+    def run_classic_cpm(self):
+        self.esd, self.efd, self.lsd, self.lfd = self.compute_cpm_arrays()
+        self.map_node = self.build_map_node(self.esd, self.efd, self.lsd, self.lfd)
+        return self.compute_critical_path(self.esd, self.efd, self.lsd)
+
     def return_order_cpm(self):
-        order = sorted(self.map_node, key=lambda x: (self.map_node[x]._LSD,
-                                                     self.map_node[x]._LSD-self.map_node[x]._ESD))
-        return order
+        # tasks by increasing latest start date, then increasing slack
+        if self.lsd is None:
+            return sorted(self.map_node, key=lambda x: (self.map_node[x]._LSD,
+                                                         self.map_node[x]._LSD-self.map_node[x]._ESD))
+        return [self.tasks_list[i] for i in np.lexsort((self.lsd-self.esd, self.lsd))]
 
     def run_sgs_on_order(self,
                          map_nodes: Dict[Any, CPMObject],
@@ -158,7 +193,7 @@ class CPM(SolverDO):
         if cut_sgs_by_critical:
             index_critical = 0
             cur_critical_task_to_schedule = critical_path[index_critical]
-            sorted_task_to_do_before = sorted([n for n in self.predecessors_map[cur_critical_task_to_schedule]["succs"]
+            sorted_task_to_do_before = sorted([n for n in self.closure.ancestors(cur_critical_task_to_schedule)
                                                if n not in done],
                                               key=lambda x: index_in_order[x])
         effects_on_delay = {}
@@ -192,8 +227,7 @@ class CPM(SolverDO):
                                 causes_of_delay[j]["res_t_other_task"] += [(res, t,
                                                                             set([task for task in
                                                                                  ressource_usage[res][t]
-                                                                            if task
-                                                                            not in self.predecessors_map[j]["succs"]]))]
+                                                                            if not self.closure.is_ancestor(j, task)]))]
                                 break
                         if not valid:
                             break
@@ -219,7 +253,7 @@ class CPM(SolverDO):
                                     ressource_usage[res][t][j] = ressource_consumption[res]
                         # if not (self.map_node[j]._ESD <= time <= self.map_node[j]._LSD):
                         #    print("This task was delayed :(")
-                        for task in self.successors_map[j]["succs"]:
+                        for task in self.closure.descendants(j):
                             prev = min_time_to_schedule[task]
                             min_time_to_schedule[task] = max(min_time_to_schedule[task],
                                                              current_schedule[j]["end_time"])
@@ -245,7 +279,7 @@ class CPM(SolverDO):
                     break
                 cur_critical_task_to_schedule = critical_path[index_critical]
                 sorted_task_to_do_before = sorted([n for n in
-                                                   self.predecessors_map[cur_critical_task_to_schedule]["succs"]
+                                                   self.closure.ancestors(cur_critical_task_to_schedule)
                                                    if n not in done],
                                                   key=lambda x: index_in_order[x])
             else:
@@ -332,9 +366,7 @@ class CPM(SolverDO):
                                         causes_of_delay[j]["res_t_other_task"] += [(res, t,
                                                                                     set([task for task in
                                                                                          ressource_usage[res][t]
-                                                                                    if task
-                                                                                    not in
-                                                                                    self.predecessors_map[j]["succs"]]))]
+                                                                                    if not self.closure.is_ancestor(j, task)]))]
                                     break
                             if not valid:
                                 break
@@ -348,7 +380,7 @@ class CPM(SolverDO):
                                     resource_avail_in_time[res][t] -= ressource_consumption[res]
                                     if ressource_consumption[res] > 0:
                                         ressource_usage[res][t][j] = ressource_consumption[res]
-                            for task in self.successors_map[j]["succs"]:
+                            for task in self.closure.descendants(j):
                                 prev = min_time_to_schedule[task]
                                 min_time_to_schedule[task] = max(min_time_to_schedule[task],
                                                                  current_schedule[j]["end_time"])
@@ -375,18 +407,23 @@ class CPM(SolverDO):
     def solve(self, **kwargs) -> ResultStorage:
         # TODO : make this more generic. here we return some serial and parallel
         #  sgs results based on priority queue found by CPM method
+        # optional generic_tools.callbacks.Callback(s) (and max_time_seconds), called after the serial sgs
+        # on the cpm order (iteration 0), they can skip the slower sgs of run_sgs_on_order (iteration 1).
+        callbacks = build_callbacks(kwargs.get("callbacks", None), kwargs.get("max_time_seconds", None))
+        callbacks.on_solve_start(self, self.params_objective_function.sense_function)
         cpath = self.run_classic_cpm()
         order = self.return_order_cpm()
-        order = sorted(self.map_node, key=lambda x: (self.map_node[x]._LSD,
-                                                     self.map_node[x]._LSD - self.map_node[x]._ESD))
         permutation_sgs = [self.rcpsp_model.index_task_non_dummy[o] for o in order
                            if o in self.rcpsp_model.index_task_non_dummy]
         solution_sgs_0 = RCPSPSolution(problem=self.rcpsp_model,
                                        rcpsp_permutation=permutation_sgs,
                                        rcpsp_modes=[1 for i in range(self.rcpsp_model.n_jobs_non_dummy)])
         fit_0 = self.aggreg_sol(solution_sgs_0)
-        order = sorted(self.map_node, key=lambda x: (self.map_node[x]._LSD,
-                                                     self.map_node[x]._LSD - self.map_node[x]._ESD))
+        callbacks.on_new_best(self, 0, solution_sgs_0, fit_0)
+        callbacks.on_iteration(self, 0, fit_0)
+        if callbacks.should_stop(self, 0):
+            return ResultStorage(list_solution_fits=[(solution_sgs_0, fit_0)],
+                                 mode_optim=self.params_objective_function.sense_function)
         schedule, link_to_add, effects_on_delay, causes_of_delay = self.run_sgs_on_order(map_nodes=self.map_node,
                                                                                          critical_path=cpath,
                                                                                          total_order=order)
@@ -394,93 +431,17 @@ class CPM(SolverDO):
                                    rcpsp_schedule=schedule,
                                    rcpsp_modes=[1 for i in range(self.rcpsp_model.n_jobs_non_dummy)])
         fit_1 = self.aggreg_sol(solution_1)
+        if self.params_objective_function.sense_function == ModeOptim.MAXIMIZATION and fit_1 > fit_0 \
+                or self.params_objective_function.sense_function == ModeOptim.MINIMIZATION and fit_1 < fit_0:
+            callbacks.on_new_best(self, 1, solution_1, fit_1)
+        callbacks.on_iteration(self, 1, max(fit_0, fit_1)
+                               if self.params_objective_function.sense_function == ModeOptim.MAXIMIZATION
+                               else min(fit_0, fit_1))
         res = ResultStorage(list_solution_fits=[(solution_sgs_0, fit_0), (solution_1, fit_1)],
                             mode_optim=self.params_objective_function.sense_function)
         return res
 
 
-def run_partial_classic_cpm(partial_schedule, cpm_solver):
-    done_forward = set()
-    done_backward = set()
-    current_succ = {k: {"succs": set(cpm_solver.successors_map[k]["succs"]),
-                        "nb": cpm_solver.successors_map[k]["nb"]} for k in cpm_solver.successors_map}
-    current_pred = {k: {"succs": set(cpm_solver.predecessors_map[k]["succs"]),
-                        "nb": cpm_solver.predecessors_map[k]["nb"]} for k in cpm_solver.predecessors_map}
-    map_node: Dict[Any, CPMObject] = {n: CPMObject(None, None, None, None)
-                                      for n in cpm_solver.graph_nx.nodes()}
-    forward = True
-
-    for task in partial_schedule:
-        map_node[task].set_earliest_start_date(partial_schedule[task][0])
-        map_node[task].set_earliest_finish_date(partial_schedule[task][1])
-        map_node[task].set_latest_start_date(partial_schedule[task][0])
-        map_node[task].set_latest_finish_date(partial_schedule[task][1])
-        done_forward.add(task)
-        done_backward.add(task)
-    available_activities = {n for n in current_pred
-                            if n not in done_forward
-                            and current_pred[n]["nb"] == 0}
-    queue = [(0, n) for n in available_activities]
-    for task in partial_schedule:
-        next_nodes = cpm_solver.immediate_successors[task]
-        for next_node in next_nodes:
-            pred = cpm_solver.immediate_predecessors[next_node] \
-                if forward else cpm_solver.immediate_successors[next_node]
-            if forward:
-                if all(map_node[n]._ESD is not None
-                       for n in pred):
-                    max_esd = max([map_node[n]._EFD for n in pred])
-                    heappush(queue, (max_esd, next_node))
-    print(queue)
-    while queue:
-        time, node = heappop(queue)
-        if forward and node in done_forward:
-            continue
-        elif not forward and node in done_backward:
-            continue
-        if forward:
-            map_node[node].set_earliest_start_date(time)
-            done_forward.add(node)
-        else:
-            map_node[node].set_latest_finish_date(-time)
-            done_backward.add(node)
-        min_duration = min([cpm_solver.rcpsp_model.mode_details[node][k]["duration"]
-                            for k in cpm_solver.rcpsp_model.mode_details[node]])
-        if forward:
-            map_node[node].set_earliest_finish_date(time+min_duration)
-        else:
-            map_node[node].set_latest_start_date(-time-min_duration)
-        if forward:
-            next_nodes = cpm_solver.immediate_successors[node]
-        else:
-            next_nodes = cpm_solver.immediate_predecessors[node]
-        for next_node in next_nodes:
-            pred = cpm_solver.immediate_predecessors[next_node] \
-                if forward else cpm_solver.immediate_successors[next_node]
-            if forward:
-                if all(map_node[n]._ESD is not None
-                       for n in pred):
-                    max_esd = max([map_node[n]._EFD for n in pred])
-                    heappush(queue, (max_esd, next_node))
-            else:
-                if all(map_node[n]._LSD is not None
-                       for n in pred):
-                    max_esd = min([map_node[n]._LSD
-                                   for n in pred])
-                    heappush(queue, (-max_esd, next_node))
-        if node == cpm_solver.rcpsp_model.sink_task:
-            forward = False
-            heappush(queue, (-map_node[node]._EFD, node))
-    critical_path = [cpm_solver.rcpsp_model.sink_task]
-    cur_node = cpm_solver.rcpsp_model.sink_task
-    while cur_node is not cpm_solver.rcpsp_model.source_task:
-        nodes = [n for n in
-                 cpm_solver.immediate_predecessors[cur_node]
-                 if map_node[n]._ESD == map_node[n]._LSD
-                 and map_node[n]._EFD == map_node[cur_node]._ESD]
-        if len(nodes) == 0:
-            break
-        cur_node = nodes[0]
-        critical_path += [cur_node]
-    return critical_path[::-1], map_node
-
+def run_partial_classic_cpm(partial_schedule, cpm_solver: CPM):
+    esd, efd, lsd, lfd = cpm_solver.compute_cpm_arrays(partial_schedule=partial_schedule)
+    return cpm_solver.compute_critical_path(esd, efd, lsd), cpm_solver.build_map_node(esd, efd, lsd, lfd)
@@ -0,0 +1,134 @@
+import random
+from abc import abstractmethod
+from typing import Union, Set, Hashable, Iterable, Any, List, Tuple
+from discrete_optimization.generic_tools.cp_tools import ParametersCP, CPSolverName, SignEnum
+from discrete_optimization.generic_tools.lns_cp import ConstraintHandler, LNS_CP
+from discrete_optimization.generic_tools.lns_mip import InitialSolutionFromSolver
+from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution
+from discrete_optimization.rcpsp.solver.cp_solvers import CP_RCPSP_MZN, CP_MRCPSP_MZN
+from discrete_optimization.rcpsp.solver.cpm import CPM
+
+
+class ConstraintHandlerFixStartTime(ConstraintHandler):
+    """
+    Neighbourhood of the best solution of the lns : the tasks not returned by tasks_to_free keep their start time
+    (and their mode with a multimode cp solver), and the makespan can't be worse than the current one.
+    """
+    def __init__(self, problem: RCPSPModel):
+        self.problem = problem
+
+    @abstractmethod
+    def tasks_to_free(self, solution: RCPSPSolution) -> Set[Hashable]:
+        ...
+
+    def adding_constraint_from_results_store(self,
+                                             cp_solver: Union[CP_RCPSP_MZN, CP_MRCPSP_MZN],
+                                             child_instance,
+                                             result_storage: ResultStorage,
+                                             last_result_store: ResultStorage = None) -> Iterable[Any]:
+        solution: RCPSPSolution = result_storage.get_best_solution()
+        tasks_to_free = self.tasks_to_free(solution)
+        # the makespan is bounded by the sink task
+        tasks_to_free.add(self.problem.sink_task)
+        modes = None
+        if hasattr(cp_solver, "constraint_task_to_mode"):
+            modes = self.problem.build_mode_dict(solution.rcpsp_modes)
+        list_strings = []
+        for task in self.problem.tasks_list:
+            if task in tasks_to_free:
+                continue
+            list_strings.append(cp_solver.constraint_start_time_string(task=task,
+                                                                       start_time=solution.get_start_time(task),
+                                                                       sign=SignEnum.EQUAL))
+            if modes is not None and task in self.problem.index_task_non_dummy:
+                list_strings += cp_solver.constraint_task_to_mode(task, modes[task])
+        list_strings.append(cp_solver.constraint_end_time_string(task=self.problem.sink_task,
+                                                                 end_time=solution.get_end_time(self.problem.sink_task),
+                                                                 sign=SignEnum.LEQ))
+        for s in list_strings:
+            child_instance.add_string(s)
+        return list_strings
+
+    def remove_constraints_from_previous_iteration(self,
+                                                   cp_solver: Union[CP_RCPSP_MZN, CP_MRCPSP_MZN],
+                                                   child_instance,
+                                                   previous_constraints: Iterable[Any]):
+        # the constraints are added to a branch of the cp instance, dropped after each iteration
+        pass
+
+
+class ConstraintHandlerTimeWindow(ConstraintHandlerFixStartTime):
+    """
+    Frees the tasks running in a random time window of fraction_window * makespan.
+    """
+    def __init__(self, problem: RCPSPModel, fraction_window: float = 0.3):
+        super().__init__(problem)
+        self.fraction_window = fraction_window
+
+    def tasks_to_free(self, solution: RCPSPSolution) -> Set[Hashable]:
+        makespan = solution.get_end_time(self.problem.sink_task)
+        width = max(1, int(self.fraction_window*makespan))
+        start_window = random.randint(0, max(0, makespan-width))
+        end_window = start_window+width
+        return set(task for task in self.problem.tasks_list
+                   if solution.get_start_time(task) < end_window and solution.get_end_time(task) >= start_window)
+
+
+class ConstraintHandlerResourceSubset(ConstraintHandlerFixStartTime):
+    """
+    Frees the tasks consuming nb_resources random resources (in their mode of the current solution),
+    or a random fraction_to_free of them.
+    """
+    def __init__(self, problem: RCPSPModel, nb_resources: int = 1, fraction_to_free: float = 1.):
+        super().__init__(problem)
+        self.nb_resources = nb_resources
+        self.fraction_to_free = fraction_to_free
+
+    def tasks_to_free(self, solution: RCPSPSolution) -> Set[Hashable]:
+        resources = random.sample(self.problem.resources_list, min(self.nb_resources,
+                                                                   len(self.problem.resources_list)))
+        modes = self.problem.build_mode_dict(solution.rcpsp_modes)
+        tasks = [task for task in self.problem.tasks_list
+                 if any(self.problem.mode_details[task][modes[task]].get(res, 0) > 0 for res in resources)]
+        return set(random.sample(tasks, int(self.fraction_to_free*len(tasks))))
+
+
+class ConstraintHandlerRandomSubset(ConstraintHandlerFixStartTime):
+    """
+    Frees a random fraction_to_free of the tasks.
+    """
+    def __init__(self, problem: RCPSPModel, fraction_to_free: float = 0.3):
+        super().__init__(problem)
+        self.fraction_to_free = fraction_to_free
+
+    def tasks_to_free(self, solution: RCPSPSolution) -> Set[Hashable]:
+        return set(random.sample(self.problem.tasks_list, int(self.fraction_to_free*len(self.problem.tasks_list))))
+
+
+# constraint handler and cp backend of the workers of build_rcpsp_lns_worker, by index of the worker
+PORTFOLIO_CONSTRAINT_HANDLERS = [ConstraintHandlerTimeWindow,
+                                 ConstraintHandlerResourceSubset,
+                                 ConstraintHandlerRandomSubset]
+PORTFOLIO_CP_SOLVER_NAMES = [CPSolverName.CHUFFED, CPSolverName.GECODE]
+
+
+def build_rcpsp_lns_worker(problem: RCPSPModel, index_worker: int) -> Tuple[LNS_CP, ParametersCP]:
+    """
+    build_worker of a generic_tools.parallel_lns_cp.ParallelLNS for rcpsp : the worker index_worker gets the
+    constraint handler index_worker % 3 of PORTFOLIO_CONSTRAINT_HANDLERS and the cp backend
+    (index_worker // 3) % 2 of PORTFOLIO_CP_SOLVER_NAMES, starting from the cpm solutions.
+    """
+    constraint_handler = PORTFOLIO_CONSTRAINT_HANDLERS[index_worker % len(PORTFOLIO_CONSTRAINT_HANDLERS)](problem)
+    cp_solver_name = PORTFOLIO_CP_SOLVER_NAMES[(index_worker // len(PORTFOLIO_CONSTRAINT_HANDLERS))
+                                               % len(PORTFOLIO_CP_SOLVER_NAMES)]
+    if problem.is_rcpsp_multimode():
+        cp_solver = CP_MRCPSP_MZN(problem, cp_solver_name=cp_solver_name)
+    else:
+        cp_solver = CP_RCPSP_MZN(problem, cp_solver_name=cp_solver_name)
+    cp_solver.init_model()
+    lns_solver = LNS_CP(problem=problem,
+                        cp_solver=cp_solver,
+                        initial_solution_provider=InitialSolutionFromSolver(CPM(problem)),
+                        constraint_handler=constraint_handler)
+    return lns_solver, ParametersCP.default_fast_lns()
@@ -3,15 +3,14 @@ from copy import deepcopy
 from discrete_optimization.generic_tools.do_problem import Problem, ObjectiveRegister, TypeObjective, ModeOptim, \
     ObjectiveHandling
 
-from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, PartialSolution, RCPSPSolution
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, PartialSolution, RCPSPSolution, copy_vector
 from discrete_optimization.rcpsp.rcpsp_model_preemptive import RCPSPModelPreemptive, RCPSPSolutionPreemptive
 from discrete_optimization.rcpsp.rcpsp_utils import intersect
 from typing import Dict, Tuple, List, Hashable, Union
-import networkx as nx
 import numpy as np
 import random
 from functools import partial
-from discrete_optimization.rcpsp.fast_function_rcpsp import sgs_fast, \
+from discrete_optimization.rcpsp.fast_function_rcpsp import sgs_fast, build_successors_csr, \
     sgs_fast_preemptive_some_special_constraints,\
     sgs_fast_partial_schedule_preemptive, sgs_fast_partial_schedule,\
     sgs_fast_preemptive_minduration, sgs_fast_partial_schedule_preemptive_minduration,\
@@ -60,6 +59,7 @@ class SpecialConstraintsDescription(PartialSolution):
             self.start_after_nunit = []
         if self.disjunctive_tasks is None:
             self.disjunctive_tasks = []
+        import networkx as nx
         self.dict_start_together = {}
         self.graph_start_together = nx.Graph()
         for i, j in self.start_together:
@@ -131,12 +131,10 @@ class RCPSPSolutionSpecial(RCPSPSolution):
                       rcpsp_permutation=self.rcpsp_permutation,
                       rcpsp_modes=self.rcpsp_modes)
 
-    def __setattr__(self, key, value):
-        super.__setattr__(self, key, value)
-        if key == "rcpsp_permutation":
-            self._schedule_to_recompute = True
-
     def copy(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            return self._copy_from_arrays(rcpsp_permutation=copy_vector(self.rcpsp_permutation),
+                                          rcpsp_modes=copy_vector(self.rcpsp_modes))
         return RCPSPSolutionSpecial(problem=self.problem,
                                     rcpsp_permutation=deepcopy(self.rcpsp_permutation),
                                     rcpsp_modes=deepcopy(self.rcpsp_modes),
@@ -145,6 +143,9 @@ class RCPSPSolutionSpecial(RCPSPSolution):
                                     standardised_permutation=self.standardised_permutation)
 
     def lazy_copy(self):
+        if self._rcpsp_schedule is None and self._starts is not None:
+            return self._copy_from_arrays(rcpsp_permutation=self.rcpsp_permutation,
+                                          rcpsp_modes=self.rcpsp_modes)
         return RCPSPSolutionSpecial(problem=self.problem,
                                     rcpsp_permutation=self.rcpsp_permutation,
                                     rcpsp_modes=self.rcpsp_modes,
@@ -564,7 +565,7 @@ def evaluate_constraints(solution: Union[RCPSPSolution, RCPSPSolutionPreemptive]
 
 def compute_constraints_details(solution: Union[RCPSPSolution, RCPSPSolutionPreemptive],
                                 constraints: SpecialConstraintsDescription):
-    if "rcpsp_schedule_feasible" in solution.__dict__.keys() and not solution.rcpsp_schedule_feasible:
+    if hasattr(solution, "rcpsp_schedule_feasible") and not solution.rcpsp_schedule_feasible:
         return []
     start_together = constraints.start_together
     start_at_end = constraints.start_at_end
@@ -1496,8 +1497,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
     consumption_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode,
                                   len(rcpsp_problem.resources_list)), dtype=np.int32)
     duration_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode), dtype=np.int)
-    predecessors = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.n_jobs), dtype=np.int)
-    successors = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.n_jobs), dtype=np.int)
     preemptive_tag = np.zeros((rcpsp_problem.n_jobs), dtype=np.bool)
     horizon = rcpsp_problem.horizon
     ressource_available = np.zeros((len(rcpsp_problem.resources_list), horizon), dtype=np.int32)
@@ -1520,7 +1519,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
             duration_array[i, index_mode] = rcpsp_problem.mode_details[task][mode]["duration"]
             index_mode += 1
 
-    task_index = {rcpsp_problem.tasks_list[i]: i for i in range(rcpsp_problem.n_jobs)}
     for k in range(len(rcpsp_problem.resources_list)):
         if rcpsp_problem.is_varying_resource():
             ressource_available[k, :] = \
@@ -1532,12 +1530,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
         if rcpsp_problem.resources_list[k] in rcpsp_problem.non_renewable_resources:
             ressource_renewable[k] = False
 
-    for i in range(len(rcpsp_problem.tasks_list)):
-        task = rcpsp_problem.tasks_list[i]
-        for s in rcpsp_problem.successors[task]:
-            index_s = task_index[s]
-            predecessors[index_s, i] = 1
-            successors[i, index_s] = 1
+    successors_indptr, successors_indices = build_successors_csr(rcpsp_problem.tasks_list,
+                                                                 rcpsp_problem.successors)
     minimum_starting_time_array = np.zeros(rcpsp_problem.n_jobs, dtype=int)
     for t in rcpsp_problem.special_constraints.start_times_window:
         if rcpsp_problem.special_constraints.start_times_window[t][0] is not None:
@@ -1568,8 +1562,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
                            start_at_end_plus_offset=start_at_end_plus_offset,
                            minimum_starting_time_array=minimum_starting_time_array,
                            duration_array=duration_array,
-                           predecessors=predecessors,
-                           successors=successors,
+                           successors_indptr=successors_indptr,
+                           successors_indices=successors_indices,
                            horizon=horizon,
                            ressource_available=ressource_available,
                            ressource_renewable=ressource_renewable)
@@ -1577,8 +1571,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
                              consumption_array=consumption_array,
                              preemptive_tag=preemptive_tag,
                              duration_array=duration_array,
-                             predecessors=predecessors,
-                             successors=successors,
+                             successors_indptr=successors_indptr,
+                             successors_indices=successors_indices,
                              horizon=horizon,
                              ressource_available=ressource_available,
                              ressource_renewable=ressource_renewable)
@@ -1587,8 +1581,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
                            consumption_array=consumption_array,
                            preemptive_tag=preemptive_tag,
                            duration_array=duration_array,
-                           predecessors=predecessors,
-                           successors=successors,
+                           successors_indptr=successors_indptr,
+                           successors_indices=successors_indices,
                            horizon=horizon,
                            ressource_available=ressource_available,
                            ressource_renewable=ressource_renewable,
@@ -1598,8 +1592,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[RCPSPModelSpecialConst
                              consumption_array=consumption_array,
                              preemptive_tag=preemptive_tag,
                              duration_array=duration_array,
-                             predecessors=predecessors,
-                             successors=successors,
+                             successors_indptr=successors_indptr,
+                             successors_indices=successors_indices,
                              horizon=horizon,
                              ressource_available=ressource_available,
                              ressource_renewable=ressource_renewable,
@@ -1,16 +1,17 @@
 import numpy as np
 from numba import njit, jit
+from discrete_optimization.rcpsp.fast_function_rcpsp import count_predecessors
 
 #@jit(nopython=False, forceobj=True)
-@njit
+@njit(cache=True)
 def sgs_fast_ms(permutation_task,     # permutation_task=array(task)->task index
                 priority_worker_per_task, # array(task, worker)
                 modes_array,          # modes=array(task)->0, 1...
                 consumption_array,    # consumption_array=array3D(task, mode, res),
                 skills_needs,         # array(task, mode, skill)
                 duration_array,       # array(task, mode) -> d
-                predecessors,         # array(task, task) -> bool
-                successors,           # array(task, task)->bool
+                successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                successors_indices,   # array(nb_precedences)->successor task index
                 horizon,              # int
                 ressource_available,  # array(res, times)->int
                 ressource_renewable,  # array(res)->bool
@@ -31,7 +32,7 @@ def sgs_fast_ms(permutation_task,     # permutation_task=array(task)->task index
     skills_usage = {}
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     while done < nb_task and not unfeasible_non_renewable_resources:
         act_id = 0
@@ -88,7 +89,7 @@ def sgs_fast_ms(permutation_task,     # permutation_task=array(task)->task index
                     resource_avail_in_time[res][current_min_time:end_t] -= consumption_array[act_id, modes_array[act_id], res]
                 else:
                     resource_avail_in_time[res][current_min_time:] -= consumption_array[act_id, modes_array[act_id], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             skills = skills_needs[act_id, modes_array[act_id]]
@@ -129,11 +130,150 @@ def sgs_fast_ms(permutation_task,     # permutation_task=array(task)->task index
             done_np[act_id] = 1
             skills_usage[act_id] = skills_usage_i
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))
+                pred_links[s] -= 1
+    rcpsp_schedule = {}
+    for act_id in activity_end_times:
+        rcpsp_schedule[act_id] = (activity_end_times[act_id] - duration_array[act_id, modes_array[act_id]],
+                                  activity_end_times[act_id])
+    return rcpsp_schedule, skills_usage, unfeasible_non_renewable_resources
+
+
+
+@njit(cache=True)
+def sgs_fast_ms_parallel(permutation_task,     # permutation_task=array(task)->task index
+                         priority_worker_per_task, # array(task, worker)
+                         modes_array,          # modes=array(task)->0, 1...
+                         consumption_array,    # consumption_array=array3D(task, mode, res),
+                         skills_needs,         # array(task, mode, skill)
+                         duration_array,       # array(task, mode) -> d
+                         successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                         successors_indices,   # array(nb_precedences)->successor task index
+                         horizon,              # int
+                         ressource_available,  # array(res, times)->int
+                         ressource_renewable,  # array(res)->bool
+                         worker_available,     # array(workers, int)->bool
+                         worker_skills,        # array(workers, skills)->int
+                         minimum_starting_time_array,
+                         one_unit_per_task: bool = True):
+    # Parallel sgs version of sgs_fast_ms : at each decision point t, the eligible activities (in the order
+    # of the permutation) are started at t when the resources and enough skilled workers are available
+    # on [t, t+duration), workers being allocated as in sgs_fast_ms. The next decision point is the next
+    # end of an activity or release date, t+1 if there is none (calendars of the workers/resources).
+    activity_end_times = {}
+    unfeasible_non_renewable_resources = False
+    new_horizon = horizon
+    resource_avail_in_time = {}
+    worker_avail_in_time = np.copy(worker_available)
+    for index in range(ressource_available.shape[0]):
+        resource_avail_in_time[index] = np.copy(ressource_available[index][:new_horizon+1])
+    minimum_starting_time = {}
+    for act in range(permutation_task.shape[0]):
+        minimum_starting_time[act] = minimum_starting_time_array[act]
+    skills_usage = {}
+    done = 0
+    nb_task = permutation_task.shape[0]
+    pred_links = count_predecessors(successors_indptr, successors_indices)
+    done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
+    current_min_time = 0
+    while done < nb_task and not unfeasible_non_renewable_resources:
+        next_time = -1
+        scheduled_at_t = True
+        while scheduled_at_t and not unfeasible_non_renewable_resources:
+            scheduled_at_t = False
+            for index_perm in range(nb_task):
+                act_id = np.int64(permutation_task[index_perm])
+                if pred_links[act_id] != 0 or done_np[act_id] == 1:
+                    continue
+                if minimum_starting_time[act_id] > current_min_time:
+                    if next_time < 0 or minimum_starting_time[act_id] < next_time:
+                        next_time = minimum_starting_time[act_id]
+                    continue
+                valid = True
+                end_time = current_min_time + duration_array[act_id, modes_array[act_id]]
+                for t in range(current_min_time,
+                               end_time):
+                    for res in range(ressource_available.shape[0]):
+                        if t < new_horizon:
+                            if resource_avail_in_time[res][t] < consumption_array[act_id, modes_array[act_id], res]:
+                                valid = False
+                                break
+                        else:
+                            unfeasible_non_renewable_resources = True
+                            break
+                    if not valid or unfeasible_non_renewable_resources:
+                        break
+                if unfeasible_non_renewable_resources:
+                    break
+                if valid:
+                    skills = skills_needs[act_id, modes_array[act_id]]
+                    if end_time-current_min_time > 0 and np.max(skills) > 0:
+                        indexes_present_worker = np.array([priority_worker_per_task[act_id, i]
+                                                           for i in range(worker_avail_in_time.shape[0])
+                                                           if np.min(worker_avail_in_time[priority_worker_per_task[act_id, i],
+                                                                                          current_min_time:end_time]) > 0])
+                        if one_unit_per_task:
+                            indexes_present_worker = np.array([i for i in indexes_present_worker
+                                                               if np.all(worker_skills[i, :] >= skills)
+                                                               ])
+                        if len(indexes_present_worker) > 0:
+                            available_skills_t = np.sum(worker_skills[indexes_present_worker, :], axis=0)
+                            if np.min(available_skills_t-skills_needs[act_id, modes_array[act_id]]) < 0:
+                                valid = False
+                        else:
+                            valid = False
+                if not valid:
+                    continue
+                end_t = current_min_time + duration_array[act_id, modes_array[act_id]]
+                for res in range(ressource_available.shape[0]):
+                    if ressource_renewable[res]:
+                        resource_avail_in_time[res][current_min_time:end_t] -= consumption_array[act_id, modes_array[act_id], res]
+                    else:
+                        resource_avail_in_time[res][current_min_time:] -= consumption_array[act_id, modes_array[act_id], res]
+                        if resource_avail_in_time[res][-1] < 0:
+                            unfeasible_non_renewable_resources = True
+                            break
+                skills = skills_needs[act_id, modes_array[act_id]]
+                skills_done = np.zeros((skills.shape[0]))
+                skills_usage_i = np.zeros((worker_avail_in_time.shape[0],
+                                           skills_needs.shape[2]))
+                used = [0]
+                if np.max(skills) > 0:
+                    while True:
+                        score = [np.sum(worker_skills[p, :]*((skills-skills_done) > 0)) for p in indexes_present_worker]
+                        sort = [indexes_present_worker[p] for p in np.argsort(-np.array(score)) if indexes_present_worker[p] not in used[1:]]
+                        j = sort[0]
+                        nz = np.nonzero(worker_skills[j, :] * skills > 0)[0]
+                        if len(nz) > 0:
+                            for nnz in nz:
+                                skills_usage_i[j, nnz] = 1
+                                skills_done[nnz] += worker_skills[j, nnz]
+                            worker_avail_in_time[j, current_min_time:end_t] = 0
+                            used += [j]
+                        if np.all(skills_done >= skills):
+                            break
+                if unfeasible_non_renewable_resources:
+                    break
+                activity_end_times[act_id] = end_t
+                done_np[act_id] = 1
+                skills_usage[act_id] = skills_usage_i
+                done += 1
+                scheduled_at_t = True
+                for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
                     minimum_starting_time[s] = max(int(minimum_starting_time[s]),
                                                    int(activity_end_times[act_id]))
                     pred_links[s] -= 1
+        if done == nb_task or unfeasible_non_renewable_resources:
+            break
+        for act_id in activity_end_times:
+            if activity_end_times[act_id] > current_min_time and \
+                    (next_time < 0 or activity_end_times[act_id] < next_time):
+                next_time = activity_end_times[act_id]
+        current_min_time = next_time if next_time > current_min_time else current_min_time + 1
+        if current_min_time > horizon:
+            unfeasible_non_renewable_resources = True
     rcpsp_schedule = {}
     for act_id in activity_end_times:
         rcpsp_schedule[act_id] = (activity_end_times[act_id] - duration_array[act_id, modes_array[act_id]],
@@ -141,8 +281,7 @@ def sgs_fast_ms(permutation_task,     # permutation_task=array(task)->task index
     return rcpsp_schedule, skills_usage, unfeasible_non_renewable_resources
 
 
-
-@njit
+@njit(cache=True)
 def sgs_fast_ms_partial_schedule(permutation_task,            # permutation_task=array(task)->task index
                                  priority_worker_per_task,    # array(task, worker)
                                  modes_array,                 # modes=array(task)->0, 1...
@@ -154,8 +293,8 @@ def sgs_fast_ms_partial_schedule(permutation_task,            # permutation_task
                                  consumption_array,           # consumption_array=array3D(task, mode, res),
                                  skills_needs,                # array(task, mode, skill)
                                  duration_array,              # array(task, mode) -> d
-                                 predecessors,                # array(task, task) -> bool
-                                 successors,                  # array(task, task)->bool
+                                 successors_indptr,           # array(task+1), csr row pointer of the precedence graph
+                                 successors_indices,          # array(nb_precedences)->successor task index
                                  horizon,                     # int
                                  ressource_available,         # array(res, times)->int
                                  ressource_renewable,         # array(res)->bool
@@ -176,7 +315,7 @@ def sgs_fast_ms_partial_schedule(permutation_task,            # permutation_task
     skills_usage = {}
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     rcpsp_schedule = {}
     for t in range(nb_task):
@@ -188,17 +327,16 @@ def sgs_fast_ms_partial_schedule(permutation_task,            # permutation_task
                         -= consumption_array[t, modes_array[t], res]
                 else:
                     resource_avail_in_time[res][scheduled_end_task_times[t]:] -= consumption_array[t, modes_array[t], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             activity_end_times[t] = scheduled_end_task_times[t]
             if unfeasible_non_renewable_resources:
                 break
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[t]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[t]))
+                pred_links[s] -= 1
             done += 1
             done_np[t] = 1
             skills_act_id = np.zeros((worker_avail_in_time.shape[0],
@@ -272,7 +410,7 @@ def sgs_fast_ms_partial_schedule(permutation_task,            # permutation_task
                     resource_avail_in_time[res][current_min_time:end_t] -= consumption_array[act_id, modes_array[act_id], res]
                 else:
                     resource_avail_in_time[res][current_min_time:] -= consumption_array[act_id, modes_array[act_id], res]
-                    if resource_avail_in_time[res][horizon] < 0:
+                    if resource_avail_in_time[res][-1] < 0:
                         unfeasible_non_renewable_resources = True
                         break
             skills = skills_needs[act_id, modes_array[act_id]]
@@ -295,18 +433,17 @@ def sgs_fast_ms_partial_schedule(permutation_task,            # permutation_task
             done_np[act_id] = 1
             skills_usage[act_id] = skills_usage_i
             done += 1
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))
+                pred_links[s] -= 1
     for act_id in activity_end_times:
         rcpsp_schedule[act_id] = (activity_end_times[act_id] - duration_array[act_id, modes_array[act_id]],
                                   activity_end_times[act_id])
     return rcpsp_schedule, skills_usage, unfeasible_non_renewable_resources
 
 
-@njit
+@njit(cache=True)
 def sgs_fast_ms_preemptive(permutation_task,     # permutation_task=array(task)->task index
                            priority_worker_per_task,  # array(task, worker)
                            modes_array,          # permutation_task=array(task)->task index
@@ -315,8 +452,8 @@ def sgs_fast_ms_preemptive(permutation_task,     # permutation_task=array(task)-
                            skills_needs,
                            duration_array,
                            preemptive_tag,       # array(task)->bool
-                           predecessors,         # array(task, task) -> bool
-                           successors,           # array(task, task)->bool
+                           successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                           successors_indices,   # array(nb_precedences)->successor task index
                            horizon,
                            ressource_available,
                            ressource_renewable,
@@ -341,7 +478,7 @@ def sgs_fast_ms_preemptive(permutation_task,     # permutation_task=array(task)-
         minimum_starting_time[act] = minimum_starting_time_array[act]
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     done_duration = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     skills_usage = {}
@@ -500,7 +637,7 @@ def sgs_fast_ms_preemptive(permutation_task,     # permutation_task=array(task)-
                         if i == 0:
                             resource_avail_in_time[res][starts[i]:] -= \
                                 consumption_array[act_id, modes_array[act_id], res]
-                        if resource_avail_in_time[res][horizon] < 0:
+                        if resource_avail_in_time[res][-1] < 0:
                             unfeasible_non_renewable_resources = True
                             break
                 skills = skills_needs[act_id, modes_array[act_id]]
@@ -541,14 +678,13 @@ def sgs_fast_ms_preemptive(permutation_task,     # permutation_task=array(task)-
             done_np[act_id] = 1
             done += 1
             # print('scheduled to complete at: ', activity_end_times[act_id])
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
     return starts_dict, ends_dict, skills_usage, unfeasible_sched
 
-@njit
+@njit(cache=True)
 def sgs_fast_ms_preemptive_some_special_constraints(permutation_task,     # permutation_task=array(task)->task index
                                                     priority_worker_per_task, # array(task, worker)
                                                     modes_array,          # modes = array(task) -> 0, 1...
@@ -556,8 +692,8 @@ def sgs_fast_ms_preemptive_some_special_constraints(permutation_task,     # perm
                                                     skills_needs,
                                                     duration_array,
                                                     preemptive_tag,       # array(task)->bool
-                                                    predecessors,         # array(task, task) -> bool
-                                                    successors,           # array(task, task)->bool
+                                                    successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                                                    successors_indices,   # array(nb_precedences)->successor task index
                                                     start_at_end_plus_offset, # array(N, 3) -> (task1, task2, offset)
                                                     start_after_nunit,        # array(N, 3) -> (task1, task2, offset)
                                                     horizon,
@@ -584,7 +720,7 @@ def sgs_fast_ms_preemptive_some_special_constraints(permutation_task,     # perm
         minimum_starting_time[act] = minimum_starting_time_array[act]
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
     done_duration = np.zeros((permutation_task.shape[0]), dtype=np.int64)
 
@@ -761,7 +897,7 @@ def sgs_fast_ms_preemptive_some_special_constraints(permutation_task,     # perm
                         if i == 0:
                             resource_avail_in_time[res][starts[i]:] -=\
                                 consumption_array[act_id, modes_array[act_id], res]
-                        if resource_avail_in_time[res][horizon] < 0:
+                        if resource_avail_in_time[res][-1] < 0:
                             unfeasible_non_renewable_resources = True
                             break
                 skills = skills_needs[act_id, modes_array[act_id]]
@@ -791,11 +927,10 @@ def sgs_fast_ms_preemptive_some_special_constraints(permutation_task,     # perm
             done_np[act_id] = 1
             done += 1
             # print('scheduled to complete at: ', activity_end_times[act_id])
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
             for t in range(start_after_nunit.shape[0]):
                 if start_after_nunit[t, 0] == act_id:
                     task = start_after_nunit[t, 1]
@@ -826,7 +961,7 @@ def sgs_fast_ms_preemptive_some_special_constraints(permutation_task,     # perm
 
 
 
-@njit
+@njit(cache=True)
 def sgs_fast_ms_preemptive_partial_schedule(permutation_task,           # permutation_task=array(task)->task index
                                             priority_worker_per_task,   # array(task, worker)
                                             modes_array,                # modes=array(task)->0, 1...
@@ -840,8 +975,8 @@ def sgs_fast_ms_preemptive_partial_schedule(permutation_task,           # permut
                                             skills_needs,
                                             duration_array,
                                             preemptive_tag,       # array(task)->bool
-                                            predecessors,         # array(task, task) -> bool
-                                            successors,           # array(task, task)->bool
+                                            successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+                                            successors_indices,   # array(nb_precedences)->successor task index
                                             horizon,
                                             ressource_available,
                                             ressource_renewable,
@@ -866,7 +1001,7 @@ def sgs_fast_ms_preemptive_partial_schedule(permutation_task,           # permut
     skills_usage = {}
     done = 0
     nb_task = permutation_task.shape[0]
-    pred_links = np.sum(predecessors, axis=1)
+    pred_links = count_predecessors(successors_indptr, successors_indices)
     done_np = np.zeros((permutation_task.shape[0]), dtype=np.int64)
 
     for t in range(nb_task):
@@ -886,17 +1021,16 @@ def sgs_fast_ms_preemptive_partial_schedule(permutation_task,           # permut
                     else:
                         if j == starts_dict[t].shape[0]-1:
                             resource_avail_in_time[res][ends_dict[t][j]:] -= consumption_array[t, modes_array[t], res]
-                            if resource_avail_in_time[res][horizon] < 0:
+                            if resource_avail_in_time[res][-1] < 0:
                                 unfeasible_non_renewable_resources = True
                                 break
             activity_end_times[t] = ends_dict[t][-1]
             if unfeasible_non_renewable_resources:
                 break
-            for s in range(successors.shape[1]):
-                if successors[t, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[t]))
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[t]:successors_indptr[t+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[t]))
+                pred_links[s] -= 1
             done += 1
             done_np[t] = 1
             skills_act_id = np.zeros((starts_dict[t].shape[0],
@@ -1041,7 +1175,7 @@ def sgs_fast_ms_preemptive_partial_schedule(permutation_task,           # permut
                         if i == 0:
                             resource_avail_in_time[res][starts[i]:] -=\
                                 consumption_array[act_id, modes_array[act_id], res]
-                        if resource_avail_in_time[res][horizon] < 0:
+                        if resource_avail_in_time[res][-1] < 0:
                             unfeasible_non_renewable_resources = True
                             break
                 skills = skills_needs[act_id, modes_array[act_id]]
@@ -1065,9 +1199,8 @@ def sgs_fast_ms_preemptive_partial_schedule(permutation_task,           # permut
             done_np[act_id] = 1
             done += 1
             # print('scheduled to complete at: ', activity_end_times[act_id])
-            for s in range(successors.shape[1]):
-                if successors[act_id, s] == 1:
-                    minimum_starting_time[s] = max(int(minimum_starting_time[s]),
-                                                   int(activity_end_times[act_id]))  # 20
-                    pred_links[s] -= 1
+            for s in successors_indices[successors_indptr[act_id]:successors_indptr[act_id+1]]:
+                minimum_starting_time[s] = max(int(minimum_starting_time[s]),
+                                               int(activity_end_times[act_id]))  # 20
+                pred_links[s] -= 1
     return starts_dict, ends_dict, skills_usage, unfeasible_non_renewable_resources
\ No newline at end of file
@@ -6,16 +6,18 @@ from discrete_optimization.generic_tools.graph_api import Graph
 from typing import List, Union, NamedTuple, Tuple, Dict, Set, Optional, Hashable, Iterable
 from abc import abstractmethod
 import numpy as np
-import scipy.stats as ss
 from enum import Enum
 from copy import deepcopy
 from collections import defaultdict
+from discrete_optimization.rcpsp.fast_function_rcpsp import build_successors_csr
+from discrete_optimization.rcpsp.rcpsp_feasibility import ViolationReport, check_resource_usage, \
+    check_non_renewable_usage, check_precedences, check_no_overlap
 from discrete_optimization.rcpsp_multiskill.fast_function_ms_rcpsp import \
     sgs_fast_ms,\
     sgs_fast_ms_preemptive, \
     sgs_fast_ms_partial_schedule, \
     sgs_fast_ms_preemptive_partial_schedule, \
-    sgs_fast_ms_preemptive_some_special_constraints
+    sgs_fast_ms_preemptive_some_special_constraints, sgs_fast_ms_parallel
 from functools import partial
 
 
@@ -296,16 +298,16 @@ class MS_RCPSPSolution_Variant(MS_RCPSPSolution):
                                                 unfeasible_non_renewable_resources=unfeasible_non_renewable_resources)
 
     def update_infos_from_numba_output(self, rcpsp_schedule, skills_usage, unfeasible_non_renewable_resources):
+        self.schedule = {}
         if unfeasible_non_renewable_resources:
+            # modes still set below, so that the solution can be evaluated (with a huge makespan)
             for t in self.problem.tasks_list:
-                self.schedule[t] = {"starts": [99999],
-                                    "ends": [99999]}
-            return
-        self.schedule = {}
-        for k in rcpsp_schedule:
-            self.schedule[self.problem.tasks_list[k]] = {"start_time": rcpsp_schedule[k][0],
-                                                         "end_time": rcpsp_schedule[k][1]}
-        if True:
+                self.schedule[t] = {"start_time": 99999,
+                                    "end_time": 99999}
+        else:
+            for k in rcpsp_schedule:
+                self.schedule[self.problem.tasks_list[k]] = {"start_time": rcpsp_schedule[k][0],
+                                                             "end_time": rcpsp_schedule[k][1]}
             for act_id in skills_usage:
                 non_z = np.nonzero(skills_usage[act_id])
                 for i, j in zip(non_z[0], non_z[1]):
@@ -1438,7 +1440,8 @@ class MS_RCPSPModel(Problem):
                  always_releasable_resources: Set[str] = None,
                  never_releasable_resources: Set[str] = None,
                  resource_blocking_data: List[Tuple[List[Hashable], Set[str]]] = None,
-                 strictly_disjunctive_subtasks: bool = True):
+                 strictly_disjunctive_subtasks: bool = True,
+                 np_data: Dict[str, np.array] = None):
         self.skills_set = skills_set
         self.skills_list = sorted(self.skills_set)
 
@@ -1554,7 +1557,13 @@ class MS_RCPSPModel(Problem):
                        for t in self.partial_preemption_data for m in self.partial_preemption_data[t]):
                     self.always_releasable_resources.add(r)
         self.strictly_disjunctive_subtasks = strictly_disjunctive_subtasks
-        self.func_sgs, self.func_sgs_partial = create_np_data_and_jit_functions(rcpsp_problem=self)
+        self.sgs = ScheduleGenerationScheme.SERIAL_SGS
+        # arrays of the instance given by load_binary, computed from the dictionaries otherwise
+        self.np_data = np_data
+        if self.np_data is None:
+            self.np_data = create_np_data(self)
+        self.func_sgs, self.func_sgs_partial = create_np_data_and_jit_functions(rcpsp_problem=self,
+                                                                                np_data=self.np_data)
         self.resource_blocking_data = resource_blocking_data
         if self.resource_blocking_data is None:
             self.resource_blocking_data = []
@@ -1582,11 +1591,28 @@ class MS_RCPSPModel(Problem):
             return self.resources_availability[res]
 
     def update_functions(self):
-        self.func_sgs, self.func_sgs_partial = create_np_data_and_jit_functions(rcpsp_problem=self)
+        self.np_data = create_np_data(self)
+        self.func_sgs, self.func_sgs_partial = create_np_data_and_jit_functions(rcpsp_problem=self,
+                                                                                np_data=self.np_data)
 
     def update_function(self):
         self.update_functions()
 
+    def set_sgs(self, sgs: ScheduleGenerationScheme):
+        # the parallel sgs is available for the non preemptive model (serial sgs used otherwise)
+        self.sgs = sgs
+        self.update_functions()
+
+    def save_binary(self, path: str):
+        # see discrete_optimization.rcpsp.rcpsp_binary_format
+        from discrete_optimization.rcpsp.rcpsp_binary_format import save_binary
+        save_binary(self, path)
+
+    @staticmethod
+    def load_binary(path: str, mmap_mode: str = None):
+        from discrete_optimization.rcpsp.rcpsp_binary_format import load_binary
+        return load_binary(path, mmap_mode=mmap_mode)
+
     def is_rcpsp_multimode(self):
         return self.is_multimode
 
@@ -1683,198 +1709,96 @@ class MS_RCPSPModel(Problem):
                             1)
 
     def satisfy(self, variable: Solution) -> bool:
-        if isinstance(variable, MS_RCPSPSolution_Preemptive):
-            return self.satisfy_preemptive(variable)
-        return self.satisfy_classic(variable)
+        return self.get_violation_report(variable).is_feasible()
 
     def satisfy_classic(self, rcpsp_sol: MS_RCPSPSolution) -> bool:
-        # check the skills :
-        if len(rcpsp_sol.schedule) != self.nb_tasks:
-            return False
-        for task in self.tasks:
-            mode = rcpsp_sol.modes[task]
-            required_skills = {s: self.mode_details[task][mode][s]
-                               for s in self.mode_details[task][mode]
-                               if s in self.skills_set and self.mode_details[task][mode][s] > 0}
-            # Skills for the given task are used
-            if len(required_skills) > 0:
-                for skill in required_skills:
-                    employees_used = [self.employees[emp].dict_skill[skill].skill_value
-                                      for emp in rcpsp_sol.employee_usage[task]
-                                      if skill in rcpsp_sol.employee_usage[task][emp]]
-                    if sum(employees_used) < required_skills[skill]:
-                        print('1')
-                        return False
-            if task in rcpsp_sol.employee_usage:
-                employee_used = [emp for emp in rcpsp_sol.employee_usage[task]
-                                 if len(rcpsp_sol.employee_usage[task][emp]) > 0]
-                # print(rcpsp_sol.employee_usage)
-                # employee available at this time
-                if len(employee_used) > 0:
-                    for e in employee_used:
-                        if not all(self.employees[e].calendar_employee[t]
-                                   for t in range(rcpsp_sol.schedule[task]["start_time"],
-                                                  rcpsp_sol.schedule[task]["end_time"])):
-                            print("Task : ", task)
-                            print("Employee : ", e)
-                            print(e, [self.employees[e].calendar_employee[t]
-                                      for t in range(rcpsp_sol.schedule[task]["start_time"],
-                                                     rcpsp_sol.schedule[task]["end_time"])])
-                            print('Problem with employee availability')
-                            return False
-        overlaps = [(t1, t2) for t1 in self.tasks for t2 in self.tasks
-                    if self.index_task[t2] > self.index_task[t1]
-                    and intersect((rcpsp_sol.schedule[t1]["start_time"],
-                                   rcpsp_sol.schedule[t1]["end_time"]),
-                                  (rcpsp_sol.schedule[t2]["start_time"],
-                                   rcpsp_sol.schedule[t2]["end_time"]))
-                    is not None
-                    and rcpsp_sol.schedule[t1]["end_time"] > rcpsp_sol.schedule[t1]["start_time"]
-                    and rcpsp_sol.schedule[t2]["end_time"] > rcpsp_sol.schedule[t2]["start_time"]]
-        for t1, t2 in overlaps:
-            if any(k in rcpsp_sol.employee_usage.get(t2, {})
-                   for k in rcpsp_sol.employee_usage.get(t1, {})):
-                print("Worker working on 2 task the same time")
-                print([k
-                       for k in rcpsp_sol.employee_usage.get(t1, {})
-                       if k in rcpsp_sol.employee_usage.get(t2, {})])
-                print("Tasks ", t1, t2)
-                print(rcpsp_sol.schedule[t1], rcpsp_sol.schedule[t2])
-                return False
-        # ressource usage respected
-        makespan = rcpsp_sol.schedule[self.sink_task]['end_time']
-        for t in range(makespan):
-            resource_usage = {}
-            for res in self.resources_set:
-                resource_usage[res] = 0
-            for act_id in self.tasks:
-                start = rcpsp_sol.schedule[act_id]['start_time']
-                end = rcpsp_sol.schedule[act_id]['end_time']
-                mode = rcpsp_sol.modes[act_id]
-                if start <= t and t < end:
-                    # print(act_id)
-                    for res in self.resources_set:  # self.mode_details[act_id][mode]:
-                        # print('res: ', res)
-                        # print('adding usage from act', act_id)
-                        # print('mode:', mode)
-                        # print('self.mode_details[act_id][mode][res]: ', self.mode_details[act_id][mode][res])
-                        resource_usage[res] += self.mode_details[act_id][mode].get(res, 0)
-            for res in self.resources_set:
-                if resource_usage[res] > self.resources_availability[res][t]:
-                    print('Time step resource violation: time: ', t, 'res', res,
-                          'res_usage: ', resource_usage[res], 'res_avail: ',
-                          self.resources_availability[res][t])
-                    print('3')
-                    return False
-
-        # Check for non-renewable resource violation
-        for res in self.non_renewable_resources:
-            usage = 0
-            for act_id in self.tasks:
-                mode = rcpsp_sol.modes[act_id]
-                usage += self.mode_details[act_id][mode][res]
-            if usage > self.resources_availability[res][0]:
-                print('Non-renewable res', res, 'res_usage: ',
-                      usage, 'res_avail: ', self.resources_availability[res][0])
-                return False
-        # Check precedences / successors
-        for act_id in list(self.successors.keys()):
-            for succ_id in self.successors[act_id]:
-                start_succ = rcpsp_sol.schedule[succ_id]['start_time']
-                end_pred = rcpsp_sol.schedule[act_id]['end_time']
-                if start_succ < end_pred:
-                    print('Precedence relationship broken: ', act_id, 'end at ', end_pred, 'while ', succ_id,
-                          'start at', start_succ)
-                    return False
-        return True
+        return self.get_violation_report(rcpsp_sol).is_feasible()
 
     def satisfy_preemptive(self, rcpsp_sol: MS_RCPSPSolution_Preemptive) -> bool:
-        # check the skills :
-        if len(rcpsp_sol.schedule) != self.nb_tasks:
-            return False
-        for task in self.tasks:
+        return self.get_violation_report(rcpsp_sol).is_feasible()
+
+    def get_violation_report(self, rcpsp_sol: MS_RCPSPSolution) -> ViolationReport:
+        # MS_RCPSPSolution is seen as a preemptive solution with one part per task,
+        # employee_usage[task] being the usage of its unique part.
+        preemptive = isinstance(rcpsp_sol, MS_RCPSPSolution_Preemptive)
+        report = ViolationReport()
+        schedule = rcpsp_sol.schedule
+        for task in self.tasks_list:
+            if task not in schedule:
+                report.add("missing_task", task=task)
+        tasks = [t for t in self.tasks_list if t in schedule]
+
+        def employee_usage_part(task, i):
+            if task not in rcpsp_sol.employee_usage:
+                return {}
+            return rcpsp_sol.employee_usage[task][i] if preemptive else rcpsp_sol.employee_usage[task]
+
+        calendars = {}
+        intervals_employee = defaultdict(list)
+        for task in tasks:
             mode = rcpsp_sol.modes[task]
+            starts_task = rcpsp_sol.get_start_times_list(task)
+            ends_task = rcpsp_sol.get_end_times_list(task)
             required_skills = {s: self.mode_details[task][mode][s]
                                for s in self.mode_details[task][mode]
                                if s in self.skills_set and self.mode_details[task][mode][s] > 0}
-            # Skills for the given task are used
-            if len(required_skills) > 0 and self.mode_details[task][mode]["duration"]>0:
+            if preemptive and self.mode_details[task][mode]["duration"] == 0:
+                required_skills = {}
+            for i in range(len(starts_task)):
+                usage = employee_usage_part(task, i)
                 for skill in required_skills:
-                    for i in range(rcpsp_sol.get_number_of_part(task)):
-                        employees_used = [self.employees[emp].dict_skill[skill].skill_value
-                                          for emp in rcpsp_sol.employee_usage[task][i]
-                                          if skill in rcpsp_sol.employee_usage[task][i][emp]]
-                        if sum(employees_used) < required_skills[skill]:
-                            print('Not enough skills to do task :', task)
-                            return False
-            if task in rcpsp_sol.employee_usage:
-                for i in range(rcpsp_sol.get_number_of_part(task)):
-                    employee_used = [emp for emp in rcpsp_sol.employee_usage[task][i]
-                                     if len(rcpsp_sol.employee_usage[task][i][emp]) > 0]
-                    if len(employee_used) > 0:
-                        for e in employee_used:
-                            if not all(self.employees[e].calendar_employee[t]
-                                       for t in range(rcpsp_sol.schedule[task]["starts"][i],
-                                                      rcpsp_sol.schedule[task]["ends"][i])):
-                                print("Task : ", task)
-                                print("Employee : ", e)
-                                print(rcpsp_sol.schedule[task]["starts"][i],
-                                      rcpsp_sol.schedule[task]["ends"][i],
-                                      [self.employees[e].calendar_employee[t] for t in range(rcpsp_sol.schedule[task]["starts"][i],
-                                                                                             rcpsp_sol.schedule[task]["ends"][i])])
-                                print('Problem with employee availability')
-                                return False
-        for employee in self.employees:
-            usage = np.zeros((rcpsp_sol.get_end_time(self.sink_task)+1))
-            task_employees = set([(t, j) for t in rcpsp_sol.employee_usage
-                                  for j in range(rcpsp_sol.get_number_of_part(t))
-                                  if employee in rcpsp_sol.employee_usage[t]])
-            for t, j in task_employees:
-                s = rcpsp_sol.schedule[t]["starts"][j]
-                e = rcpsp_sol.schedule[t]["ends"][j]
-                usage[s:e] += 1
-                if np.max(usage) >= 2:
-                    print("Two task at same time for worker "+str(employee))
-                    return False
-        makespan = rcpsp_sol.get_end_time(self.sink_task)
-        for t in range(makespan):
-            resource_usage = {}
-            for res in self.resources_set:
-                resource_usage[res] = 0
-            for act_id in self.tasks:
-                starts = rcpsp_sol.schedule[act_id]["starts"]
-                ends = rcpsp_sol.schedule[act_id]["ends"]
-                mode = rcpsp_sol.modes[act_id]
-                for start, end in zip(starts, ends):
-                    if start <= t < end:
-                        for res in self.resources_set:
-                            resource_usage[res] += self.mode_details[act_id][mode].get(res, 0)
-            for res in self.resources_set:
-                if resource_usage[res] > self.resources_availability[res][t]:
-                    print('Time step resource violation: time: ', t, 'res', res,
-                          'res_usage: ', resource_usage[res], 'res_avail: ',
-                          self.resources_availability[res][t])
-                    return False
-        # Check for non-renewable resource violation
-        for res in self.non_renewable_resources:
-            usage = 0
-            for act_id in self.tasks:
-                mode = rcpsp_sol.modes[act_id]
-                usage += self.mode_details[act_id][mode][res]
-            if usage > self.resources_availability[res][0]:
-                print('Non-renewable res', res, 'res_usage: ',
-                      usage, 'res_avail: ', self.resources_availability[res][0])
-                return False
-        # Check precedences / successors
-        for act_id in list(self.successors.keys()):
-            for succ_id in self.successors[act_id]:
-                start_succ = rcpsp_sol.get_start_time(succ_id)
-                end_pred = rcpsp_sol.get_end_time(act_id)
-                if start_succ < end_pred:
-                    print('Precedence relationship broken: ', act_id, 'end at ', end_pred, 'while ', succ_id,
-                          'start at', start_succ)
-                    return False
-        return True
+                    skill_value = sum([self.employees[emp].dict_skill[skill].skill_value
+                                       for emp in usage if skill in usage[emp]])
+                    if skill_value < required_skills[skill]:
+                        report.add("skill", task=task, part=i, skill=skill,
+                                   skill_value=skill_value, required=required_skills[skill])
+                for e in usage:
+                    intervals_employee[e] += [(starts_task[i], ends_task[i], task)]
+                    if len(usage[e]) == 0 or ends_task[i] <= starts_task[i]:
+                        continue
+                    if e not in calendars:
+                        calendars[e] = np.asarray(self.employees[e].calendar_employee, dtype=bool)
+                    available = calendars[e][starts_task[i]:ends_task[i]]
+                    if available.shape[0] < ends_task[i]-starts_task[i] or not np.all(available):
+                        report.add("employee_availability", task=task, part=i, employee=e)
+        for e in intervals_employee:
+            check_no_overlap(report, employee=e,
+                             interval_starts=[x[0] for x in intervals_employee[e]],
+                             interval_ends=[x[1] for x in intervals_employee[e]],
+                             interval_tasks=[x[2] for x in intervals_employee[e]])
+        interval_tasks = [t for t in tasks for k in range(len(rcpsp_sol.get_start_times_list(t)))]
+        consumption_task = {t: [self.mode_details[t][rcpsp_sol.modes[t]].get(res, 0)
+                                for res in self.resources_list]
+                            for t in tasks}
+        consumption = np.array([consumption_task[t] for t in interval_tasks],
+                               dtype=np.int64).reshape((len(interval_tasks), len(self.resources_list))).T
+        check_resource_usage(report,
+                             interval_starts=[s for t in tasks for s in rcpsp_sol.get_start_times_list(t)],
+                             interval_ends=[e for t in tasks for e in rcpsp_sol.get_end_times_list(t)],
+                             interval_consumption=consumption,
+                             interval_tasks=interval_tasks,
+                             resources_names=self.resources_list,
+                             capacities=[self.resources_availability[res] for res in self.resources_list])
+        non_renewable = [res for res in self.resources_list if res in self.non_renewable_resources]
+        tasks_with_mode = [t for t in self.tasks_list if t in rcpsp_sol.modes]
+        consumption_non_renewable = np.array([[self.mode_details[t][rcpsp_sol.modes[t]].get(res, 0)
+                                               for t in tasks_with_mode]
+                                              for res in non_renewable], dtype=np.int64)
+        check_non_renewable_usage(report,
+                                  consumption=consumption_non_renewable.reshape((len(non_renewable),
+                                                                                 len(tasks_with_mode))),
+                                  resources_names=non_renewable,
+                                  capacities=[self.resources_availability[res][0] for res in non_renewable])
+        scheduled = np.array([t in schedule for t in self.tasks_list], dtype=bool)
+        starts = np.array([rcpsp_sol.get_start_time(t) if t in schedule else 0 for t in self.tasks_list],
+                          dtype=np.int64)
+        ends = np.array([rcpsp_sol.get_end_time(t) if t in schedule else 0 for t in self.tasks_list],
+                        dtype=np.int64)
+        successors_indptr, successors_indices = build_successors_csr(self.tasks_list, self.successors)
+        check_precedences(report, starts=starts, ends=ends, scheduled=scheduled,
+                          successors_indptr=successors_indptr, successors_indices=successors_indices,
+                          tasks_list=self.tasks_list)
+        return report
 
     def __str__(self):
         val = "Multiskill RCPSP model\n"
@@ -1985,7 +1909,8 @@ class MS_RCPSPModel_Variant(MS_RCPSPModel):
                  always_releasable_resources: Set[str] = None,
                  never_releasable_resources: Set[str] = None,
                  resource_blocking_data: List[Tuple[List[Hashable], Set[str]]] = None,
-                 strictly_disjunctive_subtasks: bool = True):
+                 strictly_disjunctive_subtasks: bool = True,
+                 np_data: Dict[str, np.array] = None):
         MS_RCPSPModel.__init__(self, skills_set=skills_set,
                                resources_set=resources_set,
                                non_renewable_resources=non_renewable_resources,
@@ -2008,7 +1933,8 @@ class MS_RCPSPModel_Variant(MS_RCPSPModel):
                                always_releasable_resources=always_releasable_resources,
                                never_releasable_resources=never_releasable_resources,
                                resource_blocking_data=resource_blocking_data,
-                               strictly_disjunctive_subtasks=strictly_disjunctive_subtasks)
+                               strictly_disjunctive_subtasks=strictly_disjunctive_subtasks,
+                               np_data=np_data)
         self.fixed_modes = None
         self.fixed_permutation = None
         self.fixed_priority_worker_per_task = None
@@ -2094,23 +2020,28 @@ class MS_RCPSPModel_Variant(MS_RCPSPModel):
 
     def set_fixed_modes(self, fixed_modes):
         self.fixed_modes = fixed_modes
+        self.clear_evaluation_cache()
 
     def set_fixed_task_permutation(self, fixed_permutation):
         self.fixed_permutation = fixed_permutation
+        self.clear_evaluation_cache()
 
     def set_fixed_priority_worker_per_task(self, fixed_priority_worker_per_task):
         self.fixed_priority_worker_per_task = fixed_priority_worker_per_task
+        self.clear_evaluation_cache()
 
     def set_fixed_priority_worker_per_task_from_permutation(self, permutation):
         self.fixed_priority_worker_per_task = self.convert_fixed_priority_worker_per_task_from_permutation(permutation)
+        self.clear_evaluation_cache()
 
     def convert_fixed_priority_worker_per_task_from_permutation(self, permutation):
+        from scipy.stats import rankdata
         priority_worker_per_task_corrected = []
         for i in range(self.n_jobs_non_dummy):
             tmp = []
             for j in range(len(self.employees.keys())):
                 tmp.append(permutation[i * len(self.employees.keys()) + j])
-            tmp_corrected = [int(x) for x in ss.rankdata(tmp)]
+            tmp_corrected = [int(x) for x in rankdata(tmp)]
             priority_worker_per_task_corrected.append(tmp_corrected)
         return priority_worker_per_task_corrected
 
@@ -2138,12 +2069,13 @@ class MS_RCPSPModel_Variant(MS_RCPSPModel):
         elif encoding_name == 'priority_worker_per_task':
             # change the resource permutation priority lists in the solution from int_vector and set the permutation
             # with self.fixed_permutation and the modes with self.fixed_modes
+            from scipy.stats import rankdata
             priority_worker_per_task_corrected = []
             for i in range(self.n_jobs_non_dummy):
                 tmp = []
                 for j in range(len(self.employees.keys())):
                     tmp.append(int_vector[i*len(self.employees.keys())+j])
-                tmp_corrected = [int(x) for x in ss.rankdata(tmp)]
+                tmp_corrected = [int(x) for x in rankdata(tmp)]
                 priority_worker_per_task_corrected.append(tmp_corrected)
             rcpsp_sol = MS_RCPSPSolution_Variant(problem=self,
                                                  priority_list_task=self.fixed_permutation,
@@ -2279,7 +2211,12 @@ def cluster_employees_to_resource_types(ms_rcpsp_problem: MS_RCPSPModel):
     return skills_representation_str,  skills_dict
 
 
-def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPSPModel_Variant]):
+def create_np_data(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPSPModel_Variant]) -> Dict[str, np.array]:
+    """
+    Arrays describing the instance, as taken by the numba sgs kernels
+    (tasks in the order of tasks_list, modes sorted, resources/skills/employees in the order of
+    resources_list/skills_list/employees_list).
+    """
     consumption_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode,
                                   len(rcpsp_problem.resources_list)), dtype=np.int32)
     is_releasable_array = np.zeros((rcpsp_problem.n_jobs, rcpsp_problem.max_number_of_mode,
@@ -2291,10 +2228,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
     duration_array = np.zeros((rcpsp_problem.n_jobs,
                                rcpsp_problem.max_number_of_mode), dtype=np.int)
 
-    predecessors = np.zeros((rcpsp_problem.n_jobs,
-                             rcpsp_problem.n_jobs), dtype=np.int)
-    successors = np.zeros((rcpsp_problem.n_jobs,
-                           rcpsp_problem.n_jobs), dtype=np.int)
     horizon = rcpsp_problem.horizon
     ressource_available = np.zeros((len(rcpsp_problem.resources_list), horizon), dtype=np.int32)
     worker_available = np.zeros((len(rcpsp_problem.employees_list), horizon), dtype=np.int32)
@@ -2325,7 +2258,6 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
             if rcpsp_problem.special_constraints.start_times_window[t][0] is not None:
                 minimum_starting_time_array[rcpsp_problem.index_task[t]] = \
                     rcpsp_problem.special_constraints.start_times_window[t][0]
-    task_index = {rcpsp_problem.tasks_list[i]: i for i in range(rcpsp_problem.n_jobs)}
     for k in range(len(rcpsp_problem.resources_list)):
         ressource_available[k, :] = \
             rcpsp_problem.resources_availability[rcpsp_problem.resources_list[k]][:horizon]
@@ -2345,12 +2277,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
             worker_skills[emp, s] = rcpsp_problem.employees[rcpsp_problem.employees_list[emp]]\
                 .dict_skill.get(rcpsp_problem.skills_list[s],
                                 SkillDetail(skill_value=0, efficiency_ratio=0, experience=0)).skill_value
-    for i in range(len(rcpsp_problem.tasks_list)):
-        task = rcpsp_problem.tasks_list[i]
-        for s in rcpsp_problem.successors[task]:
-            index_s = task_index[s]
-            predecessors[index_s, i] = 1
-            successors[i, index_s] = 1
+    successors_indptr, successors_indices = build_successors_csr(rcpsp_problem.tasks_list,
+                                                                 rcpsp_problem.successors)
 
     if rcpsp_problem.includes_special_constraint():
         start_at_end_plus_offset = np.zeros((len(rcpsp_problem.special_constraints.start_at_end_plus_offset), 3),
@@ -2373,13 +2301,55 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
         preemptive_tag = np.ones((rcpsp_problem.n_jobs), dtype=np.int32)
         for t in rcpsp_problem.preemptive_indicator:
             preemptive_tag[rcpsp_problem.index_task[t]] = 1 if rcpsp_problem.preemptive_indicator[t] else 0
+    np_data = {"consumption_array": consumption_array,
+               "is_releasable": is_releasable_array,
+               "skills_needs": skills_need,
+               "duration_array": duration_array,
+               "horizon": horizon,
+               "ressource_available": ressource_available,
+               "ressource_renewable": ressource_renewable,
+               "worker_available": worker_available,
+               "worker_skills": worker_skills,
+               "minimum_starting_time_array": minimum_starting_time_array,
+               "successors_indptr": successors_indptr,
+               "successors_indices": successors_indices,
+               "consider_partial_preemptive": consider_partial_preemptive}
+    if rcpsp_problem.includes_special_constraint():
+        np_data["start_at_end_plus_offset"] = start_at_end_plus_offset
+        np_data["start_after_nunit"] = start_after_nunit
+    if rcpsp_problem.preemptive:
+        np_data["preemptive_tag"] = preemptive_tag
+    return np_data
+
+
+def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPSPModel_Variant],
+                                     np_data: Dict[str, np.array] = None):
+    # np_data : output of create_np_data, recomputed from the model if not given
+    if np_data is None:
+        np_data = create_np_data(rcpsp_problem)
+    consumption_array = np_data["consumption_array"]
+    is_releasable_array = np_data["is_releasable"]
+    skills_need = np_data["skills_needs"]
+    duration_array = np_data["duration_array"]
+    horizon = np_data["horizon"]
+    ressource_available = np_data["ressource_available"]
+    ressource_renewable = np_data["ressource_renewable"]
+    worker_available = np_data["worker_available"]
+    worker_skills = np_data["worker_skills"]
+    minimum_starting_time_array = np_data["minimum_starting_time_array"]
+    successors_indptr = np_data["successors_indptr"]
+    successors_indices = np_data["successors_indices"]
+    consider_partial_preemptive = np_data["consider_partial_preemptive"]
+    start_at_end_plus_offset = np_data.get("start_at_end_plus_offset", None)
+    start_after_nunit = np_data.get("start_after_nunit", None)
+    preemptive_tag = np_data.get("preemptive_tag", None)
 
     # modes_array,          # modes=array(task)->0, 1...
     # consumption_array,    # consumption_array=array3D(task, mode, res),
     # skills_needs,         # array(task, mode, skill)
     # duration_array,       # array(task, mode) -> d
-    # predecessors,         # array(task, task) -> bool
-    # successors,           # array(task, task)->bool
+    # successors_indptr,    # array(task+1), csr row pointer of the precedence graph
+    # successors_indices,   # array(nb_precedences)->successor task index
     # horizon,              # int
     # ressource_available,  # array(res, times)->int
     # ressource_renewable,  # array(res)->bool
@@ -2397,9 +2367,9 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
                                minimum_starting_time_array=minimum_starting_time_array,
                                start_at_end_plus_offset=start_at_end_plus_offset,
                                start_after_nunit=start_after_nunit,
-                               predecessors=predecessors,
+                               successors_indptr=successors_indptr,
                                preemptive_tag=preemptive_tag,
-                               successors=successors,
+                               successors_indices=successors_indices,
                                horizon=horizon,
                                ressource_available=ressource_available,
                                ressource_renewable=ressource_renewable,
@@ -2416,9 +2386,9 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
                                worker_available=worker_available,
                                duration_array=duration_array,
                                minimum_starting_time_array=minimum_starting_time_array,
-                               predecessors=predecessors,
+                               successors_indptr=successors_indptr,
                                preemptive_tag=preemptive_tag,
-                               successors=successors,
+                               successors_indices=successors_indices,
                                horizon=horizon,
                                ressource_available=ressource_available,
                                ressource_renewable=ressource_renewable,
@@ -2433,8 +2403,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
                                    worker_available=worker_available,
                                    duration_array=duration_array,
                                    minimum_starting_time_array=minimum_starting_time_array,
-                                   predecessors=predecessors,
-                                   successors=successors,
+                                   successors_indptr=successors_indptr,
+                                   successors_indices=successors_indices,
                                    horizon=horizon,
                                    preemptive_tag=preemptive_tag,
                                    ressource_available=ressource_available,
@@ -2443,15 +2413,17 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
                                    is_releasable=is_releasable_array,
                                    consider_partial_preemptive=consider_partial_preemptive)
     else:
-        func_sgs = partial(sgs_fast_ms,
+        parallel_sgs = getattr(rcpsp_problem, "sgs", ScheduleGenerationScheme.SERIAL_SGS) \
+            == ScheduleGenerationScheme.PARALLEL_SGS
+        func_sgs = partial(sgs_fast_ms_parallel if parallel_sgs else sgs_fast_ms,
                            consumption_array=consumption_array,
                            skills_needs=skills_need,
                            worker_skills=worker_skills,
                            worker_available=worker_available,
                            duration_array=duration_array,
                            minimum_starting_time_array=minimum_starting_time_array,
-                           predecessors=predecessors,
-                           successors=successors,
+                           successors_indptr=successors_indptr,
+                           successors_indices=successors_indices,
                            horizon=horizon,
                            ressource_available=ressource_available,
                            ressource_renewable=ressource_renewable,
@@ -2463,8 +2435,8 @@ def create_np_data_and_jit_functions(rcpsp_problem: Union[MS_RCPSPModel, MS_RCPS
                                    worker_available=worker_available,
                                    duration_array=duration_array,
                                    minimum_starting_time_array=minimum_starting_time_array,
-                                   predecessors=predecessors,
-                                   successors=successors,
+                                   successors_indptr=successors_indptr,
+                                   successors_indices=successors_indices,
                                    horizon=horizon,
                                    ressource_available=ressource_available,
                                    ressource_renewable=ressource_renewable,
@@ -8,7 +8,7 @@ from discrete_optimization.rcpsp_multiskill.rcpsp_multiskill import MS_RCPSPSolu
     MS_RCPSPModel, MS_RCPSPModel_Variant, Employee, SkillDetail, MS_RCPSPSolution
 import os
 import sys
-from discrete_optimization.generic_tools.path_tools import abspath_from_file
+from discrete_optimization.generic_tools.path_tools import abspath_from_file, listdir_cached
 path_to_data =\
     os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/rcpsp_multiskill/dataset_def/")
 folder_to_do_solution = \
@@ -21,7 +21,7 @@ folder_to_benchmark_solution =\
 
 
 def get_data_available():
-    files = [f for f in os.listdir(path_to_data) if "pk" not in f and "json" not in f]
+    files = [f for f in listdir_cached(path_to_data) if "pk" not in f and "json" not in f]
     return [os.path.join(path_to_data, f) for f in files]
 
 
@@ -129,14 +129,11 @@ def parse_imopse(input_data, max_horizon=None, one_unit_per_task=True, preemptiv
                     i = i+2
                     continue
                 else:
-                    if "precedence" not in task_dict[task_id]:
-                        task_dict[task_id]["precedence"] = []
-                    task_dict[task_id]["precedence"] += [int(words[i])]
-                    if int(words[i]) not in task_dict:
-                        task_dict[int(words[i])] = {"id": int(words[i]), "successors": [], "skills": {}}
-                    if "successors" not in task_dict[int(words[i])]:
-                        task_dict[int(words[i])]["successors"] = []
-                    task_dict[int(words[i])]["successors"] += [task_id]
+                    predecessor = int(words[i])
+                    task_dict[task_id].setdefault("precedence", []).append(predecessor)
+                    if predecessor not in task_dict:
+                        task_dict[predecessor] = {"id": predecessor, "successors": [], "skills": {}}
+                    task_dict[predecessor]["successors"].append(task_id)
                     i += 1
     # print(resource_dict)
     # print(task_dict)
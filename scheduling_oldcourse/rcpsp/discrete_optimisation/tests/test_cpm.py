@@ -0,0 +1,87 @@
+import os
+import networkx as nx
+import numpy as np
+import pytest
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file, path_to_data
+from discrete_optimization.rcpsp.solver.cpm import CPM, run_partial_classic_cpm
+
+FILES = ["j301_1.sm", "j1201_1.sm", "j1010_1.mm"]
+
+
+def longest_path_dates(rcpsp_model, partial_schedule=None):
+    # reference dates : longest paths over a networkx topological order, with the minimum duration of each task
+    # and the tasks of partial_schedule fixed at their dates, like the previous heap based passes
+    if partial_schedule is None:
+        partial_schedule = {}
+    graph = nx.DiGraph()
+    graph.add_nodes_from(rcpsp_model.tasks_list)
+    graph.add_edges_from((t, s) for t in rcpsp_model.successors for s in rcpsp_model.successors[t])
+    duration = {t: min(rcpsp_model.mode_details[t][m]["duration"] for m in rcpsp_model.mode_details[t])
+                for t in rcpsp_model.tasks_list}
+    order = list(nx.topological_sort(graph))
+    esd, efd, lsd, lfd = {}, {}, {}, {}
+    for t in order:
+        if t in partial_schedule:
+            esd[t], efd[t] = partial_schedule[t]
+        else:
+            esd[t] = max([efd[p] for p in graph.predecessors(t)], default=0)
+            efd[t] = esd[t]+duration[t]
+    makespan = max(efd.values())
+    for t in reversed(order):
+        if t in partial_schedule:
+            lsd[t], lfd[t] = partial_schedule[t]
+        else:
+            lfd[t] = min([lsd[s] for s in graph.successors(t)], default=makespan)
+            lsd[t] = lfd[t]-duration[t]
+    return esd, efd, lsd, lfd
+
+
+def check_critical_path(cpm, critical_path, map_node):
+    assert critical_path[0] == cpm.source and critical_path[-1] == cpm.sink
+    for t, next_t in zip(critical_path[:-1], critical_path[1:]):
+        assert next_t in cpm.rcpsp_model.successors[t]
+        assert map_node[t]._ESD == map_node[t]._LSD
+        assert map_node[t]._EFD == map_node[next_t]._ESD
+
+
+@pytest.mark.parametrize("file_name", FILES)
+def test_cpm_against_longest_paths(file_name):
+    rcpsp_model = parse_file(os.path.join(path_to_data, file_name))
+    cpm = CPM(rcpsp_model)
+    critical_path = cpm.run_classic_cpm()
+    esd, efd, lsd, lfd = longest_path_dates(rcpsp_model)
+    for t in rcpsp_model.tasks_list:
+        i = cpm.index_task[t]
+        assert (cpm.esd[i], cpm.efd[i], cpm.lsd[i], cpm.lfd[i]) == (esd[t], efd[t], lsd[t], lfd[t])
+        node = cpm.map_node[t]
+        assert (node._ESD, node._EFD, node._LSD, node._LFD) == (esd[t], efd[t], lsd[t], lfd[t])
+    check_critical_path(cpm, critical_path, cpm.map_node)
+    order = cpm.return_order_cpm()
+    assert sorted(order) == sorted(rcpsp_model.tasks_list)
+    keys = [(lsd[t], lsd[t]-esd[t]) for t in order]
+    assert keys == sorted(keys)
+    result_storage = cpm.solve()
+    if not rcpsp_model.is_rcpsp_multimode():
+        # the sgs solutions of solve use mode 1 for every task, not necessarily feasible on multimode instances
+        assert all(rcpsp_model.satisfy(s) for s, f in result_storage.list_solution_fits)
+    assert all(rcpsp_model.evaluate(s)["makespan"] >= efd[rcpsp_model.sink_task]
+               for s, f in result_storage.list_solution_fits)
+
+
+@pytest.mark.parametrize("file_name", FILES)
+def test_partial_cpm_against_longest_paths(file_name):
+    rcpsp_model = parse_file(os.path.join(path_to_data, file_name))
+    cpm = CPM(rcpsp_model)
+    cpm.run_classic_cpm()
+    solution = cpm.solve().get_best_solution()
+    # the first third of the tasks (by start time of a feasible schedule) are fixed
+    tasks = sorted(rcpsp_model.tasks_list, key=solution.get_start_time)[:len(rcpsp_model.tasks_list)//3]
+    partial_schedule = {t: (solution.get_start_time(t), solution.get_end_time(t)) for t in tasks}
+    critical_path, map_node = run_partial_classic_cpm(partial_schedule, cpm)
+    esd, efd, lsd, lfd = longest_path_dates(rcpsp_model, partial_schedule)
+    for t in rcpsp_model.tasks_list:
+        node = map_node[t]
+        assert (node._ESD, node._EFD, node._LSD, node._LFD) == (esd[t], efd[t], lsd[t], lfd[t])
+    assert critical_path[-1] == cpm.sink
+    arrays = cpm.compute_cpm_arrays(partial_schedule)
+    assert all(isinstance(a, np.ndarray) and a.shape == (len(rcpsp_model.tasks_list),) for a in arrays)
@@ -0,0 +1,13 @@
+import pytest
+from discrete_optimization.benchmarks.import_time_benchmark import import_time, CORE_MODULES, LAZY_MODULES
+
+# cold import budget (seconds) of each module, in a fresh interpreter. Before the lazy imports,
+# rcpsp_parser took ~1.3 sec (matplotlib, networkx, deap...), it is ~0.3 sec now, most of it numba.
+IMPORT_BUDGET_SECONDS = 1.
+
+
+@pytest.mark.parametrize("module", ["discrete_optimization"]+CORE_MODULES)
+def test_cold_import_budget(module):
+    times = import_time(module)
+    assert times[module] < IMPORT_BUDGET_SECONDS
+    assert [m for m in LAZY_MODULES if m in times] == []
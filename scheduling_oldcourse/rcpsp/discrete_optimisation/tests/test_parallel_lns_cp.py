@@ -0,0 +1,154 @@
+import os
+import random
+import pytest
+
+pytest.importorskip("mip")
+pytest.importorskip("minizinc")
+
+from discrete_optimization.generic_tools.cp_tools import ParametersCP, SignEnum
+from discrete_optimization.generic_tools.do_problem import build_aggreg_function_and_params_objective
+from discrete_optimization.generic_tools.lns_cp import LNS_CP
+from discrete_optimization.generic_tools.lns_mip import InitialSolutionFromSolver
+from discrete_optimization.generic_tools.parallel_lns_cp import ParallelLNS
+from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPSolution
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file, path_to_data
+from discrete_optimization.rcpsp.solver.cpm import CPM
+from discrete_optimization.rcpsp.solver.rcpsp_lns_cp import ConstraintHandlerFixStartTime, \
+    ConstraintHandlerTimeWindow, ConstraintHandlerResourceSubset, ConstraintHandlerRandomSubset
+
+
+HANDLERS = [ConstraintHandlerTimeWindow, ConstraintHandlerResourceSubset, ConstraintHandlerRandomSubset]
+
+
+class StubResult:
+    def __init__(self, solutions):
+        self.solutions = solutions
+        self.status = "SATISFIED"
+
+
+class StubChildInstance:
+    """
+    Branch of the StubInstance : keeps the constraints added, and "solves" by returning the sgs schedules
+    of a few random permutations.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.constraints = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def add_string(self, constraint):
+        self.constraints.append(constraint)
+
+    def solve(self, timeout, intermediate_solutions, free_search, processes):
+        solutions = []
+        for i in range(3):
+            permutation = list(range(self.problem.n_jobs_non_dummy))
+            random.shuffle(permutation)
+            solutions.append(RCPSPSolution(problem=self.problem, rcpsp_permutation=permutation))
+        return StubResult(solutions)
+
+
+class StubInstance:
+    def __init__(self, problem):
+        self.problem = problem
+        self.children = []
+
+    def branch(self):
+        child = StubChildInstance(self.problem)
+        self.children.append(child)
+        return child
+
+
+class StubCPSolver:
+    """
+    Interface of CP_RCPSP_MZN used by LNS_CP and the ConstraintHandlerFixStartTime, the constraints are
+    tuples instead of minizinc strings.
+    """
+    def __init__(self, problem, multimode: bool = False):
+        self.problem = problem
+        self.instance = StubInstance(problem)
+        self.aggreg_from_sol, _, self.params_objective_function = \
+            build_aggreg_function_and_params_objective(problem=problem)
+        if multimode:
+            self.constraint_task_to_mode = lambda task, mode: [("mode", task, mode)]
+
+    def constraint_start_time_string(self, task, start_time, sign: SignEnum = SignEnum.EQUAL):
+        return "start", task, sign, start_time
+
+    def constraint_end_time_string(self, task, end_time, sign: SignEnum = SignEnum.EQUAL):
+        return "end", task, sign, end_time
+
+    def retrieve_solutions(self, result, parameters_cp: ParametersCP = ParametersCP.default()) -> ResultStorage:
+        return ResultStorage(list_solution_fits=[(s, self.aggreg_from_sol(s)) for s in result.solutions],
+                             mode_optim=self.params_objective_function.sense_function,
+                             limit_store=False)
+
+
+def build_stub_lns_worker(problem, index_worker):
+    lns_solver = LNS_CP(problem=problem,
+                        cp_solver=StubCPSolver(problem),
+                        initial_solution_provider=InitialSolutionFromSolver(CPM(problem)),
+                        constraint_handler=HANDLERS[index_worker % len(HANDLERS)](problem))
+    return lns_solver, ParametersCP.default_fast_lns()
+
+
+def test_constraint_handler_fix_start_time_is_abstract():
+    problem = parse_file(os.path.join(path_to_data, "j301_1.sm"))
+    with pytest.raises(TypeError):
+        ConstraintHandlerFixStartTime(problem)
+
+
+@pytest.mark.parametrize("file_name", ["j301_1.sm", "j1010_1.mm"])
+@pytest.mark.parametrize("handler_class", HANDLERS)
+def test_constraint_handlers_fix_start_times(file_name, handler_class):
+    random.seed(0)
+    problem = parse_file(os.path.join(path_to_data, file_name))
+    multimode = problem.is_rcpsp_multimode()
+    cp_solver = StubCPSolver(problem, multimode=multimode)
+    store = CPM(problem).solve()
+    solution = store.get_best_solution()
+    handler = handler_class(problem)
+    with cp_solver.instance.branch() as child:
+        constraints = handler.adding_constraint_from_results_store(cp_solver=cp_solver,
+                                                                   child_instance=child,
+                                                                   result_storage=store,
+                                                                   last_result_store=store)
+        assert child.constraints == list(constraints)
+    fixed = {c[1]: c[3] for c in constraints if c[0] == "start"}
+    assert all(c[2] == SignEnum.EQUAL for c in constraints if c[0] == "start")
+    assert 0 < len(fixed) < len(problem.tasks_list)
+    assert problem.sink_task not in fixed
+    assert all(fixed[task] == solution.get_start_time(task) for task in fixed)
+    assert [c for c in constraints if c[0] == "end"] == [("end", problem.sink_task, SignEnum.LEQ,
+                                                          solution.get_end_time(problem.sink_task))]
+    modes = problem.build_mode_dict(solution.rcpsp_modes)
+    fixed_modes = {c[1]: c[2] for c in constraints if c[0] == "mode"}
+    if multimode:
+        assert fixed_modes == {task: modes[task] for task in fixed if task in problem.index_task_non_dummy}
+    else:
+        assert fixed_modes == {}
+
+
+def test_parallel_lns_stub_cp_solver():
+    problem = parse_file(os.path.join(path_to_data, "j301_1.sm"))
+    cpm_store = CPM(problem).solve()
+    parallel_lns = ParallelLNS(problem=problem,
+                               build_worker=build_stub_lns_worker,
+                               nb_workers=3,
+                               nb_process=3,
+                               seed=0)
+    result_storage = parallel_lns.solve(nb_iteration_lns=5)
+    assert len(parallel_lns.workers_stats) == 3
+    assert [stats["constraint_handler"] for stats in parallel_lns.workers_stats] == \
+        [handler_class.__name__ for handler_class in HANDLERS]
+    assert all(problem.satisfy(s) for s, f in result_storage.list_solution_fits)
+    best_solution = result_storage.get_best_solution()
+    assert best_solution.problem is problem
+    assert problem.evaluate(best_solution)["makespan"] <= \
+        min(problem.evaluate(s)["makespan"] for s, f in cpm_store.list_solution_fits)
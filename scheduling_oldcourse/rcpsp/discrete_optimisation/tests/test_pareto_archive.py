@@ -0,0 +1,75 @@
+import random
+import numpy as np
+import pytest
+from discrete_optimization.generic_tools.do_problem import ModeOptim, TupleFitness
+from discrete_optimization.generic_tools.result_storage.pareto_archive import ParetoArchive, SortedFront2D, \
+    ArrayParetoArchive, build_pareto_archive
+from discrete_optimization.generic_tools.result_storage.result_storage import ParetoFront
+
+
+def naive_paretos(solution_fits, maximize):
+    # previous ParetoFront.add_point, replayed over the solutions with the TupleFitness comparisons
+    paretos = []
+    for solution, tuple_fitness in solution_fits:
+        if maximize and all(tuple_fitness >= t[1] for t in paretos):
+            paretos = [p for p in paretos+[(solution, tuple_fitness)] if not p[1] < tuple_fitness]
+        if not maximize and all(tuple_fitness <= t[1] for t in paretos):
+            paretos = [p for p in paretos+[(solution, tuple_fitness)] if not p[1] > tuple_fitness]
+    return paretos
+
+
+def random_solution_fits(nb_solutions, nb_objectives, seed):
+    rng = np.random.RandomState(seed)
+    # few distinct values, so that there are equal and weakly dominated points
+    vectors = rng.randint(0, 12, size=(nb_solutions, nb_objectives))
+    return [("s"+str(i), TupleFitness(vectors[i].astype(np.float64), nb_objectives)) for i in range(nb_solutions)]
+
+
+def sorted_vectors(paretos):
+    return sorted(tuple(t.vector_fitness) for s, t in paretos)
+
+
+def test_pareto_archive_is_abstract():
+    with pytest.raises(TypeError):
+        ParetoArchive(2)
+    assert isinstance(build_pareto_archive(2), SortedFront2D)
+    assert isinstance(build_pareto_archive(3), ArrayParetoArchive)
+
+
+@pytest.mark.parametrize("archive_class", [SortedFront2D, ArrayParetoArchive])
+@pytest.mark.parametrize("seed", range(3))
+def test_archive_2d_against_brute_force(archive_class, seed):
+    archive = SortedFront2D() if archive_class is SortedFront2D else ArrayParetoArchive(2, initial_capacity=2)
+    rng = random.Random(seed)
+    points = []
+    for i in range(200):
+        point = np.array([rng.randint(0, 30), rng.randint(0, 30)], dtype=np.float64)
+        points.append(point)
+        array = np.array(points)
+        # dominance[k, l] : points[k] dominates points[l]
+        dominance = np.all(array[:, None] >= array[None], axis=2) & np.any(array[:, None] > array[None], axis=2)
+        dominated = bool(np.any(dominance[:, -1]))
+        assert archive.is_dominated(point) == dominated
+        assert archive.add(point, i) == (not dominated)
+        front = list(np.flatnonzero(~np.any(dominance, axis=0)))
+        assert sorted(archive.get_payloads()) == front
+        assert len(archive) == len(front)
+        assert sorted(map(tuple, archive.get_points())) == sorted(tuple(points[k]) for k in front)
+
+
+@pytest.mark.parametrize("mode_optim", [ModeOptim.MAXIMIZATION, ModeOptim.MINIMIZATION])
+@pytest.mark.parametrize("nb_objectives", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(3))
+def test_pareto_front_against_previous_add_point(mode_optim, nb_objectives, seed):
+    solution_fits = random_solution_fits(300, nb_objectives, seed)
+    maximize = mode_optim == ModeOptim.MAXIMIZATION
+    pareto_front = ParetoFront(list_solution_fits=solution_fits[:50], best_solution=None, mode_optim=mode_optim)
+    for solution, fitness in solution_fits[50:]:
+        pareto_front.add_solution(solution, fitness)
+    expected = naive_paretos(solution_fits, maximize)
+    assert sorted(s for s, t in pareto_front.paretos) == sorted(s for s, t in expected)
+    assert sorted_vectors(pareto_front.paretos) == sorted_vectors(expected)
+    assert pareto_front.len_pareto_front() == len(expected)
+    pareto_front.finalize()
+    assert sorted(s for s, t in pareto_front.paretos) == sorted(s for s, t in expected)
+    assert len(pareto_front.list_solution_fits) == len(solution_fits)
@@ -0,0 +1,111 @@
+import os
+import numpy as np
+import pytest
+from discrete_optimization.rcpsp.rcpsp_binary_format import FORMAT_VERSION, read_npz
+from discrete_optimization.rcpsp.rcpsp_model import RCPSPModel, RCPSPSolution, create_np_data
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file, path_to_data
+from discrete_optimization.rcpsp_multiskill import rcpsp_multiskill
+from discrete_optimization.rcpsp_multiskill.rcpsp_multiskill import MS_RCPSPModel, Employee, SkillDetail
+
+
+def assert_np_data_equal(np_data_1, np_data_2):
+    assert set(np_data_1) == set(np_data_2)
+    for key in np_data_1:
+        assert np.array_equal(np.asarray(np_data_1[key]), np.asarray(np_data_2[key])), key
+
+
+def build_ms_model() -> MS_RCPSPModel:
+    horizon = 30
+    skills = {"s1", "s2"}
+    employees = {0: Employee(dict_skill={"s1": SkillDetail(1., 1., 1.)}, calendar_employee=[True]*horizon),
+                 1: Employee(dict_skill={"s1": SkillDetail(1., 1., 1.), "s2": SkillDetail(2., 1., 1.)},
+                             calendar_employee=[True]*10+[False]*5+[True]*15, salary=2.),
+                 2: Employee(dict_skill={"s2": SkillDetail(1., 1., 1.)}, calendar_employee=[True]*horizon)}
+    mode_details = {1: {1: {"duration": 0}},
+                    2: {1: {"duration": 3, "R1": 1, "s1": 1}, 2: {"duration": 5, "R1": 1, "s2": 1}},
+                    3: {1: {"duration": 2, "R2": 2, "s2": 2}},
+                    4: {1: {"duration": 4, "s1": 1, "s2": 1}},
+                    5: {1: {"duration": 0}}}
+    successors = {1: [2, 3], 2: [4], 3: [4], 4: [5], 5: []}
+    return MS_RCPSPModel(skills_set=skills,
+                         resources_set={"R1", "R2"},
+                         non_renewable_resources=set(),
+                         resources_availability={"R1": np.array([1]*horizon), "R2": np.array([2]*horizon)},
+                         employees=employees,
+                         employees_availability=[3]*horizon,
+                         mode_details=mode_details,
+                         successors=successors,
+                         horizon=horizon,
+                         tasks_list=[1, 2, 3, 4, 5],
+                         employees_list=[0, 1, 2],
+                         source_task=1,
+                         sink_task=5)
+
+
+@pytest.mark.parametrize("file_name", ["j301_1.sm", "j1010_1.mm"])
+@pytest.mark.parametrize("mmap_mode", [None, "c"])
+def test_rcpsp_binary_round_trip(tmp_path, file_name, mmap_mode):
+    model = parse_file(os.path.join(path_to_data, file_name))
+    path = str(tmp_path / "instance.npz")
+    model.save_binary(path)
+    loaded = RCPSPModel.load_binary(path, mmap_mode=mmap_mode)
+    assert loaded.__class__ is model.__class__
+    assert loaded.tasks_list == model.tasks_list
+    assert loaded.resources_list == model.resources_list
+    assert loaded.non_renewable_resources == model.non_renewable_resources
+    assert loaded.resources == model.resources
+    assert loaded.mode_details == model.mode_details
+    assert {t: sorted(loaded.successors[t]) for t in loaded.successors} == \
+        {t: sorted(model.successors[t]) for t in model.successors}
+    assert (loaded.source_task, loaded.sink_task, loaded.horizon) == (model.source_task, model.sink_task, model.horizon)
+    # the arrays read from the file are the ones the model computes from its dictionaries
+    assert_np_data_equal(loaded.np_data, create_np_data(model))
+    rng = np.random.RandomState(0)
+    for i in range(20):
+        permutation = rng.permutation(model.n_jobs_non_dummy).tolist()
+        modes = [rng.choice(sorted(model.mode_details[t])) for t in model.tasks_list
+                 if t in model.index_task_non_dummy]
+        solution = RCPSPSolution(problem=model, rcpsp_permutation=permutation, rcpsp_modes=modes)
+        solution_loaded = RCPSPSolution(problem=loaded, rcpsp_permutation=permutation, rcpsp_modes=modes)
+        assert solution_loaded.rcpsp_schedule == solution.rcpsp_schedule
+        assert loaded.evaluate(solution_loaded) == model.evaluate(solution)
+        assert loaded.satisfy(solution_loaded) == model.satisfy(solution)
+
+
+def test_ms_rcpsp_binary_round_trip(tmp_path):
+    model = build_ms_model()
+    path = str(tmp_path / "instance.npz")
+    model.save_binary(path)
+    loaded = MS_RCPSPModel.load_binary(path)
+    assert loaded.__class__ is model.__class__
+    assert loaded.tasks_list == model.tasks_list
+    assert loaded.employees_list == model.employees_list
+    assert loaded.mode_details == model.mode_details
+    assert loaded.successors == model.successors
+    assert loaded.employees_availability == model.employees_availability
+    for e in model.employees_list:
+        assert loaded.employees[e].calendar_employee == list(model.employees[e].calendar_employee)
+        assert loaded.employees[e].salary == model.employees[e].salary
+        assert {s: (d.skill_value, d.efficiency_ratio, d.experience)
+                for s, d in loaded.employees[e].dict_skill.items()} == \
+            {s: (d.skill_value, d.efficiency_ratio, d.experience)
+             for s, d in model.employees[e].dict_skill.items()}
+    for r in model.resources_set:
+        assert np.array_equal(loaded.resources_availability[r], model.resources_availability[r])
+    assert_np_data_equal(loaded.np_data, rcpsp_multiskill.create_np_data(loaded))
+
+
+def test_binary_format_version(tmp_path):
+    model = parse_file(os.path.join(path_to_data, "j301_1.sm"))
+    path = str(tmp_path / "instance.npz")
+    model.save_binary(path)
+    arrays = read_npz(path)
+    assert int(arrays["format_version"]) == FORMAT_VERSION
+    arrays["format_version"] = np.array(FORMAT_VERSION+1)
+    newer_path = str(tmp_path / "newer.npz")
+    np.savez(newer_path, **arrays)
+    with pytest.raises(ValueError):
+        RCPSPModel.load_binary(newer_path)
+    np.savez(str(tmp_path / "other.npz"), x=np.zeros(3))
+    with pytest.raises(ValueError):
+        RCPSPModel.load_binary(str(tmp_path / "other.npz"))
@@ -0,0 +1,81 @@
+import random
+import pytest
+from discrete_optimization.generic_tools.do_problem import ModeOptim
+from discrete_optimization.generic_tools.result_storage.result_storage import ResultStorage
+
+
+def naive_store(additions, maximize, nb_best_store=None):
+    # linear scan reference : distinct solutions in insertion order, the worst one (latest among equal
+    # fitnesses) dropped when more than nb_best_store are stored
+    stored = []
+    for solution, fitness in additions:
+        if any(s == solution for s, f in stored):
+            continue
+        stored.append((solution, fitness))
+        if nb_best_store is not None and len(stored) > nb_best_store:
+            worst = min(range(len(stored)),
+                        key=lambda i: (stored[i][1] if maximize else -stored[i][1], -i))
+            del stored[worst]
+    return stored
+
+
+def random_additions(nb_additions, nb_solutions, seed):
+    rng = random.Random(seed)
+    fitness_of = {"s"+str(i): rng.randint(0, 20) for i in range(nb_solutions)}
+    solutions = [rng.choice(list(fitness_of)) for i in range(nb_additions)]
+    return [(s, fitness_of[s]) for s in solutions]
+
+
+def best_of(stored, maximize):
+    best = max(f for s, f in stored) if maximize else min(f for s, f in stored)
+    best_indexes = [i for i in range(len(stored)) if stored[i][1] == best]
+    return stored[best_indexes[0]], stored[best_indexes[-1]], [stored[i] for i in best_indexes]
+
+
+@pytest.mark.parametrize("mode_optim", [ModeOptim.MAXIMIZATION, ModeOptim.MINIMIZATION])
+@pytest.mark.parametrize("limit_store", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_result_storage_against_linear_scan(mode_optim, limit_store, seed):
+    maximize = mode_optim == ModeOptim.MAXIMIZATION
+    nb_best_store = 15
+    additions = random_additions(nb_additions=300, nb_solutions=60, seed=seed)
+    storage = ResultStorage(list_solution_fits=additions[:10], mode_optim=mode_optim,
+                            limit_store=limit_store, nb_best_store=nb_best_store)
+    for k in range(10, len(additions)):
+        storage.add_solution(*additions[k])
+        stored = naive_store(additions[:k+1], maximize, nb_best_store if limit_store else None)
+        first_best, last_best, all_best = best_of(stored, maximize)
+        assert storage.get_best_solution_fit() == first_best
+        assert storage.get_best_solution() == first_best[0]
+        assert storage.get_last_best_solution() == last_best
+        assert storage.get_random_best_solution() in all_best
+        assert storage.min == min(f for s, f in stored)
+        assert storage.max == max(f for s, f in stored)
+    assert storage.list_solution_fits == stored
+    assert set(storage.map_solutions) == set(s for s, f in stored)
+    assert storage.heap == sorted((f for s, f in stored), reverse=maximize)
+    assert storage.size_heap == len(stored)
+
+
+def test_result_storage_memory_is_bounded():
+    storage = ResultStorage(list_solution_fits=[], mode_optim=ModeOptim.MINIMIZATION,
+                            limit_store=True, nb_best_store=10)
+    for i in range(1000):
+        storage.add_solution("s"+str(i), 1000-i)
+        assert len(storage._list) <= 2*10+1
+        assert len(storage.map_solutions) <= 10
+    assert storage.list_solution_fits == [("s"+str(i), 1000-i) for i in range(990, 1000)]
+    assert storage.get_best_solution_fit() == ("s999", 1)
+
+
+def test_result_storage_empty_and_duplicates():
+    storage = ResultStorage(list_solution_fits=[], mode_optim=ModeOptim.MAXIMIZATION)
+    assert storage.get_best_solution_fit() == (None, None)
+    assert storage.get_best_solution() is None
+    assert storage.min is None and storage.max is None
+    storage.add_solution("a", 1)
+    storage.add_solution("a", 1)
+    storage.add_solution("b", 3)
+    storage.add_solution("b", 3)
+    assert storage.list_solution_fits == [("a", 1), ("b", 3)]
+    assert storage.get_best_solution_fit() == ("b", 3)
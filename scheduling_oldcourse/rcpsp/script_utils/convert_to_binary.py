@@ -0,0 +1,66 @@
+import argparse
+import os
+import time
+import numpy as np
+from discrete_optimization.rcpsp.rcpsp_parser import parse_file
+from discrete_optimization.rcpsp.rcpsp_binary_format import save_binary, load_binary
+from script_utils.json_format import load_any_json
+
+
+def load_instance(path):
+    # json instances (see json_format) or psplib files (.sm, .mm, ...)
+    if path.endswith(".json"):
+        return load_any_json(path)
+    return parse_file(path)
+
+
+def check_same_arrays(model, loaded):
+    # the resources of the multiskill model can come in another order
+    order = [loaded.resources_list.index(r) for r in model.resources_list]
+    for key in model.np_data:
+        array = np.asarray(loaded.np_data[key])
+        if key in {"consumption_array", "is_releasable"}:
+            array = array[:, :, order]
+        if key in {"ressource_available", "ressource_renewable"}:
+            array = array[order]
+        assert np.array_equal(np.asarray(model.np_data[key]), array), key
+
+
+def convert_to_binary(paths, output_dir=None, check=False):
+    """
+    Convert instance files to the binary format of rcpsp_binary_format,
+    written next to the input files (or in output_dir) with the .npz extension.
+    Returns the list of the files written.
+    """
+    written = []
+    for path in paths:
+        folder = output_dir if output_dir is not None else os.path.dirname(path)
+        output = os.path.join(folder, os.path.splitext(os.path.basename(path))[0]+".npz")
+        t = time.perf_counter()
+        model = load_instance(path)
+        t_parse = time.perf_counter()-t
+        try:
+            save_binary(model, output)
+        except (NotImplementedError, TypeError) as e:
+            print("Skipped ", path, " : ", e)
+            continue
+        t = time.perf_counter()
+        loaded = load_binary(output)
+        t_load = time.perf_counter()-t
+        if check:
+            check_same_arrays(model, loaded)
+        print(path, " -> ", output, " parse ", round(t_parse, 4), " sec, load ", round(t_load, 4), " sec")
+        written += [output]
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert rcpsp/ms-rcpsp json or psplib instances "
+                                                 "to the binary format")
+    parser.add_argument("paths", nargs="+", help="instance files")
+    parser.add_argument("--output-dir", default=None, help="folder of the .npz files (default: next to the input)")
+    parser.add_argument("--check", action="store_true", help="check that the saved arrays are loaded back")
+    args = parser.parse_args()
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    convert_to_binary(args.paths, output_dir=args.output_dir, check=args.check)